@@ -0,0 +1,147 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent calls through ``AsyncClient`` versus one thread per call.
+
+The fake server delays each response to emulate network latency, so the
+rate reached reflects how many calls are in flight at once.  The server
+counts the requests it holds at once, and the client records the threads
+sending requests.  Requires Python 3.5+.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+from gcloud.aio import AsyncClient
+from gcloud.aio import AsyncHttp
+from gcloud.transport import PooledHttp
+
+from benchmarks import benchmark_utils
+
+
+class _Client(object):
+
+    def __init__(self, connection):
+        self.connection = connection
+
+
+class _InFlight(object):
+    """Server-side count of the requests held at once."""
+
+    def __init__(self, latency):
+        self._app = benchmark_utils.json_app({'kind': 'storage#object'})
+        self._latency = latency
+        self._lock = threading.Lock()
+        self._current = 0
+        self.peak = 0
+
+    def __call__(self, *args):
+        with self._lock:
+            self._current += 1
+            self.peak = max(self.peak, self._current)
+        try:
+            time.sleep(self._latency)
+            return self._app(*args)
+        finally:
+            with self._lock:
+                self._current -= 1
+
+
+class _RecordingHttp(object):
+    """Record the threads sending requests through ``http``."""
+
+    def __init__(self, http):
+        self._http = http
+        self.threads = set()
+
+    def request(self, *args, **kwargs):
+        self.threads.add(threading.current_thread())
+        return self._http.request(*args, **kwargs)
+
+
+class _RecordingAsyncHttp(AsyncHttp):
+    """Record the threads sending requests."""
+
+    def __init__(self, *args, **kwargs):
+        super(_RecordingAsyncHttp, self).__init__(*args, **kwargs)
+        self.threads = set()
+
+    def request(self, *args, **kwargs):
+        self.threads.add(threading.current_thread())
+        return super(_RecordingAsyncHttp, self).request(*args, **kwargs)
+
+
+def _threaded(server, num_calls):
+    http = _RecordingHttp(PooledHttp(max_size=num_calls))
+    conn = benchmark_utils.make_connection(server.base_url, http=http)
+
+    def _call(index):  # pylint: disable=W0613
+        conn.api_request('GET', '/b/bucket/o/blob')
+
+    elapsed = benchmark_utils.run_threads(_call, num_calls)
+    return num_calls / elapsed, len(http.threads)
+
+
+def _async(server, num_calls, max_connections):
+    conn = benchmark_utils.make_connection(server.base_url)
+    http = _RecordingAsyncHttp(max_connections=max_connections)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    async def _calls():
+        async with AsyncClient(_Client(conn), http=http) as aclient:
+            await asyncio.gather(
+                *[aclient.api_request('GET', '/b/bucket/o/blob')
+                  for _ in range(num_calls)])
+
+    elapsed = benchmark_utils.timed(loop.run_until_complete, _calls())
+    asyncio.set_event_loop(None)
+    loop.close()
+    return num_calls / elapsed, len(http.threads)
+
+
+def run(num_calls=1000, max_connections=100, latency=0.02):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    results = []
+    for label, func, args in (
+            ('thread per call', _threaded, (num_calls,)),
+            ('AsyncClient', _async, (num_calls, max_connections))):
+        app = _InFlight(latency)
+        with benchmark_utils.FakeServer(app) as server:
+            rate, threads = func(server, *args)
+        results.append((label, rate, 'req/s'))
+        results.append((label + ', peak in flight', app.peak, 'requests'))
+        results.append((label + ', sending threads', threads, 'threads'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1000,
+                        help='Concurrent calls issued.')
+    parser.add_argument('--connections', type=int, default=100,
+                        help='Connections opened by the AsyncClient.')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Simulated server latency, in seconds.')
+    args = parser.parse_args()
+    benchmark_utils.print_results(
+        'asyncio client surface',
+        run(num_calls=args.calls, max_connections=args.connections,
+            latency=args.latency))
+
+
+if __name__ == '__main__':
+    main()
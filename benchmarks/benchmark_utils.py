@@ -0,0 +1,193 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+import gzip
+import io
+import json
+import re
+import threading
+import time
+
+from six.moves import BaseHTTPServer  # pylint: disable=F0401
+from six.moves import socketserver  # pylint: disable=F0401
+from six.moves.urllib.parse import parse_qs  # pylint: disable=F0401
+
+from gcloud import connection
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+    # Concurrent benchmarks open hundreds of connections at once:  with the
+    # default backlog of 5, connections are dropped and retried after 1s.
+    request_queue_size = 1024
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    # HTTP/1.1 so that clients can keep connections alive.
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        length = int(self.headers.get('content-length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, content = self.server.app(
+            self.command, self.path, self.headers, body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeServer(object):
+    """Local HTTP server answering requests through ``app``.
+
+    ``app`` is called with ``(method, path, headers, body)`` and must return
+    a ``(status, headers, content)`` triple, ``content`` being bytes.
+    """
+
+    def __init__(self, app):
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.app = app
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return 'http://%s:%d' % (host, port)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+def json_app(payload):
+    """Build an ``app`` answering every request with ``payload`` as JSON."""
+    content = json.dumps(payload).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+
+    def _app(method, path, headers_in, body):  # pylint: disable=W0613
+        return 200, headers, content
+    return _app
+
+
+def json_response(payload, status=200, headers=None):
+    """Build a ``(status, headers, content)`` triple answering JSON."""
+    response_headers = {'Content-Type': 'application/json'}
+    response_headers.update(headers or {})
+    return status, response_headers, json.dumps(payload).encode('utf-8')
+
+
+def read_json(headers, body):
+    """Decode a JSON request body, gzip-compressed or not."""
+    if headers.get('content-encoding') == 'gzip':
+        body = gzip.GzipFile(fileobj=io.BytesIO(body)).read()
+    return json.loads(body.decode('utf-8'))
+
+
+def route_app(routes):
+    """Build an ``app`` dispatching requests to handlers.
+
+    ``routes`` is a sequence of ``(method, path_regex, handler)``;  the
+    handler of the first route matching a request is called with
+    ``(match, query, headers, body)``, where ``query`` is the parsed query
+    string (a dict of lists), and returns a ``(status, headers, content)``
+    triple.  Other requests are answered with a 404.
+    """
+    compiled = [(method, re.compile(pattern + '$'), handler)
+                for method, pattern, handler in routes]
+
+    def _app(method, path, headers, body):
+        path, _, query = path.partition('?')
+        for route_method, regex, handler in compiled:
+            match = regex.match(path)
+            if route_method == method and match is not None:
+                return handler(match, parse_qs(query), headers, body)
+        return json_response({'error': {'message': path}}, status=404)
+    return _app
+
+
+def point_at(conn, base_url):
+    """Send the requests of a connection to a fake server.
+
+    Connections accepting an ``api_base_url`` (e.g. for emulators) keep it
+    as an attribute.  Others build their URLs from a class attribute, so
+    the connection is switched to a subclass overriding it.
+    """
+    if hasattr(conn, 'api_base_url'):
+        conn.api_base_url = base_url
+    else:
+        conn_class = type(conn)
+        conn.__class__ = type(conn_class.__name__, (conn_class,),
+                              {'API_BASE_URL': base_url})
+    return conn
+
+
+def make_connection(base_url, http=None):
+    """Build a :class:`gcloud.connection.JSONConnection` for a fake server."""
+
+    class _FakeConnection(connection.JSONConnection):
+        API_BASE_URL = base_url
+        API_VERSION = 'v1'
+        API_URL_TEMPLATE = '{api_base_url}/fake/{api_version}{path}'
+
+    return _FakeConnection(http=http)
+
+
+def timed(func, *args, **kwargs):
+    """Call ``func`` and return the wall time it took, in seconds."""
+    start = time.time()
+    func(*args, **kwargs)
+    return time.time() - start
+
+
+def run_threads(target, num_threads):
+    """Run ``target(thread_index)`` in ``num_threads`` threads, return time."""
+    threads = [threading.Thread(target=target, args=(index,))
+               for index in range(num_threads)]
+
+    def _run():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return timed(_run)
+
+
+def print_results(title, results):
+    """Print ``results`` (a list of (label, value, unit)) as a table."""
+    print(title)
+    print('-' * len(title))
+    for label, value, unit in results:
+        print('%-40s %12.1f %s' % (label, value, unit))
+    print()
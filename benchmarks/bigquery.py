@@ -0,0 +1,125 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""BigQuery table data against a local fake backend.
+
+Covers ``Table.insert_data`` (streaming inserts) and ``Table.fetch_data``
+(paged reads, including row parsing).
+"""
+
+import argparse
+
+from gcloud.bigquery.client import Client
+from gcloud.bigquery.table import SchemaField
+from gcloud.transport import PooledHttp
+
+from benchmarks import benchmark_utils
+
+
+SCHEMA = (
+    SchemaField('name', 'STRING', mode='REQUIRED'),
+    SchemaField('age', 'INTEGER', mode='REQUIRED'),
+    SchemaField('score', 'FLOAT'),
+    SchemaField('active', 'BOOLEAN'),
+)
+_TABLE_PATH = '/bigquery/v2/projects/[^/]+/datasets/[^/]+/tables/[^/]+'
+
+
+def _row(index):
+    return ('user-%d' % (index,), index % 100, index * 0.25, index % 2 == 0)
+
+
+class _FakeBigQuery(object):
+    """Just enough of the BigQuery API for the benchmark."""
+
+    def __init__(self, num_rows):
+        self.num_rows = num_rows
+        self.inserted = 0
+
+    def insert_all(self, match, query, headers, body):
+        self.inserted += len(benchmark_utils.read_json(headers, body)['rows'])
+        return benchmark_utils.json_response(
+            {'kind': 'bigquery#tableDataInsertAllResponse'})
+
+    def list_data(self, match, query, headers, body):
+        start = int(query.get('pageToken', ['0'])[0])
+        page_size = int(query.get('maxResults', ['10000'])[0])
+        end = min(start + page_size, self.num_rows)
+        payload = {
+            'kind': 'bigquery#tableDataList',
+            'totalRows': str(self.num_rows),
+            'rows': [{'f': [{'v': str(value).lower()
+                             if isinstance(value, bool) else str(value)}
+                            for value in _row(index)]}
+                     for index in range(start, end)],
+        }
+        if end < self.num_rows:
+            payload['pageToken'] = str(end)
+        return benchmark_utils.json_response(payload)
+
+    def app(self):
+        return benchmark_utils.route_app((
+            ('POST', _TABLE_PATH + '/insertAll', self.insert_all),
+            ('GET', _TABLE_PATH + '/data', self.list_data),
+        ))
+
+
+def run(num_rows=50000, batch_size=500):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    backend = _FakeBigQuery(num_rows)
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        client = Client(project='bench-project', http=PooledHttp())
+        benchmark_utils.point_at(client.connection, server.base_url)
+        table = client.dataset('bench_dataset').table('bench_table',
+                                                      schema=SCHEMA)
+        rows = [_row(index) for index in range(num_rows)]
+
+        def _insert():
+            for start in range(0, num_rows, batch_size):
+                errors = table.insert_data(rows[start:start + batch_size])
+                assert not errors
+
+        def _fetch():
+            fetched, page_token = 0, None
+            while True:
+                page, _, page_token = table.fetch_data(
+                    page_token=page_token)
+                fetched += len(page)
+                if page_token is None:
+                    return fetched
+
+        insert_time = benchmark_utils.timed(_insert)
+        assert backend.inserted == num_rows
+        fetch_time = benchmark_utils.timed(_fetch)
+
+    return [
+        ('Table.insert_data, %d rows/call' % (batch_size,),
+         num_rows / insert_time, 'rows/s'),
+        ('Table.fetch_data', num_rows / fetch_time, 'rows/s'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000,
+                        help='Rows inserted, then fetched.')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Rows per insert_data call.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('BigQuery', run(
+        num_rows=args.rows, batch_size=args.batch_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cloud Bigtable reads against a local gRPC stand-in.
+
+Covers ``Table.sample_row_keys`` and streaming ``ReadRows`` through the
+client's data stub (the tables here have no row-reading helper yet).
+Requires gRPC.
+"""
+
+import argparse
+
+from grpc.beta import implementations
+
+from gcloud.bigtable._generated import bigtable_data_pb2 as data_pb2
+from gcloud.bigtable._generated import (
+    bigtable_service_messages_pb2 as messages_pb2)
+from gcloud.bigtable._generated import bigtable_service_pb2
+from gcloud.bigtable.client import Client
+
+from benchmarks import benchmark_utils
+
+
+_NUM_SAMPLES = 100
+
+
+class _Credentials(object):
+
+    def create_scoped(self, scopes):  # pylint: disable=W0613
+        return self
+
+
+class _FakeBigtable(bigtable_service_pb2.BetaBigtableServiceServicer):
+    """Just enough of the Bigtable data API for the benchmark."""
+
+    def __init__(self, num_rows, cell_size):
+        self.num_rows = num_rows
+        self._value = b'x' * cell_size
+
+    def ReadRows(self, request, context):  # pylint: disable=W0613
+        for index in range(self.num_rows):
+            row_key = ('row-%08d' % (index,)).encode('ascii')
+            family = data_pb2.Family(name='cf', columns=[
+                data_pb2.Column(qualifier=b'col', cells=[
+                    data_pb2.Cell(timestamp_micros=1000, value=self._value),
+                ]),
+            ])
+            yield messages_pb2.ReadRowsResponse(row_key=row_key, chunks=[
+                messages_pb2.ReadRowsResponse.Chunk(row_contents=family),
+                messages_pb2.ReadRowsResponse.Chunk(commit_row=True),
+            ])
+
+    def SampleRowKeys(self, request, context):  # pylint: disable=W0613
+        for index in range(_NUM_SAMPLES):
+            yield messages_pb2.SampleRowKeysResponse(
+                row_key=('row-%08d' % (index * 1000,)).encode('ascii'),
+                offset_bytes=index * 1000)
+
+
+def run(num_rows=20000, num_samples=200, cell_size=256):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    server = bigtable_service_pb2.beta_create_BigtableService_server(
+        _FakeBigtable(num_rows, cell_size))
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    try:
+        client = Client(project='bench-project', credentials=_Credentials())
+        channel = implementations.insecure_channel('localhost', port)
+        client._data_stub_internal = (
+            bigtable_service_pb2.beta_create_BigtableService_stub(channel))
+        table = client.cluster('zone', 'cluster').table('table')
+
+        def _read_rows():
+            request_pb = messages_pb2.ReadRowsRequest(table_name=table.name)
+            rows = 0
+            for response in client._data_stub.ReadRows(
+                    request_pb, client.timeout_seconds):
+                rows += response.chunks[-1].commit_row
+            assert rows == num_rows
+
+        def _sample_row_keys():
+            for _ in range(num_samples):
+                assert len(list(table.sample_row_keys())) == _NUM_SAMPLES
+
+        read_time = benchmark_utils.timed(_read_rows)
+        sample_time = benchmark_utils.timed(_sample_row_keys)
+    finally:
+        server.stop(0)
+
+    return [
+        ('ReadRows (streaming)', num_rows / read_time, 'rows/s'),
+        ('Table.sample_row_keys', num_samples / sample_time, 'calls/s'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000,
+                        help='Rows streamed by ReadRows.')
+    parser.add_argument('--samples', type=int, default=200,
+                        help='SampleRowKeys calls.')
+    parser.add_argument('--size', type=int, default=256,
+                        help='Size of each cell value, in bytes.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Cloud Bigtable', run(
+        num_rows=args.rows, num_samples=args.samples, cell_size=args.size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""JSON encode / decode cost of each codec, per megabyte of payload.
+
+The payload mimics a large BigQuery ``insertAll`` request body.
+"""
+
+import argparse
+
+from gcloud import codec
+
+from benchmarks import benchmark_utils
+
+
+def _make_payload(num_rows):
+    return {
+        'kind': 'bigquery#tableDataInsertAllRequest',
+        'rows': [{
+            'insertId': 'row-%d' % (index,),
+            'json': {
+                'name': u'User \u00e9 %d' % (index,),
+                'age': index % 100,
+                'score': index * 0.25,
+                'active': index % 2 == 0,
+                'tags': ['alpha', 'beta', 'gamma'],
+            },
+        } for index in range(num_rows)],
+    }
+
+
+def _codecs():
+    codecs = [codec.StdlibJSONCodec()]
+    try:
+        codecs.append(codec.OrjsonCodec())
+    except RuntimeError:
+        pass
+    return codecs
+
+
+def run(num_rows=50000, repeat=5):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    payload = _make_payload(num_rows)
+    results = []
+    for json_codec in _codecs():
+        encoded = json_codec.dumps(payload)
+        megabytes = len(encoded) / float(1 << 20)
+        encode = min(benchmark_utils.timed(json_codec.dumps, payload)
+                     for _ in range(repeat))
+        decode = min(benchmark_utils.timed(json_codec.loads, encoded)
+                     for _ in range(repeat))
+        results.append(('%s dumps' % (json_codec.name,),
+                        encode * 1000 / megabytes, 'ms/MB'))
+        results.append(('%s loads' % (json_codec.name,),
+                        decode * 1000 / megabytes, 'ms/MB'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000,
+                        help='Rows in the encoded payload.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timings per codec (the best is reported).')
+    args = parser.parse_args()
+    benchmark_utils.print_results(
+        'JSON codecs', run(num_rows=args.rows, repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
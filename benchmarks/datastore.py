@@ -0,0 +1,463 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cloud Datastore hot paths against a local fake backend.
+
+Covers ``Client.get_multi``, ``Client.put_multi``, hot-key ``Client.get``
+(with and without an entity cache), query iteration and split (parallel)
+full-kind scans;  the fake backend speaks the
+protobuf-over-HTTP API.  Scans are also run against a backend adding a
+fixed latency to each query page, as the real service would, and
+ingestion (batches committed in turn, or by a ``BufferedWriter``) against
+one adding latency to each commit.  Exports of the kind to a file, and
+imports back, run against a backend adding both latencies.  Keys are
+completed one at a time by ``Client.allocate_ids``, with and without an
+``IdReservoir``, against a backend adding latency to each allocation.
+"""
+
+import argparse
+import tempfile
+import time
+
+from gcloud.datastore._generated import datastore_pb2
+from gcloud.datastore._generated import entity_pb2
+from gcloud.datastore._generated import query_pb2
+from gcloud.datastore.bulk import DELIMITED
+from gcloud.datastore.bulk import NDJSON
+from gcloud.datastore.bulk import _encode_delimited
+from gcloud.datastore.bulk import _read_delimited
+from gcloud.datastore.bulk import export_entities
+from gcloud.datastore.bulk import import_entities
+from gcloud.datastore.client import Client
+from gcloud.datastore.entity import Entity
+from gcloud.datastore.entity_cache import EntityCache
+from gcloud.datastore.helpers import entity_from_protobuf
+from gcloud.datastore.helpers import entity_to_protobuf
+from gcloud.datastore.id_reservoir import IdReservoir
+from gcloud.datastore.writer import BufferedWriter
+from gcloud.transport import PooledHttp
+
+from benchmarks import benchmark_utils
+
+
+DATASET_ID = 's~bench-dataset'
+KIND = 'Person'
+_PAGE_SIZE = 500
+_METHOD_PATH = '/datastore/v1beta2/datasets/[^/]+/'
+
+
+def _properties(index):
+    return {
+        'name': u'person-%d' % (index,),
+        'age': index % 100,
+        'score': index * 0.25,
+        'active': index % 2 == 0,
+        'tags': [u'alpha', u'beta', u'gamma'],
+    }
+
+
+def _set_properties(entity_pb, index):
+    for name, value in sorted(_properties(index).items()):
+        value_pb = entity_pb.property.add(name=name).value
+        if isinstance(value, list):
+            for item in value:
+                value_pb.list_value.add(string_value=item)
+        elif isinstance(value, bool):
+            value_pb.boolean_value = value
+        elif isinstance(value, int):
+            value_pb.integer_value = value
+        elif isinstance(value, float):
+            value_pb.double_value = value
+        else:
+            value_pb.string_value = value
+
+
+def _protobuf_response(response_pb):
+    return (200, {'Content-Type': 'application/x-protobuf'},
+            response_pb.SerializeToString())
+
+
+class _FakeDatastore(object):
+    """Just enough of the Datastore API for the benchmark."""
+
+    def __init__(self, num_entities, query_latency=0.0, commit_latency=0.0,
+                 allocate_latency=0.0):
+        self.num_entities = num_entities
+        self.query_latency = query_latency
+        self.commit_latency = commit_latency
+        self.allocate_latency = allocate_latency
+        self._next_id = 1
+
+    def lookup(self, match, query, headers, body):
+        request_pb = datastore_pb2.LookupRequest.FromString(body)
+        response_pb = datastore_pb2.LookupResponse()
+        for key_pb in request_pb.key:
+            entity_pb = response_pb.found.add().entity
+            entity_pb.key.CopyFrom(key_pb)
+            entity_pb.key.partition_id.dataset_id = DATASET_ID
+            _set_properties(entity_pb, key_pb.path_element[-1].id)
+        return _protobuf_response(response_pb)
+
+    def commit(self, match, query, headers, body):
+        request_pb = datastore_pb2.CommitRequest.FromString(body)
+        if self.commit_latency:
+            time.sleep(self.commit_latency)
+        response_pb = datastore_pb2.CommitResponse()
+        response_pb.mutation_result.index_updates = 0
+        for key_pb in (entity_pb.key for entity_pb in
+                       request_pb.mutation.insert_auto_id):
+            new_key_pb = response_pb.mutation_result.insert_auto_id_key.add()
+            new_key_pb.CopyFrom(key_pb)
+            new_key_pb.path_element[-1].id = self._next_id
+            self._next_id += 1
+        return _protobuf_response(response_pb)
+
+    def allocate_ids(self, match, query, headers, body):
+        request_pb = datastore_pb2.AllocateIdsRequest.FromString(body)
+        if self.allocate_latency:
+            time.sleep(self.allocate_latency)
+        response_pb = datastore_pb2.AllocateIdsResponse()
+        for key_pb in request_pb.key:
+            new_key_pb = response_pb.key.add()
+            new_key_pb.CopyFrom(key_pb)
+            new_key_pb.path_element[-1].id = self._next_id
+            self._next_id += 1
+        return _protobuf_response(response_pb)
+
+    def _key_range(self, query_pb):
+        """Indexes of the entities within the ``__key__`` filters."""
+        first, last = 0, self.num_entities
+        for filter_pb in query_pb.filter.composite_filter.filter:
+            property_filter = filter_pb.property_filter
+            if property_filter.property.name != '__key__':
+                continue
+            index = property_filter.value.key_value.path_element[-1].id - 1
+            if (property_filter.operator ==
+                    query_pb2.PropertyFilter.GREATER_THAN_OR_EQUAL):
+                first = max(first, index)
+            else:
+                last = min(last, index)
+        return first, last
+
+    def run_query(self, match, query, headers, body):
+        request_pb = datastore_pb2.RunQueryRequest.FromString(body)
+        query_pb = request_pb.query
+        if self.query_latency:
+            time.sleep(self.query_latency)
+        first, last = self._key_range(query_pb)
+        indexes = range(first, last)
+        if query_pb.order and query_pb.order[0].property.name == '__scatter__':
+            indexes = sorted(indexes, key=lambda index: (index * 7919) % 10007)
+        start = int(query_pb.start_cursor or b'0')
+        end = min(start + _PAGE_SIZE, len(indexes))
+        if query_pb.limit:
+            end = min(end, query_pb.limit)
+        response_pb = datastore_pb2.RunQueryResponse()
+        batch_pb = response_pb.batch
+        batch_pb.entity_result_type = query_pb2.EntityResult.FULL
+        keys_only = bool(query_pb.projection)
+        for index in indexes[start:end]:
+            entity_pb = batch_pb.entity_result.add().entity
+            entity_pb.key.partition_id.dataset_id = DATASET_ID
+            entity_pb.key.path_element.add(kind=KIND, id=index + 1)
+            if not keys_only:
+                _set_properties(entity_pb, index)
+        batch_pb.end_cursor = str(end).encode('ascii')
+        if end < len(indexes) and not query_pb.limit:
+            batch_pb.more_results = query_pb2.QueryResultBatch.NOT_FINISHED
+        else:
+            batch_pb.more_results = query_pb2.QueryResultBatch.NO_MORE_RESULTS
+        return _protobuf_response(response_pb)
+
+    def app(self):
+        return benchmark_utils.route_app((
+            ('POST', _METHOD_PATH + 'lookup', self.lookup),
+            ('POST', _METHOD_PATH + 'commit', self.commit),
+            ('POST', _METHOD_PATH + 'runQuery', self.run_query),
+            ('POST', _METHOD_PATH + 'allocateIds', self.allocate_ids),
+        ))
+
+
+def _scan_rates(num_entities, query_latency, num_splits, worker_counts):
+    """Full-kind scan rates:  sequential, prefetched and per worker count."""
+    backend = _FakeDatastore(num_entities, query_latency)
+    results = []
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        client = Client(dataset_id=DATASET_ID,
+                        http=PooledHttp(max(worker_counts)))
+        benchmark_utils.point_at(client.connection, server.base_url)
+        query = client.query(kind=KIND)
+
+        def _scan():
+            assert len(list(query.fetch())) == num_entities
+        results.append((
+            'Query.fetch, %.0f ms/page' % (query_latency * 1000,),
+            num_entities / benchmark_utils.timed(_scan), 'entities/s'))
+
+        # Processing each page of results (e.g. writing it elsewhere)
+        # takes as long as fetching it:  prefetching overlaps the two.
+        for prefetch in (0, 2):
+            def _processed_scan():
+                count = 0
+                for count, _ in enumerate(query.fetch(prefetch=prefetch), 1):
+                    if count % _PAGE_SIZE == 0:
+                        time.sleep(query_latency)
+                assert count == num_entities
+            results.append((
+                'Query.fetch, prefetch=%d, %.0f ms/page, processed' % (
+                    prefetch, query_latency * 1000),
+                num_entities / benchmark_utils.timed(_processed_scan),
+                'entities/s'))
+
+        for max_workers in worker_counts:
+            def _parallel_scan():
+                fetched = list(query.fetch_parallel(
+                    num_splits, max_workers=max_workers))
+                assert len(fetched) == num_entities
+            results.append((
+                'Query.fetch_parallel, %d workers, %.0f ms/page' % (
+                    max_workers, query_latency * 1000),
+                num_entities / benchmark_utils.timed(_parallel_scan),
+                'entities/s'))
+    return results
+
+
+def _hot_get_rates(client, num_gets, num_hot_keys):
+    """Rates of ``Client.get`` over a few hot keys, uncached and cached."""
+    keys = [client.key(KIND, index + 1) for index in range(num_hot_keys)]
+
+    def _get():
+        for index in range(num_gets):
+            assert client.get(keys[index % num_hot_keys]) is not None
+
+    results = [('Client.get, %d hot keys' % (num_hot_keys,),
+                num_gets / benchmark_utils.timed(_get), 'calls/s')]
+    client.entity_cache = EntityCache()
+    try:
+        results.append(('Client.get, %d hot keys, EntityCache' % (
+            num_hot_keys,), num_gets / benchmark_utils.timed(_get),
+            'calls/s'))
+    finally:
+        client.entity_cache = None
+    return results
+
+
+def _ingest_rates(num_entities, batch_size, commit_latency):
+    """Rates of writing entities in batches, in turn or write-behind."""
+    backend = _FakeDatastore(num_entities, commit_latency=commit_latency)
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        client = Client(dataset_id=DATASET_ID, http=PooledHttp())
+        benchmark_utils.point_at(client.connection, server.base_url)
+
+        def _entities():
+            for index in range(num_entities):
+                entity = Entity(client.key(KIND, index + 1))
+                entity.update(_properties(index))
+                yield entity
+
+        def _batches():
+            batch = client.batch()
+            for entity in _entities():
+                batch.put(entity)
+                if batch.mutation_count >= batch_size:
+                    batch.commit()
+                    batch = client.batch()
+            batch.commit()
+
+        def _writer():
+            with BufferedWriter(client, max_mutations=batch_size) as writer:
+                for entity in _entities():
+                    writer.put(entity)
+
+        label = '%d entities/commit, %.0f ms/commit' % (
+            batch_size, commit_latency * 1000)
+        return [
+            ('Batch.commit in turn, ' + label,
+             num_entities / benchmark_utils.timed(_batches), 'entities/s'),
+            ('BufferedWriter, ' + label,
+             num_entities / benchmark_utils.timed(_writer), 'entities/s'),
+        ]
+
+
+def _transfer_rates(num_entities, query_latency, commit_latency,
+                    num_splits, max_workers):
+    """Rates of exporting the kind to files, and importing them back.
+
+    The baselines go through entities:  iterating a query, and
+    ``put_multi`` of each chunk read.
+    """
+    backend = _FakeDatastore(num_entities, query_latency, commit_latency)
+    results = []
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        client = Client(dataset_id=DATASET_ID, http=PooledHttp(max_workers))
+        client.max_workers = max_workers
+        benchmark_utils.point_at(client.connection, server.base_url)
+        query = client.query(kind=KIND)
+
+        def _add_rates(label, elapsed, stream):
+            stream.seek(0, 2)
+            results.extend([
+                (label, num_entities / elapsed, 'entities/s'),
+                (label, stream.tell() / elapsed / 1e6, 'MB/s'),
+            ])
+
+        def _baseline_export(stream):
+            for entity in query.fetch():
+                stream.write(_encode_delimited(entity_to_protobuf(entity)))
+
+        def _baseline_import(stream):
+            entities = []
+            for data in _read_delimited(stream):
+                entities.append(entity_from_protobuf(
+                    entity_pb2.Entity.FromString(data)))
+                if len(entities) == client.commit_chunk_size:
+                    client.put_multi(entities)
+                    entities = []
+            client.put_multi(entities)
+
+        stream = tempfile.TemporaryFile()
+        _add_rates('export, Query.fetch (baseline)',
+                   benchmark_utils.timed(_baseline_export, stream), stream)
+        stream.seek(0)
+        _add_rates('import, put_multi (baseline)',
+                   benchmark_utils.timed(_baseline_import, stream), stream)
+        stream.close()
+
+        files = []
+        for file_format in (DELIMITED, NDJSON):
+            for splits in (1, num_splits):
+                stream = tempfile.TemporaryFile()
+                _add_rates(
+                    'export_entities, %s, %d splits' % (file_format, splits),
+                    benchmark_utils.timed(export_entities, query, stream,
+                                          file_format, splits), stream)
+            files.append((file_format, stream))
+        for file_format, stream in files:
+            stream.seek(0)
+            _add_rates('import_entities, %s' % (file_format,),
+                       benchmark_utils.timed(import_entities, client, stream,
+                                             file_format), stream)
+            stream.close()
+    return results
+
+
+def _allocate_rates(num_keys, allocate_latency):
+    """Rates of completing keys one at a time, with and without pools."""
+    backend = _FakeDatastore(0, allocate_latency=allocate_latency)
+    results = []
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        client = Client(dataset_id=DATASET_ID, http=PooledHttp())
+        benchmark_utils.point_at(client.connection, server.base_url)
+        incomplete_key = client.key(KIND)
+
+        def _complete():
+            for _ in range(num_keys):
+                key, = client.allocate_ids(incomplete_key, 1)
+                assert not key.is_partial
+
+        label = '1 key/call, %.0f ms/allocation' % (allocate_latency * 1000,)
+        results.append(('Client.allocate_ids, ' + label,
+                        num_keys / benchmark_utils.timed(_complete),
+                        'keys/s'))
+        client.id_reservoir = IdReservoir(client)
+        results.append(('Client.allocate_ids, IdReservoir, ' + label,
+                        num_keys / benchmark_utils.timed(_complete),
+                        'keys/s'))
+        results.append(('IdReservoir, IDs allocated on the caller thread',
+                        client.id_reservoir.misses, 'keys'))
+    return results
+
+
+def run(num_entities=5000, batch_size=500, query_latency=0.05,
+        num_splits=16, worker_counts=(1, 4, 8), num_gets=2000,
+        num_hot_keys=10, commit_latency=0.1, num_allocations=200,
+        allocate_latency=0.02):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    backend = _FakeDatastore(num_entities)
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        client = Client(dataset_id=DATASET_ID, http=PooledHttp())
+        benchmark_utils.point_at(client.connection, server.base_url)
+        keys = [client.key(KIND, index + 1) for index in range(num_entities)]
+
+        def _put():
+            for start in range(0, num_entities, batch_size):
+                entities = []
+                for index in range(start, min(start + batch_size,
+                                              num_entities)):
+                    entity = Entity(client.key(KIND))
+                    entity.update(_properties(index))
+                    entities.append(entity)
+                client.put_multi(entities)
+
+        def _get():
+            for start in range(0, num_entities, batch_size):
+                entities = client.get_multi(keys[start:start + batch_size])
+                assert len(entities) == len(keys[start:start + batch_size])
+
+        def _query():
+            fetched = list(client.query(kind=KIND).fetch())
+            assert len(fetched) == num_entities
+
+        put_time = benchmark_utils.timed(_put)
+        get_time = benchmark_utils.timed(_get)
+        query_time = benchmark_utils.timed(_query)
+        hot_get_rates = _hot_get_rates(client, num_gets, num_hot_keys)
+
+    return [
+        ('Client.put_multi, %d entities/call' % (batch_size,),
+         num_entities / put_time, 'entities/s'),
+        ('Client.get_multi, %d keys/call' % (batch_size,),
+         num_entities / get_time, 'entities/s'),
+        ('Query.fetch, %d entities/batch' % (_PAGE_SIZE,),
+         num_entities / query_time, 'entities/s'),
+    ] + hot_get_rates + _scan_rates(num_entities, query_latency, num_splits,
+                                    worker_counts) + _ingest_rates(
+        num_entities, batch_size, commit_latency) + _transfer_rates(
+        num_entities, query_latency, commit_latency, num_splits,
+        max(worker_counts)) + _allocate_rates(
+        num_allocations, allocate_latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entities', type=int, default=5000,
+                        help='Entities written, read and queried.')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Entities per put_multi / get_multi call.')
+    parser.add_argument('--gets', type=int, default=2000,
+                        help='Client.get calls on hot keys.')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Seconds added to each query page in scans.')
+    parser.add_argument('--commit-latency', type=float, default=0.1,
+                        help='Seconds added to each commit in ingestion.')
+    parser.add_argument('--allocations', type=int, default=200,
+                        help='Keys completed by Client.allocate_ids.')
+    parser.add_argument('--allocate-latency', type=float, default=0.02,
+                        help='Seconds added to each ID allocation.')
+    parser.add_argument('--splits', type=int, default=16,
+                        help='Sub-queries in parallel scans.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8],
+                        help='Worker counts for parallel scans.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Cloud Datastore', run(
+        num_entities=args.entities, batch_size=args.batch_size,
+        query_latency=args.latency, num_splits=args.splits,
+        worker_counts=args.workers, num_gets=args.gets,
+        commit_latency=args.commit_latency,
+        num_allocations=args.allocations,
+        allocate_latency=args.allocate_latency))
+
+
+if __name__ == '__main__':
+    main()
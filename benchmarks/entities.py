@@ -0,0 +1,150 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Decoding wide Cloud Datastore entities, eagerly and lazily.
+
+Converts each entity of a parsed page of query results with
+``entity_from_protobuf``, then reads a few properties (the common case)
+or all of them.  The memory held by the converted entities (beyond the
+protobufs, which the page holds either way) is reported where
+``tracemalloc`` exists.
+"""
+
+import argparse
+import datetime
+
+from gcloud._helpers import UTC
+from gcloud.datastore._generated import datastore_pb2
+from gcloud.datastore._generated import query_pb2
+from gcloud.datastore.helpers import _set_protobuf_value
+from gcloud.datastore.helpers import entity_from_protobuf
+from gcloud.datastore.key import Key
+
+from benchmarks import benchmark_utils
+
+try:
+    import tracemalloc
+except ImportError:  # Python < 3.4
+    tracemalloc = None
+
+
+DATASET_ID = 's~bench-dataset'
+_READ_PROPERTIES = ('prop0', 'prop1')
+
+
+def _value(index):
+    """Property values cycling through the types the datastore stores."""
+    kind = index % 6
+    if kind == 0:
+        return u'value-%d' % (index,)
+    elif kind == 1:
+        return index * 1000
+    elif kind == 2:
+        return index * 0.5
+    elif kind == 3:
+        return datetime.datetime(2015, 1, 1, tzinfo=UTC) + datetime.timedelta(
+            seconds=index)
+    elif kind == 4:
+        return Key('Other', index + 1, dataset_id=DATASET_ID)
+    return [u'alpha', u'beta', index]
+
+
+def _page(num_entities, num_properties):
+    """A serialized ``RunQueryResponse`` holding wide entities."""
+    response_pb = datastore_pb2.RunQueryResponse()
+    batch_pb = response_pb.batch
+    batch_pb.entity_result_type = query_pb2.EntityResult.FULL
+    batch_pb.more_results = query_pb2.QueryResultBatch.NO_MORE_RESULTS
+    for index in range(num_entities):
+        entity_pb = batch_pb.entity_result.add().entity
+        entity_pb.key.partition_id.dataset_id = DATASET_ID
+        entity_pb.key.path_element.add(kind='Wide', id=index + 1)
+        for prop in range(num_properties):
+            value_pb = entity_pb.property.add(name='prop%d' % (prop,)).value
+            _set_protobuf_value(value_pb, _value(prop))
+    return response_pb.SerializeToString()
+
+
+def _decode(entity_pbs, lazy, names):
+    """Convert entities and read ``names`` (or all properties) of each."""
+    entities = [entity_from_protobuf(entity_pb, lazy=lazy)
+                for entity_pb in entity_pbs]
+    for entity in entities:
+        for name in names or list(entity):
+            entity[name]
+    return entities
+
+
+def _allocated_memory(func):
+    """Bytes allocated by ``func`` and still held afterwards, or None."""
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+        del result
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+def run(num_entities=500, num_properties=60, repeat=5):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    page = _page(num_entities, num_properties)
+    response_pb = datastore_pb2.RunQueryResponse.FromString(page)
+    entity_pbs = [result_pb.entity
+                  for result_pb in response_pb.batch.entity_result]
+
+    def _parse():
+        datastore_pb2.RunQueryResponse.FromString(page)
+
+    results = [('parse page (for scale)',
+                num_entities / benchmark_utils.timed(_parse), 'entities/s')]
+    for names, reading in ((_READ_PROPERTIES, '%d properties read' % (
+            len(_READ_PROPERTIES),)), (None, 'all properties read')):
+        for lazy in (False, True):
+            label = '%s, %s' % ('lazy' if lazy else 'eager', reading)
+
+            def _decode_all():
+                for _ in range(repeat):
+                    _decode(entity_pbs, lazy, names)
+
+            results.append((
+                label, num_entities * repeat /
+                benchmark_utils.timed(_decode_all), 'entities/s'))
+            size = _allocated_memory(
+                lambda: _decode(entity_pbs, lazy, names))
+            if size is not None:
+                results.append((label + ', memory held',
+                                size / 1024.0 ** 2, 'MiB'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entities', type=int, default=500,
+                        help='Entities in the decoded page.')
+    parser.add_argument('--properties', type=int, default=60,
+                        help='Properties of each entity.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Times the page is decoded per measurement.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Entity decoding', run(
+        num_entities=args.entities, num_properties=args.properties,
+        repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
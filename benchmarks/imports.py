@@ -0,0 +1,80 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time taken to import each gcloud subpackage in a fresh interpreter.
+
+Each import is repeated in new processes and the best time is reported,
+which excludes most of the noise due to other activity on the machine.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks import benchmark_utils
+
+
+PACKAGES = (
+    'gcloud',
+    'gcloud.bigquery',
+    'gcloud.bigtable',
+    'gcloud.datastore',
+    'gcloud.dns',
+    'gcloud.pubsub',
+    'gcloud.resource_manager',
+    'gcloud.search',
+    'gcloud.storage',
+)
+
+_SCRIPT = """\
+import time
+start = time.time()
+import %s
+print(time.time() - start)
+"""
+
+
+def _import_time(package):
+    with open(os.devnull, 'w') as devnull:
+        output = subprocess.check_output(
+            [sys.executable, '-c', _SCRIPT % (package,)], stderr=devnull)
+    return float(output.decode('ascii').strip())
+
+
+def run(repeat=5, packages=PACKAGES):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    results = []
+    for package in packages:
+        try:
+            best = min(_import_time(package) for _ in range(repeat))
+        except subprocess.CalledProcessError:
+            continue  # Missing optional dependencies (e.g. gRPC).
+        results.append((package, best * 1000, 'ms'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Fresh interpreters started per package.')
+    parser.add_argument('packages', nargs='*', default=PACKAGES,
+                        help='Packages to import.')
+    args = parser.parse_args()
+    benchmark_utils.print_results(
+        'import time', run(repeat=args.repeat, packages=args.packages))
+
+
+if __name__ == '__main__':
+    main()
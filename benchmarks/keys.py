@@ -0,0 +1,241 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory and speed of Cloud Datastore keys.
+
+Compares :class:`gcloud.datastore.key.Key` with the implementation it
+replaced (copied below, without its docstrings, as the baseline), which
+kept a list of dicts besides the flat path, copied it for each access and
+recomputed its hash on each call.
+"""
+
+import argparse
+import copy
+
+import six
+
+from gcloud.datastore._generated import entity_pb2
+from gcloud.datastore.key import Key
+from gcloud.datastore.key import _dataset_ids_equal
+
+from benchmarks import benchmark_utils
+
+try:
+    import tracemalloc
+except ImportError:  # Python < 3.4
+    tracemalloc = None
+
+
+DATASET_ID = 's~bench-dataset'
+
+
+class _BaselineKey(object):
+
+    def __init__(self, *path_args, **kwargs):
+        self._flat_path = path_args
+        self._parent = kwargs.get('parent')
+        self._namespace = kwargs.get('namespace')
+        self._dataset_id = kwargs.get('dataset_id')
+        self._path = self._combine_args()
+
+    def __eq__(self, other):
+        if not isinstance(other, _BaselineKey):
+            return False
+        if self.is_partial or other.is_partial:
+            return False
+        return (self.flat_path == other.flat_path and
+                _dataset_ids_equal(self.dataset_id, other.dataset_id) and
+                self.namespace == other.namespace)
+
+    def __hash__(self):
+        return (hash(self.flat_path) +
+                hash(self.dataset_id) +
+                hash(self.namespace))
+
+    @staticmethod
+    def _parse_path(path_args):
+        kind_list = path_args[::2]
+        id_or_name_list = path_args[1::2]
+        partial_ending = object()
+        if len(path_args) % 2 == 1:
+            id_or_name_list += (partial_ending,)
+        result = []
+        for kind, id_or_name in zip(kind_list, id_or_name_list):
+            curr_key_part = {}
+            if isinstance(kind, six.string_types):
+                curr_key_part['kind'] = kind
+            else:
+                raise ValueError(kind, 'Kind was not a string.')
+            if isinstance(id_or_name, six.string_types):
+                curr_key_part['name'] = id_or_name
+            elif isinstance(id_or_name, six.integer_types):
+                curr_key_part['id'] = id_or_name
+            elif id_or_name is not partial_ending:
+                raise ValueError(id_or_name,
+                                 'ID/name was not a string or integer.')
+            result.append(curr_key_part)
+        return result
+
+    def _combine_args(self):
+        child_path = self._parse_path(self._flat_path)
+        if self._parent is not None:
+            child_path = self._parent.path + child_path
+            self._flat_path = self._parent.flat_path + self._flat_path
+            self._namespace = self._parent.namespace
+            self._dataset_id = self._parent.dataset_id
+        return child_path
+
+    def to_protobuf(self):
+        key = entity_pb2.Key()
+        key.partition_id.dataset_id = self.dataset_id
+        if self.namespace:
+            key.partition_id.namespace = self.namespace
+        for item in self.path:
+            element = key.path_element.add()
+            if 'kind' in item:
+                element.kind = item['kind']
+            if 'id' in item:
+                element.id = item['id']
+            if 'name' in item:
+                element.name = item['name']
+        return key
+
+    @property
+    def is_partial(self):
+        return self.id_or_name is None
+
+    @property
+    def namespace(self):
+        return self._namespace
+
+    @property
+    def path(self):
+        return copy.deepcopy(self._path)
+
+    @property
+    def flat_path(self):
+        return self._flat_path
+
+    @property
+    def kind(self):
+        return self.path[-1]['kind']
+
+    @property
+    def id(self):
+        return self.path[-1].get('id')
+
+    @property
+    def name(self):
+        return self.path[-1].get('name')
+
+    @property
+    def id_or_name(self):
+        return self.id or self.name
+
+    @property
+    def dataset_id(self):
+        return self._dataset_id
+
+    @property
+    def parent(self):
+        if self._parent is None:
+            if self.is_partial:
+                parent_args = self.flat_path[:-1]
+            else:
+                parent_args = self.flat_path[:-2]
+            if parent_args:
+                self._parent = self.__class__(*parent_args,
+                                              dataset_id=self.dataset_id,
+                                              namespace=self.namespace)
+        return self._parent
+
+
+def _make_keys(klass, count):
+    """Keys two levels deep, as entity groups usually are."""
+    return [klass('Parent', 'group-%d' % (index // 10,), 'Child', index + 1,
+                  dataset_id=DATASET_ID)
+            for index in range(count)]
+
+
+def _allocated_memory(func):
+    """Bytes allocated by ``func`` and still held afterwards, or None."""
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+        del result
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+def run(count=20000, repeat=5):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    results = []
+    for klass, name in ((_BaselineKey, 'baseline'), (Key, 'Key')):
+        keys = _make_keys(klass, count)
+        index = dict.fromkeys(keys)
+
+        def _per_key(func, times=1):
+            return count * times / benchmark_utils.timed(func)
+
+        def _lookups():
+            for _ in range(repeat):
+                for key in keys:
+                    index[key]
+
+        def _kinds():
+            for key in keys:
+                key.kind
+
+        def _protobufs():
+            for key in keys:
+                key.to_protobuf()
+
+        def _parents():
+            for key in _make_keys(klass, count):
+                key.parent
+
+        results.extend([
+            ('%s, construct' % (name,),
+             _per_key(lambda: _make_keys(klass, count)), 'keys/s'),
+            ('%s, dict lookup' % (name,),
+             _per_key(_lookups, repeat), 'keys/s'),
+            ('%s, kind' % (name,), _per_key(_kinds), 'keys/s'),
+            ('%s, to_protobuf' % (name,), _per_key(_protobufs), 'keys/s'),
+            ('%s, construct and derive parent' % (name,),
+             _per_key(_parents), 'keys/s'),
+        ])
+        size = _allocated_memory(lambda: _make_keys(klass, count))
+        if size is not None:
+            results.append(('%s, memory per key' % (name,),
+                            float(size) / count, 'bytes'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=20000,
+                        help='Keys per measurement.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Lookups of each key in the dict measurement.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Datastore keys', run(
+        count=args.count, repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Overhead of request instrumentation on ``api_request``.
+
+Requests are answered in memory, so the rate measured is bounded by the
+client-side work only:  no hook, a no-op hook and ``LatencyHistograms``.
+"""
+
+import argparse
+
+import httplib2
+
+from gcloud import metrics
+
+from benchmarks import benchmark_utils
+
+
+class _InMemoryHttp(object):
+
+    def __init__(self):
+        self._response = httplib2.Response(
+            {'status': '200', 'content-type': 'application/json'})
+
+    def request(self, **kw):  # pylint: disable=W0613
+        return self._response, b'{"kind": "storage#object"}'
+
+
+def _rate(conn, num_calls):
+    def _calls():
+        for _ in range(num_calls):
+            conn.api_request('GET', '/b/bucket/o/blob')
+    return num_calls / benchmark_utils.timed(_calls)
+
+
+def _with_hook(hook, conn, num_calls):
+    metrics.register_hook(hook)
+    try:
+        return _rate(conn, num_calls)
+    finally:
+        metrics.unregister_hook(hook)
+
+
+def run(num_calls=20000):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    conn = benchmark_utils.make_connection('http://localhost',
+                                           http=_InMemoryHttp())
+    histograms = metrics.LatencyHistograms()
+    return [
+        ('no hook', _rate(conn, num_calls), 'req/s'),
+        ('no-op hook', _with_hook(metrics.RequestHook(), conn, num_calls),
+         'req/s'),
+        ('LatencyHistograms', _with_hook(histograms, conn, num_calls),
+         'req/s'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000,
+                        help='Requests made per configuration.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('request instrumentation',
+                                  run(num_calls=args.calls))
+
+
+if __name__ == '__main__':
+    main()
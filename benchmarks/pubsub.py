@@ -0,0 +1,121 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pub/Sub publish and pull against a local fake backend."""
+
+import argparse
+import base64
+
+from gcloud.pubsub.client import Client
+from gcloud.pubsub.subscription import Subscription
+from gcloud.transport import PooledHttp
+
+from benchmarks import benchmark_utils
+
+
+class _FakePubsub(object):
+    """Just enough of the Pub/Sub API for the benchmark."""
+
+    def __init__(self, message_size):
+        self.published = 0
+        self.acknowledged = 0
+        self._data = base64.b64encode(b'x' * message_size).decode('ascii')
+
+    def publish(self, match, query, headers, body):
+        messages = benchmark_utils.read_json(headers, body)['messages']
+        first = self.published
+        self.published += len(messages)
+        return benchmark_utils.json_response({
+            'messageIds': [str(message_id) for message_id in
+                           range(first, self.published)]})
+
+    def pull(self, match, query, headers, body):
+        max_messages = benchmark_utils.read_json(headers, body)['maxMessages']
+        return benchmark_utils.json_response({'receivedMessages': [{
+            'ackId': 'ack-%d' % (index,),
+            'message': {
+                'messageId': str(index),
+                'data': self._data,
+                'attributes': {'index': str(index)},
+            },
+        } for index in range(max_messages)]})
+
+    def acknowledge(self, match, query, headers, body):
+        ack_ids = benchmark_utils.read_json(headers, body)['ackIds']
+        self.acknowledged += len(ack_ids)
+        return benchmark_utils.json_response({})
+
+    def app(self):
+        return benchmark_utils.route_app((
+            ('POST', '/v1/projects/[^/]+/topics/[^/]+:publish', self.publish),
+            ('POST', '/v1/projects/[^/]+/subscriptions/[^/]+:pull',
+             self.pull),
+            ('POST', '/v1/projects/[^/]+/subscriptions/[^/]+:acknowledge',
+             self.acknowledge),
+        ))
+
+
+def run(num_messages=20000, batch_size=100, message_size=256):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    backend = _FakePubsub(message_size)
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        client = Client(project='bench-project', http=PooledHttp())
+        benchmark_utils.point_at(client.connection, server.base_url)
+        topic = client.topic('bench-topic')
+        subscription = Subscription('bench-subscription', topic)
+        payload = b'x' * message_size
+        num_batches = num_messages // batch_size
+
+        def _publish():
+            for _ in range(num_batches):
+                with topic.batch() as batch:
+                    for _ in range(batch_size):
+                        batch.publish(payload)
+
+        def _pull():
+            for _ in range(num_batches):
+                received = subscription.pull(return_immediately=True,
+                                             max_messages=batch_size)
+                subscription.acknowledge(
+                    [ack_id for ack_id, _ in received])
+
+        publish_time = benchmark_utils.timed(_publish)
+        pull_time = benchmark_utils.timed(_pull)
+        assert backend.published == backend.acknowledged
+
+    total = num_batches * batch_size
+    return [
+        ('Batch.commit, %d messages/call' % (batch_size,),
+         total / publish_time, 'messages/s'),
+        ('Subscription.pull / acknowledge, %d/call' % (batch_size,),
+         total / pull_time, 'messages/s'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000,
+                        help='Messages published, then pulled.')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Messages per publish / pull call.')
+    parser.add_argument('--size', type=int, default=256,
+                        help='Size of each message, in bytes.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Pub/Sub', run(
+        num_messages=args.messages, batch_size=args.batch_size,
+        message_size=args.size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Signed URL generation:  per call, in bulk and over a process pool.
+
+Uses a freshly generated 2048-bit service account key.
+"""
+
+import argparse
+import multiprocessing
+
+from Crypto.PublicKey import RSA
+from oauth2client import service_account
+
+from gcloud.credentials import URLSigner
+from gcloud.credentials import generate_signed_url
+
+from benchmarks import benchmark_utils
+
+
+def _make_credentials():
+    pem_text = RSA.generate(2048).exportKey(pkcs=8)
+    return service_account._ServiceAccountCredentials(
+        'service-account-id', 'benchmark@example.com', 'private-key-id',
+        pem_text, [])
+
+
+def run(num_urls=2000, processes=None):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    credentials = _make_credentials()
+    requests = [('/bucket/blob-%d' % (index,), 3600)
+                for index in range(num_urls)]
+
+    def _per_call():
+        for resource, expiration in requests:
+            generate_signed_url(credentials, resource, expiration)
+
+    signer = URLSigner(credentials)
+    return [
+        ('generate_signed_url', num_urls / benchmark_utils.timed(_per_call),
+         'URLs/s'),
+        ('URLSigner.sign_many', num_urls / benchmark_utils.timed(
+            signer.sign_many, requests), 'URLs/s'),
+        ('URLSigner.sign_many, %d processes' % (processes,),
+         num_urls / benchmark_utils.timed(
+             signer.sign_many, requests, processes=processes), 'URLs/s'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--urls', type=int, default=2000,
+                        help='URLs signed per configuration.')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Signing processes (default: CPU count).')
+    args = parser.parse_args()
+    benchmark_utils.print_results(
+        'signed URLs', run(num_urls=args.urls, processes=args.processes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cloud Storage hot paths against a local fake backend.
+
+Covers ``Bucket.list_blobs`` (paged listing) and blob upload / download.
+"""
+
+import argparse
+
+from gcloud.storage.client import Client
+from gcloud.transport import PooledHttp
+
+from benchmarks import benchmark_utils
+
+
+BUCKET = 'bench-bucket'
+_PAGE_SIZE = 1000
+
+
+class _FakeStorage(object):
+    """Just enough of the JSON API (and media endpoints) for the benchmark.
+    """
+
+    def __init__(self, num_blobs):
+        self.num_blobs = num_blobs
+        self.base_url = None
+        self.blobs = {}
+
+    def _resource(self, name, size):
+        return {
+            'kind': 'storage#object',
+            'id': '%s/%s/1' % (BUCKET, name),
+            'name': name,
+            'bucket': BUCKET,
+            'generation': '1',
+            'metageneration': '1',
+            'contentType': 'application/octet-stream',
+            'size': str(size),
+            'md5Hash': 'XrY7u+Ae7tCTyyK7j1rNww==',
+            'crc32c': 'AAAAAA==',
+            'etag': 'CAE=',
+            'updated': '2015-01-01T00:00:00.000Z',
+            'timeCreated': '2015-01-01T00:00:00.000Z',
+            'mediaLink': '%s/download/storage/v1/b/%s/o/%s?alt=media' % (
+                self.base_url, BUCKET, name),
+        }
+
+    def list_objects(self, match, query, headers, body):
+        start = int(query.get('pageToken', ['0'])[0])
+        end = min(start + _PAGE_SIZE, self.num_blobs)
+        payload = {
+            'kind': 'storage#objects',
+            'items': [self._resource('blob-%08d' % (index,), 1024)
+                      for index in range(start, end)],
+        }
+        if end < self.num_blobs:
+            payload['nextPageToken'] = str(end)
+        return benchmark_utils.json_response(payload)
+
+    def upload(self, match, query, headers, body):
+        name = query['name'][0]
+        self.blobs[name] = body
+        return benchmark_utils.json_response(
+            self._resource(name, len(body)))
+
+    def download(self, match, query, headers, body):
+        content = self.blobs[match.group(1)]
+        return 200, {'Content-Type': 'application/octet-stream'}, content
+
+    def app(self):
+        return benchmark_utils.route_app((
+            ('GET', '/storage/v1/b/[^/]+/o', self.list_objects),
+            ('POST', '/upload/storage/v1/b/[^/]+/o', self.upload),
+            ('GET', '/download/storage/v1/b/[^/]+/o/(.+)', self.download),
+        ))
+
+
+def run(num_blobs=20000, num_transfers=200, blob_size=256 * 1024):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    backend = _FakeStorage(num_blobs)
+    with benchmark_utils.FakeServer(backend.app()) as server:
+        backend.base_url = server.base_url
+        client = Client(project='bench-project', http=PooledHttp())
+        benchmark_utils.point_at(client.connection, server.base_url)
+        bucket = client.bucket(BUCKET)
+
+        listed = []
+        list_time = benchmark_utils.timed(
+            lambda: listed.extend(bucket.list_blobs()))
+        assert len(listed) == num_blobs
+
+        data = b'x' * blob_size
+        blobs = [bucket.blob('upload-%d' % (index,))
+                 for index in range(num_transfers)]
+
+        def _upload():
+            for blob in blobs:
+                blob.upload_from_string(data)
+
+        def _download():
+            for blob in blobs:
+                blob.download_as_string()
+
+        upload_time = benchmark_utils.timed(_upload)
+        download_time = benchmark_utils.timed(_download)
+
+    megabytes = num_transfers * blob_size / float(1 << 20)
+    return [
+        ('Bucket.list_blobs', num_blobs / list_time, 'blobs/s'),
+        ('Blob.upload_from_string', num_transfers / upload_time, 'blobs/s'),
+        ('Blob.upload_from_string', megabytes / upload_time, 'MB/s'),
+        ('Blob.download_as_string', num_transfers / download_time,
+         'blobs/s'),
+        ('Blob.download_as_string', megabytes / download_time, 'MB/s'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--blobs', type=int, default=20000,
+                        help='Blobs listed.')
+    parser.add_argument('--transfers', type=int, default=200,
+                        help='Blobs uploaded, then downloaded.')
+    parser.add_argument('--size', type=int, default=256 * 1024,
+                        help='Size of each blob transferred, in bytes.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Cloud Storage', run(
+        num_blobs=args.blobs, num_transfers=args.transfers,
+        blob_size=args.size))
+
+
+if __name__ == '__main__':
+    main()
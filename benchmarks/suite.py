@@ -0,0 +1,171 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run every benchmark offline and write a JSON report.
+
+All benchmarks run against local fake backends, so the report measures
+library overhead only and can be compared between commits::
+
+    $ python -m benchmarks.suite --output before.json
+    $ git checkout other-branch
+    $ python -m benchmarks.suite --output after.json --compare before.json
+
+Benchmarks whose dependencies are missing (e.g. gRPC for Bigtable) are
+reported as skipped.
+"""
+
+from __future__ import print_function
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks import benchmark_utils
+
+
+BENCHMARKS = (
+    'datastore',
+    'entities',
+    'keys',
+    'storage',
+    'bigquery',
+    'pubsub',
+    'bigtable',
+    'transport',
+    'aio',
+    'metrics',
+    'codec',
+    'timestamps',
+    'signed_urls',
+    'imports',
+)
+
+
+def _git_commit():
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], stderr=devnull,
+                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def run_benchmark(name):
+    """Run one benchmark module, returning its entry in the report."""
+    try:
+        module = __import__('benchmarks.' + name, fromlist=['run'])
+    except (ImportError, SyntaxError) as exc:
+        return {'skipped': '%s: %s' % (type(exc).__name__, exc)}
+    start = time.time()
+    results = module.run()
+    return {
+        'seconds': time.time() - start,
+        'results': [{'label': label, 'value': value, 'unit': unit}
+                    for label, value, unit in results],
+    }
+
+
+def run(names=BENCHMARKS):
+    """Run the benchmarks, returning the report as a dict."""
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'started': datetime.datetime.utcnow().isoformat() + 'Z',
+        'benchmarks': {},
+    }
+    for name in names:
+        print('Running %s...' % (name,), file=sys.stderr)
+        report['benchmarks'][name] = run_benchmark(name)
+    return report
+
+
+def _is_rate(unit):
+    """Whether higher values of ``unit`` are better (e.g. ``req/s``)."""
+    return unit.endswith('/s')
+
+
+def compare(baseline, report):
+    """Relative change of each result present in both reports.
+
+    :returns: list of ``(benchmark, label, unit, old, new, change)``, with
+              ``change`` positive for improvements whatever the unit.
+    """
+    changes = []
+    for name, entry in sorted(report['benchmarks'].items()):
+        old_entry = baseline['benchmarks'].get(name, {})
+        old_values = dict(((result['label'], result['unit']),
+                           result['value'])
+                          for result in old_entry.get('results', ()))
+        for result in entry.get('results', ()):
+            key = (result['label'], result['unit'])
+            old, new = old_values.get(key), result['value']
+            if not old or not new:
+                continue
+            if _is_rate(result['unit']):
+                change = new / old - 1
+            else:
+                change = old / new - 1
+            changes.append((name, result['label'], result['unit'], old, new,
+                            change))
+    return changes
+
+
+def print_report(report):
+    """Print each benchmark of ``report`` as a table."""
+    for name, entry in sorted(report['benchmarks'].items()):
+        if 'skipped' in entry:
+            print('%s: skipped (%s)\n' % (name, entry['skipped']))
+            continue
+        benchmark_utils.print_results(name, [
+            (result['label'], result['value'], result['unit'])
+            for result in entry['results']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', '-o', default=None,
+                        help='File to write the JSON report to.')
+    parser.add_argument('--compare', default=None,
+                        help='Earlier JSON report to compare results with.')
+    parser.add_argument('benchmarks', nargs='*', default=BENCHMARKS,
+                        help='Benchmarks to run (default: all).')
+    args = parser.parse_args()
+
+    report = run(args.benchmarks)
+    if args.output is not None:
+        with open(args.output, 'w') as file_obj:
+            json.dump(report, file_obj, indent=2, sort_keys=True)
+    print_report(report)
+
+    if args.compare is not None:
+        with open(args.compare) as file_obj:
+            baseline = json.load(file_obj)
+        title = 'Change since %s' % (baseline.get('commit') or args.compare,)
+        print(title)
+        print('-' * len(title))
+        for name, label, unit, old, new, change in compare(baseline, report):
+            print('%-50s %+7.1f%%  (%.1f -> %.1f %s)' % (
+                '%s: %s' % (name, label), change * 100, old, new, unit))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Timestamp conversions in ``gcloud._helpers``.
+
+Compares the helpers with the ``strptime`` / ``strftime`` / ``timegm``
+implementations they replaced (copied below as the baseline).
+"""
+
+import argparse
+import calendar
+import datetime
+
+from gcloud import _helpers
+
+from benchmarks import benchmark_utils
+
+
+def _strptime_to_datetime(dt_str):
+    return datetime.datetime.strptime(
+        dt_str, _helpers._RFC3339_MICROS).replace(tzinfo=_helpers.UTC)
+
+
+def _strftime_from_datetime(value):
+    return value.strftime(_helpers._RFC3339_MICROS)
+
+
+def _timegm_microseconds(value):
+    if not value.tzinfo:
+        value = value.replace(tzinfo=_helpers.UTC)
+    value = value.astimezone(_helpers.UTC)
+    return int(calendar.timegm(value.timetuple()) * 1e6) + value.microsecond
+
+
+def _datetimes(count):
+    start = datetime.datetime(2015, 7, 29, 17, 45, 21, tzinfo=_helpers.UTC)
+    return [start + datetime.timedelta(seconds=index * 37.123457)
+            for index in range(count)]
+
+
+def run(count=50000, distinct=100):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    values = _datetimes(count)
+    strings = [_helpers._datetime_to_rfc3339(value) for value in values]
+    repeated = [strings[index % distinct] for index in range(count)]
+    micros = [_helpers._microseconds_from_datetime(value)
+              for value in values]
+
+    def _per_item(func, items):
+        def _convert():
+            for item in items:
+                func(item)
+        return count / benchmark_utils.timed(_convert)
+
+    def _uncached(dt_str):
+        _helpers._RFC3339_CACHE.clear()
+        return _helpers._rfc3339_to_datetime(dt_str)
+
+    _helpers._RFC3339_CACHE.clear()
+    results = [
+        ('parse, strptime (baseline)',
+         _per_item(_strptime_to_datetime, strings), 'values/s'),
+        ('parse, hand-written',
+         _per_item(_helpers._parse_rfc3339, strings), 'values/s'),
+        ('parse, uncached _rfc3339_to_datetime',
+         _per_item(_uncached, strings), 'values/s'),
+        ('parse, %d distinct values, cached' % (distinct,),
+         _per_item(_helpers._rfc3339_to_datetime, repeated), 'values/s'),
+        ('format, strftime (baseline)',
+         _per_item(_strftime_from_datetime, values), 'values/s'),
+        ('format, _datetime_to_rfc3339',
+         _per_item(_helpers._datetime_to_rfc3339, values), 'values/s'),
+        ('to microseconds, timegm (baseline)',
+         _per_item(_timegm_microseconds, values), 'values/s'),
+        ('to microseconds, _microseconds_from_datetime',
+         _per_item(_helpers._microseconds_from_datetime, values),
+         'values/s'),
+        ('from microseconds, _datetime_from_microseconds',
+         _per_item(_helpers._datetime_from_microseconds, micros),
+         'values/s'),
+    ]
+    _helpers._RFC3339_CACHE.clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=50000,
+                        help='Timestamps converted per measurement.')
+    parser.add_argument('--distinct', type=int, default=100,
+                        help='Distinct values parsed through the cache.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Timestamps', run(
+        count=args.count, distinct=args.distinct))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Requests/sec through ``JSONConnection`` at various thread counts.
+
+Compares one shared :class:`gcloud.transport.PooledHttp` against the
+previous workaround of one :class:`httplib2.Http` per thread.
+"""
+
+import argparse
+
+import httplib2
+
+from gcloud.transport import PooledHttp
+
+from benchmarks import benchmark_utils
+
+
+THREAD_COUNTS = (1, 8, 32)
+PAYLOAD = {'kind': 'storage#bucket', 'name': 'bucket', 'items': list(
+    range(50))}
+
+
+def _requests_per_second(server, num_threads, num_requests, shared):
+    per_thread = max(1, num_requests // num_threads)
+    if shared:
+        conn = benchmark_utils.make_connection(
+            server.base_url, http=PooledHttp(max_size=num_threads))
+
+    def _worker(index):  # pylint: disable=W0613
+        if shared:
+            worker_conn = conn
+        else:
+            worker_conn = benchmark_utils.make_connection(
+                server.base_url, http=httplib2.Http())
+        for _ in range(per_thread):
+            worker_conn.api_request('GET', '/b/bucket')
+
+    elapsed = benchmark_utils.run_threads(_worker, num_threads)
+    return per_thread * num_threads / elapsed
+
+
+def run(num_requests=2000):
+    """Run the benchmark, returning a list of (label, value, unit)."""
+    results = []
+    app = benchmark_utils.json_app(PAYLOAD)
+    with benchmark_utils.FakeServer(app) as server:
+        for num_threads in THREAD_COUNTS:
+            for shared, label in ((False, 'httplib2.Http per thread'),
+                                  (True, 'shared PooledHttp')):
+                rate = _requests_per_second(server, num_threads,
+                                            num_requests, shared)
+                results.append(('%s, %d threads' % (label, num_threads),
+                                rate, 'req/s'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Requests issued per measurement.')
+    args = parser.parse_args()
+    benchmark_utils.print_results('Pooled HTTP transport',
+                                  run(num_requests=args.requests))
+
+
+if __name__ == '__main__':
+    main()
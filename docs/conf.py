@@ -294,3 +294,26 @@ intersphinx_mapping = {
     'oauth2client': ('http://oauth2client.readthedocs.org/en/latest/', None),
     'python': ('https://docs.python.org/', None),
 }
+
+# gcloud.aio uses ``async`` / ``await``, so it cannot be imported (nor
+# documented by autodoc) before Python 3.5:  its page is replaced there.
+_ASYNCIO_STUB = """\
+asyncio Integration
+~~~~~~~~~~~~~~~~~~~
+
+.. module:: gcloud.aio
+
+:class:`AsyncHttp`, :class:`AsyncConnection` and :class:`AsyncClient` make
+the requests of gcloud clients on an :mod:`asyncio` event loop.  They
+require Python 3.5+, and are documented in the docs built with it.
+"""
+
+
+def _stub_asyncio_docs(app, docname, source):
+    """Replace the page of :mod:`gcloud.aio` before Python 3.5."""
+    if docname == 'gcloud-aio' and sys.version_info < (3, 5):
+        source[0] = _ASYNCIO_STUB
+
+
+def setup(app):
+    app.connect('source-read', _stub_asyncio_docs)
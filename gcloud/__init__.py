@@ -14,6 +14,4 @@
 
 """GCloud API access in idiomatic Python."""
 
-from pkg_resources import get_distribution
-
-__version__ = get_distribution('gcloud').version
+__version__ = '0.8.0'
@@ -16,14 +16,16 @@
 This module is not part of the public API surface of `gcloud`.
 """
 
-import calendar
 import datetime
 import os
+import re
 from threading import local as Local
 import socket
 import sys
+import threading
 
 import six
+from six.moves import queue  # pylint: disable=F0401
 from six.moves.http_client import HTTPConnection  # pylint: disable=F0401
 
 from gcloud.environment_vars import PROJECT
@@ -36,6 +38,39 @@ except ImportError:
 
 _NOW = datetime.datetime.utcnow  # To be replaced by tests.
 _RFC3339_MICROS = '%Y-%m-%dT%H:%M:%S.%fZ'
+_RFC3339_FORMAT = '%04d-%02d-%02dT%02d:%02d:%02d.%06dZ'
+_RFC3339_RE = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})T'
+    r'([0-9]{2}):([0-9]{2}):([0-9]{2})\.([0-9]{1,6})Z\Z')
+_RFC3339_CACHE = {}
+_RFC3339_CACHE_SIZE = 1024
+_MICROS_PER_SECOND = 1000000
+_MICROS_PER_DAY = 86400 * _MICROS_PER_SECOND
+_PREFETCH_POLL_SECONDS = 0.1
+
+
+class _LazyModule(object):
+    """Proxy for a module imported on first attribute access.
+
+    Used for heavy dependencies (generated protobuf code, crypto
+    libraries) which are not needed to import a package.
+
+    :type name: string
+    :param name: The absolute name of the module.
+    """
+
+    def __init__(self, name):
+        self.__name = name
+
+    def __getattr__(self, attr):
+        __import__(self.__name)
+        module = sys.modules[self.__name]
+        # Later lookups find the attributes directly.
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return '<lazy module %r>' % (self.__name,)
 
 
 class _LocalStack(Local):
@@ -76,6 +111,110 @@ class _LocalStack(Local):
             return self._stack[-1]
 
 
+class _LRUDict(object):
+    """Mapping keeping track of the order in which its keys were used.
+
+    :meth:`get` and :meth:`put` make a key the most recently used one, and
+    :meth:`pop_oldest` removes the least recently used one, all in O(1):
+    entries are linked in a circular list, as in ``OrderedDict`` (missing
+    from Python 2.6).  Not thread-safe:  callers hold their own lock.
+    """
+
+    _PREV, _NEXT, _KEY, _VALUE = range(4)
+
+    def __init__(self):
+        self._links = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+
+    def __len__(self):
+        return len(self._links)
+
+    def _unlink(self, link):
+        """Remove a link from the list."""
+        link[self._PREV][self._NEXT] = link[self._NEXT]
+        link[self._NEXT][self._PREV] = link[self._PREV]
+
+    def _append(self, link):
+        """Insert a link at the most recently used end of the list."""
+        last = self._root[self._PREV]
+        link[self._PREV], link[self._NEXT] = last, self._root
+        last[self._NEXT] = self._root[self._PREV] = link
+
+    def get(self, key, default=None):
+        """Look up a key, making it the most recently used one.
+
+        :type key: hashable
+        :param key: The key to look up.
+
+        :type default: object
+        :param default: (Optional) The value returned if ``key`` is missing.
+
+        :rtype: object
+        :returns: The value of ``key``, else ``default``.
+        """
+        link = self._links.get(key)
+        if link is None:
+            return default
+        self._unlink(link)
+        self._append(link)
+        return link[self._VALUE]
+
+    def put(self, key, value):
+        """Set the value of a key, making it the most recently used one.
+
+        :type key: hashable
+        :param key: The key to set.
+
+        :type value: object
+        :param value: Its value.
+        """
+        link = self._links.get(key)
+        if link is None:
+            link = self._links[key] = [None, None, key, value]
+        else:
+            self._unlink(link)
+            link[self._VALUE] = value
+        self._append(link)
+
+    def pop(self, key, default=None):
+        """Remove a key.
+
+        :type key: hashable
+        :param key: The key to remove.
+
+        :type default: object
+        :param default: (Optional) The value returned if ``key`` is missing.
+
+        :rtype: object
+        :returns: The value of ``key``, else ``default``.
+        """
+        link = self._links.pop(key, None)
+        if link is None:
+            return default
+        self._unlink(link)
+        return link[self._VALUE]
+
+    def pop_oldest(self):
+        """Remove the least recently used key.
+
+        :rtype: tuple
+        :returns: The key removed and its value.
+        :raises: :class:`KeyError` if the mapping is empty.
+        """
+        link = self._root[self._NEXT]
+        if link is self._root:
+            raise KeyError('pop_oldest(): mapping is empty')
+        del self._links[link[self._KEY]]
+        self._unlink(link)
+        return link[self._KEY], link[self._VALUE]
+
+    def clear(self):
+        """Remove all keys."""
+        self._links.clear()
+        self._root[:] = [self._root, self._root, None, None]
+
+
 class _UTC(datetime.tzinfo):
     """Basic UTC implementation.
 
@@ -247,12 +386,14 @@ def _microseconds_from_datetime(value):
     :rtype: integer
     :returns: The timestamp, in microseconds.
     """
-    if not value.tzinfo:
-        value = value.replace(tzinfo=UTC)
-    # Regardless of what timezone is on the value, convert it to UTC.
-    value = value.astimezone(UTC)
-    # Convert the datetime to a microsecond timestamp.
-    return int(calendar.timegm(value.timetuple()) * 1e6) + value.microsecond
+    # Naive values are taken to be UTC; subtracting the epoch converts
+    # zone-aware values to UTC.  Integer arithmetic keeps the result exact.
+    if value.tzinfo is None:
+        delta = value - _EPOCH_NAIVE
+    else:
+        delta = value - _EPOCH
+    return (delta.days * _MICROS_PER_DAY +
+            delta.seconds * _MICROS_PER_SECOND + delta.microseconds)
 
 
 def _millis_from_datetime(value):
@@ -298,17 +439,50 @@ def _total_seconds(offset):
         return offset.total_seconds()
 
 
+def _parse_rfc3339(dt_str):
+    """Parse an RFC 3339 timestamp without going through ``strptime``.
+
+    Handles the ``YYYY-MM-DDTHH:MM:SS.ffffffZ`` shape (one to six
+    fractional digits) returned by the APIs; other strings are left to
+    ``strptime``, which accepts or rejects them as it always has.
+
+    :type dt_str: str
+    :param dt_str: The string to convert.
+
+    :rtype: :class:`datetime.datetime`
+    :returns: The datetime object created from the string.
+    :raises: :class:`ValueError` if ``dt_str`` is not a valid timestamp.
+    """
+    match = _RFC3339_RE.match(dt_str)
+    if match is None:
+        return datetime.datetime.strptime(
+            dt_str, _RFC3339_MICROS).replace(tzinfo=UTC)
+    year, month, day, hour, minute, second, fraction = match.groups()
+    return datetime.datetime(
+        int(year), int(month), int(day), int(hour), int(minute),
+        int(second), int(fraction.ljust(6, '0')), UTC)
+
+
 def _rfc3339_to_datetime(dt_str):
     """Convert a string to a native timestamp.
 
+    Recently parsed values are cached, as listings tend to repeat them.
+
     :type dt_str: str
     :param dt_str: The string to convert.
 
     :rtype: :class:`datetime.datetime`
     :returns: The datetime object created from the string.
     """
-    return datetime.datetime.strptime(
-        dt_str, _RFC3339_MICROS).replace(tzinfo=UTC)
+    try:
+        return _RFC3339_CACHE[dt_str]
+    except KeyError:
+        pass
+    value = _parse_rfc3339(dt_str)
+    if len(_RFC3339_CACHE) >= _RFC3339_CACHE_SIZE:
+        _RFC3339_CACHE.clear()
+    _RFC3339_CACHE[dt_str] = value
+    return value
 
 
 def _datetime_to_rfc3339(value):
@@ -320,7 +494,8 @@ def _datetime_to_rfc3339(value):
     :rtype: str
     :returns: The string representing the datetime stamp.
     """
-    return value.strftime(_RFC3339_MICROS)
+    return _RFC3339_FORMAT % (value.year, value.month, value.day, value.hour,
+                              value.minute, value.second, value.microsecond)
 
 
 def _to_bytes(value, encoding='ascii'):
@@ -354,6 +529,204 @@ def _to_bytes(value, encoding='ascii'):
         raise TypeError('%r could not be converted to bytes' % (value,))
 
 
+def _prefetch(iterable, depth):
+    """Yield the items of ``iterable``, produced ahead on a background thread.
+
+    At most ``depth`` items are buffered ahead of the consumer.  An
+    exception raised while producing is re-raised in the consumer, after
+    the items produced before it.  If the consumer stops early, the
+    producer stops after its current item.
+
+    :type iterable: iterable
+    :param iterable: The items to produce;  only iterated by the background
+                     thread.
+
+    :type depth: integer
+    :param depth: Maximum number of items buffered ahead of the consumer.
+
+    :rtype: generator
+    :returns: The items of ``iterable``, in order.
+    """
+    buffered = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def _put(entry):
+        while not stopped.is_set():
+            try:
+                buffered.put(entry, timeout=_PREFETCH_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce():
+        try:
+            for item in iterable:
+                if not _put((True, item)):
+                    return
+        except Exception:  # pylint: disable=broad-except
+            _put((False, sys.exc_info()))
+        else:
+            _put((False, None))
+
+    producer = threading.Thread(target=_produce)
+    producer.daemon = True
+    producer.start()
+    try:
+        while True:
+            is_item, value = buffered.get()
+            if not is_item:
+                if value is not None:
+                    six.reraise(*value)
+                return
+            yield value
+    finally:
+        stopped.set()
+
+
+def _map_concurrently(func, items, max_workers):
+    """Call ``func`` on each of ``items`` using up to ``max_workers`` threads.
+
+    With a single item or a single worker, ``func`` is called inline.
+    If any call raises, remaining items are not started and the first
+    exception is re-raised once the running calls finish.
+
+    :type func: callable
+    :param func: Callable taking one item.
+
+    :type items: iterable
+    :param items: The arguments for ``func``.
+
+    :type max_workers: integer
+    :param max_workers: Maximum number of calls running at once.
+
+    :rtype: list
+    :returns: The results of ``func``, in the order of ``items``.
+    """
+    items = list(items)
+    if max_workers < 2 or len(items) < 2:
+        return [func(item) for item in items]
+
+    results = [None] * len(items)
+    errors = []
+    pending = queue.Queue()
+    for index in range(len(items)):
+        pending.put(index)
+
+    def _work():
+        while not errors:
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[index] = func(items[index])
+            except Exception:  # pylint: disable=broad-except
+                errors.append(sys.exc_info())
+
+    workers = [threading.Thread(target=_work)
+               for _ in range(min(max_workers, len(items)))]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        six.reraise(*errors[0])
+    return results
+
+
+def _iterate_concurrently(iterables, max_workers, ordered, depth):
+    """Yield the items of several iterables, each consumed on a worker thread.
+
+    Up to ``max_workers`` iterables are consumed at once, starting in the
+    order given;  each may run at most ``depth`` items ahead of the
+    consumer.  An exception raised by an iterable is re-raised in the
+    consumer.  If the consumer stops early, the workers stop after their
+    current item.
+
+    :type iterables: sequence of iterable
+    :param iterables: The iterables to consume.
+
+    :type max_workers: integer
+    :param max_workers: Maximum number of iterables consumed at once.
+
+    :type ordered: boolean
+    :param ordered: If true, yield all the items of the first iterable, then
+                    of the second, etc.;  otherwise, yield items as they
+                    are produced.
+
+    :type depth: integer
+    :param depth: Maximum number of items buffered ahead of the consumer,
+                  per running iterable.
+
+    :rtype: generator
+    :returns: The items of ``iterables``.
+    """
+    iterables = list(iterables)
+    stopped = threading.Event()
+    if ordered:
+        outputs = [queue.Queue(maxsize=depth) for _ in iterables]
+    else:
+        outputs = [queue.Queue(maxsize=depth * max_workers)] * len(iterables)
+    pending = queue.Queue()
+    for index in range(len(iterables)):
+        pending.put(index)
+
+    def _put(output, entry):
+        while not stopped.is_set():
+            try:
+                output.put(entry, timeout=_PREFETCH_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _work():
+        while not stopped.is_set():
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            output = outputs[index]
+            try:
+                for item in iterables[index]:
+                    if not _put(output, (True, item)):
+                        return
+            except Exception:  # pylint: disable=broad-except
+                _put(output, (False, sys.exc_info()))
+                return
+            _put(output, (False, None))
+
+    for _ in range(min(max_workers, len(iterables))):
+        worker = threading.Thread(target=_work)
+        worker.daemon = True
+        worker.start()
+
+    try:
+        if ordered:
+            for output in outputs:
+                while True:
+                    is_item, value = output.get()
+                    if not is_item:
+                        break
+                    yield value
+                if value is not None:
+                    six.reraise(*value)
+        else:
+            remaining = len(iterables)
+            while remaining:
+                is_item, value = outputs[0].get()
+                if is_item:
+                    yield value
+                elif value is not None:
+                    six.reraise(*value)
+                else:
+                    remaining -= 1
+    finally:
+        stopped.set()
+
+
 try:
     from pytz import UTC  # pylint: disable=unused-import,wrong-import-position
 except ImportError:
@@ -361,3 +734,4 @@ except ImportError:
 
 # Need to define _EPOCH at the end of module since it relies on UTC.
 _EPOCH = datetime.datetime.utcfromtimestamp(0).replace(tzinfo=UTC)
+_EPOCH_NAIVE = _EPOCH.replace(tzinfo=None)
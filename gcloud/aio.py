@@ -0,0 +1,609 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Use gcloud clients from :mod:`asyncio` code.
+
+:class:`AsyncClient` makes the requests of a client on an :mod:`asyncio`
+event loop, over non-blocking keep-alive connections (:class:`AsyncHttp`):
+a call in flight costs a coroutine rather than a thread, so thousands of
+calls can be awaited at once.  Resource methods (``Blob.exists``,
+``Dataset.reload``, ``Subscription.pull``, ``ManagedZone.create``, ...)
+run unchanged through :meth:`AsyncClient.call`, so that they build their
+requests and apply the responses exactly as when called directly:
+
+>>> import asyncio
+>>> from gcloud import storage
+>>> from gcloud.aio import AsyncClient
+>>> client = storage.Client()
+>>> bucket = client.bucket('bucket-name')
+>>> blobs = [bucket.blob('blob-%d' % (index,)) for index in range(1000)]
+>>> async def check(blobs):
+...     async with AsyncClient(client) as aclient:
+...         return await asyncio.gather(
+...             *[aclient.call(blob.exists) for blob in blobs])
+>>> exists = asyncio.get_event_loop().run_until_complete(check(blobs))
+
+Requires Python 3.5+:  this module cannot be imported on older versions.
+"""
+
+import asyncio
+import ssl
+import time
+import zlib
+
+import httplib2
+from six.moves.urllib.parse import urlsplit  # pylint: disable=F0401
+
+from gcloud import metrics
+from gcloud.connection import _RequestOptions
+from gcloud.retry import _get_retry_after
+
+
+DEFAULT_MAX_CONNECTIONS = 100
+"""Default maximum number of connections opened by an AsyncHttp."""
+
+_NOW = time.time  # To be replaced by tests.
+_SLEEP = asyncio.sleep  # To be replaced by tests.
+_HTTP_FACTORY = httplib2.Http  # To be replaced by tests.
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+_NO_BODY_STATUSES = (204, 304)
+
+
+class Response(dict):
+    """Status and headers of an HTTP response.
+
+    Like :class:`httplib2.Response`, header names are lower-cased, and the
+    status is also available as the ``'status'`` header.
+
+    :type status: integer
+    :param status: The HTTP status code.
+
+    :type reason: string
+    :param reason: The HTTP reason phrase.
+
+    :type headers: dict
+    :param headers: The response headers, keyed by lower-cased name.
+    """
+
+    def __init__(self, status, reason, headers):
+        super(Response, self).__init__(headers)
+        self.status = status
+        self.reason = reason
+        self['status'] = str(status)
+
+
+async def _read_headers(reader):
+    """Read header lines up to the blank line ending them.
+
+    :type reader: :class:`asyncio.StreamReader`
+    :param reader: The stream positioned at the first header line.
+
+    :rtype: dict
+    :returns: The headers, keyed by lower-cased name;  repeated headers
+              are joined with commas.
+    """
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip()
+        if name in headers:
+            value = headers[name] + ', ' + value
+        headers[name] = value
+
+
+async def _read_chunked(reader):
+    """Read a body sent with the chunked transfer encoding.
+
+    :type reader: :class:`asyncio.StreamReader`
+    :param reader: The stream positioned at the first chunk.
+
+    :rtype: bytes
+    :returns: The body, without the chunk framing.
+    """
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b';', 1)[0].strip(), 16)
+        if size == 0:
+            await _read_headers(reader)  # Trailers, ignored.
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readline()
+
+
+def _decode_content(headers, content):
+    """Decompress the body of a response, as :mod:`httplib2` does.
+
+    :type headers: dict
+    :param headers: The response headers;  ``content-encoding`` is
+                    replaced by ``-content-encoding`` once decoded.
+
+    :type content: bytes
+    :param content: The body, as received.
+
+    :rtype: bytes
+    :returns: The decompressed body.
+    """
+    encoding = headers.get('content-encoding')
+    if encoding == 'gzip':
+        content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+    elif encoding == 'deflate':
+        content = zlib.decompress(content, -zlib.MAX_WBITS)
+    else:
+        return content
+    headers['-content-encoding'] = headers.pop('content-encoding')
+    headers['content-length'] = str(len(content))
+    return content
+
+
+async def _read_response(reader, method):
+    """Read a response from a connection.
+
+    :type reader: :class:`asyncio.StreamReader`
+    :param reader: The stream of the connection.
+
+    :type method: string
+    :param method: The method of the request answered.
+
+    :rtype: tuple
+    :returns: ``(response, content, keep_alive)``:  the
+              :class:`Response`, its (decoded) body, and whether the
+              connection may be reused.
+    :raises: :class:`ConnectionResetError` if the connection is closed
+             before a response.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('Connection closed by the server')
+    parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    version, status = parts[0], int(parts[1])
+    reason = parts[2] if len(parts) > 2 else ''
+    headers = await _read_headers(reader)
+
+    keep_alive = (version == 'HTTP/1.1' and
+                  headers.get('connection', '').lower() != 'close')
+    if (method == 'HEAD' or status in _NO_BODY_STATUSES or
+            100 <= status < 200):
+        content = b''
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        content = await _read_chunked(reader)
+    elif 'content-length' in headers:
+        content = await reader.readexactly(int(headers['content-length']))
+    else:
+        content = await reader.read()
+        keep_alive = False
+
+    content = _decode_content(headers, content)
+    return Response(status, reason, headers), content, keep_alive
+
+
+class AsyncHttp(object):
+    """Non-blocking HTTP/1.1 client, keeping connections alive for reuse.
+
+    Idle connections are pooled by host.  When ``max_connections``
+    connections are busy, further requests wait on the event loop for one
+    to be released.  Redirects are not followed.
+
+    :type max_connections: integer
+    :param max_connections: Maximum number of connections open at once,
+                            hence of requests in flight.
+
+    :type ssl_context: :class:`ssl.SSLContext`
+    :param ssl_context: (Optional) The context of ``https`` connections.
+                        Defaults to :func:`ssl.create_default_context`.
+
+    :raises: :class:`ValueError` if ``max_connections`` is not positive.
+    """
+
+    opened = 0
+    """Number of connections opened so far."""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 ssl_context=None):
+        if max_connections < 1:
+            raise ValueError('max_connections must be positive',
+                             max_connections)
+        self.max_connections = max_connections
+        self._ssl_context = ssl_context
+        self._idle = {}
+        self._slots = None
+
+    async def _connect(self, scheme, host, port):
+        """Open a new connection.
+
+        :rtype: tuple
+        :returns: The ``(reader, writer)`` streams of the connection.
+        """
+        context = None
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            context = self._ssl_context
+        streams = await asyncio.open_connection(host, port, ssl=context)
+        self.opened += 1
+        return streams
+
+    async def request(self, uri, method='GET', body=None, headers=None):
+        """Perform a request, waiting for a free connection if needed.
+
+        Mirrors :meth:`httplib2.Http.request`, without redirections.
+
+        :type uri: string
+        :param uri: The absolute URI of the request.
+
+        :type method: string
+        :param method: The HTTP method to use.
+
+        :type body: bytes or string
+        :param body: (Optional) The body of the request;  text is sent
+                     encoded as UTF-8.
+
+        :type headers: dict
+        :param headers: (Optional) HTTP headers to send with the request.
+
+        :rtype: tuple of ``response`` (a :class:`Response`)
+                and ``content`` (bytes).
+        :returns: The HTTP response and its (decompressed) content.
+        """
+        parts = urlsplit(uri)
+        scheme, host = parts.scheme, parts.hostname
+        port = parts.port or _DEFAULT_PORTS[scheme]
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        lines = ['%s %s HTTP/1.1' % (method, target),
+                 'Host: %s' % (parts.netloc,)]
+        headers = dict(headers or {})
+        if body is not None and not any(
+                name.lower() == 'content-length' for name in headers):
+            headers['Content-Length'] = str(len(body))
+        lines.extend('%s: %s' % item for item in headers.items())
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        if body:
+            request += body
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        key = (scheme, host, port)
+        async with self._slots:
+            idle = self._idle.setdefault(key, [])
+            while True:
+                reused = bool(idle)
+                if reused:
+                    reader, writer = idle.pop()
+                else:
+                    reader, writer = await self._connect(scheme, host, port)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    response, content, keep_alive = await _read_response(
+                        reader, method)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        # The server closed the idle connection:  retry on
+                        # another one.
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                break
+            if keep_alive:
+                idle.append((reader, writer))
+            else:
+                writer.close()
+        return response, content
+
+    async def close(self):
+        """Close the idle connections."""
+        for idle in self._idle.values():
+            while idle:
+                _, writer = idle.pop()
+                writer.close()
+
+
+async def _call_with_retry(retry, method, send):
+    """Send a request, retrying it while it fails transiently.
+
+    Mirrors :meth:`gcloud.retry.Retry.call`, sleeping on the event loop.
+
+    :type retry: :class:`gcloud.retry.Retry`
+    :param retry: The retry policy.
+
+    :type method: string
+    :param method: The HTTP method of the request.
+
+    :type send: callable
+    :param send: Callable taking no arguments, returning an awaitable of
+                 ``(response, content)``.
+
+    :rtype: tuple of ``response`` and ``content``.
+    :returns: The final HTTP response and its content.
+    """
+    allowed = retry.allows(method)
+    started = _NOW()
+    retry_num = 0
+    while True:
+        retry_num += 1
+        retry._record()
+        try:
+            response, content = await send()
+        except retry.exceptions:
+            delay = None
+            if allowed:
+                delay = retry._retry_delay(retry_num, _NOW() - started)
+            if delay is None:
+                raise
+        else:
+            delay = None
+            if allowed and response.status in retry.statuses:
+                delay = retry._retry_delay(retry_num, _NOW() - started,
+                                           _get_retry_after(response))
+            if delay is None:
+                return response, content
+        await _SLEEP(delay)
+        retry._record(retried=True, slept=delay)
+
+
+class AsyncConnection(object):
+    """Make the API requests of a JSON connection on an event loop.
+
+    Requests are built, retried, measured, cached and checked as by
+    :meth:`gcloud.connection.JSONConnection.api_request`, using the
+    settings of ``connection``;  only the transport differs.  Requests
+    are authorized with the connection's credentials, which are refreshed
+    (on a worker thread, as :mod:`oauth2client` blocks) once expired or
+    rejected.
+
+    :type connection: :class:`gcloud.connection.JSONConnection`
+    :param connection: The connection whose requests should be made.
+
+    :type http: :class:`AsyncHttp`
+    :param http: (Optional) The transport of the requests.  Defaults to a
+                 new :class:`AsyncHttp`.
+    """
+
+    def __init__(self, connection, http=None):
+        if http is None:
+            http = AsyncHttp()
+        self.connection = connection
+        self.http = http
+        self._refresh_lock = None
+
+    async def _access_token(self, rejected=None):
+        """Get a valid access token, refreshing the credentials if needed.
+
+        :type rejected: string
+        :param rejected: (Optional) A token rejected by the server, which
+                         must be refreshed.
+
+        :rtype: string
+        :returns: The access token.
+        """
+        credentials = self.connection.credentials
+
+        def _valid():
+            token = credentials.access_token
+            return (token is not None and token != rejected and
+                    not credentials.access_token_expired)
+
+        if not _valid():
+            if self._refresh_lock is None:
+                self._refresh_lock = asyncio.Lock()
+            async with self._refresh_lock:
+                # Another request may have refreshed while we waited.
+                if not _valid():
+                    loop = asyncio.get_event_loop()
+                    await loop.run_in_executor(
+                        None, credentials.refresh, _HTTP_FACTORY())
+        return credentials.access_token
+
+    async def _send(self, method, url, body, headers):
+        """Send a request once, authorized if the connection has
+        credentials.
+
+        :rtype: tuple of ``response`` and ``content``.
+        :returns: The HTTP response and its content.
+        """
+        if self.connection.credentials is None:
+            return await self.http.request(url, method, body, headers)
+        token = await self._access_token()
+        response, content = await self.http.request(
+            url, method, body, dict(headers, Authorization='Bearer ' + token))
+        if response.status == 401:
+            token = await self._access_token(rejected=token)
+            response, content = await self.http.request(
+                url, method, body,
+                dict(headers, Authorization='Bearer ' + token))
+        return response, content
+
+    async def api_request(self, method, path, query_params=None,
+                          data=None, content_type=None,
+                          api_base_url=None, api_version=None,
+                          expect_json=True, _target_object=None, **options):
+        """Make a request to the API.
+
+        See :meth:`gcloud.connection.JSONConnection.api_request` for the
+        arguments;  ``_target_object`` is ignored, as requests are never
+        deferred.
+
+        :rtype: dict or string
+        :returns: The decoded JSON resource, or the raw content.
+        :raises: Exception if the response code is not 200 OK.
+        """
+        conn = self.connection
+        options = _RequestOptions(**options)
+        url, data, content_type, headers, uncompressed_bytes, cached = (
+            conn._prepare_api_request(method, path, query_params, data,
+                                      content_type, api_base_url,
+                                      api_version, options))
+        body, headers = conn._encode_request(data, content_type, headers)
+
+        attempts = []
+
+        def _send():
+            attempts.append(None)
+            return self._send(method, url, body, headers)
+
+        retry = options.retry or conn.retry
+        info = metrics.request_started(method, url, data, uncompressed_bytes)
+        try:
+            response, content = await _call_with_retry(retry, method, _send)
+        except Exception as exc:  # pylint: disable=broad-except
+            metrics.request_finished(info, retries=len(attempts) - 1,
+                                     error=exc)
+            raise
+        metrics.request_finished(info, response.status, content,
+                                 retries=len(attempts) - 1)
+
+        return conn._finish_api_request(method, url, response, content,
+                                        expect_json, cached,
+                                        options.conditional)
+
+
+class _PendingRequest(Exception):
+    """Raised by :class:`_ReplayConnection` for a request not made yet."""
+
+
+class _ReplayConnection(object):
+    """Answer ``api_request`` calls with outcomes already awaited.
+
+    :type outcomes: list of tuples
+    :param outcomes: The ``(result, exception)`` of each request made so
+                     far, in order.
+    """
+
+    def __init__(self, outcomes):
+        self._outcomes = iter(outcomes)
+
+    def api_request(self, *args, **kwargs):
+        """Return (or raise) the outcome of the next request.
+
+        :raises: :class:`_PendingRequest` carrying the arguments, if the
+                 request has not been made yet.
+        """
+        for result, exc in self._outcomes:
+            if exc is not None:
+                raise exc
+            return result
+        raise _PendingRequest(args, kwargs)
+
+
+class _ReplayClient(object):
+    """Stand-in for a client, whose connection replays outcomes.
+
+    :type client: :class:`gcloud.client.Client`
+    :param client: The client to which other attributes are delegated.
+
+    :type outcomes: list of tuples
+    :param outcomes: See :class:`_ReplayConnection`.
+    """
+
+    def __init__(self, client, outcomes):
+        self._client = client
+        self.connection = _ReplayConnection(outcomes)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class AsyncClient(object):
+    """Run the calls of a client on an :mod:`asyncio` event loop.
+
+    The instance can be used as an asynchronous context manager, which
+    closes the idle connections on exit.
+
+    :type client: :class:`gcloud.client.Client`
+    :param client: The client whose calls should be run;  its connection
+                   must be a :class:`gcloud.connection.JSONConnection`.
+
+    :type http: :class:`AsyncHttp`
+    :param http: (Optional) The transport of the requests.  Defaults to a
+                 new :class:`AsyncHttp`.
+    """
+
+    def __init__(self, client, http=None):
+        self.client = client
+        self.connection = AsyncConnection(client.connection, http)
+
+    def api_request(self, *args, **kwargs):
+        """Make a request through :attr:`connection`.
+
+        See :meth:`AsyncConnection.api_request`.
+
+        :type args: tuple
+        :param args: Positional arguments passed to ``api_request``.
+
+        :type kwargs: dict
+        :param kwargs: Keyword arguments passed to ``api_request``.
+
+        :rtype: coroutine
+        :returns: A coroutine resolving to the decoded response.
+        """
+        return self.connection.api_request(*args, **kwargs)
+
+    async def call(self, method, *args, **kwargs):
+        """Run a resource method, making its requests on the event loop.
+
+        ``method`` must accept a ``client`` argument, and make its requests
+        through ``client.connection.api_request``, as the resource methods
+        of the JSON API clients do.  It is passed a stand-in for
+        :attr:`client`, and run again each time it reaches a request not
+        made yet, with the outcomes of the earlier ones:  the code before
+        each request must have no side effects (that of resource methods
+        only builds the request).
+
+        :type method: callable
+        :param method: The method to run, e.g. ``blob.exists``.
+
+        :type args: tuple
+        :param args: Positional arguments passed to ``method``.
+
+        :type kwargs: dict
+        :param kwargs: Keyword arguments passed to ``method``.
+
+        :rtype: object
+        :returns: The result of ``method``.
+        """
+        outcomes = []
+        while True:
+            try:
+                return method(*args, client=_ReplayClient(self.client,
+                                                          outcomes),
+                              **kwargs)
+            except _PendingRequest as pending:
+                request_args, request_kwargs = pending.args
+            try:
+                result = await self.connection.api_request(
+                    *request_args, **request_kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                outcomes.append((None, exc))
+            else:
+                outcomes.append((result, None))
+
+    async def close(self):
+        """Close the idle connections of the transport."""
+        await self.connection.http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -412,7 +412,7 @@ class Dataset(object):
         client = self._require_client(client)
 
         api_response = client.connection.api_request(
-            method='GET', path=self.path)
+            method='GET', path=self.path, conditional=True)
         self._set_properties(api_response)
 
     def patch(self, client=None, **kw):
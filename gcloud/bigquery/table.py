@@ -466,7 +466,7 @@ class Table(object):
         client = self._require_client(client)
 
         api_response = client.connection.api_request(
-            method='GET', path=self.path)
+            method='GET', path=self.path, conditional=True)
         self._set_properties(api_response)
 
     def patch(self,
@@ -684,7 +684,8 @@ class Table(object):
         response = client.connection.api_request(
             method='POST',
             path='%s/insertAll' % self.path,
-            data=data)
+            data=data,
+            compress=True)
         errors = []
 
         for error in response.get('insertErrors', ()):
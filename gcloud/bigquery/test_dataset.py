@@ -416,6 +416,7 @@ class TestDataset(unittest2.TestCase):
         req = conn._requested[0]
         self.assertEqual(req['method'], 'GET')
         self.assertEqual(req['path'], '/%s' % PATH)
+        self.assertTrue(req['conditional'])
         self._verifyResourceProperties(dataset, RESOURCE)
 
     def test_reload_w_alternate_client(self):
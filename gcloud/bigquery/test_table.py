@@ -606,6 +606,7 @@ class TestTable(unittest2.TestCase, _SchemaBase):
         req = conn._requested[0]
         self.assertEqual(req['method'], 'GET')
         self.assertEqual(req['path'], '/%s' % PATH)
+        self.assertTrue(req['conditional'])
         self._verifyResourceProperties(table, RESOURCE)
 
     def test_reload_w_alternate_client(self):
@@ -1147,6 +1148,7 @@ class TestTable(unittest2.TestCase, _SchemaBase):
         self.assertEqual(req['method'], 'POST')
         self.assertEqual(req['path'], '/%s' % PATH)
         self.assertEqual(req['data'], SENT)
+        self.assertTrue(req['compress'])
 
     def test_insert_data_w_alternate_client(self):
         from gcloud.bigquery.table import SchemaField
@@ -23,6 +23,8 @@ import platform
 
 from grpc.beta import implementations
 
+from gcloud import metrics
+
 
 # See https://gist.github.com/dhermes/bbc5b7be1932bfffae77
 # for appropriate values on other systems.
@@ -55,6 +57,48 @@ class MetadataTransformer(object):
         ]
 
 
+class _InstrumentedStub(object):
+    """Wraps a gRPC stub, notifying :mod:`gcloud.metrics` hooks of its RPCs.
+
+    RPCs are reported as ``POST`` requests to ``https://{host}/{method}``,
+    without status nor sizes;  streaming RPCs complete when they return
+    their response iterator.
+
+    :type stub: :class:`grpc.beta._stub._AutoIntermediary`
+    :param stub: The stub to wrap.
+
+    :type host: str
+    :param host: The host of the service.
+    """
+
+    def __init__(self, stub, host):
+        self._stub = stub
+        self._host = host
+
+    def __enter__(self):
+        self._stub.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self._stub.__exit__(exc_type, exc_val, exc_tb)
+
+    def __getattr__(self, name):
+        method = getattr(self._stub, name)
+        url = 'https://%s/%s' % (self._host, name)
+
+        def _call(*args, **kwargs):
+            """Call the RPC, notifying hooks before and after."""
+            info = metrics.request_started('POST', url, None)
+            try:
+                result = method(*args, **kwargs)
+            except Exception as exc:
+                metrics.request_finished(info, error=exc)
+                raise
+            metrics.request_finished(info)
+            return result
+        return _call
+
+
 def get_certs():
     """Gets the root certificates.
 
@@ -93,8 +137,9 @@ def make_stub(client, stub_factory, host, port):
     :type port: int
     :param port: The port for the service.
 
-    :rtype: :class:`grpc.beta._stub._AutoIntermediary`
-    :returns: The stub object used to make gRPC requests to a given API.
+    :rtype: :class:`_InstrumentedStub`
+    :returns: The stub object used to make gRPC requests to a given API,
+              reporting them to :mod:`gcloud.metrics` hooks.
     """
     root_certificates = get_certs()
     client_credentials = implementations.ssl_client_credentials(
@@ -102,5 +147,6 @@ def make_stub(client, stub_factory, host, port):
     channel = implementations.secure_channel(
         host, port, client_credentials)
     custom_metadata_transformer = MetadataTransformer(client)
-    return stub_factory(channel,
+    stub = stub_factory(channel,
                         metadata_transformer=custom_metadata_transformer)
+    return _InstrumentedStub(stub, host)
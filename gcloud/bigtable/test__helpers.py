@@ -136,7 +136,8 @@ class Test_make_stub(unittest2.TestCase):
                      MetadataTransformer=mock_transformer):
             result = self._callFUT(client, mock_stub_factory, host, port)
 
-        self.assertTrue(result is mock_result)
+        self.assertTrue(result._stub is mock_result)
+        self.assertEqual(result._host, host)
         self.assertEqual(stub_inputs, [(CHANNEL, transformed)])
         self.assertEqual(clients, [client])
         ssl_cli_kwargs = {'private_key': None, 'certificate_chain': None}
@@ -146,6 +147,93 @@ class Test_make_stub(unittest2.TestCase):
                          ((host, port, CLIENT_CREDS), {}))
 
 
+class Test_InstrumentedStub(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.bigtable._helpers import _InstrumentedStub
+        return _InstrumentedStub
+
+    def _makeOne(self, *args, **kwargs):
+        return self._getTargetClass()(*args, **kwargs)
+
+    def _callWithHook(self, func, *args):
+        from gcloud import metrics
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            return func(*args), hook._finished
+        finally:
+            metrics.unregister_hook(hook)
+
+    def test_context_manager(self):
+        stub = _Stub()
+        instrumented = self._makeOne(stub, 'HOST')
+        with instrumented as entered:
+            self.assertTrue(entered is instrumented)
+            self.assertEqual(stub._entered, 1)
+        self.assertEqual(stub._exited, [(None, None, None)])
+
+    def test_rpc(self):
+        stub = _Stub()
+        instrumented = self._makeOne(stub, 'HOST')
+        result, finished = self._callWithHook(instrumented.ReadRow, 'PB', 10)
+        self.assertEqual(result, 'RESPONSE')
+        self.assertEqual(stub._called_with, [(('PB', 10), {})])
+        info, = finished
+        self.assertEqual(info.method, 'POST')
+        self.assertEqual(info.url, 'https://HOST/ReadRow')
+        self.assertEqual(info.status, None)
+        self.assertEqual(info.error, None)
+
+    def test_rpc_w_error(self):
+        from gcloud import metrics
+        stub = _Stub(error=ValueError('RPC'))
+        instrumented = self._makeOne(stub, 'HOST')
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            self.assertRaises(ValueError, instrumented.ReadRow, 'PB')
+        finally:
+            metrics.unregister_hook(hook)
+        info, = hook._finished
+        self.assertTrue(info.error is stub._error)
+
+
+class _Stub(object):
+
+    _entered = 0
+
+    def __init__(self, error=None):
+        self._error = error
+        self._called_with = []
+        self._exited = []
+
+    def __enter__(self):
+        self._entered += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._exited.append((exc_type, exc_val, exc_tb))
+
+    def ReadRow(self, *args, **kwargs):
+        self._called_with.append((args, kwargs))
+        if self._error is not None:
+            raise self._error
+        return 'RESPONSE'
+
+
+class _Hook(object):
+
+    def __init__(self):
+        self._finished = []
+
+    def before_request(self, info):
+        pass
+
+    def after_request(self, info):
+        self._finished.append(info)
+
+
 class _Credentials(object):
 
     _scopes = None
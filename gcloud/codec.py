@@ -0,0 +1,214 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""JSON codecs used for request and response bodies.
+
+Bodies are encoded straight to UTF-8 bytes, and decoded from the bytes
+received.  When `orjson <https://pypi.python.org/pypi/orjson>`_ is
+installed it is used by default, else the standard library :mod:`json`.
+Any object with ``dumps`` and ``loads`` methods can be installed instead:
+
+>>> from gcloud import codec
+>>> codec.set_codec(codec.StdlibJSONCodec())
+"""
+
+import json
+import math
+import re
+
+import six
+
+try:
+    import orjson
+except ImportError:  # pragma: NO COVER
+    orjson = None
+
+
+_LONG_NUMBER = re.compile(b'[0-9]{19}')
+"""Digits of a number ``orjson`` may not decode as exactly as :mod:`json`."""
+
+
+def _has_non_finite(value):
+    """Whether a value holds NaN or infinite floats, at any depth.
+
+    :type value: object
+    :param value: A JSON-serializable value.
+
+    :rtype: bool
+    :returns: ``True`` if ``value`` holds a float which is not finite.
+    """
+    if isinstance(value, float):
+        return math.isinf(value) or math.isnan(value)
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return False
+    for item in value:
+        if _has_non_finite(item):
+            return True
+    return False
+
+
+class StdlibJSONCodec(object):
+    """JSON codec using the standard library :mod:`json` module."""
+
+    name = 'json'
+
+    @staticmethod
+    def dumps(value):
+        """Encode a value as JSON.
+
+        :type value: object
+        :param value: A JSON-serializable value.
+
+        :rtype: bytes
+        :returns: The compact, UTF-8 encoded JSON document.
+        """
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def loads(data):
+        """Decode a JSON document.
+
+        :type data: bytes or string
+        :param data: The JSON document, UTF-8 encoded if bytes.
+
+        :rtype: object
+        :returns: The decoded value.
+        """
+        if isinstance(data, six.binary_type):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class OrjsonCodec(object):
+    """JSON codec using :mod:`orjson`, which works on bytes directly.
+
+    Results match those of :class:`StdlibJSONCodec`:  values ``orjson``
+    would handle differently are left to the standard library.  These are
+    integers wider than 64 bits, non-string keys, subclasses of built-in
+    types, NaN and infinite floats (written as ``NaN`` / ``Infinity``
+    rather than ``null``) and datetimes or dataclasses (rejected rather
+    than serialized).  Only enums and UUIDs are still accepted.
+
+    :raises: :class:`RuntimeError` if ``orjson`` is not installed.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError('orjson is not installed')
+
+    @staticmethod
+    def dumps(value):
+        """Encode a value as JSON.
+
+        :type value: object
+        :param value: A JSON-serializable value.
+
+        :rtype: bytes
+        :returns: The compact, UTF-8 encoded JSON document.
+        """
+        try:
+            data = orjson.dumps(value, option=(
+                orjson.OPT_PASSTHROUGH_DATETIME |
+                orjson.OPT_PASSTHROUGH_DATACLASS |
+                orjson.OPT_PASSTHROUGH_SUBCLASS))
+        except TypeError:
+            return StdlibJSONCodec.dumps(value)
+        # ``orjson`` writes NaN and infinities as ``null``.
+        if b'null' in data and _has_non_finite(value):
+            return StdlibJSONCodec.dumps(value)
+        return data
+
+    @staticmethod
+    def loads(data):
+        """Decode a JSON document.
+
+        :type data: bytes or string
+        :param data: The JSON document, UTF-8 encoded if bytes.
+
+        :rtype: object
+        :returns: The decoded value.
+        """
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        # ``orjson`` decodes integers wider than 64 bits as floats.
+        if _LONG_NUMBER.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except ValueError:  # E.g. ``NaN``, which :mod:`json` accepts.
+                pass
+        return StdlibJSONCodec.loads(data)
+
+
+_CODEC = []
+
+
+def _default_codec():
+    """The fastest codec available."""
+    if orjson is not None:
+        return OrjsonCodec()
+    return StdlibJSONCodec()  # pragma: NO COVER
+
+
+def get_codec():
+    """The codec used for JSON bodies.
+
+    :rtype: object
+    :returns: The codec passed to :func:`set_codec`, else
+              :class:`OrjsonCodec` if ``orjson`` is installed, else
+              :class:`StdlibJSONCodec`.
+    """
+    if not _CODEC:
+        _CODEC.append(_default_codec())
+    return _CODEC[0]
+
+
+def set_codec(codec):
+    """Set the codec used for JSON bodies.
+
+    :type codec: object
+    :param codec: An object with ``dumps`` (value to bytes) and ``loads``
+                  (bytes or text to value) methods;  ``None`` restores the
+                  default.
+    """
+    del _CODEC[:]
+    if codec is not None:
+        _CODEC.append(codec)
+
+
+def dumps(value):
+    """Encode a value with the current codec.
+
+    :type value: object
+    :param value: A JSON-serializable value.
+
+    :rtype: bytes
+    :returns: The UTF-8 encoded JSON document.
+    """
+    return get_codec().dumps(value)
+
+
+def loads(data):
+    """Decode a JSON document with the current codec.
+
+    :type data: bytes or string
+    :param data: The JSON document, UTF-8 encoded if bytes.
+
+    :rtype: object
+    :returns: The decoded value.
+    """
+    return get_codec().loads(data)
@@ -14,19 +14,57 @@
 
 """Shared implementation of connections to API servers."""
 
-import json
-from pkg_resources import get_distribution
+import gzip
+import io
+
 import six
 from six.moves.urllib.parse import urlencode  # pylint: disable=F0401
 
-import httplib2
-
+from gcloud import __version__
+from gcloud import codec
+from gcloud import metrics
 from gcloud.exceptions import make_exception
+from gcloud.retry import Retry
+from gcloud.token_cache import share_credentials
+from gcloud.transport import PooledHttp
 
 
 API_BASE_URL = 'https://www.googleapis.com'
 """The base of the API call URL."""
 
+_GZIP_LEVEL = 6
+
+
+def _gzip(data):
+    """Compress a request body.
+
+    :type data: bytes
+    :param data: The body to compress.
+
+    :rtype: bytes
+    :returns: ``data``, gzip-compressed.
+    """
+    buf = io.BytesIO()
+    gzip_file = gzip.GzipFile(fileobj=buf, mode='wb',
+                              compresslevel=_GZIP_LEVEL)
+    try:
+        gzip_file.write(data)
+    finally:
+        gzip_file.close()
+    return buf.getvalue()
+
+
+class _RequestOptions(object):
+    """Per-request options of :meth:`JSONConnection.api_request`.
+
+    See :meth:`JSONConnection.api_request` for the arguments.
+    """
+
+    def __init__(self, retry=None, compress=False, conditional=False):
+        self.retry = retry
+        self.compress = compress
+        self.conditional = conditional
+
 
 class Connection(object):
     """A generic connection to Google Cloud Platform.
@@ -34,9 +72,10 @@ class Connection(object):
     Subclasses should understand only the basic types in method arguments,
     however they should be capable of returning advanced types.
 
-    If no value is passed in for ``http``, a :class:`httplib2.Http` object
-    will be created and authorized with the ``credentials``. If not, the
-    ``credentials`` and ``http`` need not be related.
+    If no value is passed in for ``http``, a thread-safe
+    :class:`gcloud.transport.PooledHttp` object will be created and
+    authorized with the ``credentials``. If not, the ``credentials`` and
+    ``http`` need not be related.
 
     Subclasses may seek to use the private key from ``credentials`` to sign
     data.
@@ -63,7 +102,7 @@ class Connection(object):
     :param http: An optional HTTP object to make requests.
     """
 
-    USER_AGENT = "gcloud-python/{0}".format(get_distribution('gcloud').version)
+    USER_AGENT = "gcloud-python/{0}".format(__version__)
     """The user agent for gcloud-python requests."""
 
     SCOPE = None
@@ -74,8 +113,8 @@ class Connection(object):
 
     def __init__(self, credentials=None, http=None):
         self._http = http
-        self._credentials = self._create_scoped_credentials(
-            credentials, self.SCOPE)
+        self._credentials = share_credentials(
+            self._create_scoped_credentials(credentials, self.SCOPE))
 
     @property
     def credentials(self):
@@ -91,11 +130,12 @@ class Connection(object):
     def http(self):
         """A getter for the HTTP transport used in talking to the API.
 
-        :rtype: :class:`httplib2.Http`
+        :rtype: :class:`gcloud.transport.PooledHttp` or the ``http``
+                passed to the constructor.
         :returns: A Http object used to transport data.
         """
         if self._http is None:
-            self._http = httplib2.Http()
+            self._http = PooledHttp()
             if self._credentials:
                 self._http = self._credentials.authorize(self._http)
         return self._http
@@ -137,6 +177,14 @@ class JSONConnection(Connection):
     * :attr:`API_URL_TEMPLATE`
 
     must be updated by subclasses.
+
+    Transient failures are retried according to :attr:`retry`.
+
+    Request bodies of at least :attr:`compression_threshold` bytes are
+    sent gzip-compressed to the methods which accept it.
+
+    If :attr:`etag_cache` is set, resources fetched by conditional requests
+    are cached, and revalidated by ETag when fetched again.
     """
 
     API_BASE_URL = None
@@ -148,6 +196,42 @@ class JSONConnection(Connection):
     API_URL_TEMPLATE = None
     """A template for the URL of a particular API call."""
 
+    compression_threshold = None
+    """Minimum size (in bytes) of compressed request bodies.
+
+    Bodies are only compressed for calls to :meth:`api_request` passing
+    ``compress=True``.  ``None`` (the default) disables compression.
+    """
+
+    etag_cache = None
+    """Cache (:class:`gcloud.etag_cache.ETagCache`) of resources fetched by
+    conditional requests;  ``None`` (the default) disables caching."""
+
+    _retry = None
+
+    @property
+    def retry(self):
+        """Retry policy used by :meth:`api_request`.
+
+        Defaults to a :class:`gcloud.retry.Retry` with default settings,
+        created the first time it is needed.
+
+        :rtype: :class:`gcloud.retry.Retry`
+        :returns: The retry policy (and counters) for this connection.
+        """
+        if self._retry is None:
+            self._retry = Retry()
+        return self._retry
+
+    @retry.setter
+    def retry(self, value):
+        """Update the retry policy used by :meth:`api_request`.
+
+        :type value: :class:`gcloud.retry.Retry` or ``NoneType``
+        :param value: The new policy;  ``None`` restores the default.
+        """
+        self._retry = value
+
     @classmethod
     def build_api_url(cls, path, query_params=None,
                       api_base_url=None, api_version=None):
@@ -197,8 +281,9 @@ class JSONConnection(Connection):
         :type url: string
         :param url: The URL to send the request to.
 
-        :type data: string
-        :param data: The data to send as the body of the request.
+        :type data: bytes or string
+        :param data: The data to send as the body of the request.  Text is
+                     sent encoded as UTF-8.
 
         :type content_type: string
         :param content_type: The proper MIME type of the data provided.
@@ -217,22 +302,44 @@ class JSONConnection(Connection):
         :returns: The HTTP response object and the content of the response,
                   returned by :meth:`_do_request`.
         """
+        data, headers = self._encode_request(data, content_type, headers)
+        return self._do_request(method, url, headers, data, target_object)
+
+    def _encode_request(self, data, content_type=None, headers=None):
+        """Encode the body of a request, and add the standard headers.
+
+        :type data: bytes or string
+        :param data: The data to send as the body of the request.  Text is
+                     sent encoded as UTF-8.
+
+        :type content_type: string
+        :param content_type: The proper MIME type of the data provided.
+
+        :type headers: dict
+        :param headers: A dictionary of HTTP headers to send with the request.
+
+        :rtype: tuple of ``data`` and ``headers``
+        :returns: The body to send, and the headers updated for it.
+        """
         headers = headers or {}
         headers['Accept-Encoding'] = 'gzip'
 
-        if data:
-            content_length = len(str(data))
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+
+        if isinstance(data, six.binary_type):
+            content_length = len(data)
         else:
+            # No body, or a mapping deferred by a batch (which encodes it).
             content_length = 0
 
-        headers['Content-Length'] = content_length
+        headers['Content-Length'] = str(content_length)
 
         if content_type:
             headers['Content-Type'] = content_type
 
         headers['User-Agent'] = self.USER_AGENT
-
-        return self._do_request(method, url, headers, data, target_object)
+        return data, headers
 
     def _do_request(self, method, url, headers, data,
                     target_object):  # pylint: disable=unused-argument
@@ -266,13 +373,16 @@ class JSONConnection(Connection):
     def api_request(self, method, path, query_params=None,
                     data=None, content_type=None,
                     api_base_url=None, api_version=None,
-                    expect_json=True, _target_object=None):
+                    expect_json=True, _target_object=None, **options):
         """Make a request over the HTTP transport to the API.
 
         You shouldn't need to use this method, but if you plan to
         interact with the API using these primitives, this is the
         correct one to use.
 
+        The ``retry``, ``compress`` and ``conditional`` options can only be
+        passed as keyword arguments.
+
         :type method: string
         :param method: The HTTP method name (ie, ``GET``, ``POST``, etc).
                        Required.
@@ -317,7 +427,54 @@ class JSONConnection(Connection):
                                example, to defer an HTTP request and complete
                                initialization of the object at a later time.
 
-        :raises: Exception if the response code is not 200 OK.
+        :type retry: :class:`gcloud.retry.Retry`
+        :param retry: (Optional) Retry policy for this request, overriding
+                      :attr:`retry`.
+
+        :type compress: bool
+        :param compress: If True, the API method accepts gzip-compressed
+                         bodies:  the body is compressed if it is at least
+                         :attr:`compression_threshold` bytes long.
+
+        :type conditional: bool
+        :param conditional: If True, and :attr:`etag_cache` is set, a
+                            ``GET`` request is sent with the ETag of the
+                            cached resource (if any), which is returned if
+                            unchanged;  else the resource fetched is cached.
+
+        :raises: Exception if the response code is not 200 OK;
+                 :class:`TypeError` if an unknown option is passed.
+        """
+        options = _RequestOptions(**options)
+        url, data, content_type, headers, uncompressed_bytes, cached = (
+            self._prepare_api_request(method, path, query_params, data,
+                                      content_type, api_base_url,
+                                      api_version, options))
+
+        response, content = self._send_api_request(
+            method, url, data, content_type, headers, _target_object,
+            options.retry or self.retry, uncompressed_bytes)
+
+        return self._finish_api_request(method, url, response, content,
+                                        expect_json, cached,
+                                        options.conditional)
+
+    def _prepare_api_request(self, method, path, query_params, data,
+                             content_type, api_base_url, api_version,
+                             options):
+        """Build the URL, body and headers of an :meth:`api_request` call.
+
+        See :meth:`api_request` for the arguments.
+
+        :type options: :class:`_RequestOptions`
+        :param options: The per-request options of the call.
+
+        :rtype: tuple
+        :returns: ``(url, data, content_type, headers, uncompressed_bytes,
+                  cached)``:  ``uncompressed_bytes`` is the size of a body
+                  sent compressed (else ``None``), and ``cached`` the
+                  ``(etag, resource)`` revalidated by a conditional request
+                  (else ``None``).
         """
         url = self.build_api_url(path=path, query_params=query_params,
                                  api_base_url=api_base_url,
@@ -326,12 +483,108 @@ class JSONConnection(Connection):
         # Making the executive decision that any dictionary
         # data will be sent properly as JSON.
         if data and isinstance(data, dict):
-            data = json.dumps(data)
+            data = codec.dumps(data)
             content_type = 'application/json'
 
-        response, content = self._make_request(
-            method=method, url=url, data=data, content_type=content_type,
-            target_object=_target_object)
+        headers = {}
+        uncompressed_bytes = None
+        if options.compress:
+            data, uncompressed_bytes = self._compress_body(data, headers)
+
+        cache = self.etag_cache
+        cached = None
+        if cache is not None:
+            if method != 'GET':
+                cache.invalidate(url)
+            elif options.conditional:
+                cached = cache.get(url)
+                if cached is not None:
+                    headers['If-None-Match'] = cached[0]
+
+        return url, data, content_type, headers, uncompressed_bytes, cached
+
+    def _compress_body(self, data, headers):
+        """Compress a request body, if it is large enough.
+
+        :type data: bytes or string
+        :param data: The body of the request.
+
+        :type headers: dict
+        :param headers: The headers of the request:  ``Content-Encoding``
+                        is set if the body is compressed.
+
+        :rtype: tuple
+        :returns: ``(data, uncompressed_bytes)``:  the body to send, and
+                  the size of ``data`` if it was compressed (else ``None``).
+        """
+        threshold = self.compression_threshold
+        if (threshold is None or not isinstance(data, six.binary_type) or
+                len(data) < threshold):
+            return data, None
+        headers['Content-Encoding'] = 'gzip'
+        return _gzip(data), len(data)
+
+    def _send_api_request(self, method, url, data, content_type, headers,
+                          target_object, retry, uncompressed_bytes):
+        """Send the request of an :meth:`api_request` call, with retries.
+
+        The request is reported to :mod:`gcloud.metrics`.
+
+        See :meth:`_prepare_api_request` for the arguments.
+
+        :type target_object: :class:`object` or :class:`NoneType`
+        :param target_object: The ``_target_object`` of the call.
+
+        :type retry: :class:`gcloud.retry.Retry`
+        :param retry: The retry policy of the request.
+
+        :rtype: tuple of ``response`` (a dictionary of sorts)
+                and ``content`` (a string).
+        :returns: The HTTP response object and the content of the response.
+        """
+        attempts = []
+
+        def _send():
+            attempts.append(None)
+            return self._make_request(
+                method=method, url=url, data=data, content_type=content_type,
+                headers=dict(headers), target_object=target_object)
+
+        info = metrics.request_started(method, url, data, uncompressed_bytes)
+        try:
+            response, content = retry.call(method, _send)
+        except Exception as exc:  # pylint: disable=broad-except
+            metrics.request_finished(info, retries=len(attempts) - 1,
+                                     error=exc)
+            raise
+        metrics.request_finished(info, response.status, content,
+                                 retries=len(attempts) - 1)
+        return response, content
+
+    def _finish_api_request(self, method, url, response, content,
+                            expect_json, cached, conditional):
+        """Check and decode the response to an :meth:`api_request` call.
+
+        See :meth:`api_request` for the arguments.
+
+        :type response: :class:`httplib2.Response` or other mapping of
+                        headers with a ``status`` attribute
+        :param response: The final HTTP response.
+
+        :type content: bytes or string
+        :param content: The content of the response.
+
+        :type cached: tuple or ``NoneType``
+        :param cached: The ``(etag, resource)`` revalidated by the request.
+
+        :rtype: dict or string
+        :returns: The decoded JSON resource, or the raw content.
+        :raises: Exception if the response code is not 200 OK.
+        """
+        cache = self.etag_cache
+        if cached is not None and response.status == 304:
+            cache.record_hit()
+            return cached[1]
 
         if not 200 <= response.status < 300:
             raise make_exception(response, content,
@@ -342,8 +595,12 @@ class JSONConnection(Connection):
             content_type = response.get('content-type', '')
             if not content_type.startswith('application/json'):
                 raise TypeError('Expected JSON, got %s' % content_type)
-            if isinstance(content, six.binary_type):
-                content = content.decode('utf-8')
-            return json.loads(content)
+            result = codec.loads(content)
+            if cache is not None and conditional and method == 'GET':
+                cache.record_miss()
+                etag = response.get('etag')
+                if etag is not None:
+                    cache.put(url, etag, result)
+            return result
 
         return content
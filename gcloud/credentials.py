@@ -16,16 +16,12 @@
 
 import base64
 import datetime
+import multiprocessing
 import six
 from six.moves.urllib.parse import urlencode  # pylint: disable=F0401
 
-from Crypto.Hash import SHA256
-from Crypto.PublicKey import RSA
-from Crypto.Signature import PKCS1_v1_5
 from oauth2client import client
 from oauth2client.client import _get_application_default_credential_from_file
-from oauth2client import crypt
-from oauth2client import service_account
 try:
     from oauth2client.appengine import AppAssertionCredentials as _GAECreds
 except ImportError:
@@ -38,10 +34,19 @@ except ImportError:
     app_identity = None
 
 from gcloud._helpers import UTC
+from gcloud._helpers import _LazyModule
 from gcloud._helpers import _NOW
 from gcloud._helpers import _microseconds_from_datetime
 
 
+# Only needed to sign URLs, so loaded on first use.
+SHA256 = _LazyModule('Crypto.Hash.SHA256')
+RSA = _LazyModule('Crypto.PublicKey.RSA')
+PKCS1_v1_5 = _LazyModule('Crypto.Signature.PKCS1_v1_5')
+crypt = _LazyModule('oauth2client.crypt')
+service_account = _LazyModule('oauth2client.service_account')
+
+
 def get_credentials():
     """Gets credentials implicitly from the current environment.
 
@@ -269,6 +274,38 @@ def _get_signed_query_params(credentials, expiration, string_to_sign):
     }
 
 
+def _get_string_to_sign(resource, expiration, method='GET',
+                        content_md5=None, content_type=None):
+    """Build the string signed for a signed URL.
+
+    :type resource: string
+    :param resource: A pointer to a specific resource.
+
+    :type expiration: int or long
+    :param expiration: When the signed URL should expire.
+
+    :type method: string
+    :param method: The HTTP verb that will be used when requesting the URL.
+
+    :type content_md5: string
+    :param content_md5: The MD5 hash of the object referenced by
+                        ``resource``.
+
+    :type content_type: string
+    :param content_type: The content type of the object referenced by
+                         ``resource``.
+
+    :rtype: string
+    :returns: The string to sign.
+    """
+    return '\n'.join([
+        method,
+        content_md5 or '',
+        content_type or '',
+        str(expiration),
+        resource])
+
+
 def _get_expiration_seconds(expiration):
     """Convert 'expiration' to a number of seconds in the future.
 
@@ -338,14 +375,8 @@ def generate_signed_url(credentials, resource, expiration,
               until expiration.
     """
     expiration = _get_expiration_seconds(expiration)
-
-    # Generate the string to sign.
-    string_to_sign = '\n'.join([
-        method,
-        content_md5 or '',
-        content_type or '',
-        str(expiration),
-        resource])
+    string_to_sign = _get_string_to_sign(resource, expiration, method,
+                                         content_md5, content_type)
 
     # Set the right query parameters.
     query_params = _get_signed_query_params(credentials,
@@ -356,3 +387,159 @@ def generate_signed_url(credentials, resource, expiration,
     return '{endpoint}{resource}?{querystring}'.format(
         endpoint=api_access_endpoint, resource=resource,
         querystring=urlencode(query_params))
+
+
+_WORKER_SIGNER = []
+
+
+def _init_signing_worker(signer):
+    """Keep the signer used by a :meth:`URLSigner.sign_many` worker.
+
+    :type signer: :class:`URLSigner`
+    :param signer: The signer, unpickled in the worker process.
+    """
+    _WORKER_SIGNER[:] = [signer]
+
+
+def _sign_in_worker(string_to_sign):
+    """Sign a string in a :meth:`URLSigner.sign_many` worker.
+
+    :type string_to_sign: string
+    :param string_to_sign: The string to be signed.
+
+    :rtype: bytes
+    :returns: The base64-encoded signature.
+    """
+    return _WORKER_SIGNER[0]._get_signature(string_to_sign)
+
+
+class URLSigner(object):
+    """Generate many signed URLs with the same credentials.
+
+    Unlike :func:`generate_signed_url`, which parses the private key of the
+    credentials on every call, the key is parsed once when the signer is
+    created.
+
+    :type credentials: :class:`client.SignedJwtAssertionCredentials`,
+                       :class:`service_account._ServiceAccountCredentials`,
+                       :class:`_GAECreds`
+    :param credentials: Credentials object with an associated private key to
+                        sign text.
+
+    :type api_access_endpoint: string
+    :param api_access_endpoint: Optional URI base. Defaults to empty string.
+    """
+
+    def __init__(self, credentials, api_access_endpoint=''):
+        self.api_access_endpoint = api_access_endpoint
+        self.service_account_name = _get_service_account_name(credentials)
+        if isinstance(credentials, _GAECreds):
+            self._pem_text = self._signer = None
+        else:
+            pem_key = _get_pem_key(credentials)
+            self._pem_text = pem_key.exportKey()
+            self._signer = PKCS1_v1_5.new(pem_key)
+
+    def __getstate__(self):
+        if self._pem_text is None:
+            raise ValueError('App Engine signers cannot be pickled')
+        return (self.api_access_endpoint, self.service_account_name,
+                self._pem_text)
+
+    def __setstate__(self, state):
+        self.api_access_endpoint, self.service_account_name, pem_text = state
+        self._pem_text = pem_text
+        self._signer = PKCS1_v1_5.new(RSA.importKey(pem_text))
+
+    def _get_signature(self, string_to_sign):
+        """Sign a string with the cached key.
+
+        :type string_to_sign: string
+        :param string_to_sign: The string to be signed.
+
+        :rtype: bytes
+        :returns: The base64-encoded signature.
+        """
+        if not isinstance(string_to_sign, six.binary_type):
+            string_to_sign = string_to_sign.encode('utf-8')
+        if self._signer is None:
+            _, signature_bytes = app_identity.sign_blob(string_to_sign)
+        else:
+            signature_bytes = self._signer.sign(SHA256.new(string_to_sign))
+        return base64.b64encode(signature_bytes)
+
+    def _build_url(self, resource, expiration, signature):
+        """Assemble a signed URL."""
+        query_params = {
+            'GoogleAccessId': self.service_account_name,
+            'Expires': str(expiration),
+            'Signature': signature,
+        }
+        return '{endpoint}{resource}?{querystring}'.format(
+            endpoint=self.api_access_endpoint, resource=resource,
+            querystring=urlencode(query_params))
+
+    def sign(self, resource, expiration, method='GET', content_md5=None,
+             content_type=None):
+        """Generate a signed URL.
+
+        See :func:`generate_signed_url` for the meaning of the arguments.
+
+        :rtype: string
+        :returns: A signed URL you can use to access the resource
+                  until expiration.
+        """
+        expiration = _get_expiration_seconds(expiration)
+        string_to_sign = _get_string_to_sign(resource, expiration, method,
+                                             content_md5, content_type)
+        return self._build_url(resource, expiration,
+                               self._get_signature(string_to_sign))
+
+    def sign_many(self, requests, processes=None, chunksize=256):
+        """Generate signed URLs in bulk.
+
+        :type requests: iterable of tuples
+        :param requests: Tuples of ``(resource, expiration)``, optionally
+                         followed by ``method``, ``content_md5`` and
+                         ``content_type`` (see :meth:`sign`).
+
+        :type processes: integer
+        :param processes: (Optional) If passed, spread the RSA signing over
+                          a :class:`multiprocessing.Pool` of that many
+                          processes.
+
+        :type chunksize: integer
+        :param chunksize: Number of URLs sent to a process at a time.
+
+        :rtype: list of string
+        :returns: The signed URLs, in the order of ``requests``.
+        :raises: :class:`ValueError` if ``processes`` is passed for App
+                 Engine credentials, which can only sign in-process.
+        """
+        resources, expirations, strings_to_sign = [], [], []
+        for request in requests:
+            resource, expiration = request[:2]
+            expiration = _get_expiration_seconds(expiration)
+            resources.append(resource)
+            expirations.append(expiration)
+            strings_to_sign.append(
+                _get_string_to_sign(resource, expiration, *request[2:]))
+
+        if processes is None:
+            signatures = [self._get_signature(string_to_sign)
+                          for string_to_sign in strings_to_sign]
+        else:
+            if self._pem_text is None:
+                raise ValueError('App Engine credentials cannot sign in '
+                                 'other processes')
+            pool = multiprocessing.Pool(processes, _init_signing_worker,
+                                        (self,))
+            try:
+                signatures = pool.map(_sign_in_worker, strings_to_sign,
+                                      chunksize)
+            finally:
+                pool.close()
+                pool.join()
+
+        return [self._build_url(*args) for args in
+                zip(resources, expirations, signatures)]
@@ -21,9 +21,14 @@ See
 https://cloud.google.com/datastore/docs/concepts/entities#Datastore_Batch_operations
 """
 
+from google.protobuf.message import DecodeError
+
+from gcloud._helpers import _LazyModule
 from gcloud.datastore import helpers
 from gcloud.datastore.key import _dataset_ids_equal
-from gcloud.datastore._generated import datastore_pb2 as _datastore_pb2
+
+
+_datastore_pb2 = _LazyModule('gcloud.datastore._generated.datastore_pb2')
 
 
 class Batch(object):
@@ -67,6 +72,8 @@ class Batch(object):
         self._client = client
         self._commit_request = _datastore_pb2.CommitRequest()
         self._partial_key_entities = []
+        self._mutation_count = 0
+        self._mutation_bytes = 0
 
     def current(self):
         """Return the topmost batch / transaction, or None."""
@@ -90,6 +97,25 @@ class Batch(object):
         """
         return self._client.namespace
 
+    @property
+    def mutation_count(self):
+        """Getter for the number of mutations added to the batch.
+
+        :rtype: integer
+        :returns: The number of entities put and keys deleted so far.
+        """
+        return self._mutation_count
+
+    @property
+    def mutation_bytes(self):
+        """Getter for the encoded size of the mutations added to the batch.
+
+        :rtype: integer
+        :returns: The total size, in bytes, of the entity and key protobufs
+                  added so far.
+        """
+        return self._mutation_bytes
+
     @property
     def connection(self):
         """Getter for connection over which the batch will run.
@@ -182,6 +208,42 @@ class Batch(object):
             entity_pb = self._add_complete_key_entity_pb()
 
         _assign_entity_to_pb(entity_pb, entity)
+        self._mutation_count += 1
+        self._mutation_bytes += entity_pb.ByteSize()
+
+    def _put_serialized_entity(self, data):
+        """Remember a serialized entity to be saved during :meth:`commit`.
+
+        Unlike :meth:`put`, the entity is parsed straight into its
+        mutation, and its key's dataset ID is dropped, so that it is saved
+        in the batch's dataset.  A partial key is sent as an
+        ``insert_auto_id`` mutation, but not completed afterwards.
+
+        :type data: bytes
+        :param data: A serialized
+                     :class:`gcloud.datastore._generated.entity_pb2.Entity`.
+
+        :raises: :class:`ValueError` if ``data`` is not an entity with a
+                 key.
+        """
+        mutation_pb = self._add_complete_key_entity_pb()
+        try:
+            mutation_pb.MergeFromString(data)
+        except DecodeError as exc:
+            del self.mutations.upsert[-1]
+            raise ValueError('Invalid entity record', exc)
+        if not (mutation_pb.key.path_element and mutation_pb.IsInitialized()):
+            del self.mutations.upsert[-1]
+            raise ValueError('Entity record has no valid key', data)
+        last_element = mutation_pb.key.path_element[-1]
+        if not (last_element.HasField('id') or last_element.HasField('name')):
+            del self.mutations.upsert[-1]
+            mutation_pb = self._add_partial_key_entity_pb()
+            mutation_pb.MergeFromString(data)
+
+        mutation_pb.key.partition_id.ClearField('dataset_id')
+        self._mutation_count += 1
+        self._mutation_bytes += len(data)
 
     def delete(self, key):
         """Remember a key to be deleted during :meth:`commit`.
@@ -200,6 +262,8 @@ class Batch(object):
 
         key_pb = helpers._prepare_key_for_request(key.to_protobuf())
         self._add_delete_key_pb().CopyFrom(key_pb)
+        self._mutation_count += 1
+        self._mutation_bytes += key_pb.ByteSize()
 
     def begin(self):
         """No-op
@@ -213,9 +277,20 @@ class Batch(object):
         This is called automatically upon exiting a with statement,
         however it can be called explicitly if you don't want to use a
         context manager.
+
+        Entities put or deleted are dropped from the client's
+        ``entity_cache``, if any, even if the commit fails.
         """
-        _, updated_keys = self.connection.commit(
-            self.dataset_id, self._commit_request, self._id)
+        try:
+            _, updated_keys = self.connection.commit(
+                self.dataset_id, self._commit_request, self._id)
+        finally:
+            cache = self._client.entity_cache
+            if cache is not None:
+                mutation = self.mutations
+                cache.invalidate(
+                    [entity_pb.key for entity_pb in mutation.upsert] +
+                    list(mutation.delete))
         # If the back-end returns without error, we are guaranteed that
         # :meth:`Connection.commit` will return keys that match (length and
         # order) directly ``_partial_key_entities``.
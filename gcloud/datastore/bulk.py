@@ -0,0 +1,553 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk export and import of datastore entities, to and from files.
+
+Entities are streamed as protobufs, never decoded into
+:class:`gcloud.datastore.entity.Entity` instances, and only a few pages
+(or commits) are held in memory at once::
+
+  >>> from gcloud.datastore.bulk import export_entities
+  >>> from gcloud.datastore.bulk import import_entities
+  >>> query = client.query(kind='Person')
+  >>> with open('people.bin', 'wb') as stream:
+  ...     export_entities(query, stream, num_splits=16)
+  >>> with open('people.bin', 'rb') as stream:
+  ...     import_entities(other_client, stream)
+
+Files are opened in binary mode, and hold entities in one of two
+formats:
+
+* :data:`DELIMITED`:  each entity protobuf, serialized and prefixed with
+  its size as a varint (as protobuf's ``writeDelimitedTo`` does).
+
+* :data:`NDJSON`:  an entity per line, as a JSON object whose members are
+  the fields of the entity protobuf, with camel-cased names.  64-bit
+  integers are written as strings, and bytes in base64.
+"""
+
+import base64
+import itertools
+import json
+
+import six
+
+from gcloud._helpers import _LazyModule
+from gcloud._helpers import _iterate_concurrently
+from gcloud._helpers import _map_concurrently
+from gcloud._helpers import _prefetch
+from gcloud.datastore.batch import Batch
+from gcloud.datastore.client import PartialCommitError
+from gcloud.datastore.query import _SPLIT_BUFFER_PAGES
+from gcloud.datastore.query import _iter_pages
+
+
+_entity_pb2 = _LazyModule('gcloud.datastore._generated.entity_pb2')
+
+DELIMITED = 'delimited'
+"""Format of files holding size-prefixed entity protobufs."""
+
+NDJSON = 'ndjson'
+"""Format of files holding an entity, as JSON, per line."""
+
+_JSON_FIELDS = {}
+
+_NON_FINITE_FLOATS = {
+    'NaN': float('nan'),
+    'Infinity': float('inf'),
+    '-Infinity': float('-inf'),
+}
+
+
+def export_entities(query, stream, file_format=DELIMITED, num_splits=1,
+                    max_workers=None, split_points=None, client=None):
+    """Write the entities matching a query to a file.
+
+    With ``num_splits`` (or ``split_points``), the query is split into
+    sub-queries over key ranges (see
+    :meth:`gcloud.datastore.query.Query.split`), whose pages are fetched
+    concurrently and written as they arrive.  Otherwise pages are fetched
+    on a background thread, while the previous one is written.
+
+    :type query: :class:`gcloud.datastore.query.Query`
+    :param query: The query whose entities are exported.
+
+    :type stream: file-like object
+    :param stream: The (binary) file written.
+
+    :type file_format: string
+    :param file_format: (Optional) :data:`DELIMITED` (the default) or
+                        :data:`NDJSON`.
+
+    :type num_splits: integer
+    :param num_splits: (Optional) The number of sub-queries wanted.
+
+    :type max_workers: integer
+    :param max_workers: (Optional) Maximum number of sub-queries run at
+                        once.  Defaults to the client's ``max_workers``.
+
+    :type split_points: sequence of :class:`gcloud.datastore.key.Key`
+    :param split_points: (Optional) Keys at which to split the query.
+
+    :type client: :class:`gcloud.datastore.client.Client`
+    :param client: (Optional) client used to connect to datastore.
+                   If not supplied, uses the query's value.
+
+    :rtype: integer
+    :returns: The number of entities written.
+    :raises: :class:`ValueError` if the format is unknown, if called within
+             a transaction, or if the query cannot be split.
+    """
+    encode, _ = _get_format(file_format)
+    if client is None:
+        client = query._client
+    if client.current_transaction is not None:
+        raise ValueError('Exports cannot run in a transaction')
+    if max_workers is None:
+        max_workers = client.max_workers
+
+    if num_splits == 1 and split_points is None:
+        queries = [query]
+    else:
+        queries = query.split(num_splits, split_points, client)
+    pages = _iterate_concurrently(
+        [_iter_pages(sub_query.fetch(client=client), raw=True)
+         for sub_query in queries],
+        max_workers, False, _SPLIT_BUFFER_PAGES)
+
+    count = 0
+    for entity_pbs in pages:
+        stream.write(b''.join(encode(entity_pb) for entity_pb in entity_pbs))
+        count += len(entity_pbs)
+    return count
+
+
+def import_entities(client, stream, file_format=DELIMITED, max_workers=None):
+    """Save the entities read from a file.
+
+    Entities are saved in the client's dataset, in concurrent commits of
+    at most the client's ``commit_chunk_size`` entities (or
+    ``commit_chunk_bytes``);  the file is read ahead on a background
+    thread while they are sent, each entity being parsed straight into
+    its commit request.  Entities with complete keys are upserted.
+    A failed commit does not stop the import:  the keys of its entities
+    are reported at the end.  The import stops, though, after a wave of
+    concurrent commits which all failed (e.g. during an outage), without
+    reading the rest of the file.
+
+    :type client: :class:`gcloud.datastore.client.Client`
+    :param client: The client used to commit.
+
+    :type stream: file-like object
+    :param stream: The (binary) file read, written by
+                   :func:`export_entities`.
+
+    :type file_format: string
+    :param file_format: (Optional) :data:`DELIMITED` (the default) or
+                        :data:`NDJSON`.
+
+    :type max_workers: integer
+    :param max_workers: (Optional) Maximum number of commits sent at once.
+                        Defaults to the client's ``max_workers``.
+
+    :rtype: integer
+    :returns: The number of entities saved.
+    :raises: :class:`ValueError` if the format is unknown, or if the file
+             is not valid;
+             :class:`gcloud.datastore.client.PartialCommitError` if any
+             commit failed, whose ``failures`` hold
+             :class:`gcloud.datastore._generated.entity_pb2.Key` protobufs.
+    """
+    _, read = _get_format(file_format)
+    if max_workers is None:
+        max_workers = client.max_workers
+
+    def _commit(batch):
+        try:
+            batch.commit()
+        except Exception as exc:  # pylint: disable=broad-except
+            return exc
+
+    batches = _prefetch(_batch_entities(client, read(stream)), max_workers)
+    total = 0
+    failures = []
+    while True:
+        wave = list(itertools.islice(batches, max_workers))
+        if not wave:
+            break
+        errors = _map_concurrently(_commit, wave, max_workers)
+        for batch, error in zip(wave, errors):
+            total += batch.mutation_count
+            if error is not None:
+                mutations = batch.mutations
+                failures.extend(
+                    (_copy_key_pb(entity_pb), error)
+                    for entity_pb in itertools.chain(
+                        mutations.upsert, mutations.insert_auto_id))
+        if None not in errors:
+            batches.close()
+            break
+
+    if failures:
+        raise PartialCommitError(failures, total)
+    return total
+
+
+def _copy_key_pb(entity_pb):
+    """Copy the key of an entity protobuf, so the entity can be freed.
+
+    :type entity_pb: :class:`gcloud.datastore._generated.entity_pb2.Entity`
+    :param entity_pb: The entity whose key is copied.
+
+    :rtype: :class:`gcloud.datastore._generated.entity_pb2.Key`
+    :returns: A copy of the entity's key.
+    """
+    key_pb = _entity_pb2.Key()
+    key_pb.CopyFrom(entity_pb.key)
+    return key_pb
+
+
+def _batch_entities(client, entities):
+    """Group serialized entities into batches no larger than a commit.
+
+    :type client: :class:`gcloud.datastore.client.Client`
+    :param client: The client used to commit.
+
+    :type entities: iterable of bytes
+    :param entities: The serialized entities to save.
+
+    :rtype: generator
+    :returns: :class:`gcloud.datastore.batch.Batch` instances.
+    :raises: :class:`ValueError` if an entity is not valid.
+    """
+    batch = None
+    for data in entities:
+        if (batch is None or
+                batch.mutation_count >= client.commit_chunk_size or
+                batch.mutation_bytes >= client.commit_chunk_bytes):
+            if batch is not None:
+                yield batch
+            batch = Batch(client)
+        batch._put_serialized_entity(data)
+    if batch is not None:
+        yield batch
+
+
+def _get_format(file_format):
+    """Find the functions writing and reading a file format.
+
+    :type file_format: string
+    :param file_format: :data:`DELIMITED` or :data:`NDJSON`.
+
+    :rtype: tuple
+    :returns: ``(encode, read)``:  the function encoding an entity protobuf
+              as a record, and the one reading a file's (serialized)
+              entities.
+    :raises: :class:`ValueError` if the format is unknown.
+    """
+    if file_format == DELIMITED:
+        return _encode_delimited, _read_delimited
+    elif file_format == NDJSON:
+        return _encode_json, _read_json
+    raise ValueError('Unknown file format', file_format)
+
+
+def _encode_varint(value):
+    """Encode a non-negative integer as a protobuf varint.
+
+    :type value: integer
+    :param value: The integer to encode.
+
+    :rtype: bytes
+    :returns: The little-endian groups of 7 bits of ``value``.
+    """
+    groups = bytearray()
+    while value > 0x7f:
+        groups.append(0x80 | (value & 0x7f))
+        value >>= 7
+    groups.append(value)
+    return bytes(groups)
+
+
+def _read_varint(stream):
+    """Read a protobuf varint from a file.
+
+    :type stream: file-like object
+    :param stream: The (binary) file read.
+
+    :rtype: integer or ``NoneType``
+    :returns: The integer read, or ``None`` at the end of the file.
+    :raises: :class:`ValueError` if the file ends within the varint.
+    """
+    value = shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise ValueError('Truncated record size')
+            return None
+        byte = ord(byte)
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value
+        shift += 7
+
+
+def _encode_delimited(entity_pb):
+    """Encode an entity protobuf, prefixed with its size.
+
+    :type entity_pb: :class:`gcloud.datastore._generated.entity_pb2.Entity`
+    :param entity_pb: The entity to encode.
+
+    :rtype: bytes
+    :returns: The record written for the entity.
+    """
+    data = entity_pb.SerializeToString()
+    return _encode_varint(len(data)) + data
+
+
+def _read_delimited(stream):
+    """Read the size-prefixed entities of a file.
+
+    :type stream: file-like object
+    :param stream: The (binary) file read.
+
+    :rtype: generator
+    :returns: Serialized
+              :class:`gcloud.datastore._generated.entity_pb2.Entity`
+              protobufs.
+    :raises: :class:`ValueError` if the file ends within a record.
+    """
+    while True:
+        size = _read_varint(stream)
+        if size is None:
+            return
+        data = stream.read(size)
+        if len(data) < size:
+            raise ValueError('Truncated record', size, len(data))
+        yield data
+
+
+def _encode_json(entity_pb):
+    """Encode an entity protobuf as a line of JSON.
+
+    :type entity_pb: :class:`gcloud.datastore._generated.entity_pb2.Entity`
+    :param entity_pb: The entity to encode.
+
+    :rtype: bytes
+    :returns: The line written for the entity.
+    """
+    return json.dumps(_message_to_json(entity_pb), sort_keys=True,
+                      separators=(',', ':'),
+                      allow_nan=False).encode('ascii') + b'\n'
+
+
+def _read_json(stream):
+    """Read the entities of a file holding a JSON object per line.
+
+    Blank lines are skipped.  The entities are only checked by the
+    :class:`gcloud.datastore.batch.Batch` parsing them.
+
+    :type stream: file-like object
+    :param stream: The (binary) file read.
+
+    :rtype: generator
+    :returns: Serialized
+              :class:`gcloud.datastore._generated.entity_pb2.Entity`
+              protobufs.
+    :raises: :class:`ValueError` if a line is not a JSON object holding
+             the fields of an entity.
+    """
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                entity_pb = _message_from_json(
+                    _entity_pb2.Entity(), json.loads(line.decode('utf-8')))
+            except (AttributeError, TypeError) as exc:
+                raise ValueError('Invalid entity record', line, exc)
+            yield entity_pb.SerializePartialToString()
+
+
+def _camel_case(name):
+    """Convert a protobuf field name to its JSON name.
+
+    :type name: string
+    :param name: The name, in lower case with underscores.
+
+    :rtype: string
+    :returns: The name, in camel case.
+    """
+    first, rest = name.split('_')[0], name.split('_')[1:]
+    return first + ''.join(part.capitalize() for part in rest)
+
+
+def _is_repeated(field):
+    """Whether a field holds a list of values.
+
+    :type field: :class:`google.protobuf.descriptor.FieldDescriptor`
+    :param field: The field.
+
+    :rtype: boolean
+    """
+    try:
+        return field.is_repeated
+    except AttributeError:  # pragma: NO COVER  protobuf < 3.20
+        return field.label == field.LABEL_REPEATED
+
+
+def _is_int64(field):
+    """Whether a field holds 64-bit integers, written as JSON strings.
+
+    :type field: :class:`google.protobuf.descriptor.FieldDescriptor`
+    :param field: The field.
+
+    :rtype: boolean
+    """
+    return field.type in (field.TYPE_INT64, field.TYPE_UINT64,
+                          field.TYPE_SINT64, field.TYPE_FIXED64,
+                          field.TYPE_SFIXED64)
+
+
+def _is_float(field):
+    """Whether a field holds floating point numbers.
+
+    Non-finite ones are written as the JSON strings ``"NaN"``,
+    ``"Infinity"`` and ``"-Infinity"``.
+
+    :type field: :class:`google.protobuf.descriptor.FieldDescriptor`
+    :param field: The field.
+
+    :rtype: boolean
+    """
+    return field.type in (field.TYPE_DOUBLE, field.TYPE_FLOAT)
+
+
+def _message_to_json(message):
+    """Convert a protobuf message to a JSON-compatible dict.
+
+    :type message: :class:`google.protobuf.message.Message`
+    :param message: The message to convert.
+
+    :rtype: dict
+    :returns: The fields set on ``message``, by camel-cased name.
+    """
+    result = {}
+    for field, value in message.ListFields():
+        if _is_repeated(field):
+            value = [_value_to_json(field, item) for item in value]
+        else:
+            value = _value_to_json(field, value)
+        result[_camel_case(field.name)] = value
+    return result
+
+
+def _value_to_json(field, value):
+    """Convert the value of a protobuf field to a JSON-compatible value.
+
+    :type field: :class:`google.protobuf.descriptor.FieldDescriptor`
+    :param field: The field.
+
+    :type value: object
+    :param value: A (single) value of the field.
+
+    :rtype: object
+    :returns: The value to write as JSON.
+    """
+    if field.type == field.TYPE_MESSAGE:
+        return _message_to_json(value)
+    elif field.type == field.TYPE_BYTES:
+        return base64.b64encode(value).decode('ascii')
+    elif _is_int64(field):
+        return str(value)
+    elif _is_float(field) and value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '-Infinity'
+    elif _is_float(field) and value != value:
+        return 'NaN'
+    return value
+
+
+def _json_fields(descriptor):
+    """Map the JSON names of a message type's fields to the fields.
+
+    :type descriptor: :class:`google.protobuf.descriptor.Descriptor`
+    :param descriptor: The message type.
+
+    :rtype: dict
+    :returns: The fields, by camel-cased name.
+    """
+    fields = _JSON_FIELDS.get(descriptor.full_name)
+    if fields is None:
+        fields = _JSON_FIELDS[descriptor.full_name] = dict(
+            (_camel_case(field.name), field) for field in descriptor.fields)
+    return fields
+
+
+def _message_from_json(message, data):
+    """Set the fields of a protobuf message from a JSON-compatible dict.
+
+    :type message: :class:`google.protobuf.message.Message`
+    :param message: The (empty) message to set.
+
+    :type data: dict
+    :param data: The fields, by camel-cased name, as written by
+                 :func:`_message_to_json`.
+
+    :rtype: :class:`google.protobuf.message.Message`
+    :returns: ``message``.
+    :raises: :class:`ValueError` if ``data`` names an unknown field.
+    """
+    fields = _json_fields(message.DESCRIPTOR)
+    for name, value in six.iteritems(data):
+        field = fields.get(name)
+        if field is None:
+            raise ValueError('Unknown field', message.DESCRIPTOR.name, name)
+        if _is_repeated(field):
+            # Entity protobufs only have repeated message fields.
+            container = getattr(message, field.name)
+            for item in value:
+                _message_from_json(container.add(), item)
+        elif field.type == field.TYPE_MESSAGE:
+            sub_message = getattr(message, field.name)
+            sub_message.SetInParent()
+            _message_from_json(sub_message, value)
+        else:
+            setattr(message, field.name, _value_from_json(field, value))
+    return message
+
+
+def _value_from_json(field, value):
+    """Convert a JSON value to the value of a (non-message) protobuf field.
+
+    :type field: :class:`google.protobuf.descriptor.FieldDescriptor`
+    :param field: The field.
+
+    :type value: object
+    :param value: A (single) value, as written by :func:`_value_to_json`.
+
+    :rtype: object
+    :returns: The value to set on the field.
+    :raises: :class:`ValueError` if a floating point value is an unknown
+             string.
+    """
+    if field.type == field.TYPE_BYTES:
+        return base64.b64decode(value.encode('ascii'))
+    elif _is_int64(field):
+        return int(value)
+    elif _is_float(field) and isinstance(value, six.string_types):
+        try:
+            return _NON_FINITE_FLOATS[value]
+        except KeyError:
+            raise ValueError('Invalid floating point value', value)
+    return value
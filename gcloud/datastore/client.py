@@ -18,6 +18,7 @@ import os
 from gcloud._helpers import _LocalStack
 from gcloud._helpers import _app_engine_id
 from gcloud._helpers import _compute_engine_id
+from gcloud._helpers import _map_concurrently
 from gcloud.client import Client as _BaseClient
 from gcloud.datastore import helpers
 from gcloud.datastore.connection import Connection
@@ -34,6 +35,29 @@ from gcloud.environment_vars import GCD_DATASET
 _MAX_LOOPS = 128
 """Maximum number of iterations to wait for deferred keys."""
 
+DEFAULT_LOOKUP_CHUNK_SIZE = 500
+"""Default maximum number of keys sent in one ``lookup`` request.
+
+Half the backend's limit of 1000 keys:  smaller requests are less likely
+to have keys deferred, and spread a large fetch over more workers.
+"""
+
+DEFAULT_COMMIT_CHUNK_SIZE = 500
+"""Default maximum number of mutations sent in one ``commit`` request.
+
+The backend's limit on the entities written by a commit.
+"""
+
+DEFAULT_COMMIT_CHUNK_BYTES = 8 * 1024 * 1024
+"""Default size, in bytes, of the mutations after which a commit is full.
+
+A commit may go over by one mutation:  together with the 1 MiB limit on
+an entity, this keeps requests under the backend's 10 MiB limit.
+"""
+
+DEFAULT_MAX_WORKERS = 8
+"""Default maximum number of concurrent requests made by one call."""
+
 
 def _get_production_dataset_id():
     """Gets the production application ID if it can be inferred."""
@@ -77,13 +101,59 @@ def _determine_default_dataset_id(dataset_id=None):
     return dataset_id
 
 
+def _chunked(values, size):
+    """Split a list into consecutive slices of at most ``size`` items.
+
+    :type values: list
+    :param values: The values to split.
+
+    :type size: integer or ``NoneType``
+    :param size: Maximum length of each slice;  if ``None``, ``values`` is
+                 not split.
+
+    :rtype: list of list
+    :returns: The slices, in order.
+    """
+    if size is None or len(values) <= size:
+        return [values]
+    return [values[start:start + size]
+            for start in range(0, len(values), size)]
+
+
+def _sort_by_keys(entity_pbs, key_pbs):
+    """Sort entity protobufs into the order of the requested keys.
+
+    :type entity_pbs: list of
+                      :class:`gcloud.datastore._generated.entity_pb2.Entity`
+    :param entity_pbs: Entities returned by the backend.
+
+    :type key_pbs: list of :class:`gcloud.datastore._generated.entity_pb2.Key`
+    :param key_pbs: The keys, in the order requested.
+
+    :rtype: list of :class:`gcloud.datastore._generated.entity_pb2.Entity`
+    :returns: ``entity_pbs``, in the order of their keys in ``key_pbs``;
+              entities with unrequested keys come last.
+    """
+    positions = {}
+    for position, key_pb in enumerate(key_pbs):
+        positions.setdefault(helpers._key_path(key_pb), position)
+    last = len(key_pbs)
+    return sorted(entity_pbs, key=lambda entity_pb: positions.get(
+        helpers._key_path(entity_pb.key), last))
+
+
 def _extended_lookup(connection, dataset_id, key_pbs,
                      missing=None, deferred=None,
-                     eventual=False, transaction_id=None):
+                     eventual=False, transaction_id=None,
+                     chunk_size=None, max_workers=1):
     """Repeat lookup until all keys found (unless stop requested).
 
     Helper function for :meth:`Client.get_multi`.
 
+    Keys are looked up in chunks of at most ``chunk_size``, with up to
+    ``max_workers`` requests in flight.  Deferred keys from all chunks are
+    then retried together, chunked the same way.
+
     :type connection: :class:`gcloud.datastore.connection.Connection`
     :param connection: The connection used to connect to datastore.
 
@@ -112,6 +182,14 @@ def _extended_lookup(connection, dataset_id, key_pbs,
                            the given transaction.  Incompatible with
                            ``eventual==True``.
 
+    :type chunk_size: integer
+    :param chunk_size: (Optional) Maximum number of keys per request.
+                       Defaults to sending all keys in one request.
+
+    :type max_workers: integer
+    :param max_workers: (Optional) Maximum number of concurrent requests.
+                        Defaults to ``1`` (requests made one at a time).
+
     :rtype: list of :class:`gcloud.datastore._generated.entity_pb2.Entity`
     :returns: The requested entities.
     :raises: :class:`ValueError` if missing / deferred are not null or
@@ -123,23 +201,32 @@ def _extended_lookup(connection, dataset_id, key_pbs,
     if deferred is not None and deferred != []:
         raise ValueError('deferred must be None or an empty list')
 
-    results = []
-
-    loop_num = 0
-    while loop_num < _MAX_LOOPS:  # loop against possible deferred.
-        loop_num += 1
+    if not key_pbs:
+        return []
 
-        results_found, missing_found, deferred_found = connection.lookup(
+    def _lookup(chunk):
+        return connection.lookup(
             dataset_id=dataset_id,
-            key_pbs=key_pbs,
+            key_pbs=chunk,
             eventual=eventual,
             transaction_id=transaction_id,
         )
 
-        results.extend(results_found)
+    results = []
 
-        if missing is not None:
-            missing.extend(missing_found)
+    loop_num = 0
+    while loop_num < _MAX_LOOPS:  # loop against possible deferred.
+        loop_num += 1
+
+        responses = _map_concurrently(
+            _lookup, _chunked(key_pbs, chunk_size), max_workers)
+
+        deferred_found = []
+        for results_found, missing_found, chunk_deferred in responses:
+            results.extend(results_found)
+            if missing is not None:
+                missing.extend(missing_found)
+            deferred_found.extend(chunk_deferred)
 
         if deferred is not None:
             deferred.extend(deferred_found)
@@ -155,6 +242,26 @@ def _extended_lookup(connection, dataset_id, key_pbs,
     return results
 
 
+class PartialCommitError(Exception):
+    """Commits made by a chunked write failed.
+
+    Mutations in the other commits were applied (and any keys completed).
+
+    :type failures: list of tuple
+    :param failures: ``(item, exception)`` for each entity (or key) whose
+                     commit failed, in the order they were passed.
+
+    :type total: integer
+    :param total: The number of entities (or keys) written.
+    """
+
+    def __init__(self, failures, total):
+        super(PartialCommitError, self).__init__(
+            '%d of %d mutations failed' % (len(failures), total))
+        self.failures = failures
+        self.total = total
+
+
 class Client(_BaseClient):
     """Convenience wrapper for invoking APIs/factories w/ a dataset ID.
 
@@ -174,10 +281,33 @@ class Client(_BaseClient):
     :type http: :class:`httplib2.Http` or class that defines ``request()``.
     :param http: An optional HTTP object to make requests. If not passed, an
                  ``http`` object is created that is bound to the
-                 ``credentials`` for the current object.
+                 ``credentials`` for the current object.  Calls spanning
+                 several requests (e.g. large :meth:`get_multi` calls) make
+                 them concurrently, so a custom ``http`` must be
+                 thread-safe, or :attr:`max_workers` set to ``1``.
     """
     _connection_class = Connection
 
+    lookup_chunk_size = DEFAULT_LOOKUP_CHUNK_SIZE
+    """Maximum number of keys sent in one ``lookup`` request."""
+
+    commit_chunk_size = DEFAULT_COMMIT_CHUNK_SIZE
+    """Maximum number of mutations sent in one ``commit`` request."""
+
+    commit_chunk_bytes = DEFAULT_COMMIT_CHUNK_BYTES
+    """Size, in bytes, of the mutations after which a commit is full."""
+
+    max_workers = DEFAULT_MAX_WORKERS
+    """Maximum number of concurrent requests made by one call."""
+
+    entity_cache = None
+    """Optional :class:`gcloud.datastore.entity_cache.EntityCache` read
+    through by :meth:`get_multi` outside transactions."""
+
+    id_reservoir = None
+    """Optional :class:`gcloud.datastore.id_reservoir.IdReservoir` from
+    which :meth:`allocate_ids` takes IDs."""
+
     def __init__(self, dataset_id=None, namespace=None,
                  credentials=None, http=None):
         dataset_id = _determine_default_dataset_id(dataset_id)
@@ -234,7 +364,7 @@ class Client(_BaseClient):
         if isinstance(transaction, Transaction):
             return transaction
 
-    def get(self, key, missing=None, deferred=None):
+    def get(self, key, missing=None, deferred=None, lazy=False):
         """Retrieve an entity from a single key (if it exists).
 
         .. note::
@@ -255,17 +385,29 @@ class Client(_BaseClient):
         :param deferred: (Optional) If a list is passed, the keys returned
                          by the backend as "deferred" will be copied into it.
 
+        :type lazy: boolean
+        :param lazy: (Optional) If true, return a
+                     :class:`gcloud.datastore.entity.LazyEntity`, whose
+                     properties are decoded when first read.
+
         :rtype: :class:`gcloud.datastore.entity.Entity` or ``NoneType``
         :returns: The requested entity if it exists.
         """
         entities = self.get_multi(keys=[key], missing=missing,
-                                  deferred=deferred)
+                                  deferred=deferred, lazy=lazy)
         if entities:
             return entities[0]
 
-    def get_multi(self, keys, missing=None, deferred=None):
+    def get_multi(self, keys, missing=None, deferred=None, lazy=False):
         """Retrieve entities, along with their attributes.
 
+        Keys are looked up in chunks of at most :attr:`lookup_chunk_size`,
+        with up to :attr:`max_workers` requests in flight.  Entities are
+        returned in the order of ``keys``.
+
+        Outside a transaction, keys found in :attr:`entity_cache` (if set)
+        are not looked up, and the entities fetched are cached.
+
         :type keys: list of :class:`gcloud.datastore.key.Key`
         :param keys: The keys to be retrieved from the datastore.
 
@@ -279,6 +421,11 @@ class Client(_BaseClient):
                          by the backend as "deferred" will be copied into it.
                          If the list is not empty, an error will occur.
 
+        :type lazy: boolean
+        :param lazy: (Optional) If true, return
+                     :class:`gcloud.datastore.entity.LazyEntity` instances,
+                     whose properties are decoded when first read.
+
         :rtype: list of :class:`gcloud.datastore.entity.Entity`
         :returns: The requested entities.
         :raises: :class:`ValueError` if one or more of ``keys`` has a dataset
@@ -293,27 +440,41 @@ class Client(_BaseClient):
                 raise ValueError('Keys do not match dataset ID')
 
         transaction = self.current_transaction
+        key_pbs = [k.to_protobuf() for k in keys]
+
+        cache = self.entity_cache
+        if transaction is not None:
+            cache = None
+        cached_pbs, lookup_pbs = [], key_pbs
+        if cache is not None:
+            generation = cache.generation
+            cached_pbs, lookup_pbs = cache.lookup(key_pbs)
 
         entity_pbs = _extended_lookup(
             connection=self.connection,
             dataset_id=self.dataset_id,
-            key_pbs=[k.to_protobuf() for k in keys],
+            key_pbs=lookup_pbs,
             missing=missing,
             deferred=deferred,
             transaction_id=transaction and transaction.id,
+            chunk_size=self.lookup_chunk_size,
+            max_workers=self.max_workers,
         )
+        if cache is not None:
+            cache.store(entity_pbs, generation)
+        entity_pbs = _sort_by_keys(cached_pbs + entity_pbs, key_pbs)
 
         if missing is not None:
             missing[:] = [
                 helpers.entity_from_protobuf(missed_pb)
-                for missed_pb in missing]
+                for missed_pb in _sort_by_keys(missing, key_pbs)]
 
         if deferred is not None:
             deferred[:] = [
                 helpers.key_from_protobuf(deferred_pb)
                 for deferred_pb in deferred]
 
-        return [helpers.entity_from_protobuf(entity_pb)
+        return [helpers.entity_from_protobuf(entity_pb, lazy=lazy)
                 for entity_pb in entity_pbs]
 
     def put(self, entity):
@@ -333,10 +494,17 @@ class Client(_BaseClient):
     def put_multi(self, entities):
         """Save entities in the Cloud Datastore.
 
+        Outside a batch or transaction, large numbers of entities are split
+        into several commits, sent concurrently;  see :meth:`_commit_chunked`.
+        Keys completed by the backend are set on the entities, as for a
+        single commit.
+
         :type entities: list of :class:`gcloud.datastore.entity.Entity`
         :param entities: The entities to be saved to the datastore.
 
-        :raises: :class:`ValueError` if ``entities`` is a single entity.
+        :raises: :class:`ValueError` if ``entities`` is a single entity;
+                 :class:`PartialCommitError` if any of several commits
+                 fail.
         """
         if isinstance(entities, Entity):
             raise ValueError("Pass a sequence of entities")
@@ -345,16 +513,11 @@ class Client(_BaseClient):
             return
 
         current = self.current_batch
-        in_batch = current is not None
-
-        if not in_batch:
-            current = self.batch()
-
-        for entity in entities:
-            current.put(entity)
-
-        if not in_batch:
-            current.commit()
+        if current is None:
+            self._commit_chunked(entities, Batch.put)
+        else:
+            for entity in entities:
+                current.put(entity)
 
     def delete(self, key):
         """Delete the key in the Cloud Datastore.
@@ -373,24 +536,72 @@ class Client(_BaseClient):
     def delete_multi(self, keys):
         """Delete keys from the Cloud Datastore.
 
+        Outside a batch or transaction, large numbers of keys are split
+        into several commits, sent concurrently;  see :meth:`_commit_chunked`.
+
         :type keys: list of :class:`gcloud.datastore.key.Key`
         :param keys: The keys to be deleted from the datastore.
+
+        :raises: :class:`PartialCommitError` if any of several commits fail.
         """
         if not keys:
             return
 
         # We allow partial keys to attempt a delete, the backend will fail.
         current = self.current_batch
-        in_batch = current is not None
+        if current is None:
+            self._commit_chunked(keys, Batch.delete)
+        else:
+            for key in keys:
+                current.delete(key)
+
+    def _commit_chunked(self, items, add):
+        """Write entities or keys outside a batch, in concurrent commits.
+
+        Each commit holds at most :attr:`commit_chunk_size` mutations, and
+        is closed once its mutations reach :attr:`commit_chunk_bytes`.  Up
+        to :attr:`max_workers` commits are sent at once.
+
+        :type items: list
+        :param items: The entities (or keys) to write.
 
-        if not in_batch:
-            current = self.batch()
+        :type add: callable
+        :param add: Unbound :class:`.Batch` method adding one of ``items``.
 
-        for key in keys:
-            current.delete(key)
+        :raises: :class:`PartialCommitError` if any of several commits
+                 fail;  the exception raised by the commit if there is
+                 only one.
+        """
+        chunks = []
+        batch = None
+        for item in items:
+            if (batch is None or
+                    batch.mutation_count >= self.commit_chunk_size or
+                    batch.mutation_bytes >= self.commit_chunk_bytes):
+                batch = self.batch()
+                chunk_items = []
+                chunks.append((batch, chunk_items))
+            add(batch, item)
+            chunk_items.append(item)
+
+        if len(chunks) == 1:
+            batch.commit()
+            return
 
-        if not in_batch:
-            current.commit()
+        def _commit(chunk):
+            try:
+                chunk[0].commit()
+            except Exception as exc:  # pylint: disable=broad-except
+                return exc
+
+        errors = _map_concurrently(_commit, chunks, self.max_workers)
+        failures = [(item, error)
+                    for (_, chunk_items), error in zip(chunks, errors)
+                    if error is not None
+                    for item in chunk_items]
+        if failures:
+            total = sum(len(chunk_items) for _, chunk_items in chunks)
+            raise PartialCommitError(failures, total)
 
     def allocate_ids(self, incomplete_key, num_ids):
         """Allocate a list of IDs from a partial key.
@@ -410,16 +621,33 @@ class Client(_BaseClient):
         if not incomplete_key.is_partial:
             raise ValueError(('Key is not partial.', incomplete_key))
 
+        if self.id_reservoir is not None:
+            return self.id_reservoir.completed_keys(incomplete_key, num_ids)
+
+        return [incomplete_key.completed_key(allocated_id)
+                for allocated_id in self._allocate_ids(incomplete_key,
+                                                       num_ids)]
+
+    def _allocate_ids(self, incomplete_key, num_ids):
+        """Allocate IDs from a partial key, with an ``allocateIds`` request.
+
+        :type incomplete_key: :class:`gcloud.datastore.key.Key`
+        :param incomplete_key: Partial key to use as base for allocated IDs.
+
+        :type num_ids: int
+        :param num_ids: The number of IDs to allocate.
+
+        :rtype: list of integers
+        :returns: The IDs allocated.
+        """
         incomplete_key_pb = incomplete_key.to_protobuf()
         incomplete_key_pbs = [incomplete_key_pb] * num_ids
 
         conn = self.connection
         allocated_key_pbs = conn.allocate_ids(incomplete_key.dataset_id,
                                               incomplete_key_pbs)
-        allocated_ids = [allocated_key_pb.path_element[-1].id
-                         for allocated_key_pb in allocated_key_pbs]
-        return [incomplete_key.completed_key(allocated_id)
-                for allocated_id in allocated_ids]
+        return [allocated_key_pb.path_element[-1].id
+                for allocated_key_pb in allocated_key_pbs]
 
     def key(self, *path_args, **kwargs):
         """Proxy to :class:`gcloud.datastore.key.Key`.
@@ -17,10 +17,14 @@
 import os
 
 from gcloud import connection
+from gcloud import metrics
+from gcloud._helpers import _LazyModule
 from gcloud.environment_vars import GCD_HOST
 from gcloud.exceptions import make_exception
-from gcloud.datastore._generated import datastore_pb2 as _datastore_pb2
-from gcloud.datastore._generated import entity_pb2 as _entity_pb2
+
+
+_datastore_pb2 = _LazyModule('gcloud.datastore._generated.datastore_pb2')
+_entity_pb2 = _LazyModule('gcloud.datastore._generated.entity_pb2')
 
 
 class Connection(connection.Connection):
@@ -85,11 +89,17 @@ class Connection(connection.Connection):
             'Content-Length': str(len(data)),
             'User-Agent': self.USER_AGENT,
         }
-        headers, content = self.http.request(
-            uri=self.build_api_url(dataset_id=dataset_id, method=method),
-            method='POST', headers=headers, body=data)
+        uri = self.build_api_url(dataset_id=dataset_id, method=method)
+        info = metrics.request_started('POST', uri, data)
+        try:
+            headers, content = self.http.request(
+                uri=uri, method='POST', headers=headers, body=data)
+        except Exception as exc:
+            metrics.request_finished(info, error=exc)
+            raise
 
         status = headers['status']
+        metrics.request_finished(info, status, content)
         if status != '200':
             raise make_exception(headers, content, use_json=False)
 
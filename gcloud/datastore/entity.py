@@ -15,9 +15,42 @@
 """Class for representing a single entity in the Cloud Datastore."""
 
 
+import six
+
 from gcloud._helpers import _ensure_tuple_or_list
 
 
+_UNDECODED = object()
+"""Placeholder stored for properties a :class:`LazyEntity` has not decoded."""
+
+
+def _copies_through_methods():
+    """Whether copies of a dict subclass overriding ``__iter__`` use it.
+
+    ``dict(mapping)``, ``dict.update(mapping)`` and ``**mapping`` copy the
+    storage of a dict subclass directly, bypassing its methods, unless
+    (on recent Python 3 versions) it overrides ``__iter__``.
+
+    :rtype: boolean
+    :returns: ``True`` if copies read the mapping through ``keys()`` and
+              ``__getitem__``.
+    """
+    class _Probe(dict):
+        """Dict subclass reading every value as ``True``."""
+
+        def __iter__(self):  # pragma: NO COVER  Only defining it matters.
+            return iter(dict.keys(self))
+
+        def __getitem__(self, name):
+            return True
+
+    return dict(_Probe(probe=False)) == {'probe': True}
+
+
+_LAZY_DECODING = _copies_through_methods()
+"""Whether :class:`LazyEntity` may leave properties undecoded."""
+
+
 class Entity(dict):
     """Entities are akin to rows in a relational database
 
@@ -140,3 +173,159 @@ class Entity(dict):
                                       super(Entity, self).__repr__())
         else:
             return '<Entity %s>' % (super(Entity, self).__repr__())
+
+
+class LazyEntity(Entity):
+    """An entity whose properties are decoded on first access.
+
+    Created by :func:`gcloud.datastore.helpers.entity_from_protobuf` when
+    passed ``lazy=True``:  the entity keeps each property's ``Value``
+    protobuf and converts it to a Python value only when the property is
+    read, so callers reading a few properties of wide entities do not pay
+    for decoding the rest.  Property names are known up front, so
+    ``len()``, ``in`` and iteration over names decode nothing, while
+    methods returning values (``items()``, ``values()``, comparison,
+    ``repr()``, ...) decode every remaining property.
+
+    Errors in a property's protobuf (e.g. disagreeing meanings within a
+    list) are raised when that property is decoded.
+
+    Python 2 (and early Python 3) versions copy a dict subclass in
+    ``dict(entity)``, ``dict.update(entity)`` or ``**entity`` straight from
+    its storage:  there, every property is decoded up front.
+
+    :type key: :class:`gcloud.datastore.key.Key`
+    :param key: Optional key to be set on entity.
+
+    :type exclude_from_indexes: tuple of string
+    :param exclude_from_indexes: Names of fields whose values are not to be
+                                 indexed for this entity.
+
+    :type value_pbs: list of (string, ``Value``) tuples
+    :param value_pbs: The undecoded property protobufs, in order.
+
+    :type decode: callable
+    :param decode: Converts a ``Value`` protobuf into a ``(value,
+                   meaning)`` tuple, ``meaning`` being :data:`None` if
+                   the protobuf has none.
+    """
+
+    def __init__(self, key=None, exclude_from_indexes=(), value_pbs=(),
+                 decode=None):
+        super(LazyEntity, self).__init__(
+            key=key, exclude_from_indexes=exclude_from_indexes)
+        self._value_pbs = {}
+        self._decode_value_pb = decode
+        for name, value_pb in value_pbs:
+            self._value_pbs[name] = value_pb
+            dict.__setitem__(self, name, _UNDECODED)
+        if not _LAZY_DECODING:
+            self._decode_all()
+
+    def _decode(self, name):
+        """Decode one property, storing its value and meaning.
+
+        :type name: string
+        :param name: The name of an undecoded property.
+
+        :returns: The decoded value.
+        """
+        value_pb = self._value_pbs.get(name)
+        if value_pb is None:  # Decoded meanwhile by another thread.
+            return dict.__getitem__(self, name)
+        value, meaning = self._decode_value_pb(value_pb)
+        if meaning is not None:
+            self._meanings[name] = (meaning, value)
+        # Store the value before dropping the protobuf, so that a thread
+        # finding no protobuf finds the value.
+        dict.__setitem__(self, name, value)
+        self._value_pbs.pop(name, None)
+        return value
+
+    def _decode_all(self):
+        """Decode every property not yet decoded."""
+        for name, value in list(dict.items(self)):
+            if value is _UNDECODED:
+                self._decode(name)
+
+    def __getitem__(self, name):
+        value = super(LazyEntity, self).__getitem__(name)
+        if value is _UNDECODED:
+            value = self._decode(name)
+        return value
+
+    def __setitem__(self, name, value):
+        self._value_pbs.pop(name, None)
+        super(LazyEntity, self).__setitem__(name, value)
+
+    def __delitem__(self, name):
+        self._value_pbs.pop(name, None)
+        super(LazyEntity, self).__delitem__(name)
+
+    def __iter__(self):
+        # Not inherited, so that copies read the entity through ``keys()``
+        # and ``__getitem__`` where :data:`_LAZY_DECODING` is true.
+        return iter(dict.keys(self))
+
+    def get(self, name, default=None):
+        if name in self:
+            return self[name]
+        return default
+
+    def setdefault(self, name, default=None):
+        if name in self:
+            return self[name]
+        return super(LazyEntity, self).setdefault(name, default)
+
+    def pop(self, name, *default):
+        if name in self:
+            value = self[name]
+            del self[name]
+            return value
+        return super(LazyEntity, self).pop(name, *default)
+
+    def popitem(self):
+        self._decode_all()
+        return super(LazyEntity, self).popitem()
+
+    def items(self):
+        self._decode_all()
+        return super(LazyEntity, self).items()
+
+    def values(self):
+        self._decode_all()
+        return super(LazyEntity, self).values()
+
+    if six.PY2:  # pragma: NO COVER  Python2
+        def iteritems(self):
+            self._decode_all()
+            return super(LazyEntity, self).iteritems()
+
+        def itervalues(self):
+            self._decode_all()
+            return super(LazyEntity, self).itervalues()
+
+        def viewitems(self):
+            self._decode_all()
+            return super(LazyEntity, self).viewitems()
+
+        def viewvalues(self):
+            self._decode_all()
+            return super(LazyEntity, self).viewvalues()
+
+    def copy(self):
+        self._decode_all()
+        return super(LazyEntity, self).copy()
+
+    def __eq__(self, other):
+        self._decode_all()
+        if isinstance(other, LazyEntity):
+            other._decode_all()
+        return super(LazyEntity, self).__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        self._decode_all()
+        return super(LazyEntity, self).__repr__()
@@ -0,0 +1,153 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process cache of entities read by a datastore client.
+
+Once a cache is set on a client, :meth:`Client.get` and
+:meth:`Client.get_multi` answer keys found in the cache without a
+``lookup`` request, and cache the entities they fetch:
+
+>>> from gcloud import datastore
+>>> from gcloud.datastore.entity_cache import EntityCache
+>>> client = datastore.Client()
+>>> client.entity_cache = EntityCache(max_size=1000, ttl=60)
+
+Entries are dropped whenever the client commits a put or delete of their
+key (including within batches and transactions), so the client's own
+writes are never served stale.  Writes made by other processes are seen
+once the cached entries expire:  use ``ttl`` to bound their staleness.
+Reads within a transaction bypass the cache.
+
+Cached entities are kept as protobufs and decoded for each read, so
+callers may modify the entities returned.
+"""
+
+import threading
+import time
+
+from gcloud._helpers import _LRUDict
+from gcloud.datastore.helpers import _key_path
+
+
+DEFAULT_MAX_SIZE = 1024
+"""Default maximum number of cached entities."""
+
+_NOW = time.time  # To be replaced by tests.
+
+
+class EntityCache(object):
+    """LRU cache of entity protobufs, keyed by their key's path.
+
+    :type max_size: integer
+    :param max_size: Maximum number of entities cached;  the least
+                     recently used ones are evicted to make room for more.
+
+    :type ttl: float
+    :param ttl: (Optional) Seconds after which a cached entity is
+                discarded.  By default entities are kept until evicted
+                or invalidated.
+    """
+
+    hits = 0
+    """Keys answered from the cache."""
+
+    misses = 0
+    """Keys which had to be looked up (not cached, or expired)."""
+
+    generation = 0
+    """Count of invalidations, used to detect lookups racing with them."""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = _LRUDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key_pbs):
+        """Look up cached entities.
+
+        :type key_pbs: list of
+                       :class:`gcloud.datastore._generated.entity_pb2.Key`
+        :param key_pbs: The keys to look up.
+
+        :rtype: tuple
+        :returns: ``(entity_pbs, missed_key_pbs)``:  the cached entity
+                  protobufs (which must not be modified), and the keys
+                  not cached.
+        """
+        found, missed = [], []
+        now = _NOW()
+        with self._lock:
+            for key_pb in key_pbs:
+                path = _key_path(key_pb)
+                entry = self._entries.get(path)
+                if (entry is not None and self.ttl is not None and
+                        now - entry['stored'] > self.ttl):
+                    self._entries.pop(path)
+                    entry = None
+                if entry is None:
+                    missed.append(key_pb)
+                    continue
+                found.append(entry['entity_pb'])
+            self.hits += len(found)
+            self.misses += len(missed)
+        return found, missed
+
+    def store(self, entity_pbs, generation):
+        """Cache entities fetched from the backend.
+
+        :type entity_pbs: list of
+                          :class:`gcloud.datastore._generated.entity_pb2.Entity`
+        :param entity_pbs: The entities found;  they must not be modified
+                           afterwards.
+
+        :type generation: integer
+        :param generation: The value of :attr:`generation` before the
+                           entities were looked up.  If any key was
+                           invalidated since, nothing is cached:  the
+                           entities may predate the write.
+        """
+        now = _NOW()
+        with self._lock:
+            if generation != self.generation:
+                return
+            for entity_pb in entity_pbs:
+                self._entries.put(_key_path(entity_pb.key), {
+                    'entity_pb': entity_pb,
+                    'stored': now,
+                })
+            while len(self._entries) > self.max_size:
+                self._entries.pop_oldest()
+
+    def invalidate(self, key_pbs):
+        """Drop the cached entities for keys being written.
+
+        :type key_pbs: list of
+                       :class:`gcloud.datastore._generated.entity_pb2.Key`
+        :param key_pbs: The keys put or deleted.
+        """
+        with self._lock:
+            self.generation += 1
+            for key_pb in key_pbs:
+                self._entries.pop(_key_path(key_pb), None)
+
+    def clear(self):
+        """Drop all cached entities, and reset the counters."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.hits = self.misses = 0
@@ -22,14 +22,17 @@ import datetime
 from google.protobuf.internal.type_checkers import Int64ValueChecker
 import six
 
+from gcloud._helpers import _LazyModule
 from gcloud._helpers import _datetime_from_microseconds
 from gcloud._helpers import _microseconds_from_datetime
-from gcloud.datastore._generated import entity_pb2 as _entity_pb2
 from gcloud.datastore.entity import Entity
+from gcloud.datastore.entity import LazyEntity
 from gcloud.datastore.key import Key
 
 __all__ = ('entity_from_protobuf', 'key_from_protobuf')
 
+_entity_pb2 = _LazyModule('gcloud.datastore._generated.entity_pb2')
+
 INT_VALUE_CHECKER = Int64ValueChecker()
 
 
@@ -146,7 +149,45 @@ def _property_tuples(entity_pb):
         yield property_pb.name, property_pb.value
 
 
-def entity_from_protobuf(pb):
+def _is_indexed(value_pb):
+    """Check whether a ``Value`` protobuf is indexed.
+
+    :type value_pb: :class:`gcloud.datastore._generated.entity_pb2.Value`
+    :param value_pb: The protobuf value to be checked.
+
+    :rtype: bool
+    :returns: Whether the value is indexed.
+    :raises: :class:`ValueError <exceptions.ValueError>` if a list value
+             has some elements indexed and some excluded from indexes.
+    """
+    # Lists need to be special-cased and we require all ``indexed``
+    # values in a list agree.
+    if len(value_pb.list_value) > 0:
+        indexed_values = set(sub_value_pb.indexed
+                             for sub_value_pb in value_pb.list_value)
+        if len(indexed_values) != 1:
+            raise ValueError('For a list_value, subvalues must either all '
+                             'be indexed or all excluded from indexes.')
+        return indexed_values.pop()
+    return value_pb.indexed
+
+
+def _decode_value_pb(value_pb):
+    """Get the value and the meaning from a protobuf value.
+
+    :type value_pb: :class:`gcloud.datastore._generated.entity_pb2.Value`
+    :param value_pb: The Value Protobuf.
+
+    :rtype: tuple
+    :returns: The value provided by the protobuf and its meaning (or
+              :data:`None`).
+    """
+    value = _get_value_from_value_pb(value_pb)
+    meaning = _get_meaning(value_pb, is_list=isinstance(value, list))
+    return value, meaning
+
+
+def entity_from_protobuf(pb, lazy=False):
     """Factory method for creating an entity based on a protobuf.
 
     The protobuf should be one returned from the Cloud Datastore
@@ -155,6 +196,11 @@ def entity_from_protobuf(pb):
     :type pb: :class:`gcloud.datastore._generated.entity_pb2.Entity`
     :param pb: The Protobuf representing the entity.
 
+    :type lazy: bool
+    :param lazy: If true, return a
+                 :class:`gcloud.datastore.entity.LazyEntity`, which
+                 decodes each property when it is first read.
+
     :rtype: :class:`gcloud.datastore.entity.Entity`
     :returns: The entity derived from the protobuf.
     """
@@ -162,38 +208,21 @@ def entity_from_protobuf(pb):
     if pb.HasField('key'):
         key = key_from_protobuf(pb.key)
 
-    entity_props = {}
-    entity_meanings = {}
-    exclude_from_indexes = []
+    value_pbs = list(_property_tuples(pb))
+    exclude_from_indexes = [prop_name for prop_name, value_pb in value_pbs
+                            if not _is_indexed(value_pb)]
 
-    for prop_name, value_pb in _property_tuples(pb):
-        value = _get_value_from_value_pb(value_pb)
-        entity_props[prop_name] = value
+    if lazy:
+        return LazyEntity(key=key, exclude_from_indexes=exclude_from_indexes,
+                          value_pbs=value_pbs, decode=_decode_value_pb)
 
+    entity = Entity(key=key, exclude_from_indexes=exclude_from_indexes)
+    for prop_name, value_pb in value_pbs:
+        value, meaning = _decode_value_pb(value_pb)
+        entity[prop_name] = value
         # Check if the property has an associated meaning.
-        is_list = isinstance(value, list)
-        meaning = _get_meaning(value_pb, is_list=is_list)
         if meaning is not None:
-            entity_meanings[prop_name] = (meaning, value)
-
-        # Check if ``value_pb`` was indexed. Lists need to be special-cased
-        # and we require all ``indexed`` values in a list agree.
-        if is_list:
-            indexed_values = set(value_pb.indexed
-                                 for value_pb in value_pb.list_value)
-            if len(indexed_values) != 1:
-                raise ValueError('For a list_value, subvalues must either all '
-                                 'be indexed or all excluded from indexes.')
-
-            if not indexed_values.pop():
-                exclude_from_indexes.append(prop_name)
-        else:
-            if not value_pb.indexed:
-                exclude_from_indexes.append(prop_name)
-
-    entity = Entity(key=key, exclude_from_indexes=exclude_from_indexes)
-    entity.update(entity_props)
-    entity._meanings.update(entity_meanings)
+            entity._meanings[prop_name] = (meaning, value)
     return entity
 
 
@@ -276,6 +305,23 @@ def key_from_protobuf(pb):
     return Key(*path_args, namespace=namespace, dataset_id=dataset_id)
 
 
+def _key_path(key_pb):
+    """Identify a key protobuf by namespace and path.
+
+    The dataset ID is left out, as the backend may return it with a
+    different prefix (e.g. ``s~``) than the one requested.
+
+    :type key_pb: :class:`gcloud.datastore._generated.entity_pb2.Key`
+    :param key_pb: The key to identify.
+
+    :rtype: tuple
+    :returns: A hashable identifier for the key.
+    """
+    return (key_pb.partition_id.namespace,
+            tuple((element.kind, element.id, element.name)
+                  for element in key_pb.path_element))
+
+
 def _pb_attr_value(val):
     """Given a value, return the protobuf attribute name and proper value.
 
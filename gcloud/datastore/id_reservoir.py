@@ -0,0 +1,208 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pools of IDs allocated ahead of time for partial keys.
+
+Once a reservoir is set on a client, :meth:`Client.allocate_ids` completes
+keys with IDs taken from a pool, without an ``allocateIds`` request:
+
+>>> from gcloud import datastore
+>>> from gcloud.datastore.id_reservoir import IdReservoir
+>>> client = datastore.Client()
+>>> client.id_reservoir = IdReservoir(client, pool_size=500)
+>>> key, = client.allocate_ids(client.key('Person'), 1)
+
+There is one pool for each partial key (i.e. for each kind and parent).
+Its first use allocates IDs on the caller's thread, enough to fill the
+pool (other callers wait for them);  whenever it runs down to
+``refill_threshold`` IDs, more are allocated on a background thread.
+IDs left in the pools when the process exits are never used:  the
+backend does not reuse them either.
+"""
+
+import collections
+import threading
+
+from gcloud.datastore.key import _unprefixed_dataset_id
+
+
+DEFAULT_POOL_SIZE = 100
+"""Default number of IDs allocated by each refill of a pool."""
+
+DEFAULT_REFILL_THRESHOLD = 25
+"""Default number of IDs left in a pool at which it is refilled."""
+
+_THREAD = threading.Thread  # To be replaced by tests.
+
+
+class _Pool(object):
+    """IDs allocated for one partial key."""
+
+    def __init__(self):
+        self.ids = collections.deque()
+        self.refiller = None
+        self.filling = False
+
+    @property
+    def in_flight(self):
+        """Whether IDs are being allocated for the pool.
+
+        :rtype: boolean
+        :returns: ``True`` during a background refill, or while a caller
+                  allocates IDs on its own thread.
+        """
+        return self.refiller is not None or self.filling
+
+
+class IdReservoir(object):
+    """Pre-allocated IDs, pooled by partial key.
+
+    :type client: :class:`gcloud.datastore.client.Client`
+    :param client: The client used to allocate IDs.
+
+    :type pool_size: integer
+    :param pool_size: Number of IDs allocated each time a pool is
+                      refilled.
+
+    :type refill_threshold: integer
+    :param refill_threshold: Number of IDs left in a pool at which it is
+                             refilled in the background;  must be less
+                             than ``pool_size``.
+
+    :raises: :class:`ValueError` if ``refill_threshold`` is not less than
+             ``pool_size``.
+    """
+
+    hits = 0
+    """IDs taken from a pool."""
+
+    misses = 0
+    """IDs which had to be allocated on the caller's thread."""
+
+    last_refill_error = None
+    """The exception raised by the last background refill which failed."""
+
+    def __init__(self, client, pool_size=DEFAULT_POOL_SIZE,
+                 refill_threshold=DEFAULT_REFILL_THRESHOLD):
+        if refill_threshold >= pool_size:
+            raise ValueError('refill_threshold must be less than pool_size',
+                             refill_threshold, pool_size)
+        self._client = client
+        self.pool_size = pool_size
+        self.refill_threshold = refill_threshold
+        self._cond = threading.Condition()
+        self._pools = {}
+
+    def __len__(self):
+        with self._cond:
+            return sum(len(pool.ids) for pool in self._pools.values())
+
+    def completed_key(self, incomplete_key):
+        """Complete a partial key with a pre-allocated ID.
+
+        :type incomplete_key: :class:`gcloud.datastore.key.Key`
+        :param incomplete_key: Partial key to complete.
+
+        :rtype: :class:`gcloud.datastore.key.Key`
+        :returns: The completed key.
+        :raises: :class:`ValueError` if ``incomplete_key`` is not a
+                 partial key.
+        """
+        return self.completed_keys(incomplete_key, 1)[0]
+
+    def completed_keys(self, incomplete_key, num_ids):
+        """Complete a partial key with several pre-allocated IDs.
+
+        If the pool holds fewer than ``num_ids`` IDs, waits for the IDs
+        being allocated for it, if any (by a background refill, or by
+        another caller);  the IDs still missing are then allocated on
+        the caller's thread, with enough more to fill the pool (if that
+        fails, the IDs taken are put back).  Errors of background refills
+        are only seen there, and in :attr:`last_refill_error`.
+
+        :type incomplete_key: :class:`gcloud.datastore.key.Key`
+        :param incomplete_key: Partial key to complete.
+
+        :type num_ids: integer
+        :param num_ids: The number of keys to return.
+
+        :rtype: list of :class:`gcloud.datastore.key.Key`
+        :returns: The completed keys.
+        :raises: :class:`ValueError` if ``incomplete_key`` is not a
+                 partial key.
+        """
+        if not incomplete_key.is_partial:
+            raise ValueError(('Key is not partial.', incomplete_key))
+
+        pool_key = (_unprefixed_dataset_id(incomplete_key.dataset_id),
+                    incomplete_key.namespace, incomplete_key.flat_path)
+        with self._cond:
+            pool = self._pools.get(pool_key)
+            if pool is None:
+                pool = self._pools[pool_key] = _Pool()
+            while len(pool.ids) < num_ids and pool.in_flight:
+                self._cond.wait()
+            ids = [pool.ids.popleft()
+                   for _ in range(min(num_ids, len(pool.ids)))]
+            missing = num_ids - len(ids)
+            self.hits += len(ids)
+            self.misses += missing
+            if missing:
+                pool.filling = True
+            elif (not pool.in_flight and
+                  len(pool.ids) <= self.refill_threshold):
+                pool.refiller = _THREAD(
+                    target=self._refill, args=(pool, incomplete_key))
+                pool.refiller.daemon = True
+                pool.refiller.start()
+
+        if missing:
+            try:
+                allocated = self._client._allocate_ids(
+                    incomplete_key, missing + self.pool_size)
+            except Exception:
+                with self._cond:
+                    pool.ids.extendleft(reversed(ids))
+                    pool.filling = False
+                    self._cond.notify_all()
+                raise
+            ids.extend(allocated[:missing])
+            with self._cond:
+                pool.ids.extend(allocated[missing:])
+                pool.filling = False
+                self._cond.notify_all()
+
+        return [incomplete_key.completed_key(allocated_id)
+                for allocated_id in ids]
+
+    def _refill(self, pool, incomplete_key):
+        """Allocate ``pool_size`` more IDs into a pool.
+
+        :type pool: :class:`_Pool`
+        :param pool: The pool to refill.
+
+        :type incomplete_key: :class:`gcloud.datastore.key.Key`
+        :param incomplete_key: The partial key of the pool.
+        """
+        try:
+            ids = self._client._allocate_ids(incomplete_key, self.pool_size)
+        except Exception as exc:  # pylint: disable=broad-except
+            # Callers finding the pool short allocate on their own thread,
+            # and see the error then.
+            self.last_refill_error = exc
+            ids = ()
+        with self._cond:
+            pool.ids.extend(ids)
+            pool.refiller = None
+            self._cond.notify_all()
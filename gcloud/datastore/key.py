@@ -14,10 +14,13 @@
 
 """Create / interact with gcloud datastore keys."""
 
-import copy
 import six
 
-from gcloud.datastore._generated import entity_pb2 as _entity_pb2
+from gcloud._helpers import _LazyModule
+
+
+_entity_pb2 = _LazyModule('gcloud.datastore._generated.entity_pb2')
+_ID_OR_NAME_TYPES = six.string_types + six.integer_types
 
 
 class Key(object):
@@ -36,6 +39,8 @@ class Key(object):
       <Key[{'kind': 'Parent', 'name': 'foo'}, {'kind': 'Child', 'id': 1234}]>
       >>> Key('Child', 1234, parent=parent_key)
       <Key[{'kind': 'Parent', 'name': 'foo'}, {'kind': 'Child', 'id': 1234}]>
+      >>> parent_key.child('Child', 1234)
+      <Key[{'kind': 'Parent', 'name': 'foo'}, {'kind': 'Child', 'id': 1234}]>
 
     To create a partial key:
 
@@ -58,15 +63,64 @@ class Key(object):
     The dataset ID argument is required unless it has been set implicitly.
     """
 
+    __slots__ = ('_flat_path', '_dataset_id', '_namespace', '_parent',
+                 '_hash')
+
     def __init__(self, *path_args, **kwargs):
-        self._flat_path = path_args
-        parent = self._parent = kwargs.get('parent')
-        self._namespace = kwargs.get('namespace')
-        dataset_id = kwargs.get('dataset_id')
-        self._dataset_id = _validate_dataset_id(dataset_id, parent)
-        # _flat_path, _parent, _namespace and _dataset_id must be set before
-        # _combine_args() is called.
-        self._path = self._combine_args()
+        parent = kwargs.get('parent')
+        namespace = kwargs.get('namespace')
+        dataset_id = _validate_dataset_id(kwargs.get('dataset_id'), parent)
+        flat_path = self._validate_path(path_args)
+
+        if parent is not None:
+            if parent.is_partial:
+                raise ValueError('Parent key must be complete.')
+            if namespace is not None and namespace != parent.namespace:
+                raise ValueError('Child namespace must agree with parent\'s.')
+            if dataset_id is not None and dataset_id != parent.dataset_id:
+                raise ValueError('Child dataset ID must agree with parent\'s.')
+            flat_path = parent.flat_path + flat_path
+            namespace = parent.namespace
+            dataset_id = parent.dataset_id
+
+        self._set_state(flat_path, dataset_id, namespace, parent)
+
+    @classmethod
+    def _from_flat_path(cls, flat_path, dataset_id, namespace, parent=None):
+        """Create a key from a path known to be valid, skipping checks.
+
+        :type flat_path: tuple of string and integer
+        :param flat_path: The full (validated) path of the key.
+
+        :type dataset_id: string
+        :param dataset_id: The dataset ID of the key.
+
+        :type namespace: string
+        :param namespace: The namespace of the key.
+
+        :type parent: :class:`gcloud.datastore.key.Key` or ``NoneType``
+        :param parent: (Optional) The parent of the key, if already known.
+
+        :rtype: :class:`gcloud.datastore.key.Key`
+        :returns: The new key.
+        """
+        key = cls.__new__(cls)
+        key._set_state(flat_path, dataset_id, namespace, parent)
+        return key
+
+    def _set_state(self, flat_path, dataset_id, namespace, parent):
+        """Set the key's attributes, and reset the cached ones."""
+        self._flat_path = flat_path
+        self._dataset_id = dataset_id
+        self._namespace = namespace
+        self._parent = parent
+        self._hash = None
+
+    def __getstate__(self):
+        return self._flat_path, self._dataset_id, self._namespace, self._parent
+
+    def __setstate__(self, state):
+        self._set_state(*state)
 
     def __eq__(self, other):
         """Compare two keys for equality.
@@ -85,9 +139,9 @@ class Key(object):
         if self.is_partial or other.is_partial:
             return False
 
-        return (self.flat_path == other.flat_path and
-                _dataset_ids_equal(self.dataset_id, other.dataset_id) and
-                self.namespace == other.namespace)
+        return (self._flat_path == other._flat_path and
+                _dataset_ids_equal(self._dataset_id, other._dataset_id) and
+                self._namespace == other._namespace)
 
     def __ne__(self, other):
         """Compare two keys for inequality.
@@ -105,24 +159,29 @@ class Key(object):
     def __hash__(self):
         """Hash a keys for use in a dictionary lookp.
 
+        The hash is computed once, and ignores the prefix of the dataset ID,
+        so that keys comparing equal hash equally.
+
         :rtype: integer
         :returns: a hash of the key's state.
         """
-        return (hash(self.flat_path) +
-                hash(self.dataset_id) +
-                hash(self.namespace))
+        if self._hash is None:
+            self._hash = hash((self._flat_path,
+                               _unprefixed_dataset_id(self._dataset_id),
+                               self._namespace))
+        return self._hash
 
     @staticmethod
-    def _parse_path(path_args):
-        """Parses positional arguments into key path with kinds and IDs.
+    def _validate_path(path_args):
+        """Checks positional arguments form a key path of kinds and IDs.
 
         :type path_args: tuple
         :param path_args: A tuple from positional arguments. Should be
                           alternating list of kinds (string) and ID/name
                           parts (int or string).
 
-        :rtype: :class:`list` of :class:`dict`
-        :returns: A list of key parts with kind and ID or name set.
+        :rtype: tuple
+        :returns: ``path_args``.
         :raises: :class:`ValueError` if there are no ``path_args``, if one of
                  the kinds is not a string or if one of the IDs/names is not
                  a string or an integer.
@@ -130,62 +189,16 @@ class Key(object):
         if len(path_args) == 0:
             raise ValueError('Key path must not be empty.')
 
-        kind_list = path_args[::2]
-        id_or_name_list = path_args[1::2]
-        # Dummy sentinel value to pad incomplete key to even length path.
-        partial_ending = object()
-        if len(path_args) % 2 == 1:
-            id_or_name_list += (partial_ending,)
-
-        result = []
-        for kind, id_or_name in zip(kind_list, id_or_name_list):
-            curr_key_part = {}
-            if isinstance(kind, six.string_types):
-                curr_key_part['kind'] = kind
-            else:
+        for kind in path_args[::2]:
+            if not isinstance(kind, six.string_types):
                 raise ValueError(kind, 'Kind was not a string.')
 
-            if isinstance(id_or_name, six.string_types):
-                curr_key_part['name'] = id_or_name
-            elif isinstance(id_or_name, six.integer_types):
-                curr_key_part['id'] = id_or_name
-            elif id_or_name is not partial_ending:
+        for id_or_name in path_args[1::2]:
+            if not isinstance(id_or_name, _ID_OR_NAME_TYPES):
                 raise ValueError(id_or_name,
                                  'ID/name was not a string or integer.')
 
-            result.append(curr_key_part)
-
-        return result
-
-    def _combine_args(self):
-        """Sets protected data by combining raw data set from the constructor.
-
-        If a ``_parent`` is set, updates the ``_flat_path`` and sets the
-        ``_namespace`` and ``_dataset_id`` if not already set.
-
-        :rtype: :class:`list` of :class:`dict`
-        :returns: A list of key parts with kind and ID or name set.
-        :raises: :class:`ValueError` if the parent key is not complete.
-        """
-        child_path = self._parse_path(self._flat_path)
-
-        if self._parent is not None:
-            if self._parent.is_partial:
-                raise ValueError('Parent key must be complete.')
-
-            # We know that _parent.path() will return a copy.
-            child_path = self._parent.path + child_path
-            self._flat_path = self._parent.flat_path + self._flat_path
-            if (self._namespace is not None and
-                    self._namespace != self._parent.namespace):
-                raise ValueError('Child namespace must agree with parent\'s.')
-            self._namespace = self._parent.namespace
-            if (self._dataset_id is not None and
-                    self._dataset_id != self._parent.dataset_id):
-                raise ValueError('Child dataset ID must agree with parent\'s.')
-            self._dataset_id = self._parent.dataset_id
-
-        return child_path
+        return path_args
 
     def _clone(self):
         """Duplicates the Key.
@@ -196,13 +209,8 @@ class Key(object):
         :rtype: :class:`gcloud.datastore.key.Key`
         :returns: A new ``Key`` instance with the same data as the current one.
         """
-        cloned_self = self.__class__(*self.flat_path,
-                                     dataset_id=self.dataset_id,
-                                     namespace=self.namespace)
-        # If the current parent has already been set, we re-use
-        # the same instance
-        cloned_self._parent = self._parent
-        return cloned_self
+        return self._from_flat_path(self._flat_path, self._dataset_id,
+                                    self._namespace, self._parent)
 
     def completed_key(self, id_or_name):
         """Creates new key from existing partial key by adding final ID/name.
@@ -219,19 +227,42 @@ class Key(object):
         if not self.is_partial:
             raise ValueError('Only a partial key can be completed.')
 
-        id_or_name_key = None
-        if isinstance(id_or_name, six.string_types):
-            id_or_name_key = 'name'
-        elif isinstance(id_or_name, six.integer_types):
-            id_or_name_key = 'id'
-        else:
+        if not isinstance(id_or_name, _ID_OR_NAME_TYPES):
             raise ValueError(id_or_name,
                              'ID/name was not a string or integer.')
 
-        new_key = self._clone()
-        new_key._path[-1][id_or_name_key] = id_or_name
-        new_key._flat_path += (id_or_name,)
-        return new_key
+        return self._from_flat_path(self._flat_path + (id_or_name,),
+                                    self._dataset_id, self._namespace,
+                                    self._parent)
+
+    def child(self, kind, id_or_name=None):
+        """Creates a key for a child of the current key.
+
+        The new key shares the dataset ID and namespace of the current key,
+        which becomes its :attr:`parent`.
+
+        :type kind: string
+        :param kind: The kind of the child.
+
+        :type id_or_name: string or integer
+        :param id_or_name: (Optional) The ID or name of the child.  If not
+                           passed, the child key is partial.
+
+        :rtype: :class:`gcloud.datastore.key.Key`
+        :returns: A new ``Key`` instance.
+        :raises: :class:`ValueError` if the current key is partial, or if
+                 ``kind`` or ``id_or_name`` are invalid.
+        """
+        if self.is_partial:
+            raise ValueError('Parent key must be complete.')
+
+        if id_or_name is None:
+            path_args = (kind,)
+        else:
+            path_args = (kind, id_or_name)
+        return self._from_flat_path(
+            self._flat_path + self._validate_path(path_args),
+            self._dataset_id, self._namespace, self)
 
     def to_protobuf(self):
         """Return a protobuf corresponding to the key.
@@ -240,19 +271,21 @@ class Key(object):
         :returns: The protobuf representing the key.
         """
         key = _entity_pb2.Key()
-        key.partition_id.dataset_id = self.dataset_id
+        key.partition_id.dataset_id = self._dataset_id
 
-        if self.namespace:
-            key.partition_id.namespace = self.namespace
+        if self._namespace:
+            key.partition_id.namespace = self._namespace
 
-        for item in self.path:
+        flat_path = self._flat_path
+        for index in range(0, len(flat_path), 2):
             element = key.path_element.add()
-            if 'kind' in item:
-                element.kind = item['kind']
-            if 'id' in item:
-                element.id = item['id']
-            if 'name' in item:
-                element.name = item['name']
+            element.kind = flat_path[index]
+            if index + 1 < len(flat_path):
+                id_or_name = flat_path[index + 1]
+                if isinstance(id_or_name, six.string_types):
+                    element.name = id_or_name
+                else:
+                    element.id = id_or_name
 
         return key
 
@@ -264,7 +297,7 @@ class Key(object):
         :returns: ``True`` if the last element of the key's path does not have
                   an ``id`` or a ``name``.
         """
-        return self.id_or_name is None
+        return len(self._flat_path) % 2 == 1
 
     @property
     def namespace(self):
@@ -279,12 +312,24 @@ class Key(object):
     def path(self):
         """Path getter.
 
-        Returns a copy so that the key remains immutable.
+        Built from :attr:`flat_path` for each call, so that the key remains
+        immutable.
 
         :rtype: :class:`list` of :class:`dict`
         :returns: The (key) path of the current key.
         """
-        return copy.deepcopy(self._path)
+        flat_path = self._flat_path
+        path = []
+        for index in range(0, len(flat_path), 2):
+            element = {'kind': flat_path[index]}
+            if index + 1 < len(flat_path):
+                id_or_name = flat_path[index + 1]
+                if isinstance(id_or_name, six.string_types):
+                    element['name'] = id_or_name
+                else:
+                    element['id'] = id_or_name
+            path.append(element)
+        return path
 
     @property
     def flat_path(self):
@@ -302,7 +347,7 @@ class Key(object):
         :rtype: string
         :returns: The kind of the current key.
         """
-        return self.path[-1]['kind']
+        return self._flat_path[(len(self._flat_path) - 1) // 2 * 2]
 
     @property
     def id(self):
@@ -311,7 +356,9 @@ class Key(object):
         :rtype: integer
         :returns: The (integer) ID of the key.
         """
-        return self.path[-1].get('id')
+        id_or_name = self.id_or_name
+        if isinstance(id_or_name, six.integer_types):
+            return id_or_name
 
     @property
     def name(self):
@@ -320,7 +367,9 @@ class Key(object):
         :rtype: string
         :returns: The (string) name of the key.
         """
-        return self.path[-1].get('name')
+        id_or_name = self.id_or_name
+        if isinstance(id_or_name, six.string_types):
+            return id_or_name
 
     @property
     def id_or_name(self):
@@ -330,7 +379,8 @@ class Key(object):
         :returns: The last element of the key's path if it is either an ``id``
                   or a ``name``.
         """
-        return self.id or self.name
+        if not self.is_partial:
+            return self._flat_path[-1]
 
     @property
     def dataset_id(self):
@@ -353,12 +403,12 @@ class Key(object):
                   one path element, returns ``None``.
         """
         if self.is_partial:
-            parent_args = self.flat_path[:-1]
+            parent_path = self._flat_path[:-1]
         else:
-            parent_args = self.flat_path[:-2]
-        if parent_args:
-            return self.__class__(*parent_args, dataset_id=self.dataset_id,
-                                  namespace=self.namespace)
+            parent_path = self._flat_path[:-2]
+        if parent_path:
+            return self._from_flat_path(parent_path, self._dataset_id,
+                                        self._namespace)
 
     @property
     def parent(self):
@@ -404,6 +454,20 @@ def _validate_dataset_id(dataset_id, parent):
     return dataset_id
 
 
+def _unprefixed_dataset_id(dataset_id):
+    """Strip the 's~' or 'e~' prefix of a dataset ID, if any.
+
+    :type dataset_id: string
+    :param dataset_id: A dataset ID.
+
+    :rtype: string
+    :returns: The dataset ID, without its prefix.
+    """
+    if dataset_id.startswith('s~') or dataset_id.startswith('e~'):
+        return dataset_id[2:]
+    return dataset_id
+
+
 def _dataset_ids_equal(dataset_id1, dataset_id2):
     """Compares two dataset IDs for fuzzy equality.
 
@@ -16,12 +16,35 @@
 
 import base64
 
+from gcloud._helpers import _LazyModule
 from gcloud._helpers import _ensure_tuple_or_list
-from gcloud.datastore._generated import query_pb2 as _query_pb2
+from gcloud._helpers import _iterate_concurrently
+from gcloud._helpers import _prefetch
 from gcloud.datastore import helpers
 from gcloud.datastore.key import Key
 
 
+_query_pb2 = _LazyModule('gcloud.datastore._generated.query_pb2')
+
+# Values of the ``PropertyFilter.Operator`` and
+# ``QueryResultBatch.MoreResultsType`` enums, spelled out so that defining
+# the classes below does not load the generated protobuf module.
+_LESS_THAN = 1
+_LESS_THAN_OR_EQUAL = 2
+_GREATER_THAN = 3
+_GREATER_THAN_OR_EQUAL = 4
+_EQUAL = 5
+_NOT_FINISHED = 1
+_MORE_RESULTS_AFTER_LIMIT = 2
+_NO_MORE_RESULTS = 3
+
+_SCATTER_OVERSAMPLING = 32
+"""Keys sampled with ``__scatter__`` per split point chosen."""
+
+_SPLIT_BUFFER_PAGES = 2
+"""Pages each running sub-query may fetch ahead of the consumer."""
+
+
 class Query(object):
     """A Query against the Cloud Datastore.
 
@@ -64,11 +87,11 @@ class Query(object):
     """
 
     OPERATORS = {
-        '<=': _query_pb2.PropertyFilter.LESS_THAN_OR_EQUAL,
-        '>=': _query_pb2.PropertyFilter.GREATER_THAN_OR_EQUAL,
-        '<': _query_pb2.PropertyFilter.LESS_THAN,
-        '>': _query_pb2.PropertyFilter.GREATER_THAN,
-        '=': _query_pb2.PropertyFilter.EQUAL,
+        '<=': _LESS_THAN_OR_EQUAL,
+        '>=': _GREATER_THAN_OR_EQUAL,
+        '<': _LESS_THAN,
+        '>': _GREATER_THAN,
+        '=': _EQUAL,
     }
     """Mapping of operator strings and their protobuf equivalents."""
 
@@ -293,7 +316,7 @@ class Query(object):
         self._group_by[:] = value
 
     def fetch(self, limit=None, offset=0, start_cursor=None, end_cursor=None,
-              client=None):
+              client=None, lazy=False, prefetch=0):
         """Execute the Query; return an iterator for the matching entities.
 
         For example::
@@ -322,6 +345,16 @@ class Query(object):
         :param client: client used to connect to datastore.
                        If not supplied, uses the query's value.
 
+        :type lazy: boolean
+        :param lazy: (Optional) If true, yield
+                     :class:`gcloud.datastore.entity.LazyEntity` instances,
+                     whose properties are decoded when first read.
+
+        :type prefetch: integer
+        :param prefetch: (Optional) Number of pages to fetch ahead while
+                         the current one is consumed.  See
+                         :class:`Iterator`.
+
         :rtype: :class:`Iterator`
         :raises: ValueError if ``connection`` is not passed and no implicit
                  default has been set.
@@ -329,8 +362,112 @@ class Query(object):
         if client is None:
             client = self._client
 
-        return Iterator(
-            self, client, limit, offset, start_cursor, end_cursor)
+        return Iterator(self, client, limit, offset, start_cursor, end_cursor,
+                        lazy, prefetch)
+
+    def split(self, num_splits, split_points=None, client=None):
+        """Partition the query into sub-queries over disjoint key ranges.
+
+        Unless ``split_points`` are passed, they are chosen by sampling
+        keys of the query's kind in ``__scatter__`` order, so that the
+        ranges hold roughly equal numbers of entities.  Fewer sub-queries
+        may be returned for small kinds.
+
+        :type num_splits: integer
+        :param num_splits: The number of sub-queries wanted.
+
+        :type split_points: sequence of :class:`gcloud.datastore.key.Key`
+        :param split_points: (Optional) Keys at which to split the query,
+                             in any order;  ``num_splits`` is then ignored.
+
+        :type client: :class:`gcloud.datastore.client.Client`
+        :param client: (Optional) client used to sample split points.
+                       If not supplied, uses the query's value.
+
+        :rtype: list of :class:`Query`
+        :returns: Sub-queries, in key order, whose results together are
+                  those of this query.
+        :raises: :class:`ValueError` if ``num_splits`` is not positive, or
+                 if the query has no kind, has inequality filters or
+                 sort orders (which key ranges cannot partition).
+        """
+        if num_splits < 1:
+            raise ValueError('num_splits must be positive', num_splits)
+        if not self.kind:
+            raise ValueError('Only queries with a kind can be split')
+        if [operator for _, operator, _ in self.filters if operator != '=']:
+            raise ValueError('Queries with inequality filters cannot be split')
+        if self.order:
+            raise ValueError('Queries with sort orders cannot be split')
+
+        if client is None:
+            client = self._client
+
+        if split_points is None:
+            split_points = _scatter_split_points(self, num_splits, client)
+        else:
+            split_points = _unique_sorted_keys(split_points)
+
+        bounds = [None] + split_points + [None]
+        return [_key_range_query(self, start, end)
+                for start, end in zip(bounds[:-1], bounds[1:])]
+
+    def fetch_parallel(self, num_splits, max_workers=None, ordered=False,
+                       split_points=None, client=None, lazy=False):
+        """Execute the query as concurrent sub-queries over key ranges.
+
+        See :meth:`split` for how the query is partitioned.  Each
+        sub-query pages through its results on a worker thread.  For
+        example, to export a kind with eight concurrent streams::
+
+          >>> query = client.query(kind='Person')
+          >>> for entity in query.fetch_parallel(32, max_workers=8):
+          ...     export(entity)
+
+        :type num_splits: integer
+        :param num_splits: The number of sub-queries wanted.
+
+        :type max_workers: integer
+        :param max_workers: (Optional) Maximum number of sub-queries run at
+                            once.  Defaults to the client's ``max_workers``.
+
+        :type ordered: boolean
+        :param ordered: If true, yield entities in key order;  otherwise
+                        (the default), yield them as they arrive.
+
+        :type split_points: sequence of :class:`gcloud.datastore.key.Key`
+        :param split_points: (Optional) Keys at which to split the query.
+
+        :type client: :class:`gcloud.datastore.client.Client`
+        :param client: (Optional) client used to connect to datastore.
+                       If not supplied, uses the query's value.
+
+        :type lazy: boolean
+        :param lazy: (Optional) If true, yield
+                     :class:`gcloud.datastore.entity.LazyEntity` instances.
+
+        :rtype: generator
+        :returns: The entities matching the query.
+        :raises: :class:`ValueError` if called within a transaction (whose
+                 reads cannot be spread over threads), or if the query
+                 cannot be split.
+        """
+        if client is None:
+            client = self._client
+        if client.current_transaction is not None:
+            raise ValueError('Parallel queries cannot run in a transaction')
+        if max_workers is None:
+            max_workers = client.max_workers
+
+        queries = self.split(num_splits, split_points, client)
+        if ordered:
+            for query in queries:
+                query.order = ['__key__']
+        pages = _iterate_concurrently(
+            [_iter_pages(query.fetch(client=client, lazy=lazy))
+             for query in queries],
+            max_workers, ordered, _SPLIT_BUFFER_PAGES)
+        return (entity for page in pages for entity in page)
 
 
 class Iterator(object):
@@ -358,23 +495,40 @@ class Iterator(object):
     :type end_cursor: bytes
     :param end_cursor: (Optional) Cursor to end paging through
                        query results.
+
+    :type lazy: boolean
+    :param lazy: (Optional) If true, yield
+                 :class:`gcloud.datastore.entity.LazyEntity` instances,
+                 whose properties are decoded when first read.
+
+    :type prefetch: integer
+    :param prefetch: (Optional) Number of pages to fetch (and decode) ahead,
+                     on a background thread, while iterating over the
+                     current one.  Each page is still requested with the
+                     cursor returned by the previous one.  Defaults to ``0``
+                     (no prefetching).  When enabled, the iterator's cursor
+                     and ``more_results`` state track the pages fetched,
+                     which may be ahead of the entities yielded.
     """
 
-    _NOT_FINISHED = _query_pb2.QueryResultBatch.NOT_FINISHED
+    _NOT_FINISHED = _NOT_FINISHED
 
     _FINISHED = (
-        _query_pb2.QueryResultBatch.NO_MORE_RESULTS,
-        _query_pb2.QueryResultBatch.MORE_RESULTS_AFTER_LIMIT,
+        _NO_MORE_RESULTS,
+        _MORE_RESULTS_AFTER_LIMIT,
     )
 
     def __init__(self, query, client, limit=None, offset=0,
-                 start_cursor=None, end_cursor=None):
+                 start_cursor=None, end_cursor=None, lazy=False,
+                 prefetch=0):
         self._query = query
         self._client = client
         self._limit = limit
         self._offset = offset
         self._start_cursor = start_cursor
         self._end_cursor = end_cursor
+        self._lazy = lazy
+        self._prefetch_pages = prefetch
         self._page = self._more_results = None
 
     def next_page(self):
@@ -385,6 +539,36 @@ class Iterator(object):
 
         :rtype: tuple, (entities, more_results, cursor)
         """
+        return self._next_page(self._client.current_transaction)
+
+    def _next_page(self, transaction):
+        """Fetch a single "page" of query results.
+
+        :type transaction: :class:`gcloud.datastore.transaction.Transaction`
+        :param transaction: The transaction to read in, or ``None``:  the
+                            client's current transaction is local to the
+                            calling thread, so is passed explicitly.
+
+        :rtype: tuple, (entities, more_results, cursor)
+        """
+        entity_pbs, _, _ = self._next_page_pbs(transaction)
+        self._page = [
+            helpers.entity_from_protobuf(entity, lazy=self._lazy)
+            for entity in entity_pbs]
+        return self._page, self._more_results, self._start_cursor
+
+    def _next_page_pbs(self, transaction):
+        """Fetch a single "page" of query results, without decoding them.
+
+        :type transaction: :class:`gcloud.datastore.transaction.Transaction`
+        :param transaction: The transaction to read in, or ``None``.
+
+        :rtype: tuple, (entity_pbs, more_results, cursor)
+        :returns: The page as
+                  :class:`gcloud.datastore._generated.entity_pb2.Entity`
+                  protobufs, whether more results follow, and the cursor
+                  after the page.
+        """
         pb = _pb_from_query(self._query)
 
         start_cursor = self._start_cursor
@@ -400,8 +584,6 @@ class Iterator(object):
 
         pb.offset = self._offset
 
-        transaction = self._client.current_transaction
-
         query_results = self._client.connection.run_query(
             query_pb=pb,
             dataset_id=self._query.dataset_id,
@@ -432,23 +614,139 @@ class Iterator(object):
         else:
             raise ValueError('Unexpected value returned for `more_results`.')
 
-        self._page = [
-            helpers.entity_from_protobuf(entity)
-            for entity in entity_pbs]
-        return self._page, self._more_results, self._start_cursor
+        return entity_pbs, self._more_results, self._start_cursor
 
     def __iter__(self):
         """Generator yielding all results matching our query.
 
         :rtype: sequence of :class:`gcloud.datastore.entity.Entity`
         """
-        self.next_page()
-        while True:
-            for entity in self._page:
+        pages = _iter_pages(self, self._client.current_transaction)
+        if self._prefetch_pages > 0:
+            pages = _prefetch(pages, self._prefetch_pages)
+        for page in pages:
+            for entity in page:
                 yield entity
-            if not self._more_results:
-                break
-            self.next_page()
+
+
+def _iter_pages(iterator, transaction=None, raw=False):
+    """Yield each page of results of a query iterator.
+
+    :type iterator: :class:`Iterator`
+    :param iterator: A fresh iterator.
+
+    :type transaction: :class:`gcloud.datastore.transaction.Transaction`
+    :param transaction: (Optional) The transaction to read in.
+
+    :type raw: boolean
+    :param raw: (Optional) If true, yield the entity protobufs of each page
+                rather than entities.
+
+    :rtype: generator
+    :returns: Lists of :class:`gcloud.datastore.entity.Entity` (or of
+              :class:`gcloud.datastore._generated.entity_pb2.Entity`).
+    """
+    if raw:
+        next_page = iterator._next_page_pbs
+    else:
+        next_page = iterator._next_page
+    while True:
+        page, more_results, _ = next_page(transaction)
+        yield page
+        if not more_results:
+            return
+
+
+def _key_order(key):
+    """Sort key for keys, in the order the datastore uses.
+
+    Path elements compare by kind, then by ID or name, with IDs
+    ordered before names.
+
+    :type key: :class:`gcloud.datastore.key.Key`
+    :param key: The key to order.
+
+    :rtype: tuple
+    :returns: A value comparing like ``key`` in the datastore.
+    """
+    return tuple((element['kind'], 0, element['id']) if 'id' in element
+                 else (element['kind'], 1, element['name'])
+                 for element in key.path)
+
+
+def _unique_sorted_keys(keys):
+    """Sort keys in datastore order, dropping duplicates.
+
+    :type keys: iterable of :class:`gcloud.datastore.key.Key`
+    :param keys: Complete keys.
+
+    :rtype: list of :class:`gcloud.datastore.key.Key`
+    :returns: The distinct keys, in datastore order.
+    """
+    by_order = dict((_key_order(key), key) for key in keys)
+    return [by_order[order] for order in sorted(by_order)]
+
+
+def _scatter_split_points(query, num_splits, client):
+    """Choose keys splitting a query into ranges of similar sizes.
+
+    Samples keys of the query's kind in ``__scatter__`` order (a random
+    order maintained by the datastore) and picks evenly spaced ones.
+
+    :type query: :class:`Query`
+    :param query: The query to split.
+
+    :type num_splits: integer
+    :param num_splits: The number of ranges wanted.
+
+    :type client: :class:`gcloud.datastore.client.Client`
+    :param client: The client used to sample keys.
+
+    :rtype: list of :class:`gcloud.datastore.key.Key`
+    :returns: At most ``num_splits - 1`` keys, in datastore order.
+    """
+    if num_splits == 1:
+        return []
+    scatter_query = Query(client, kind=query.kind,
+                          dataset_id=query.dataset_id,
+                          namespace=query.namespace,
+                          order=['__scatter__'])
+    scatter_query.keys_only()
+    sample_size = (num_splits - 1) * _SCATTER_OVERSAMPLING
+    samples = _unique_sorted_keys(
+        entity.key for entity in scatter_query.fetch(limit=sample_size))
+    if not samples:
+        return []
+    step = len(samples) / float(num_splits)
+    return _unique_sorted_keys(samples[int(step * index)]
+                               for index in range(1, num_splits))
+
+
+def _key_range_query(query, start, end):
+    """Restrict a copy of a query to a range of keys.
+
+    :type query: :class:`Query`
+    :param query: The query to copy.
+
+    :type start: :class:`gcloud.datastore.key.Key` or ``NoneType``
+    :param start: The first key in the range, or ``None`` for no bound.
+
+    :type end: :class:`gcloud.datastore.key.Key` or ``NoneType``
+    :param end: The key after the range, or ``None`` for no bound.
+
+    :rtype: :class:`Query`
+    :returns: The restricted copy.
+    """
+    filters = query.filters
+    if start is not None:
+        filters.append(('__key__', '>=', start))
+    if end is not None:
+        filters.append(('__key__', '<', end))
+    return Query(query._client, kind=query.kind,
+                 dataset_id=query.dataset_id, namespace=query.namespace,
+                 ancestor=query.ancestor, filters=filters,
+                 projection=query.projection, order=query.order,
+                 group_by=query.group_by)
 
 
 def _pb_from_query(query):
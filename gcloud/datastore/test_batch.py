@@ -39,6 +39,8 @@ class TestBatch(unittest2.TestCase):
         self.assertTrue(batch._id is None)
         self.assertTrue(isinstance(batch.mutations, datastore_pb2.Mutation))
         self.assertEqual(batch._partial_key_entities, [])
+        self.assertEqual(batch.mutation_count, 0)
+        self.assertEqual(batch.mutation_bytes, 0)
 
     def test_current(self):
         _DATASET = 'DATASET'
@@ -92,6 +94,8 @@ class TestBatch(unittest2.TestCase):
         mutated_entity = _mutated_pb(self, batch.mutations, 'insert_auto_id')
         self.assertEqual(mutated_entity.key, key._key)
         self.assertEqual(batch._partial_key_entities, [entity])
+        self.assertEqual(batch.mutation_count, 1)
+        self.assertEqual(batch.mutation_bytes, mutated_entity.ByteSize())
 
     def test_put_entity_w_completed_key(self):
         from gcloud.datastore.helpers import _property_tuples
@@ -157,6 +161,94 @@ class TestBatch(unittest2.TestCase):
         self.assertFalse(prop_dict['spam'].list_value[2].indexed)
         self.assertFalse('frotz' in prop_dict)
 
+    def test__put_serialized_entity_w_completed_key(self):
+        from gcloud.datastore._generated import entity_pb2
+        _DATASET = 'DATASET'
+        connection = _Connection()
+        client = _Client(_DATASET, connection)
+        batch = self._makeOne(client)
+        entity_pb = entity_pb2.Entity()
+        entity_pb.key.partition_id.dataset_id = 'OTHER'
+        entity_pb.key.partition_id.namespace = 'NAMESPACE'
+        entity_pb.key.path_element.add(kind='KIND', name='NAME')
+        entity_pb.property.add(name='foo').value.string_value = u'Foo'
+        data = entity_pb.SerializeToString()
+
+        batch._put_serialized_entity(data)
+
+        mutated_entity = _mutated_pb(self, batch.mutations, 'upsert')
+        self.assertFalse(mutated_entity.key.partition_id.HasField(
+            'dataset_id'))
+        self.assertEqual(mutated_entity.key.partition_id.namespace,
+                         'NAMESPACE')
+        self.assertEqual(mutated_entity.key.path_element,
+                         entity_pb.key.path_element)
+        self.assertEqual(mutated_entity.property, entity_pb.property)
+        self.assertEqual(batch._partial_key_entities, [])
+        self.assertEqual(batch.mutation_count, 1)
+        self.assertEqual(batch.mutation_bytes, len(data))
+
+    def test__put_serialized_entity_w_partial_key(self):
+        from gcloud.datastore._generated import entity_pb2
+        _DATASET = 'DATASET'
+        connection = _Connection()
+        client = _Client(_DATASET, connection)
+        batch = self._makeOne(client)
+        entity_pb = entity_pb2.Entity()
+        entity_pb.key.partition_id.dataset_id = 'OTHER'
+        entity_pb.key.path_element.add(kind='KIND')
+
+        batch._put_serialized_entity(entity_pb.SerializeToString())
+
+        mutated_entity = _mutated_pb(self, batch.mutations, 'insert_auto_id')
+        self.assertFalse(mutated_entity.key.partition_id.HasField(
+            'dataset_id'))
+        self.assertEqual(mutated_entity.key.path_element,
+                         entity_pb.key.path_element)
+        self.assertEqual(batch._partial_key_entities, [])
+        self.assertEqual(batch.mutation_count, 1)
+
+    def test__put_serialized_entity_w_invalid_data(self):
+        _DATASET = 'DATASET'
+        connection = _Connection()
+        client = _Client(_DATASET, connection)
+        batch = self._makeOne(client)
+
+        self.assertRaises(ValueError, batch._put_serialized_entity,
+                          b'\xff\xff')
+
+        self.assertEqual(len(batch.mutations.upsert), 0)
+        self.assertEqual(batch.mutation_count, 0)
+
+    def test__put_serialized_entity_wo_key(self):
+        from gcloud.datastore._generated import entity_pb2
+        _DATASET = 'DATASET'
+        connection = _Connection()
+        client = _Client(_DATASET, connection)
+        batch = self._makeOne(client)
+        entity_pb = entity_pb2.Entity()
+        entity_pb.property.add(name='foo').value.integer_value = 1
+
+        self.assertRaises(ValueError, batch._put_serialized_entity,
+                          entity_pb.SerializeToString())
+
+        self.assertEqual(len(batch.mutations.upsert), 0)
+        self.assertEqual(batch.mutation_count, 0)
+
+    def test__put_serialized_entity_w_uninitialized_key(self):
+        from gcloud.datastore._generated import entity_pb2
+        _DATASET = 'DATASET'
+        connection = _Connection()
+        client = _Client(_DATASET, connection)
+        batch = self._makeOne(client)
+        entity_pb = entity_pb2.Entity()
+        entity_pb.key.path_element.add(id=1)  # No kind.
+
+        self.assertRaises(ValueError, batch._put_serialized_entity,
+                          entity_pb.SerializePartialToString())
+
+        self.assertEqual(len(batch.mutations.upsert), 0)
+
     def test_delete_w_partial_key(self):
         _DATASET = 'DATASET'
         connection = _Connection()
@@ -187,6 +279,8 @@ class TestBatch(unittest2.TestCase):
 
         mutated_key = _mutated_pb(self, batch.mutations, 'delete')
         self.assertEqual(mutated_key, key._key)
+        self.assertEqual(batch.mutation_count, 1)
+        self.assertEqual(batch.mutation_bytes, mutated_key.ByteSize())
 
     def test_delete_w_completed_key_w_prefixed_dataset_id(self):
         _DATASET = 'DATASET'
@@ -229,6 +323,40 @@ class TestBatch(unittest2.TestCase):
         self.assertFalse(entity.key.is_partial)
         self.assertEqual(entity.key._id, _NEW_ID)
 
+    def test_commit_invalidates_entity_cache(self):
+        from gcloud.datastore.entity import Entity
+        from gcloud.datastore.key import Key
+        _DATASET = 'DATASET'
+        connection = _Connection()
+        client = _Client(_DATASET, connection)
+        client.entity_cache = _EntityCache()
+        batch = self._makeOne(client)
+        batch.put(Entity(key=Key('KIND', 1, dataset_id=_DATASET)))
+        batch.put(Entity(key=Key('KIND', dataset_id=_DATASET)))
+        batch.delete(Key('KIND', 2, dataset_id=_DATASET))
+
+        batch.commit()
+
+        invalidated, = client.entity_cache._invalidated
+        self.assertEqual([key_pb.path_element[0].id for key_pb in invalidated],
+                         [1, 2])
+
+    def test_commit_failure_invalidates_entity_cache(self):
+        from gcloud.datastore.key import Key
+        _DATASET = 'DATASET'
+        connection = _Connection()
+        connection._commit_error = ValueError()
+        client = _Client(_DATASET, connection)
+        client.entity_cache = _EntityCache()
+        batch = self._makeOne(client)
+        batch.delete(Key('KIND', 2, dataset_id=_DATASET))
+
+        self.assertRaises(ValueError, batch.commit)
+
+        invalidated, = client.entity_cache._invalidated
+        self.assertEqual([key_pb.path_element[0].id for key_pb in invalidated],
+                         [2])
+
     def test_as_context_mgr_wo_error(self):
         _DATASET = 'DATASET'
         _PROPERTIES = {'foo': 'bar'}
@@ -323,6 +451,7 @@ class _KeyPB(object):
 class _Connection(object):
     _marker = object()
     _save_result = (False, None)
+    _commit_error = None
 
     def __init__(self, *new_keys):
         self._completed_keys = [_KeyPB(key) for key in new_keys]
@@ -331,9 +460,20 @@ class _Connection(object):
 
     def commit(self, dataset_id, commit_request, transaction_id):
         self._committed.append((dataset_id, commit_request, transaction_id))
+        if self._commit_error is not None:
+            raise self._commit_error
         return self._index_updates, self._completed_keys
 
 
+class _EntityCache(object):
+
+    def __init__(self):
+        self._invalidated = []
+
+    def invalidate(self, key_pbs):
+        self._invalidated.append(key_pbs)
+
+
 class _Entity(dict):
     key = None
     exclude_from_indexes = ()
@@ -382,6 +522,7 @@ class _Client(object):
         self.connection = connection
         self.namespace = namespace
         self._batches = []
+        self.entity_cache = None
 
     def _push_batch(self, batch):
         self._batches.insert(0, batch)
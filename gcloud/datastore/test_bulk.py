@@ -0,0 +1,475 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+_DATASET = 'DATASET'
+_KIND = 'KIND'
+
+
+class Test_export_entities(unittest2.TestCase):
+
+    def _callFUT(self, *args, **kwargs):
+        from gcloud.datastore.bulk import export_entities
+        return export_entities(*args, **kwargs)
+
+    def _makeQuery(self, connection):
+        from gcloud.datastore.query import Query
+        client = _Client(connection)
+        return Query(client, kind=_KIND)
+
+    def _readIds(self, stream, file_format):
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore.bulk import _get_format
+        stream.seek(0)
+        _, read = _get_format(file_format)
+        return [entity_pb2.Entity.FromString(data).key.path_element[-1].id
+                for data in read(stream)]
+
+    def test_delimited(self):
+        import io
+        from gcloud.datastore.bulk import DELIMITED
+        connection = _Connection(range(1, 8))
+        query = self._makeQuery(connection)
+        stream = io.BytesIO()
+        count = self._callFUT(query, stream)
+        self.assertEqual(count, 7)
+        self.assertEqual(self._readIds(stream, DELIMITED), list(range(1, 8)))
+        self.assertEqual(len(connection._queries), 3)
+
+    def test_ndjson(self):
+        import io
+        import json
+        from gcloud.datastore.bulk import NDJSON
+        connection = _Connection(range(1, 5))
+        query = self._makeQuery(connection)
+        stream = io.BytesIO()
+        count = self._callFUT(query, stream, NDJSON)
+        self.assertEqual(count, 4)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(json.loads(lines[0].decode('ascii'))['key'], {
+            'partitionId': {'datasetId': _DATASET},
+            'pathElement': [{'kind': _KIND, 'id': '1'}],
+        })
+        self.assertEqual(self._readIds(stream, NDJSON), list(range(1, 5)))
+
+    def test_empty(self):
+        import io
+        connection = _Connection([])
+        query = self._makeQuery(connection)
+        stream = io.BytesIO()
+        self.assertEqual(self._callFUT(query, stream), 0)
+        self.assertEqual(stream.getvalue(), b'')
+
+    def test_w_split_points(self):
+        import io
+        from gcloud.datastore.bulk import DELIMITED
+        from gcloud.datastore.key import Key
+        connection = _Connection(range(1, 21))
+        query = self._makeQuery(connection)
+        stream = io.BytesIO()
+        split_points = [Key(_KIND, 8, dataset_id=_DATASET),
+                        Key(_KIND, 15, dataset_id=_DATASET)]
+        count = self._callFUT(query, stream, split_points=split_points,
+                              max_workers=3)
+        self.assertEqual(count, 20)
+        self.assertEqual(sorted(self._readIds(stream, DELIMITED)),
+                         list(range(1, 21)))
+        # Three ranges, of 7, 7 and 6 entities:  3 + 3 + 2 pages.
+        self.assertEqual(len(connection._queries), 8)
+
+    def test_w_num_splits_and_explicit_client(self):
+        import io
+        from gcloud.datastore.bulk import DELIMITED
+        from gcloud.datastore.query import Query
+        connection = _Connection(range(1, 41))
+        query = Query(_Client(None), kind=_KIND, dataset_id=_DATASET)
+        stream = io.BytesIO()
+        count = self._callFUT(query, stream, num_splits=4,
+                              client=_Client(connection))
+        self.assertEqual(count, 40)
+        self.assertEqual(sorted(self._readIds(stream, DELIMITED)),
+                         list(range(1, 41)))
+        scatter_queries = [query_pb for query_pb in connection._queries
+                           if query_pb.order]
+        self.assertEqual(len(scatter_queries), 1)
+
+    def test_in_transaction(self):
+        import io
+        connection = _Connection(range(1, 5))
+        query = self._makeQuery(connection)
+        query._client._transaction = object()
+        with self.assertRaises(ValueError):
+            self._callFUT(query, io.BytesIO())
+        self.assertEqual(connection._queries, [])
+
+    def test_unknown_format(self):
+        import io
+        connection = _Connection(range(1, 5))
+        query = self._makeQuery(connection)
+        with self.assertRaises(ValueError):
+            self._callFUT(query, io.BytesIO(), 'csv')
+        self.assertEqual(connection._queries, [])
+
+
+class Test_import_entities(unittest2.TestCase):
+
+    def _callFUT(self, *args, **kwargs):
+        from gcloud.datastore.bulk import import_entities
+        return import_entities(*args, **kwargs)
+
+    def _makeFile(self, ids, file_format=None, dataset_id='OTHER'):
+        import io
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore.bulk import DELIMITED
+        from gcloud.datastore.bulk import _get_format
+        encode, _ = _get_format(file_format or DELIMITED)
+        records = []
+        for key_id in ids:
+            entity_pb = entity_pb2.Entity()
+            entity_pb.key.partition_id.dataset_id = dataset_id
+            entity_pb.key.path_element.add(kind=_KIND, id=key_id)
+            value_pb = entity_pb.property.add(name='foo').value
+            value_pb.integer_value = key_id
+            records.append(encode(entity_pb))
+        return io.BytesIO(b''.join(records))
+
+    def _committedIds(self, connection):
+        return sorted(entity_pb.key.path_element[-1].id
+                      for commit_request in connection._commits
+                      for entity_pb in commit_request.mutation.upsert)
+
+    def test_delimited(self):
+        connection = _Connection([])
+        client = _Client(connection)
+        client.commit_chunk_size = 2
+        count = self._callFUT(client, self._makeFile(range(1, 8)))
+        self.assertEqual(count, 7)
+        self.assertEqual(len(connection._commits), 4)
+        self.assertEqual(self._committedIds(connection), list(range(1, 8)))
+        for commit_request in connection._commits:
+            for entity_pb in commit_request.mutation.upsert:
+                self.assertFalse(entity_pb.key.partition_id.HasField(
+                    'dataset_id'))
+                self.assertEqual(entity_pb.property[0].value.integer_value,
+                                 entity_pb.key.path_element[-1].id)
+        self.assertEqual(connection._dataset_ids, set([_DATASET]))
+
+    def test_ndjson(self):
+        from gcloud.datastore.bulk import NDJSON
+        connection = _Connection([])
+        client = _Client(connection)
+        count = self._callFUT(client, self._makeFile(range(1, 4), NDJSON),
+                              NDJSON, max_workers=1)
+        self.assertEqual(count, 3)
+        self.assertEqual(len(connection._commits), 1)
+        self.assertEqual(self._committedIds(connection), [1, 2, 3])
+
+    def test_empty(self):
+        connection = _Connection([])
+        client = _Client(connection)
+        self.assertEqual(self._callFUT(client, self._makeFile([])), 0)
+        self.assertEqual(connection._commits, [])
+
+    def test_chunked_by_bytes(self):
+        connection = _Connection([])
+        client = _Client(connection)
+        client.commit_chunk_bytes = 1
+        count = self._callFUT(client, self._makeFile(range(1, 4)))
+        self.assertEqual(count, 3)
+        self.assertEqual(len(connection._commits), 3)
+
+    def test_failed_commit(self):
+        from gcloud.datastore.client import PartialCommitError
+        connection = _Connection([], fail_on=[4])
+        client = _Client(connection)
+        client.commit_chunk_size = 3
+        with self.assertRaises(PartialCommitError) as caught:
+            self._callFUT(client, self._makeFile(range(1, 11)))
+        exc = caught.exception
+        self.assertEqual(exc.total, 10)
+        self.assertEqual(
+            [key_pb.path_element[-1].id for key_pb, _ in exc.failures],
+            [4, 5, 6])
+        self.assertFalse(exc.failures[0][0].partition_id.HasField(
+            'dataset_id'))
+        self.assertEqual(self._committedIds(connection),
+                         [1, 2, 3, 7, 8, 9, 10])
+
+    def test_stops_after_wave_of_failed_commits(self):
+        from gcloud.datastore.client import PartialCommitError
+        connection = _Connection([], fail_on=[1, 2, 3, 4])
+        client = _Client(connection)
+        client.commit_chunk_size = 2
+        with self.assertRaises(PartialCommitError) as caught:
+            self._callFUT(client, self._makeFile(range(1, 11)))
+        exc = caught.exception
+        self.assertEqual(exc.total, 4)
+        self.assertEqual(
+            sorted(key_pb.path_element[-1].id for key_pb, _ in exc.failures),
+            [1, 2, 3, 4])
+        self.assertEqual(connection._commits, [])
+
+    def test_entity_wo_key(self):
+        import io
+        from gcloud.datastore.bulk import NDJSON
+        connection = _Connection([])
+        client = _Client(connection)
+        stream = io.BytesIO(b'{"property":[]}\n')
+        with self.assertRaises(ValueError):
+            self._callFUT(client, stream, NDJSON)
+        self.assertEqual(connection._commits, [])
+
+    def test_truncated_file(self):
+        connection = _Connection([])
+        client = _Client(connection)
+        stream = self._makeFile(range(1, 4))
+        stream.truncate(len(stream.getvalue()) - 1)
+        with self.assertRaises(ValueError):
+            self._callFUT(client, stream)
+
+    def test_unknown_format(self):
+        connection = _Connection([])
+        client = _Client(connection)
+        with self.assertRaises(ValueError):
+            self._callFUT(client, self._makeFile([1]), 'csv')
+        self.assertEqual(connection._commits, [])
+
+
+class Test_varint(unittest2.TestCase):
+
+    def _encode(self, value):
+        from gcloud.datastore.bulk import _encode_varint
+        return _encode_varint(value)
+
+    def _read(self, data):
+        import io
+        from gcloud.datastore.bulk import _read_varint
+        return _read_varint(io.BytesIO(data))
+
+    def test_single_byte(self):
+        self.assertEqual(self._encode(0), b'\x00')
+        self.assertEqual(self._encode(0x7f), b'\x7f')
+        self.assertEqual(self._read(b'\x7f'), 0x7f)
+
+    def test_multiple_bytes(self):
+        self.assertEqual(self._encode(300), b'\xac\x02')
+        self.assertEqual(self._read(b'\xac\x02'), 300)
+        value = 2 ** 40 + 5
+        self.assertEqual(self._read(self._encode(value)), value)
+
+    def test_read_at_end(self):
+        self.assertEqual(self._read(b''), None)
+
+    def test_read_truncated(self):
+        self.assertRaises(ValueError, self._read, b'\xac')
+
+
+class Test__read_delimited(unittest2.TestCase):
+
+    def _callFUT(self, data):
+        import io
+        from gcloud.datastore.bulk import _read_delimited
+        return list(_read_delimited(io.BytesIO(data)))
+
+    def test_records(self):
+        self.assertEqual(self._callFUT(b'\x00\x02AB\x01C'),
+                         [b'', b'AB', b'C'])
+
+    def test_truncated_record(self):
+        self.assertRaises(ValueError, self._callFUT, b'\x05\x00')
+
+
+class Test__read_json(unittest2.TestCase):
+
+    def _callFUT(self, data):
+        import io
+        from gcloud.datastore.bulk import _read_json
+        return list(_read_json(io.BytesIO(data)))
+
+    def test_skips_blank_lines(self):
+        from gcloud.datastore._generated import entity_pb2
+        records = self._callFUT(
+            b'{"key":{"pathElement":[{"kind":"KIND","name":"a"}]}}\n'
+            b'\n'
+            b'  \n'
+            b'{"key":{"pathElement":[{"kind":"KIND","id":"5"}]}}')
+        entity_pbs = [entity_pb2.Entity.FromString(data) for data in records]
+        self.assertEqual(len(entity_pbs), 2)
+        self.assertEqual(entity_pbs[0].key.path_element[0].name, u'a')
+        self.assertEqual(entity_pbs[1].key.path_element[0].id, 5)
+
+    def test_unknown_field(self):
+        self.assertRaises(ValueError, self._callFUT, b'{"bogus":1}\n')
+
+    def test_not_an_object(self):
+        self.assertRaises(ValueError, self._callFUT, b'[1]\n')
+
+    def test_wrong_value_type(self):
+        self.assertRaises(ValueError, self._callFUT,
+                          b'{"key":{"pathElement":[{"kind":1}]}}\n')
+
+    def test_not_json(self):
+        self.assertRaises(ValueError, self._callFUT, b'{\n')
+
+
+class Test_json_mapping(unittest2.TestCase):
+
+    def _roundTrip(self, entity_pb):
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore.bulk import _message_from_json
+        from gcloud.datastore.bulk import _message_to_json
+        data = _message_to_json(entity_pb)
+        return data, _message_from_json(entity_pb2.Entity(), data)
+
+    def test_all_value_types(self):
+        import datetime
+        from gcloud._helpers import UTC
+        from gcloud.datastore.entity import Entity
+        from gcloud.datastore.helpers import entity_to_protobuf
+        from gcloud.datastore.key import Key
+        key = Key('PARENT', 'NAME', _KIND, 2 ** 62, namespace='NAMESPACE',
+                  dataset_id=_DATASET)
+        inner = Entity()
+        inner['bar'] = 1
+        entity = Entity(key, exclude_from_indexes=('blob',))
+        entity.update({
+            'text': u'\xe9t\xe9',
+            'blob': b'\x00\xff',
+            'float': 1.5,
+            'bool': True,
+            'none': None,
+            'when': datetime.datetime(2015, 1, 1, tzinfo=UTC),
+            'key': key,
+            'list': [1, u'two'],
+            'entity': inner,
+            'empty': Entity(),
+        })
+        entity_pb = entity_to_protobuf(entity)
+        data, result = self._roundTrip(entity_pb)
+        self.assertEqual(result, entity_pb)
+        self.assertEqual(data['key']['pathElement'][1]['id'],
+                         str(2 ** 62))
+        values = dict((prop['name'], prop['value'])
+                      for prop in data['property'])
+        self.assertEqual(values['blob'], {'blobValue': 'AP8=',
+                                          'indexed': False})
+        self.assertEqual(values['empty'], {'entityValue': {}})
+        self.assertTrue(result.property[-1].value.HasField('entity_value'))
+
+    def test_non_finite_floats(self):
+        import json
+        import math
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore.bulk import _encode_json
+        entity_pb = entity_pb2.Entity()
+        for value in (float('nan'), float('inf'), float('-inf'), 0.5):
+            entity_pb.property.add(name='f').value.double_value = value
+        data = json.loads(_encode_json(entity_pb).decode('ascii'))
+        self.assertEqual(
+            [prop['value']['doubleValue'] for prop in data['property']],
+            ['NaN', 'Infinity', '-Infinity', 0.5])
+        _, result = self._roundTrip(entity_pb)
+        values = [prop.value.double_value for prop in result.property]
+        self.assertTrue(math.isnan(values[0]))
+        self.assertEqual(values[1:], [float('inf'), float('-inf'), 0.5])
+
+    def test_unknown_float_string(self):
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore.bulk import _message_from_json
+        data = {'property': [{'name': 'f', 'value': {'doubleValue': 'nan'}}]}
+        self.assertRaises(ValueError, _message_from_json, entity_pb2.Entity(),
+                          data)
+
+
+class _Connection(object):
+    """Serves a kind of entities in pages of three;  records commits.
+
+    Honors ``__key__`` range filters, and ``__scatter__`` order.
+    """
+
+    _PAGE_SIZE = 3
+
+    def __init__(self, ids, fail_on=()):
+        import threading
+        self._ids = sorted(ids)
+        self._fail_on = set(fail_on)
+        self._lock = threading.Lock()
+        self._queries = []
+        self._commits = []
+        self._dataset_ids = set()
+
+    def run_query(self, query_pb, dataset_id, namespace=None,
+                  transaction_id=None):
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore._generated import query_pb2
+        with self._lock:
+            self._queries.append(query_pb)
+        ids = self._ids
+        for filter_pb in query_pb.filter.composite_filter.filter:
+            property_filter = filter_pb.property_filter
+            bound = property_filter.value.key_value.path_element[-1].id
+            if (property_filter.operator ==
+                    query_pb2.PropertyFilter.GREATER_THAN_OR_EQUAL):
+                ids = [key_id for key_id in ids if key_id >= bound]
+            else:
+                ids = [key_id for key_id in ids if key_id < bound]
+        if query_pb.order:
+            ids = sorted(ids, key=lambda key_id: (key_id * 37) % 101)
+        start = int(query_pb.start_cursor or b'0')
+        end = start + self._PAGE_SIZE
+        if query_pb.limit:
+            end = query_pb.limit
+        entity_pbs = []
+        for key_id in ids[start:end]:
+            entity_pb = entity_pb2.Entity()
+            entity_pb.key.partition_id.dataset_id = dataset_id
+            entity_pb.key.path_element.add(
+                kind=query_pb.kind[0].name, id=key_id)
+            entity_pbs.append(entity_pb)
+        if end < len(ids) and not query_pb.limit:
+            more = query_pb2.QueryResultBatch.NOT_FINISHED
+        else:
+            more = query_pb2.QueryResultBatch.NO_MORE_RESULTS
+        return entity_pbs, str(end).encode('ascii'), more, 0
+
+    def commit(self, dataset_id, commit_request, transaction_id):
+        key_ids = [entity_pb.key.path_element[-1].id
+                   for entity_pb in commit_request.mutation.upsert]
+        if self._fail_on.intersection(key_ids):
+            raise ValueError('Commit failed', key_ids)
+        with self._lock:
+            self._dataset_ids.add(dataset_id)
+            self._commits.append(commit_request)
+        return 0, []
+
+
+class _Client(object):
+
+    commit_chunk_size = 500
+    commit_chunk_bytes = 1024 * 1024
+    entity_cache = None
+    max_workers = 2
+    namespace = None
+    _transaction = None
+
+    def __init__(self, connection, dataset_id=_DATASET):
+        self.connection = connection
+        self.dataset_id = dataset_id
+
+    @property
+    def current_transaction(self):
+        return self._transaction
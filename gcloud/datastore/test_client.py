@@ -296,6 +296,7 @@ class TestClient(unittest2.TestCase):
         self.assertEqual(_called_with[0][1]['keys'], [key])
         self.assertTrue(_called_with[0][1]['missing'] is missing)
         self.assertTrue(_called_with[0][1]['deferred'] is deferred)
+        self.assertFalse(_called_with[0][1]['lazy'])
 
     def test_get_multi_no_keys(self):
         creds = object()
@@ -456,6 +457,22 @@ class TestClient(unittest2.TestCase):
         self.assertEqual(list(result), ['foo'])
         self.assertEqual(result['foo'], 'Foo')
 
+    def test_get_multi_hit_lazy(self):
+        from gcloud.datastore.entity import LazyEntity
+        from gcloud.datastore.key import Key
+
+        KIND = 'Kind'
+        ID = 1234
+        entity_pb = _make_entity_pb(self.DATASET_ID, KIND, ID, 'foo', 'Foo')
+        client = self._makeOne(credentials=object())
+        client.connection._add_lookup_result([entity_pb])
+
+        key = Key(KIND, ID, dataset_id=self.DATASET_ID)
+        result, = client.get_multi([key], lazy=True)
+        self.assertTrue(isinstance(result, LazyEntity))
+        self.assertEqual(result.key.path, [{'kind': KIND, 'id': ID}])
+        self.assertEqual(result['foo'], 'Foo')
+
     def test_get_multi_hit_multiple_keys_same_dataset(self):
         from gcloud.datastore.key import Key
 
@@ -482,6 +499,166 @@ class TestClient(unittest2.TestCase):
         self.assertEqual(retrieved2.key.path, key2.path)
         self.assertEqual(dict(retrieved2), {})
 
+    def test_get_multi_defaults(self):
+        from gcloud.datastore.client import DEFAULT_LOOKUP_CHUNK_SIZE
+        from gcloud.datastore.client import DEFAULT_MAX_WORKERS
+
+        client = self._makeOne(credentials=object())
+        self.assertEqual(client.lookup_chunk_size, DEFAULT_LOOKUP_CHUNK_SIZE)
+        self.assertEqual(client.max_workers, DEFAULT_MAX_WORKERS)
+
+    def test_get_multi_chunked_keeps_key_order(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object())
+        client.connection = _ChunkedLookupConnection(self.DATASET_ID)
+        client.lookup_chunk_size = 2
+        client.max_workers = 3
+        keys = [Key('Kind', key_id, dataset_id=self.DATASET_ID)
+                for key_id in (4, 2, 5, 8, 6)]
+
+        found = client.get_multi(keys)
+
+        self.assertEqual([entity.key.id for entity in found], [4, 2, 8, 6])
+        requested = sorted(
+            [[key_pb.path_element[0].id for key_pb in key_pbs]
+             for _, key_pbs, _, _ in client.connection._lookup_cw])
+        self.assertEqual(requested, [[4, 2], [5, 8], [6]])
+
+    def test_get_multi_chunked_w_missing(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object())
+        client.connection = _ChunkedLookupConnection(self.DATASET_ID)
+        client.lookup_chunk_size = 1
+        client.max_workers = 2
+        keys = [Key('Kind', key_id, dataset_id=self.DATASET_ID)
+                for key_id in (9, 2, 7, 3)]
+
+        missing = []
+        found = client.get_multi(keys, missing=missing)
+
+        self.assertEqual([entity.key.id for entity in found], [2])
+        self.assertEqual([entity.key.id for entity in missing], [9, 7, 3])
+
+    def test_get_multi_chunked_retries_deferred_together(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object())
+        connection = client.connection = _ChunkedLookupConnection(
+            self.DATASET_ID, defer=(10, 20))
+        client.lookup_chunk_size = 2
+        client.max_workers = 2
+        keys = [Key('Kind', key_id, dataset_id=self.DATASET_ID)
+                for key_id in (10, 12, 20, 22)]
+
+        found = client.get_multi(keys)
+
+        self.assertEqual([entity.key.id for entity in found],
+                         [10, 12, 20, 22])
+        self.assertEqual(len(connection._lookup_cw), 3)
+        _, retried, _, _ = connection._lookup_cw[-1]
+        self.assertEqual([key_pb.path_element[0].id for key_pb in retried],
+                         [10, 20])
+
+    def test_get_multi_chunked_w_deferred(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object())
+        client.connection = _ChunkedLookupConnection(
+            self.DATASET_ID, defer=(10, 20))
+        client.lookup_chunk_size = 2
+        client.max_workers = 2
+        keys = [Key('Kind', key_id, dataset_id=self.DATASET_ID)
+                for key_id in (10, 12, 20, 22)]
+
+        deferred = []
+        found = client.get_multi(keys, deferred=deferred)
+
+        self.assertEqual([entity.key.id for entity in found], [12, 22])
+        self.assertEqual(sorted(key.id for key in deferred), [10, 20])
+
+    def test_get_multi_chunked_in_transaction(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object())
+        connection = client.connection = _ChunkedLookupConnection(
+            self.DATASET_ID)
+        client.lookup_chunk_size = 1
+        client.max_workers = 2
+        keys = [Key('Kind', key_id, dataset_id=self.DATASET_ID)
+                for key_id in (2, 4)]
+
+        with _NoCommitTransaction(client, transaction_id=b'XACT'):
+            found = client.get_multi(keys)
+
+        self.assertEqual([entity.key.id for entity in found], [2, 4])
+        self.assertEqual([transaction_id for _, _, _, transaction_id
+                          in connection._lookup_cw], [b'XACT', b'XACT'])
+
+    def _makeCachedClient(self):
+        from gcloud.datastore.entity_cache import EntityCache
+        client = self._makeOne(credentials=object())
+        client.connection = _ChunkedLookupConnection(self.DATASET_ID)
+        client.entity_cache = EntityCache()
+        return client
+
+    def test_get_multi_w_entity_cache(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeCachedClient()
+        connection = client.connection
+        keys = [Key('Kind', key_id, dataset_id=self.DATASET_ID)
+                for key_id in (2, 3, 4)]
+
+        missing = []
+        first = client.get_multi(keys[:2], missing=missing)
+        self.assertEqual([entity.key.id for entity in first], [2])
+        self.assertEqual([entity.key.id for entity in missing], [3])
+        second = client.get_multi(keys)
+
+        self.assertEqual([entity.key.id for entity in second], [2, 4])
+        self.assertEqual(second[0], first[0])
+        self.assertFalse(second[0] is first[0])
+        # Only found entities are cached.
+        self.assertEqual(
+            [[key_pb.path_element[0].id for key_pb in key_pbs]
+             for _, key_pbs, _, _ in connection._lookup_cw],
+            [[2, 3], [3, 4]])
+        self.assertEqual(client.entity_cache.hits, 1)
+        self.assertEqual(client.entity_cache.misses, 4)
+
+    def test_get_multi_w_entity_cache_all_cached(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeCachedClient()
+        key = Key('Kind', 2, dataset_id=self.DATASET_ID)
+        client.get_multi([key])
+
+        missing, deferred = [], []
+        found, = client.get_multi([key], missing=missing, deferred=deferred)
+
+        self.assertEqual(found.key.id, 2)
+        self.assertEqual(missing, [])
+        self.assertEqual(deferred, [])
+        self.assertEqual(len(client.connection._lookup_cw), 1)
+        self.assertRaises(ValueError, client.get_multi, [key],
+                          missing=[object()])
+
+    def test_get_multi_w_entity_cache_in_transaction(self):
+        from gcloud.datastore.key import Key
+
+        client = self._makeCachedClient()
+        key = Key('Kind', 2, dataset_id=self.DATASET_ID)
+        client.get_multi([key])
+
+        with _NoCommitTransaction(client, transaction_id=b'XACT'):
+            found, = client.get_multi([key])
+
+        self.assertEqual(found.key.id, 2)
+        self.assertEqual(len(client.connection._lookup_cw), 2)
+        self.assertEqual(client.entity_cache.hits, 0)
+
     def test_get_multi_hit_multiple_keys_different_dataset(self):
         from gcloud.datastore.key import Key
 
@@ -663,6 +840,94 @@ class TestClient(unittest2.TestCase):
         self.assertEqual(name, 'foo')
         self.assertEqual(value_pb.string_value, u'bar')
 
+    def test_put_multi_chunked_by_count(self):
+        from gcloud.datastore.entity import Entity
+
+        client = self._makeOne(credentials=object())
+        connection = client.connection = _ChunkedCommitConnection()
+        client.commit_chunk_size = 2
+        client.max_workers = 2
+        entities = []
+        for index in range(5):
+            entity = Entity(client.key('Kind'))
+            entity['index'] = index
+            entities.append(entity)
+
+        client.put_multi(entities)
+
+        self.assertEqual(sorted(len(request.mutation.insert_auto_id)
+                                for request in connection._committed),
+                         [1, 2, 2])
+        # Completed keys are assigned back onto the original entities.
+        self.assertEqual(
+            [connection._ids[entity['index']] for entity in entities],
+            [entity.key.id for entity in entities])
+        self.assertFalse(any(entity.key.is_partial for entity in entities))
+
+    def test_put_multi_chunked_by_bytes(self):
+        from gcloud.datastore.entity import Entity
+
+        client = self._makeOne(credentials=object())
+        connection = client.connection = _ChunkedCommitConnection()
+        client.commit_chunk_bytes = 150
+        entities = []
+        for index in range(4):
+            entity = Entity(client.key('Kind', index + 1))
+            entity['blob'] = b'x' * 100
+            entities.append(entity)
+
+        client.put_multi(entities)
+
+        self.assertEqual([len(request.mutation.upsert)
+                          for request in connection._committed],
+                         [2, 2])
+
+    def test_put_multi_chunked_partial_failure(self):
+        from gcloud.datastore.client import PartialCommitError
+        from gcloud.datastore.entity import Entity
+        from gcloud.exceptions import ServiceUnavailable
+
+        client = self._makeOne(credentials=object())
+        error = ServiceUnavailable('down')
+        client.connection = _ChunkedCommitConnection(fail_on=(3,), error=error)
+        client.commit_chunk_size = 2
+        entities = [Entity(client.key('Kind', key_id))
+                    for key_id in (1, 2, 3, 4, 5)]
+
+        with self.assertRaises(PartialCommitError) as context:
+            client.put_multi(entities)
+
+        exc = context.exception
+        self.assertEqual(exc.failures, [(entities[2], error),
+                                        (entities[3], error)])
+        self.assertEqual(exc.total, 5)
+        self.assertEqual(str(exc), '2 of 5 mutations failed')
+
+    def test_put_multi_single_chunk_failure_propagates(self):
+        from gcloud.datastore.entity import Entity
+        from gcloud.exceptions import ServiceUnavailable
+
+        client = self._makeOne(credentials=object())
+        client.connection = _ChunkedCommitConnection(
+            fail_on=(1,), error=ServiceUnavailable('down'))
+        entity = Entity(client.key('Kind', 1))
+
+        self.assertRaises(ServiceUnavailable, client.put_multi, [entity])
+
+    def test_put_multi_existing_batch_not_chunked(self):
+        from gcloud.datastore.entity import Entity
+
+        client = self._makeOne(credentials=object())
+        client.commit_chunk_size = 1
+        entities = [Entity(client.key('Kind', key_id))
+                    for key_id in (1, 2, 3)]
+
+        with _NoCommitBatch(client) as CURR_BATCH:
+            client.put_multi(entities)
+
+        self.assertEqual(len(CURR_BATCH.mutations.upsert), 3)
+        self.assertEqual(len(client.connection._commit_cw), 0)
+
     def test_delete(self):
         _called_with = []
 
@@ -704,6 +969,29 @@ class TestClient(unittest2.TestCase):
         self.assertEqual(list(commit_req.mutation.delete), [key.to_protobuf()])
         self.assertTrue(transaction_id is None)
 
+    def test_delete_multi_chunked(self):
+        from gcloud.datastore.client import PartialCommitError
+        from gcloud.exceptions import ServiceUnavailable
+
+        client = self._makeOne(credentials=object())
+        error = ServiceUnavailable('down')
+        connection = client.connection = _ChunkedCommitConnection(
+            fail_on=(1,), error=error)
+        client.commit_chunk_size = 2
+        client.max_workers = 3
+        keys = [client.key('Kind', key_id) for key_id in (1, 2, 3, 4, 5)]
+
+        with self.assertRaises(PartialCommitError) as context:
+            client.delete_multi(iter(keys))
+
+        self.assertEqual(context.exception.failures,
+                         [(keys[0], error), (keys[1], error)])
+        self.assertEqual(context.exception.total, 5)
+        deleted = sorted(key_pb.path_element[0].id
+                         for request in connection._committed
+                         for key_pb in request.mutation.delete)
+        self.assertEqual(deleted, [3, 4, 5])
+
     def test_delete_multi_w_existing_batch(self):
         from gcloud.datastore.test_batch import _Key
         from gcloud.datastore.test_batch import _mutated_pb
@@ -752,6 +1040,23 @@ class TestClient(unittest2.TestCase):
         # Check the IDs returned.
         self.assertEqual([key._id for key in result], list(range(NUM_IDS)))
 
+    def test_allocate_ids_w_id_reservoir(self):
+        from gcloud.datastore.test_batch import _Key
+
+        INCOMPLETE_KEY = _Key(self.DATASET_ID)
+        INCOMPLETE_KEY._id = None
+
+        creds = object()
+        client = self._makeOne(credentials=creds)
+        client.id_reservoir = _IdReservoir()
+
+        result = client.allocate_ids(INCOMPLETE_KEY, 2)
+
+        self.assertEqual(result, ['completed', 'completed'])
+        self.assertEqual(client.id_reservoir._called_with,
+                         [(INCOMPLETE_KEY, 2)])
+        self.assertEqual(client.connection._alloc_cw, [])
+
     def test_allocate_ids_with_completed_key(self):
         from gcloud.datastore.test_batch import _Key
 
@@ -1026,6 +1331,84 @@ class _MockConnection(object):
         return [_KeyProto(i) for i in list(range(num_pbs))]
 
 
+class _IdReservoir(object):
+
+    def __init__(self):
+        self._called_with = []
+
+    def completed_keys(self, incomplete_key, num_ids):
+        self._called_with.append((incomplete_key, num_ids))
+        return ['completed'] * num_ids
+
+
+class _ChunkedLookupConnection(object):
+    """Finds keys with even IDs;  returns results in reverse order."""
+
+    def __init__(self, dataset_id, defer=()):
+        import threading
+        self._dataset_id = dataset_id
+        self._defer = set(defer)
+        self._lock = threading.Lock()
+        self._lookup_cw = []
+
+    def lookup(self, dataset_id, key_pbs, eventual=False, transaction_id=None):
+        from gcloud.datastore._generated import entity_pb2
+        with self._lock:
+            self._lookup_cw.append(
+                (dataset_id, key_pbs, eventual, transaction_id))
+        results, missing, deferred = [], [], []
+        for key_pb in key_pbs:
+            key_id = key_pb.path_element[0].id
+            if key_id in self._defer:
+                with self._lock:
+                    self._defer.discard(key_id)
+                deferred.append(key_pb)
+                continue
+            entity_pb = entity_pb2.Entity()
+            entity_pb.key.CopyFrom(key_pb)
+            entity_pb.key.partition_id.dataset_id = 's~' + self._dataset_id
+            if key_id % 2 == 0:
+                results.append(entity_pb)
+            else:
+                missing.append(entity_pb)
+        return results[::-1], missing[::-1], deferred
+
+
+class _ChunkedCommitConnection(object):
+    """Completes keys with sequential IDs;  may fail chosen commits.
+
+    ``fail_on`` holds IDs:  a commit containing one of them fails.
+    """
+
+    def __init__(self, fail_on=(), error=None):
+        import threading
+        self._fail_on = set(fail_on)
+        self._error = error
+        self._lock = threading.Lock()
+        self._committed = []
+        self._ids = {}
+
+    def commit(self, dataset_id, commit_request, transaction_id):
+        from gcloud.datastore.helpers import _property_tuples
+        mutation = commit_request.mutation
+        key_ids = [key_pb.path_element[-1].id for key_pb in
+                   [entity_pb.key for entity_pb in mutation.upsert] +
+                   list(mutation.delete)]
+        if self._fail_on.intersection(key_ids):
+            raise self._error
+        completed = []
+        with self._lock:
+            self._committed.append(commit_request)
+            for entity_pb in mutation.insert_auto_id:
+                key_pb = type(entity_pb.key)()
+                key_pb.CopyFrom(entity_pb.key)
+                key_pb.path_element[-1].id = 1000 + len(self._ids)
+                index = dict(_property_tuples(entity_pb))['index']
+                self._ids[index.integer_value] = key_pb.path_element[-1].id
+                completed.append(key_pb)
+        return 0, completed
+
+
 class _NoCommitBatch(object):
 
     def __init__(self, client):
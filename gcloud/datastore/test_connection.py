@@ -112,13 +112,13 @@ class TestConnection(unittest2.TestCase):
         self.assertTrue(conn.http is http)
 
     def test_http_wo_creds(self):
-        import httplib2
+        from gcloud.transport import PooledHttp
 
         conn = self._makeOne()
-        self.assertTrue(isinstance(conn.http, httplib2.Http))
+        self.assertTrue(isinstance(conn.http, PooledHttp))
 
     def test_http_w_creds(self):
-        import httplib2
+        from gcloud.transport import PooledHttp
 
         authorized = object()
 
@@ -134,7 +134,7 @@ class TestConnection(unittest2.TestCase):
         creds = Creds()
         conn = self._makeOne(creds)
         self.assertTrue(conn.http is authorized)
-        self.assertTrue(isinstance(creds._called_with, httplib2.Http))
+        self.assertTrue(isinstance(creds._called_with, PooledHttp))
 
     def test__request_w_200(self):
         DATASET_ID = 'DATASET'
@@ -167,6 +167,41 @@ class TestConnection(unittest2.TestCase):
         expected_message = '400 Entity value is indexed.'
         self.assertEqual(str(e.exception), expected_message)
 
+    def test__request_w_hook(self):
+        from gcloud import metrics
+        conn = self._makeOne()
+        conn._http = Http({'status': '200'}, b'CONTENT')
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            conn._request('DATASET', 'lookup', b'DATA')
+        finally:
+            metrics.unregister_hook(hook)
+        info, = hook._finished
+        self.assertEqual(info.method, 'POST')
+        self.assertEqual(info.url_template,
+                         '/datastore/%s/datasets/{}/lookup' % (
+                             conn.API_VERSION,))
+        self.assertEqual(info.status, 200)
+        self.assertEqual(info.payload_bytes, 4)
+        self.assertEqual(info.response_bytes, 7)
+
+    def test__request_w_hook_and_error(self):
+        from gcloud import metrics
+        conn = self._makeOne()
+        error = ValueError('reset')
+        conn._http = _FailingHttp(error)
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            self.assertRaises(ValueError, conn._request,
+                              'DATASET', 'lookup', b'DATA')
+        finally:
+            metrics.unregister_hook(hook)
+        info, = hook._finished
+        self.assertEqual(info.status, None)
+        self.assertTrue(info.error is error)
+
     def test__rpc(self):
 
         class ReqPB(object):
@@ -899,6 +934,27 @@ class Http(object):
         return self._response, self._content
 
 
+class _FailingHttp(object):
+
+    def __init__(self, error):
+        self._error = error
+
+    def request(self, **kw):
+        raise self._error
+
+
+class _Hook(object):
+
+    def __init__(self):
+        self._finished = []
+
+    def before_request(self, info):
+        pass
+
+    def after_request(self, info):
+        self._finished.append(info)
+
+
 def _compare_key_pb_after_request(test, key_before, key_after):
     test.assertFalse(key_after.partition_id.HasField('dataset_id'))
     test.assertEqual(key_before.partition_id.namespace,
@@ -195,6 +195,150 @@ class TestEntity(unittest2.TestCase):
         self.assertEqual(repr(entity), "<Entity/bar/baz {'foo': 'Foo'}>")
 
 
+class TestLazyEntity(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.datastore.entity import LazyEntity
+        return LazyEntity
+
+    def _makeOne(self, key=None, exclude_from_indexes=(), value_pbs=(),
+                 lazy=True):
+        # The fake "protobufs" are ``(value, meaning)`` tuples, decoded as
+        # themselves;  decoded names are recorded.  Decoding is deferred
+        # (unless ``lazy`` is false), even where the interpreter's copies
+        # of dict subclasses would not allow it.
+        from gcloud._testing import _Monkey
+        from gcloud.datastore import entity as MUT
+        self._decoded = []
+
+        def _decode(value_pb):
+            self._decoded.append(value_pb[0])
+            return value_pb
+
+        klass = self._getTargetClass()
+        with _Monkey(MUT, _LAZY_DECODING=lazy):
+            return klass(key=key, exclude_from_indexes=exclude_from_indexes,
+                         value_pbs=value_pbs, decode=_decode)
+
+    def _makeWide(self, key=None, lazy=True):
+        return self._makeOne(key=key, lazy=lazy, value_pbs=[
+            ('foo', ('Foo', None)),
+            ('bar', ('Bar', 9)),
+            ('baz', ('Baz', None)),
+        ])
+
+    def test_ctor_defaults(self):
+        entity = self._makeOne()
+        self.assertEqual(entity.key, None)
+        self.assertEqual(dict(entity), {})
+
+    def test_ctor_wo_lazy_decoding(self):
+        entity = self._makeWide(lazy=False)
+        self.assertEqual(self._decoded, ['Foo', 'Bar', 'Baz'])
+        self.assertEqual(entity._value_pbs, {})
+        self.assertEqual(dict.__getitem__(entity, 'baz'), 'Baz')
+
+    def test_names_without_decoding(self):
+        entity = self._makeWide()
+        self.assertEqual(len(entity), 3)
+        self.assertTrue('bar' in entity)
+        self.assertFalse('qux' in entity)
+        self.assertEqual(list(entity), ['foo', 'bar', 'baz'])
+        self.assertEqual(list(entity.keys()), ['foo', 'bar', 'baz'])
+        self.assertEqual(self._decoded, [])
+
+    def test___getitem__decodes_once(self):
+        entity = self._makeWide()
+        self.assertEqual(entity['bar'], 'Bar')
+        self.assertEqual(entity['bar'], 'Bar')
+        self.assertEqual(self._decoded, ['Bar'])
+        self.assertEqual(entity._meanings, {'bar': (9, 'Bar')})
+        self.assertEqual(entity._value_pbs.keys(), set(['foo', 'baz']))
+        self.assertRaises(KeyError, entity.__getitem__, 'qux')
+
+    def test__decode_already_decoded(self):
+        # Another thread decoded the property since it was found undecoded.
+        entity = self._makeWide()
+        self.assertEqual(entity['bar'], 'Bar')
+        self.assertEqual(entity._decode('bar'), 'Bar')
+        self.assertEqual(self._decoded, ['Bar'])
+
+    def test_get(self):
+        entity = self._makeWide()
+        self.assertEqual(entity.get('foo'), 'Foo')
+        self.assertEqual(entity.get('qux'), None)
+        self.assertEqual(entity.get('qux', 'Qux'), 'Qux')
+        self.assertEqual(self._decoded, ['Foo'])
+
+    def test_setdefault(self):
+        entity = self._makeWide()
+        self.assertEqual(entity.setdefault('foo', 'Other'), 'Foo')
+        self.assertEqual(entity.setdefault('qux', 'Qux'), 'Qux')
+        self.assertEqual(entity['qux'], 'Qux')
+        self.assertEqual(self._decoded, ['Foo'])
+
+    def test_pop(self):
+        entity = self._makeWide()
+        self.assertEqual(entity.pop('foo'), 'Foo')
+        self.assertEqual(entity.pop('foo', None), None)
+        self.assertRaises(KeyError, entity.pop, 'foo')
+        self.assertEqual(list(entity), ['bar', 'baz'])
+        self.assertEqual(self._decoded, ['Foo'])
+
+    def test_popitem(self):
+        entity = self._makeWide()
+        name, value = entity.popitem()
+        self.assertEqual(entity.get(name), None)
+        self.assertEqual(value, name.capitalize())
+        self.assertEqual(len(entity), 2)
+
+    def test___setitem_____delitem__(self):
+        entity = self._makeWide()
+        entity['foo'] = 'Other'
+        del entity['baz']
+        self.assertEqual(entity._value_pbs.keys(), set(['bar']))
+        self.assertEqual(entity.copy(), {'foo': 'Other', 'bar': 'Bar'})
+        self.assertEqual(self._decoded, ['Bar'])
+
+    def test_items_values_copy(self):
+        expected = {'foo': 'Foo', 'bar': 'Bar', 'baz': 'Baz'}
+        self.assertEqual(dict(self._makeWide().items()), expected)
+        self.assertEqual(sorted(self._makeWide().values()),
+                         sorted(expected.values()))
+        self.assertEqual(self._makeWide().copy(), expected)
+
+    def test_copied_by_dict(self):
+        from gcloud.datastore.entity import _LAZY_DECODING
+        expected = {'foo': 'Foo', 'bar': 'Bar', 'baz': 'Baz'}
+        self.assertEqual(dict(self._makeWide(lazy=_LAZY_DECODING)), expected)
+        updated = {'qux': 'Qux'}
+        updated.update(self._makeWide(lazy=_LAZY_DECODING))
+        self.assertEqual(updated, dict(expected, qux='Qux'))
+
+        def _kwargs(**kwargs):
+            return kwargs
+        self.assertEqual(_kwargs(**self._makeWide(lazy=_LAZY_DECODING)),
+                         expected)
+
+    def test___eq_____ne__(self):
+        from gcloud.datastore.entity import Entity
+        key = _Key()
+        entity = Entity(key=key)
+        entity.update({'foo': 'Foo', 'bar': 'Bar', 'baz': 'Baz'})
+        entity._meanings['bar'] = (9, 'Bar')
+        self.assertTrue(entity == self._makeWide(key))
+        self.assertFalse(entity != self._makeWide(key))
+        self.assertTrue(self._makeWide(key) == self._makeWide(key))
+        self.assertFalse(self._makeWide(key) != self._makeWide(key))
+        entity['foo'] = 'Other'
+        self.assertFalse(entity == self._makeWide(key))
+        self.assertTrue(self._makeWide(key) != entity)
+
+    def test___repr__(self):
+        entity = self._makeOne(value_pbs=[('foo', ('Foo', None))])
+        self.assertEqual(repr(entity), "<Entity {'foo': 'Foo'}>")
+
+
 class _Key(object):
     _MARKER = object()
     _key = 'KEY'
@@ -0,0 +1,130 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+def _make_key_pb(key_id, dataset_id='DATASET'):
+    from gcloud.datastore._generated import entity_pb2
+    key_pb = entity_pb2.Key()
+    key_pb.partition_id.dataset_id = dataset_id
+    key_pb.path_element.add(kind='KIND', id=key_id)
+    return key_pb
+
+
+def _make_entity_pb(key_id):
+    from gcloud.datastore._generated import entity_pb2
+    entity_pb = entity_pb2.Entity()
+    # The backend may return another prefix of the dataset ID.
+    entity_pb.key.CopyFrom(_make_key_pb(key_id, dataset_id='s~DATASET'))
+    return entity_pb
+
+
+class TestEntityCache(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.datastore.entity_cache import EntityCache
+        return EntityCache
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor_defaults(self):
+        from gcloud.datastore.entity_cache import DEFAULT_MAX_SIZE
+        cache = self._makeOne()
+        self.assertEqual(cache.max_size, DEFAULT_MAX_SIZE)
+        self.assertEqual(cache.ttl, None)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
+
+    def test_lookup_miss(self):
+        cache = self._makeOne()
+        key_pb = _make_key_pb(1)
+        found, missed = cache.lookup([key_pb])
+        self.assertEqual(found, [])
+        self.assertEqual(missed, [key_pb])
+        self.assertEqual(cache.misses, 1)
+
+    def test_store_and_lookup(self):
+        cache = self._makeOne()
+        entity_pb = _make_entity_pb(1)
+        cache.store([entity_pb], cache.generation)
+        key_pbs = [_make_key_pb(1), _make_key_pb(2)]
+        found, missed = cache.lookup(key_pbs)
+        self.assertEqual(len(found), 1)
+        self.assertTrue(found[0] is entity_pb)
+        self.assertEqual(missed, key_pbs[1:])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_store_after_invalidation(self):
+        cache = self._makeOne()
+        generation = cache.generation
+        cache.invalidate([_make_key_pb(2)])
+        cache.store([_make_entity_pb(1)], generation)
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate(self):
+        cache = self._makeOne()
+        cache.store([_make_entity_pb(1), _make_entity_pb(2)],
+                    cache.generation)
+        cache.invalidate([_make_key_pb(1), _make_key_pb(3)])
+        found, missed = cache.lookup([_make_key_pb(1), _make_key_pb(2)])
+        self.assertEqual([entity_pb.key.path_element[0].id
+                          for entity_pb in found], [2])
+        self.assertEqual([key_pb.path_element[0].id for key_pb in missed],
+                         [1])
+
+    def test_lru_eviction(self):
+        cache = self._makeOne(max_size=2)
+        cache.store([_make_entity_pb(1), _make_entity_pb(2)],
+                    cache.generation)
+        cache.lookup([_make_key_pb(1)])
+        cache.store([_make_entity_pb(3)], cache.generation)
+        self.assertEqual(len(cache), 2)
+        found, missed = cache.lookup([_make_key_pb(key_id)
+                                      for key_id in (1, 2, 3)])
+        self.assertEqual([entity_pb.key.path_element[0].id
+                          for entity_pb in found], [1, 3])
+        self.assertEqual([key_pb.path_element[0].id for key_pb in missed],
+                         [2])
+
+    def test_ttl_expiry(self):
+        from gcloud._testing import _Monkey
+        from gcloud.datastore import entity_cache as MUT
+        cache = self._makeOne(ttl=10)
+        with _Monkey(MUT, _NOW=lambda: 100.0):
+            cache.store([_make_entity_pb(1)], cache.generation)
+        with _Monkey(MUT, _NOW=lambda: 105.0):
+            found, _ = cache.lookup([_make_key_pb(1)])
+            self.assertEqual(len(found), 1)
+        with _Monkey(MUT, _NOW=lambda: 111.0):
+            found, missed = cache.lookup([_make_key_pb(1)])
+            self.assertEqual(found, [])
+            self.assertEqual(len(missed), 1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_clear(self):
+        cache = self._makeOne()
+        generation = cache.generation
+        cache.store([_make_entity_pb(1)], generation)
+        cache.lookup([_make_key_pb(1), _make_key_pb(2)])
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
+        self.assertNotEqual(cache.generation, generation)
@@ -58,9 +58,9 @@ class Test__property_tuples(unittest2.TestCase):
 
 class Test_entity_from_protobuf(unittest2.TestCase):
 
-    def _callFUT(self, val):
+    def _callFUT(self, val, lazy=False):
         from gcloud.datastore.helpers import entity_from_protobuf
-        return entity_from_protobuf(val)
+        return entity_from_protobuf(val, lazy=lazy)
 
     def test_it(self):
         from gcloud.datastore._generated import entity_pb2
@@ -190,6 +190,46 @@ class Test_entity_from_protobuf(unittest2.TestCase):
         self.assertEqual(len(inside_entity), 1)
         self.assertEqual(inside_entity[INSIDE_NAME], INSIDE_VALUE)
 
+    def test_lazy(self):
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore.entity import LazyEntity
+        from gcloud.datastore.helpers import _new_value_pb
+
+        entity_pb = entity_pb2.Entity()
+        entity_pb.key.partition_id.dataset_id = 'DATASET'
+        entity_pb.key.path_element.add(kind='KIND', id=1234)
+        _new_value_pb(entity_pb, 'foo').string_value = u'Foo'
+        unindexed_val_pb = _new_value_pb(entity_pb, 'bar')
+        unindexed_val_pb.integer_value = 10
+        unindexed_val_pb.indexed = False
+        meaning_val_pb = _new_value_pb(entity_pb, 'baz')
+        meaning_val_pb.meaning = 9
+        meaning_val_pb.string_value = u'Baz'
+
+        entity = self._callFUT(entity_pb, lazy=True)
+        self.assertTrue(isinstance(entity, LazyEntity))
+        self.assertEqual(entity.key.flat_path, ('KIND', 1234))
+        self.assertEqual(entity.exclude_from_indexes, frozenset(['bar']))
+        self.assertEqual(list(entity), ['foo', 'bar', 'baz'])
+        self.assertEqual(entity._meanings, {})
+        self.assertEqual(entity['baz'], u'Baz')
+        self.assertEqual(entity._meanings, {'baz': (9, u'Baz')})
+        self.assertEqual(entity, self._callFUT(entity_pb))
+
+    def test_lazy_mismatched_value_meanings(self):
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore.helpers import _new_value_pb
+
+        entity_pb = entity_pb2.Entity()
+        list_pb = _new_value_pb(entity_pb, 'baz').list_value
+        list_pb.add(integer_value=10, meaning=9)
+        list_pb.add(integer_value=11)
+
+        entity = self._callFUT(entity_pb, lazy=True)
+        self.assertEqual(len(entity), 1)
+        with self.assertRaises(ValueError):
+            entity['baz']
+
 
 class Test_entity_to_protobuf(unittest2.TestCase):
 
@@ -0,0 +1,245 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+class TestIdReservoir(unittest2.TestCase):
+
+    DATASET_ID = 'DATASET'
+
+    def _getTargetClass(self):
+        from gcloud.datastore.id_reservoir import IdReservoir
+        return IdReservoir
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _makeKey(self, *path, **kw):
+        from gcloud.datastore.key import Key
+        kw.setdefault('dataset_id', self.DATASET_ID)
+        return Key(*path, **kw)
+
+    def _joinRefills(self, threads):
+        for thread in threads:
+            thread.join()
+
+    def test_ctor_defaults(self):
+        from gcloud.datastore.id_reservoir import DEFAULT_POOL_SIZE
+        from gcloud.datastore.id_reservoir import DEFAULT_REFILL_THRESHOLD
+        reservoir = self._makeOne(_Client())
+        self.assertEqual(reservoir.pool_size, DEFAULT_POOL_SIZE)
+        self.assertEqual(reservoir.refill_threshold, DEFAULT_REFILL_THRESHOLD)
+        self.assertEqual(len(reservoir), 0)
+        self.assertEqual(reservoir.hits, 0)
+        self.assertEqual(reservoir.misses, 0)
+        self.assertEqual(reservoir.last_refill_error, None)
+
+    def test_ctor_w_threshold_not_below_pool_size(self):
+        self.assertRaises(ValueError, self._makeOne, _Client(),
+                          pool_size=10, refill_threshold=10)
+        self.assertRaises(ValueError, self._makeOne, _Client(),
+                          pool_size=10, refill_threshold=11)
+
+    def test_completed_key_w_complete_key(self):
+        reservoir = self._makeOne(_Client())
+        key = self._makeKey('KIND', 1234)
+        self.assertRaises(ValueError, reservoir.completed_key, key)
+
+    def test_completed_key_first_use_fills_pool(self):
+        client = _Client()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=2)
+        incomplete_key = self._makeKey('KIND')
+
+        key = reservoir.completed_key(incomplete_key)
+
+        self.assertEqual(key, self._makeKey('KIND', 1))
+        self.assertEqual(client._called_with, [(incomplete_key, 11)])
+        self.assertEqual(len(reservoir), 10)
+        self.assertEqual(reservoir.hits, 0)
+        self.assertEqual(reservoir.misses, 1)
+
+    def test_completed_keys_served_from_pool(self):
+        client = _Client()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=2)
+        incomplete_key = self._makeKey('Parent', 'p', 'KIND')
+        reservoir.completed_key(incomplete_key)
+
+        keys = reservoir.completed_keys(incomplete_key, 3)
+
+        self.assertEqual([key.id for key in keys], [2, 3, 4])
+        self.assertEqual(keys[0].parent, self._makeKey('Parent', 'p'))
+        self.assertEqual(len(client._called_with), 1)
+        self.assertEqual(len(reservoir), 7)
+        self.assertEqual(reservoir.hits, 3)
+        self.assertEqual(reservoir.misses, 1)
+
+    def test_completed_keys_refills_in_background(self):
+        from gcloud._testing import _Monkey
+        from gcloud.datastore import id_reservoir as MUT
+        client = _Client()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=2)
+        incomplete_key = self._makeKey('KIND')
+        threads = []
+        with _Monkey(MUT, _THREAD=_threadFactory(threads)):
+            reservoir.completed_key(incomplete_key)
+
+            keys = reservoir.completed_keys(incomplete_key, 8)
+            self._joinRefills(threads)
+
+            self.assertEqual(len(threads), 1)
+            self.assertTrue(threads[0].daemon)
+            self.assertEqual([key.id for key in keys], list(range(2, 10)))
+            self.assertEqual(client._called_with,
+                             [(incomplete_key, 11), (incomplete_key, 10)])
+            self.assertEqual(len(reservoir), 12)
+            keys = reservoir.completed_keys(incomplete_key, 12)
+            self._joinRefills(threads)
+            self.assertEqual([key.id for key in keys], list(range(10, 22)))
+            self.assertEqual(len(client._called_with), 3)
+
+    def test_completed_keys_waits_for_refill_in_flight(self):
+        import threading
+        client = _Client()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=2)
+        incomplete_key = self._makeKey('KIND')
+        reservoir.completed_keys(incomplete_key, 1)
+        client._release = threading.Event()
+        reservoir.completed_keys(incomplete_key, 8)  # Starts a refill.
+
+        releaser = threading.Timer(0.01, client._release.set)
+        releaser.start()
+        keys = reservoir.completed_keys(incomplete_key, 5)
+        releaser.join()
+
+        self.assertEqual([key.id for key in keys], [10, 11, 12, 13, 14])
+        self.assertEqual(len(client._called_with), 2)
+        self.assertEqual(reservoir.misses, 1)
+
+    def test_completed_keys_waits_for_fill_in_flight(self):
+        import threading
+        client = _Client()
+        client._release = threading.Event()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=0)
+        incomplete_key = self._makeKey('KIND')
+        results = []
+
+        def _complete():
+            results.append(reservoir.completed_keys(incomplete_key, 3))
+
+        first = threading.Thread(target=_complete)
+        first.start()
+        client._entered.wait()  # The first caller is allocating IDs.
+        others = [threading.Thread(target=_complete) for _ in range(3)]
+        for thread in others:
+            thread.start()
+        client._release.set()
+        for thread in [first] + others:
+            thread.join()
+
+        self.assertEqual(client._called_with, [(incomplete_key, 13)])
+        self.assertEqual(sorted(key.id for keys in results for key in keys),
+                         list(range(1, 13)))
+        self.assertEqual(reservoir.misses, 3)
+        self.assertEqual(reservoir.hits, 9)
+        self.assertEqual(len(reservoir), 1)
+        pool, = reservoir._pools.values()
+        self.assertFalse(pool.filling)
+
+    def test_completed_keys_more_than_pool(self):
+        client = _Client()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=0)
+        incomplete_key = self._makeKey('KIND')
+        reservoir.completed_key(incomplete_key)
+
+        keys = reservoir.completed_keys(incomplete_key, 15)
+
+        self.assertEqual([key.id for key in keys], list(range(2, 17)))
+        self.assertEqual(client._called_with,
+                         [(incomplete_key, 11), (incomplete_key, 15)])
+        self.assertEqual(len(reservoir), 10)
+        self.assertEqual(reservoir.hits, 10)
+        self.assertEqual(reservoir.misses, 6)
+
+    def test_completed_keys_refill_failure(self):
+        from gcloud._testing import _Monkey
+        from gcloud.datastore import id_reservoir as MUT
+        client = _Client()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=2)
+        incomplete_key = self._makeKey('KIND')
+        reservoir.completed_key(incomplete_key)
+        error = client._error = ValueError('refill')
+        threads = []
+
+        with _Monkey(MUT, _THREAD=_threadFactory(threads)):
+            keys = reservoir.completed_keys(incomplete_key, 8)
+        self._joinRefills(threads)
+
+        self.assertEqual(len(keys), 8)
+        self.assertEqual(len(reservoir), 2)
+        self.assertTrue(reservoir.last_refill_error is error)
+        self.assertRaises(ValueError, reservoir.completed_keys,
+                          incomplete_key, 3)
+        self.assertEqual(len(reservoir), 2)  # Put back.
+        pool, = reservoir._pools.values()
+        self.assertFalse(pool.filling)
+        client._error = None
+        keys = reservoir.completed_keys(incomplete_key, 3)
+        self.assertEqual([key.id for key in keys], [10, 11, 12])
+
+    def test_pools_by_partial_key(self):
+        client = _Client()
+        reservoir = self._makeOne(client, pool_size=10, refill_threshold=2)
+        reservoir.completed_key(self._makeKey('KIND'))
+        reservoir.completed_key(self._makeKey('KIND', dataset_id='s~DATASET'))
+        reservoir.completed_key(self._makeKey('OTHER'))
+        reservoir.completed_key(self._makeKey('KIND', namespace='NS'))
+        reservoir.completed_key(self._makeKey('Parent', 1, 'KIND'))
+
+        self.assertEqual(len(client._called_with), 4)
+        self.assertEqual(len(reservoir._pools), 4)
+        self.assertEqual(len(reservoir), 39)
+
+
+def _threadFactory(threads):
+    import threading
+
+    def _factory(*args, **kw):
+        thread = threading.Thread(*args, **kw)
+        threads.append(thread)
+        return thread
+
+    return _factory
+
+
+class _Client(object):
+
+    _error = None
+    _release = None
+
+    def __init__(self):
+        import threading
+        self._called_with = []
+        self._next_id = 1
+        self._entered = threading.Event()
+
+    def _allocate_ids(self, incomplete_key, num_ids):
+        self._called_with.append((incomplete_key, num_ids))
+        self._entered.set()
+        if self._release is not None:
+            self._release.wait()
+        if self._error is not None:
+            raise self._error
+        first, self._next_id = self._next_id, self._next_id + num_ids
+        return list(range(first, self._next_id))
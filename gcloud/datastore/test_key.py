@@ -308,6 +308,68 @@ class TestKey(unittest2.TestCase):
                             hash(_KIND) + hash(_NAME) +
                             hash(_DATASET) + hash(None))
 
+    def test___hash___cached(self):
+        key = self._makeOne('KIND', 1234, dataset_id=self._DEFAULT_DATASET)
+        key_hash = hash(key)
+        key._flat_path = ('OTHER', 5678)
+        self.assertEqual(hash(key), key_hash)
+
+    def test___hash___same_kind_and_id_different_dataset_pfx(self):
+        _DATASET = 'DATASET'
+        _DATASET_W_PFX = 'e~DATASET'
+        key1 = self._makeOne('KIND', 1234, dataset_id=_DATASET)
+        key2 = self._makeOne('KIND', 1234, dataset_id=_DATASET_W_PFX)
+        self.assertEqual(key1, key2)
+        self.assertEqual(hash(key1), hash(key2))
+        self.assertEqual(len(set([key1, key2])), 1)
+
+    def test_no_instance_dict(self):
+        key = self._makeOne('KIND', 1234, dataset_id=self._DEFAULT_DATASET)
+        self.assertFalse(hasattr(key, '__dict__'))
+        with self.assertRaises(AttributeError):
+            key.extra = 'EXTRA'
+
+    def test_pickle(self):
+        from six.moves import cPickle as pickle
+        parent = self._makeOne('PARENT', 'NAME', namespace='NAMESPACE',
+                               dataset_id=self._DEFAULT_DATASET)
+        key = self._makeOne('KIND', 1234, parent=parent)
+        hash(key)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(key, protocol))
+            self.assertEqual(unpickled, key)
+            self.assertEqual(hash(unpickled), hash(key))
+            self.assertEqual(unpickled.namespace, 'NAMESPACE')
+            self.assertEqual(unpickled.parent, parent)
+            self.assertEqual(unpickled.to_protobuf(), key.to_protobuf())
+
+    def test_child_w_id(self):
+        parent = self._makeOne('PARENT', 'NAME', namespace='NAMESPACE',
+                               dataset_id=self._DEFAULT_DATASET)
+        key = parent.child('KIND', 1234)
+        self.assertEqual(key, self._makeOne('KIND', 1234, parent=parent))
+        self.assertEqual(key.flat_path, ('PARENT', 'NAME', 'KIND', 1234))
+        self.assertEqual(key.namespace, 'NAMESPACE')
+        self.assertEqual(key.dataset_id, self._DEFAULT_DATASET)
+        self.assertTrue(key.parent is parent)
+
+    def test_child_partial(self):
+        parent = self._makeOne('PARENT', 'NAME',
+                               dataset_id=self._DEFAULT_DATASET)
+        key = parent.child('KIND')
+        self.assertTrue(key.is_partial)
+        self.assertEqual(key.flat_path, ('PARENT', 'NAME', 'KIND'))
+        self.assertTrue(key.parent is parent)
+
+    def test_child_on_partial(self):
+        key = self._makeOne('KIND', dataset_id=self._DEFAULT_DATASET)
+        self.assertRaises(ValueError, key.child, 'KIND2', 1234)
+
+    def test_child_invalid(self):
+        key = self._makeOne('KIND', 1234, dataset_id=self._DEFAULT_DATASET)
+        self.assertRaises(ValueError, key.child, object())
+        self.assertRaises(ValueError, key.child, 'KIND2', object())
+
     def test_completed_key_on_partial_w_id(self):
         key = self._makeOne('KIND', dataset_id=self._DEFAULT_DATASET)
         _ID = 1234
@@ -324,6 +386,14 @@ class TestKey(unittest2.TestCase):
         self.assertEqual(new_key.id, None)
         self.assertEqual(new_key.name, _NAME)
 
+    def test_completed_key_on_partial_w_parent(self):
+        parent = self._makeOne('PARENT', 1234,
+                               dataset_id=self._DEFAULT_DATASET)
+        key = self._makeOne('KIND', parent=parent)
+        new_key = key.completed_key(5678)
+        self.assertEqual(new_key.flat_path, ('PARENT', 1234, 'KIND', 5678))
+        self.assertTrue(new_key.parent is parent)
+
     def test_completed_key_on_partial_w_invalid(self):
         key = self._makeOne('KIND', dataset_id=self._DEFAULT_DATASET)
         self.assertRaises(ValueError, key.completed_key, object())
@@ -380,13 +450,16 @@ class TestKey(unittest2.TestCase):
         self.assertEqual(elems[1].kind, _CHILD)
         self.assertEqual(elems[1].id, _ID)
 
-    def test_to_protobuf_w_no_kind(self):
-        key = self._makeOne('KIND', dataset_id=self._DEFAULT_DATASET)
-        # Force the 'kind' to be unset. Maybe `to_protobuf` should fail
-        # on this? The backend certainly will.
-        key._path[-1].pop('kind')
+    def test_to_protobuf_returns_new_protobufs(self):
+        key = self._makeOne('KIND', 1234, dataset_id=self._DEFAULT_DATASET)
         pb = key.to_protobuf()
-        self.assertFalse(pb.path_element[0].HasField('kind'))
+        pb.path_element[0].id = 5678
+        pb.partition_id.ClearField('dataset_id')
+        new_pb = key.to_protobuf()
+        self.assertFalse(new_pb is pb)
+        self.assertEqual(new_pb.path_element[0].id, 1234)
+        self.assertEqual(new_pb.partition_id.dataset_id,
+                         self._DEFAULT_DATASET)
 
     def test_is_partial_no_name_or_id(self):
         key = self._makeOne('KIND', dataset_id=self._DEFAULT_DATASET)
@@ -437,6 +510,15 @@ class TestKey(unittest2.TestCase):
                             dataset_id=self._DEFAULT_DATASET)
         self.assertEqual(key.parent.path, _PARENT_PATH)
 
+    def test_parent_of_partial_nested(self):
+        key = self._makeOne('KIND1', 1234, 'KIND2', 'NAME', 'KIND3',
+                            namespace='NAMESPACE',
+                            dataset_id=self._DEFAULT_DATASET)
+        parent = key.parent
+        self.assertEqual(parent.flat_path, ('KIND1', 1234, 'KIND2', 'NAME'))
+        self.assertEqual(parent.namespace, 'NAMESPACE')
+        self.assertEqual(parent.parent.path, [{'kind': 'KIND1', 'id': 1234}])
+
     def test_parent_multiple_calls(self):
         _PARENT_KIND = 'KIND1'
         _PARENT_ID = 1234
@@ -297,6 +297,20 @@ class TestQuery(unittest2.TestCase):
         self.assertTrue(iterator._client is client)
         self.assertEqual(iterator._limit, None)
         self.assertEqual(iterator._offset, 0)
+        self.assertFalse(iterator._lazy)
+        self.assertEqual(iterator._prefetch_pages, 0)
+
+    def test_fetch_lazy(self):
+        client = self._makeClient(_Connection())
+        query = self._makeOne(client)
+        iterator = query.fetch(lazy=True)
+        self.assertTrue(iterator._lazy)
+
+    def test_fetch_w_prefetch(self):
+        client = self._makeClient(_Connection())
+        query = self._makeOne(client)
+        iterator = query.fetch(prefetch=2)
+        self.assertEqual(iterator._prefetch_pages, 2)
 
     def test_fetch_w_explicit_client(self):
         connection = _Connection()
@@ -310,6 +324,177 @@ class TestQuery(unittest2.TestCase):
         self.assertEqual(iterator._offset, 8)
 
 
+class TestQuery_split(unittest2.TestCase):
+
+    _DATASET = 'DATASET'
+    _KIND = 'Kind'
+
+    def _makeQuery(self, connection, **kw):
+        from gcloud.datastore.query import Query
+        client = _Client(self._DATASET, connection)
+        return Query(client, kind=self._KIND, **kw)
+
+    def _makeKey(self, *flat_path):
+        from gcloud.datastore.key import Key
+        return Key(*flat_path, dataset_id=self._DATASET)
+
+    def _keyBounds(self, query):
+        bounds = {}
+        for name, operator, value in query.filters:
+            if name == '__key__':
+                bounds[operator] = value.id_or_name
+        return bounds.get('>='), bounds.get('<')
+
+    def test_invalid_num_splits(self):
+        query = self._makeQuery(_KindConnection([]))
+        self.assertRaises(ValueError, query.split, 0)
+
+    def test_wo_kind(self):
+        query = self._makeQuery(_KindConnection([]))
+        query._kind = None
+        self.assertRaises(ValueError, query.split, 2)
+
+    def test_w_inequality_filter(self):
+        query = self._makeQuery(_KindConnection([]),
+                                filters=[('age', '>', 5)])
+        self.assertRaises(ValueError, query.split, 2)
+
+    def test_w_order(self):
+        query = self._makeQuery(_KindConnection([]), order=['age'])
+        self.assertRaises(ValueError, query.split, 2)
+
+    def test_w_split_points(self):
+        connection = _KindConnection([])
+        query = self._makeQuery(connection, filters=[('color', '=', 'red')],
+                                projection=['color'], group_by=['color'])
+        splits = query.split(
+            99, split_points=[self._makeKey(self._KIND, 20),
+                              self._makeKey(self._KIND, 10),
+                              self._makeKey(self._KIND, 20)])
+        self.assertEqual([self._keyBounds(split) for split in splits],
+                         [(None, 10), (10, 20), (20, None)])
+        for split in splits:
+            self.assertEqual(split.kind, self._KIND)
+            self.assertEqual(split.filters[0], ('color', '=', 'red'))
+            self.assertEqual(split.projection, ['color'])
+            self.assertEqual(split.group_by, ['color'])
+        self.assertEqual(connection._queries, [])
+        # The original query is left unchanged.
+        self.assertEqual(query.filters, [('color', '=', 'red')])
+
+    def test_split_points_in_datastore_order(self):
+        from gcloud.datastore.query import _unique_sorted_keys
+        keys = [self._makeKey('B', 1), self._makeKey('A', 'name'),
+                self._makeKey('A', 2), self._makeKey('A', 2, 'C', 1),
+                self._makeKey('A', 10)]
+        self.assertEqual([key.flat_path for key in _unique_sorted_keys(keys)],
+                         [('A', 2), ('A', 2, 'C', 1), ('A', 10),
+                          ('A', 'name'), ('B', 1)])
+
+    def test_w_scatter(self):
+        from gcloud._testing import _Monkey
+        from gcloud.datastore import query as MUT
+        from gcloud.datastore._generated import query_pb2
+        connection = _KindConnection(range(1, 101))
+        query = self._makeQuery(connection)
+        with _Monkey(MUT, _SCATTER_OVERSAMPLING=10):
+            splits = query.split(4)
+        bounds = [self._keyBounds(split) for split in splits]
+        self.assertEqual(len(bounds), 4)
+        self.assertEqual(bounds[0][0], None)
+        self.assertEqual(bounds[-1][1], None)
+        for (_, end), (start, _) in zip(bounds[:-1], bounds[1:]):
+            self.assertEqual(end, start)
+        # The sampled split points spread the 100 keys roughly evenly.
+        sizes = [(end or 101) - (start or 1) for start, end in bounds]
+        self.assertTrue(all(15 <= size <= 35 for size in sizes), sizes)
+        scatter_pb, = connection._queries
+        self.assertEqual(scatter_pb.kind[0].name, self._KIND)
+        self.assertEqual(scatter_pb.order[0].property.name, '__scatter__')
+        self.assertEqual(scatter_pb.projection[0].property.name, '__key__')
+        self.assertEqual(scatter_pb.limit, 30)
+        self.assertEqual(scatter_pb.order[0].direction,
+                         query_pb2.PropertyOrder.ASCENDING)
+
+    def test_w_scatter_few_samples(self):
+        connection = _KindConnection([3, 7])
+        query = self._makeQuery(connection)
+        splits = query.split(5)
+        self.assertEqual([self._keyBounds(split) for split in splits],
+                         [(None, 3), (3, 7), (7, None)])
+
+    def test_w_scatter_empty_kind(self):
+        connection = _KindConnection([])
+        query = self._makeQuery(connection)
+        split, = query.split(5)
+        self.assertEqual(self._keyBounds(split), (None, None))
+
+    def test_single_split_does_not_sample(self):
+        connection = _KindConnection(range(1, 10))
+        query = self._makeQuery(connection)
+        split, = query.split(1)
+        self.assertEqual(split.filters, [])
+        self.assertEqual(connection._queries, [])
+
+    def test_fetch_parallel_unordered(self):
+        ids = list(range(1, 51))
+        connection = _KindConnection(ids)
+        query = self._makeQuery(connection)
+        entities = list(query.fetch_parallel(5))
+        self.assertEqual(sorted(entity.key.id for entity in entities), ids)
+
+    def test_fetch_parallel_lazy(self):
+        from gcloud.datastore.entity import LazyEntity
+        connection = _KindConnection(list(range(1, 11)))
+        query = self._makeQuery(connection)
+        entities = list(query.fetch_parallel(2, lazy=True))
+        self.assertEqual(len(entities), 10)
+        for entity in entities:
+            self.assertTrue(isinstance(entity, LazyEntity))
+
+    def test_fetch_parallel_ordered(self):
+        ids = list(range(1, 51))
+        connection = _KindConnection(ids)
+        query = self._makeQuery(connection)
+        entities = list(query.fetch_parallel(
+            5, max_workers=3, ordered=True,
+            split_points=[self._makeKey(self._KIND, 17),
+                          self._makeKey(self._KIND, 33)]))
+        self.assertEqual([entity.key.id for entity in entities], ids)
+        for query_pb in connection._queries:
+            self.assertEqual(query_pb.order[0].property.name, '__key__')
+
+    def test_fetch_parallel_in_transaction(self):
+        query = self._makeQuery(_KindConnection([]))
+        client = _Client(self._DATASET, _KindConnection([]))
+        client._transaction = object()
+        self.assertRaises(ValueError, query.fetch_parallel, 2, client=client)
+
+
+class Test_protobuf_enums(unittest2.TestCase):
+
+    def test_operators_match_protobuf(self):
+        from gcloud.datastore._generated import query_pb2
+        from gcloud.datastore.query import Query
+        self.assertEqual(Query.OPERATORS, {
+            '<=': query_pb2.PropertyFilter.LESS_THAN_OR_EQUAL,
+            '>=': query_pb2.PropertyFilter.GREATER_THAN_OR_EQUAL,
+            '<': query_pb2.PropertyFilter.LESS_THAN,
+            '>': query_pb2.PropertyFilter.GREATER_THAN,
+            '=': query_pb2.PropertyFilter.EQUAL,
+        })
+
+    def test_more_results_match_protobuf(self):
+        from gcloud.datastore._generated import query_pb2
+        from gcloud.datastore.query import Iterator
+        self.assertEqual(Iterator._NOT_FINISHED,
+                         query_pb2.QueryResultBatch.NOT_FINISHED)
+        self.assertEqual(Iterator._FINISHED, (
+            query_pb2.QueryResultBatch.NO_MORE_RESULTS,
+            query_pb2.QueryResultBatch.MORE_RESULTS_AFTER_LIMIT,
+        ))
+
+
 class TestIterator(unittest2.TestCase):
     _DATASET = 'DATASET'
     _NAMESPACE = 'NAMESPACE'
@@ -390,6 +575,17 @@ class TestIterator(unittest2.TestCase):
         }
         self.assertEqual(connection._called_with, [EXPECTED])
 
+    def test_next_page_lazy(self):
+        from gcloud.datastore.entity import LazyEntity
+        connection = _Connection()
+        client = self._makeClient(connection)
+        query = _Query(client, self._KIND, self._DATASET, self._NAMESPACE)
+        self._addQueryResults(connection, cursor=b'')
+        iterator = self._makeOne(query, client, lazy=True)
+        entity, = iterator.next_page()[0]
+        self.assertTrue(isinstance(entity, LazyEntity))
+        self.assertEqual(entity['foo'], u'Foo')
+
     def test_next_page_no_cursors_no_more_w_offset_and_limit(self):
         from gcloud.datastore.query import _pb_from_query
         connection = _Connection()
@@ -523,6 +719,83 @@ class TestIterator(unittest2.TestCase):
         self.assertEqual(connection._called_with[0], EXPECTED1)
         self.assertEqual(connection._called_with[1], EXPECTED2)
 
+    def test___iter___w_prefetch(self):
+        connection = _Connection()
+        client = self._makeClient(connection)
+        query = _Query(client, self._KIND, self._DATASET, self._NAMESPACE)
+        self._addQueryResults(connection, cursor=b'\x01', more=True)
+        self._addQueryResults(connection, cursor=b'\x02', more=True)
+        self._addQueryResults(connection)
+        iterator = self._makeOne(query, client, prefetch=1)
+        entities = list(iterator)
+
+        self.assertEqual(len(entities), 3)
+        self.assertFalse(iterator._more_results)
+        self.assertEqual(
+            [called_with['query_pb'].start_cursor
+             for called_with in connection._called_with],
+            [b'', b'\x01', b'\x02'])
+
+    def test___iter___w_prefetch_in_transaction(self):
+        import threading
+        connection = _Connection()
+        client = _RecordingClient(self._DATASET, connection)
+        client._transaction = _Transaction(b'XACT')
+        query = _Query(client, self._KIND, self._DATASET, self._NAMESPACE)
+        self._addQueryResults(connection, cursor=b'\x01', more=True)
+        self._addQueryResults(connection)
+        iterator = self._makeOne(query, client, prefetch=2)
+        entities = list(iterator)
+
+        self.assertEqual(len(entities), 2)
+        self.assertEqual(
+            [called_with['transaction_id']
+             for called_with in connection._called_with],
+            [b'XACT', b'XACT'])
+        # Transactions are thread-local:  only the caller's thread may
+        # look its transaction up, not the prefetching one.
+        self.assertEqual(set(client._read_by),
+                         set([threading.current_thread()]))
+
+
+class Test__iter_pages(unittest2.TestCase):
+
+    _DATASET = 'DATASET'
+    _KIND = 'KIND'
+
+    def _callFUT(self, iterator, transaction=None, raw=False):
+        from gcloud.datastore.query import _iter_pages
+        return _iter_pages(iterator, transaction, raw)
+
+    def _makeIterator(self, connection):
+        from gcloud.datastore.query import Iterator
+        client = _Client(self._DATASET, connection)
+        query = _Query(client, self._KIND, self._DATASET)
+        return Iterator(query, client)
+
+    def test_entities(self):
+        from gcloud.datastore.entity import Entity
+        connection = _KindConnection(range(1, 6))
+        iterator = self._makeIterator(connection)
+        pages = list(self._callFUT(iterator))
+        self.assertEqual([len(page) for page in pages], [3, 2])
+        self.assertTrue(isinstance(pages[0][0], Entity))
+        self.assertEqual([entity.key.id for page in pages for entity in page],
+                         [1, 2, 3, 4, 5])
+
+    def test_raw(self):
+        from gcloud.datastore._generated import entity_pb2
+        connection = _KindConnection(range(1, 6))
+        iterator = self._makeIterator(connection)
+        pages = list(self._callFUT(iterator, raw=True))
+        self.assertEqual([len(page) for page in pages], [3, 2])
+        self.assertTrue(isinstance(pages[0][0], entity_pb2.Entity))
+        self.assertEqual([entity_pb.key.path_element[0].id
+                          for page in pages for entity_pb in page],
+                         [1, 2, 3, 4, 5])
+        self.assertFalse(iterator._more_results)
+        self.assertEqual(iterator._page, None)
+
 
 class Test__pb_from_query(unittest2.TestCase):
 
@@ -661,8 +934,61 @@ class _Connection(object):
         return result
 
 
+class _KindConnection(object):
+    """Serves a kind of entities with the given IDs, in pages of three.
+
+    Honors ``__key__`` range filters, and ``__scatter__`` order (as a
+    fixed shuffle).
+    """
+
+    _PAGE_SIZE = 3
+
+    def __init__(self, ids):
+        import threading
+        self._ids = sorted(ids)
+        self._lock = threading.Lock()
+        self._queries = []
+
+    def run_query(self, query_pb, dataset_id, namespace=None,
+                  transaction_id=None):
+        from gcloud.datastore._generated import entity_pb2
+        from gcloud.datastore._generated import query_pb2
+        with self._lock:
+            self._queries.append(query_pb)
+        ids = self._ids
+        for filter_pb in query_pb.filter.composite_filter.filter:
+            property_filter = filter_pb.property_filter
+            bound = property_filter.value.key_value.path_element[-1].id
+            if (property_filter.operator ==
+                    query_pb2.PropertyFilter.GREATER_THAN_OR_EQUAL):
+                ids = [key_id for key_id in ids if key_id >= bound]
+            else:
+                ids = [key_id for key_id in ids if key_id < bound]
+        if query_pb.order and query_pb.order[0].property.name == '__scatter__':
+            ids = sorted(ids, key=lambda key_id: (key_id * 37) % 101)
+        start = int(query_pb.start_cursor or b'0')
+        end = start + self._PAGE_SIZE
+        if query_pb.limit:
+            end = query_pb.limit
+        entity_pbs = []
+        for key_id in ids[start:end]:
+            entity_pb = entity_pb2.Entity()
+            entity_pb.key.partition_id.dataset_id = dataset_id
+            entity_pb.key.path_element.add(
+                kind=query_pb.kind[0].name, id=key_id)
+            entity_pbs.append(entity_pb)
+        if end < len(ids) and not query_pb.limit:
+            more = query_pb2.QueryResultBatch.NOT_FINISHED
+        else:
+            more = query_pb2.QueryResultBatch.NO_MORE_RESULTS
+        return entity_pbs, str(end).encode('ascii'), more, 0
+
+
 class _Client(object):
 
+    max_workers = 2
+    _transaction = None
+
     def __init__(self, dataset_id, connection, namespace=None):
         self.dataset_id = dataset_id
         self.connection = connection
@@ -670,4 +996,25 @@ class _Client(object):
 
     @property
     def current_transaction(self):
-        pass
+        return self._transaction
+
+
+class _RecordingClient(_Client):
+    """Records the threads reading its current transaction."""
+
+    def __init__(self, dataset_id, connection, namespace=None):
+        super(_RecordingClient, self).__init__(
+            dataset_id, connection, namespace)
+        self._read_by = []
+
+    @property
+    def current_transaction(self):
+        import threading
+        self._read_by.append(threading.current_thread())
+        return self._transaction
+
+
+class _Transaction(object):
+
+    def __init__(self, id):
+        self.id = id
@@ -209,6 +209,7 @@ class _Client(object):
         self.connection = connection
         self.namespace = namespace
         self._batches = []
+        self.entity_cache = None
 
     def _push_batch(self, batch):
         self._batches.insert(0, batch)
@@ -0,0 +1,264 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+_DATASET = 'DATASET'
+
+
+class TestBufferedWriter(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.datastore.writer import BufferedWriter
+        return BufferedWriter
+
+    def _makeOne(self, client, **kw):
+        writer = self._getTargetClass()(client, **kw)
+        self.addCleanup(writer.close)
+        return writer
+
+    def _makeEntity(self, key_id=None):
+        from gcloud.datastore.entity import Entity
+        from gcloud.datastore.key import Key
+        if key_id is None:
+            key = Key('KIND', dataset_id=_DATASET)
+        else:
+            key = Key('KIND', key_id, dataset_id=_DATASET)
+        entity = Entity(key=key)
+        entity['foo'] = u'Foo'
+        return entity
+
+    def _makeKey(self, key_id):
+        from gcloud.datastore.key import Key
+        return Key('KIND', key_id, dataset_id=_DATASET)
+
+    def test_ctor_defaults(self):
+        from gcloud.datastore.writer import DEFAULT_MAX_LATENCY
+        client = _Client(_Connection())
+        writer = self._makeOne(client)
+        self.assertEqual(writer.max_mutations, client.commit_chunk_size)
+        self.assertEqual(writer.max_bytes, client.commit_chunk_bytes)
+        self.assertEqual(writer.max_latency, DEFAULT_MAX_LATENCY)
+        self.assertEqual(writer.committed, 0)
+        self.assertEqual(writer.failures, [])
+
+    def test_close_without_writes(self):
+        connection = _Connection()
+        writer = self._makeOne(_Client(connection))
+        writer.close()
+        self.assertEqual(connection._committed, [])
+        self.assertRaises(ValueError, writer.put, self._makeEntity(1))
+        writer.close()
+
+    def test_flush_on_max_mutations(self):
+        connection = _Connection()
+        writer = self._makeOne(_Client(connection), max_mutations=2,
+                               max_latency=None)
+        for key_id in (1, 2, 3):
+            writer.put(self._makeEntity(key_id))
+        writer.delete(self._makeKey(4))
+        writer.put(self._makeEntity(5))
+        writer.flush()
+        self.assertEqual(connection._committed, [[1, 2], [3, 4], [5]])
+        self.assertEqual(writer.committed, 5)
+
+    def test_flush_on_max_bytes(self):
+        connection = _Connection()
+        writer = self._makeOne(_Client(connection), max_bytes=1,
+                               max_latency=None)
+        writer.put(self._makeEntity(1))
+        writer.delete(self._makeKey(2))
+        writer.flush()
+        self.assertEqual(connection._committed, [[1], [2]])
+
+    def test_close_commits_buffered(self):
+        connection = _Connection()
+        entity = self._makeEntity()
+        with self._makeOne(_Client(connection),
+                           max_latency=None) as writer:
+            writer.put(self._makeEntity(1))
+            writer.put(entity)
+            self.assertEqual(connection._committed, [])
+        self.assertEqual(connection._committed, [[1, None]])
+        self.assertEqual(entity.key.id, 1000)
+        self.assertEqual(writer.committed, 2)
+
+    def test_close_reports_failures(self):
+        from gcloud.datastore.client import PartialCommitError
+        connection = _Connection(fail_on=(3,))
+        writer = self._makeOne(_Client(connection), max_mutations=2,
+                               max_latency=None)
+        entities = [self._makeEntity(key_id) for key_id in (1, 2, 3, 4, 5)]
+        for entity in entities:
+            writer.put(entity)
+        writer.flush()
+        self.assertEqual([item for item, _ in writer.failures],
+                         entities[2:4])
+        writer.put(self._makeEntity(6))
+
+        with self.assertRaises(PartialCommitError) as context:
+            writer.close()
+
+        error = context.exception
+        self.assertEqual(error.total, 6)
+        self.assertEqual([item for item, _ in error.failures], entities[2:4])
+        self.assertTrue(isinstance(error.failures[0][1], ValueError))
+        self.assertEqual(writer.committed, 4)
+
+    def test_close_on_error_in_block(self):
+        connection = _Connection(fail_on=(1,))
+        with self.assertRaises(KeyError):
+            with self._makeOne(_Client(connection),
+                               max_latency=None) as writer:
+                writer.put(self._makeEntity(1))
+                raise KeyError('body')
+        self.assertEqual(len(writer.failures), 1)
+        self.assertRaises(ValueError, writer.put, self._makeEntity(2))
+
+    def test_commit_batches_commits_expired_inline(self):
+        from six.moves import queue
+        from gcloud._testing import _Monkey
+        from gcloud.datastore import writer as MUT
+        connection = _Connection()
+        writer = self._makeOne(_Client(connection), max_latency=None)
+        writer.close()  # Stop the committer thread;  run it here instead.
+        writer._closed = False
+        writer.max_latency = 5
+        with _Monkey(MUT, _NOW=lambda: 100.0):
+            writer.put(self._makeEntity(1))
+        pending = writer._pending = _Pending(
+            queue.Empty, queue.Empty, MUT._CLOSE)
+        now = iter([104.0, 105.0])
+        with _Monkey(MUT, _NOW=lambda: next(now)):
+            writer._commit_batches()
+        self.assertEqual(connection._committed, [[1]])
+        self.assertEqual(writer.committed, 1)
+        self.assertEqual(pending._put, [])
+        self.assertEqual(pending._done, 1)
+
+    def test_take_expired(self):
+        from gcloud._testing import _Monkey
+        from gcloud.datastore import writer as MUT
+        writer = self._makeOne(_Client(_Connection()), max_latency=None)
+        writer.max_latency = 5
+        self.assertEqual(writer._take_expired(), None)
+        with _Monkey(MUT, _NOW=lambda: 100.0):
+            writer.put(self._makeEntity(1))
+        with _Monkey(MUT, _NOW=lambda: 104.0):
+            self.assertEqual(writer._take_expired(), None)
+        with _Monkey(MUT, _NOW=lambda: 105.0):
+            batch, items = writer._take_expired()
+        self.assertEqual(batch.mutation_count, 1)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(writer._take_expired(), None)
+
+    def test_flush_on_max_latency(self):
+        import time
+        connection = _Connection()
+        writer = self._makeOne(_Client(connection), max_latency=0.01)
+        writer.put(self._makeEntity(1))
+        deadline = time.time() + 5
+        while not connection._committed and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(connection._committed, [[1]])
+
+    def test_back_pressure(self):
+        import threading
+        connection = _Connection(blocked=True)
+        writer = self._makeOne(_Client(connection), max_mutations=1,
+                               max_pending=1, max_latency=None)
+        writer.put(self._makeEntity(1))
+        self.assertTrue(connection._started.wait(5))
+        writer.put(self._makeEntity(2))
+
+        third = threading.Thread(target=writer.put,
+                                 args=(self._makeEntity(3),))
+        third.start()
+        third.join(0.05)
+        self.assertTrue(third.is_alive())
+
+        connection._release.set()
+        third.join(5)
+        self.assertFalse(third.is_alive())
+        writer.flush()
+        self.assertEqual(connection._committed, [[1], [2], [3]])
+
+
+class _Pending(object):
+    """Queue answering ``get`` with scripted items (or exceptions)."""
+
+    def __init__(self, *items):
+        self._items = list(items)
+        self._put = []
+        self._done = 0
+
+    def get(self, timeout=None):
+        item = self._items.pop(0)
+        if isinstance(item, type) and issubclass(item, Exception):
+            raise item()
+        return item
+
+    def put(self, item):
+        self._put.append(item)
+
+    def task_done(self):
+        self._done += 1
+
+
+class _Connection(object):
+    """Completes partial keys with ID 1000;  may fail or block commits."""
+
+    def __init__(self, fail_on=(), blocked=False):
+        import threading
+        self._fail_on = set(fail_on)
+        self._started = threading.Event()
+        self._release = threading.Event()
+        if not blocked:
+            self._release.set()
+        self._committed = []
+
+    def commit(self, dataset_id, commit_request, transaction_id):
+        from gcloud.datastore._generated import entity_pb2
+        self._started.set()
+        self._release.wait()
+        mutation = commit_request.mutation
+        key_ids = []
+        for entity_pb in mutation.upsert:
+            key_ids.append(entity_pb.key.path_element[-1].id)
+        for entity_pb in mutation.insert_auto_id:
+            key_ids.append(None)
+        for key_pb in mutation.delete:
+            key_ids.append(key_pb.path_element[-1].id)
+        if self._fail_on.intersection(key_ids):
+            raise ValueError('commit failed')
+        self._committed.append(key_ids)
+        new_keys = []
+        for entity_pb in mutation.insert_auto_id:
+            key_pb = entity_pb2.Key()
+            key_pb.CopyFrom(entity_pb.key)
+            key_pb.path_element[-1].id = 1000
+            new_keys.append(key_pb)
+        return 0, new_keys
+
+
+class _Client(object):
+
+    commit_chunk_size = 500
+    commit_chunk_bytes = 1024 * 1024
+    entity_cache = None
+    namespace = None
+
+    def __init__(self, connection, dataset_id=_DATASET):
+        self.connection = connection
+        self.dataset_id = dataset_id
@@ -0,0 +1,287 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Write-behind buffering of datastore mutations.
+
+A :class:`BufferedWriter` collects puts and deletes into batches, and
+commits each batch on a background thread once it is full or old enough,
+while the next one fills::
+
+  >>> from gcloud.datastore.writer import BufferedWriter
+  >>> with BufferedWriter(client) as writer:
+  ...     for entity in entities:
+  ...         writer.put(entity)
+
+Batches are committed one at a time, in order, so later writes of a key
+win.  Failed commits do not stop the writer:  their mutations are
+reported when it is closed.
+"""
+
+import threading
+import time
+
+from six.moves import queue  # pylint: disable=F0401
+
+from gcloud.datastore.batch import Batch
+from gcloud.datastore.client import PartialCommitError
+
+
+DEFAULT_MAX_LATENCY = 1.0
+"""Default age, in seconds, after which a batch is committed."""
+
+DEFAULT_MAX_PENDING = 2
+"""Default number of full batches waiting for commit before writes block."""
+
+_NOW = time.time  # To be replaced by tests.
+_CLOSE = object()
+
+
+class BufferedWriter(object):
+    """Buffer mutations into batches committed in the background.
+
+    A batch is committed once it holds ``max_mutations`` mutations, once
+    its mutations reach ``max_bytes``, or about ``max_latency`` seconds
+    after its first mutation (at most twice that), whichever comes first.
+    When ``max_pending`` batches are waiting for the commit in flight,
+    :meth:`put` and :meth:`delete` block:  memory stays bounded, and
+    writers are slowed down to the pace of the backend.
+
+    The writer can be used as a context manager, which calls
+    :meth:`close` on exit.  If the block raises, the buffered mutations
+    are still committed, but failed commits are only recorded in
+    :attr:`failures`, so that the block's exception propagates.
+
+    :type client: :class:`gcloud.datastore.client.Client`
+    :param client: The client used to commit.
+
+    :type max_mutations: integer
+    :param max_mutations: (Optional) Maximum number of mutations in a
+                          batch.  Defaults to the client's
+                          ``commit_chunk_size``.
+
+    :type max_bytes: integer
+    :param max_bytes: (Optional) Size, in bytes, of the mutations after
+                      which a batch is full.  Defaults to the client's
+                      ``commit_chunk_bytes``.
+
+    :type max_latency: float
+    :param max_latency: (Optional) Age, in seconds, after which a batch is
+                        committed.  If ``None``, batches are only committed
+                        when full, flushed or closed.
+
+    :type max_pending: integer
+    :param max_pending: (Optional) Maximum number of full batches waiting
+                        for commit.
+    """
+
+    def __init__(self, client, max_mutations=None, max_bytes=None,
+                 max_latency=DEFAULT_MAX_LATENCY,
+                 max_pending=DEFAULT_MAX_PENDING):
+        if max_mutations is None:
+            max_mutations = client.commit_chunk_size
+        if max_bytes is None:
+            max_bytes = client.commit_chunk_bytes
+        self._client = client
+        self.max_mutations = max_mutations
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self._lock = threading.Lock()
+        self._batch = self._items = self._started = None
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._total = 0
+        self._committed = 0
+        self._failures = []
+        self._committer = threading.Thread(target=self._commit_batches)
+        self._committer.daemon = True
+        self._committer.start()
+
+    @property
+    def committed(self):
+        """Number of mutations committed so far.
+
+        :rtype: integer
+        """
+        return self._committed
+
+    @property
+    def failures(self):
+        """Mutations whose commit failed so far.
+
+        :rtype: list of ``(item, exception)`` tuples
+        :returns: The entities (or keys) whose commit failed, with the
+                  error raised by the commit.
+        """
+        with self._lock:
+            return list(self._failures)
+
+    def put(self, entity):
+        """Buffer an entity to be saved.
+
+        See :meth:`gcloud.datastore.batch.Batch.put`.  An entity with a
+        partial key has its key completed once its batch is committed.
+
+        :type entity: :class:`gcloud.datastore.entity.Entity`
+        :param entity: The entity to be saved.
+
+        :raises: :class:`ValueError` if the writer is closed, or if the
+                 entity cannot be saved by a batch.
+        """
+        self._add(Batch.put, entity)
+
+    def delete(self, key):
+        """Buffer a key to be deleted.
+
+        See :meth:`gcloud.datastore.batch.Batch.delete`.
+
+        :type key: :class:`gcloud.datastore.key.Key`
+        :param key: The key to be deleted.
+
+        :raises: :class:`ValueError` if the writer is closed, or if the
+                 key cannot be deleted by a batch.
+        """
+        self._add(Batch.delete, key)
+
+    def _add(self, add, item):
+        """Add a mutation to the current batch, queueing it once full.
+
+        :type add: callable
+        :param add: :meth:`Batch.put` or :meth:`Batch.delete`.
+
+        :type item: :class:`gcloud.datastore.entity.Entity` or
+                    :class:`gcloud.datastore.key.Key`
+        :param item: The entity to put, or key to delete.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError('Writer is closed')
+            if self._batch is None:
+                self._batch = Batch(self._client)
+                self._items = []
+                self._started = _NOW()
+            add(self._batch, item)
+            self._items.append(item)
+            self._total += 1
+            full = None
+            if (self._batch.mutation_count >= self.max_mutations or
+                    self._batch.mutation_bytes >= self.max_bytes):
+                full = self._take()
+        if full is not None:
+            # Blocks while ``max_pending`` batches wait:  back-pressure.
+            self._pending.put(full)
+
+    def _take(self):
+        """Detach the current batch.  Called with the lock held.
+
+        :rtype: tuple or ``NoneType``
+        :returns: ``(batch, items)``, or ``None`` if no batch is open.
+        """
+        if self._batch is None:
+            return None
+        taken = self._batch, self._items
+        self._batch = self._items = self._started = None
+        return taken
+
+    def _take_expired(self):
+        """Detach the current batch if it is older than ``max_latency``.
+
+        :rtype: tuple or ``NoneType``
+        :returns: ``(batch, items)``, or ``None``.
+        """
+        with self._lock:
+            if (self._started is not None and
+                    _NOW() - self._started >= self.max_latency):
+                return self._take()
+
+    def _commit_batches(self):
+        """Commit queued batches, in order, until closed.
+
+        Runs on the committer thread, which also commits the current batch
+        once it expires:  waiting for work times out every
+        ``max_latency`` seconds to check.  Expired batches are committed
+        right away rather than queued:  the committer would block on its
+        own queue if it were full.
+        """
+        while True:
+            try:
+                work = self._pending.get(timeout=self.max_latency)
+            except queue.Empty:
+                expired = self._take_expired()
+                if expired is not None:
+                    self._commit(*expired)
+                continue
+            try:
+                if work is _CLOSE:
+                    return
+                self._commit(*work)
+            finally:
+                self._pending.task_done()
+
+    def _commit(self, batch, items):
+        """Commit a batch, recording its outcome.
+
+        :type batch: :class:`gcloud.datastore.batch.Batch`
+        :param batch: The batch to commit.
+
+        :type items: list
+        :param items: The entities and keys in the batch.
+        """
+        try:
+            batch.commit()
+        except Exception as exc:  # pylint: disable=broad-except
+            with self._lock:
+                self._failures.extend((item, exc) for item in items)
+        else:
+            with self._lock:
+                self._committed += len(items)
+
+    def flush(self):
+        """Commit the current batch, and wait for all queued commits."""
+        with self._lock:
+            taken = self._take()
+        if taken is not None:
+            self._pending.put(taken)
+        self._pending.join()
+
+    def close(self):
+        """Commit the buffered mutations, and stop the writer.
+
+        Calling :meth:`close` again does nothing.
+
+        :raises: :class:`gcloud.datastore.client.PartialCommitError` if
+                 any commit failed.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            taken = self._take()
+        if taken is not None:
+            self._pending.put(taken)
+        self._pending.put(_CLOSE)
+        self._committer.join()
+        if self._failures:
+            raise PartialCommitError(self._failures, self._total)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+            return
+        try:
+            self.close()
+        except PartialCommitError:
+            pass  # Recorded in ``failures``;  the block's error wins.
@@ -289,6 +289,7 @@ class TestManagedZone(unittest2.TestCase):
         req = conn._requested[0]
         self.assertEqual(req['method'], 'GET')
         self.assertEqual(req['path'], '/%s' % PATH)
+        self.assertTrue(req['conditional'])
         self._verifyResourceProperties(zone, RESOURCE)
 
     def test_reload_w_alternate_client(self):
@@ -282,7 +282,7 @@ class ManagedZone(object):
         client = self._require_client(client)
 
         api_response = client.connection.api_request(
-            method='GET', path=self.path)
+            method='GET', path=self.path, conditional=True)
         self._set_properties(api_response)
 
     def delete(self, client=None):
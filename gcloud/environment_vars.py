@@ -41,3 +41,6 @@ TESTS_DATASET = 'GCLOUD_TESTS_DATASET_ID'
 
 CREDENTIALS = 'GOOGLE_APPLICATION_CREDENTIALS'
 """Environment variable defining location of Google credentials."""
+
+TOKEN_CACHE = 'GCLOUD_TOKEN_CACHE'
+"""Environment variable naming a file in which to share access tokens."""
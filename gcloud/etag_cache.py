@@ -0,0 +1,160 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of resource metadata, revalidated by ETag.
+
+Once a cache is set on a client's connection, ``reload()`` requests send
+the ETag of the copy cached by the last one in an ``If-None-Match`` header.
+If the resource is unchanged, the server answers ``304 Not Modified`` with
+no body, and the cached copy is used:
+
+>>> from gcloud import storage
+>>> from gcloud.etag_cache import ETagCache
+>>> client = storage.Client()
+>>> client.connection.etag_cache = ETagCache(max_size=500, ttl=600)
+
+Every cached copy is revalidated by the server, so a resource changed by
+another client is never served stale.  Entries for a resource are also
+dropped when the connection sends any other request (e.g. ``PATCH`` or
+``DELETE``) for it.
+"""
+
+import threading
+import time
+
+from gcloud._helpers import _LRUDict
+
+
+DEFAULT_MAX_SIZE = 1024
+"""Default maximum number of cached resources."""
+
+_NOW = time.time  # To be replaced by tests.
+
+
+def _resource_key(url):
+    """Split a URL into the key of its resource and its query string."""
+    base, _, query = url.partition('?')
+    return base, query
+
+
+def _copy_json(value):
+    """Copy a decoded JSON value, so callers can't alter the cached one.
+
+    Much faster than :func:`copy.deepcopy` for JSON trees.
+    """
+    if isinstance(value, dict):
+        return dict((key, _copy_json(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+class ETagCache(object):
+    """LRU cache of resources and their ETags, keyed by URL.
+
+    :type max_size: integer
+    :param max_size: Maximum number of resources cached;  the least
+                     recently used one is evicted to make room for more.
+
+    :type ttl: float
+    :param ttl: (Optional) Seconds after which a cached resource is
+                discarded, even if unchanged.  By default resources are
+                kept until evicted.
+    """
+
+    hits = 0
+    """Requests answered from the cache (``304 Not Modified``)."""
+
+    misses = 0
+    """Requests which fetched the resource (not cached, or changed)."""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = _LRUDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, url):
+        """Look up the cached copy of a resource.
+
+        :type url: string
+        :param url: The URL of the resource, including any query string.
+
+        :rtype: tuple or ``NoneType``
+        :returns: ``(etag, resource)``, where ``resource`` is a copy of the
+                  cached one, or ``None`` if it is not cached (or expired).
+        """
+        base, query = _resource_key(url)
+        with self._lock:
+            entry = self._entries.get(base)
+            if entry is None or entry['query'] != query:
+                return None
+            if self.ttl is not None and _NOW() - entry['stored'] > self.ttl:
+                self._entries.pop(base)
+                return None
+            etag, resource = entry['etag'], entry['resource']
+        return etag, _copy_json(resource)
+
+    def put(self, url, etag, resource):
+        """Cache a resource.
+
+        :type url: string
+        :param url: The URL of the resource, including any query string.
+
+        :type etag: string
+        :param etag: The ETag returned along with the resource.
+
+        :type resource: dict
+        :param resource: The decoded resource;  the cache keeps a copy.
+        """
+        base, query = _resource_key(url)
+        resource = _copy_json(resource)
+        with self._lock:
+            self._entries.put(base, {
+                'query': query,
+                'etag': etag,
+                'resource': resource,
+                'stored': _NOW(),
+            })
+            while len(self._entries) > self.max_size:
+                self._entries.pop_oldest()
+
+    def invalidate(self, url):
+        """Drop the cached copy of a resource, if any.
+
+        :type url: string
+        :param url: The URL of the resource;  the query string is ignored.
+        """
+        base, _ = _resource_key(url)
+        with self._lock:
+            self._entries.pop(base, None)
+
+    def clear(self):
+        """Drop all cached resources, and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def record_hit(self):
+        """Count a request answered from the cache."""
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        """Count a request which fetched the resource."""
+        with self._lock:
+            self.misses += 1
@@ -18,9 +18,10 @@ See: https://cloud.google.com/storage/docs/json_api/v1/status-codes
 """
 
 import copy
-import json
 import six
 
+from gcloud import codec
+
 _HTTP_CODE_TO_EXCEPTION = {}  # populated at end of module
 
 
@@ -182,7 +183,7 @@ def make_exception(response, content, error_info=None, use_json=True):
 
     if isinstance(content, six.string_types):
         if use_json:
-            payload = json.loads(content)
+            payload = codec.loads(content)
         else:
             payload = {'error': {'message': content}}
     else:
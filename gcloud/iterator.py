@@ -42,8 +42,42 @@ requests)::
     >>>     print item.name
     >>>     if not item.is_valid:
     >>>         break
+
+To overlap the requests for the next pages with the processing of the
+current one, set a ``prefetch`` depth before iterating::
+
+    >>> iterator = MyIterator(...)
+    >>> iterator.prefetch = 2  # Fetch up to two pages ahead.
+    >>> for item in iterator:
+    >>>     process(item)
+
+Long listings can be resumed after a failure.  :meth:`Iterator.checkpoint`
+returns a small token recording the position of the items consumed so
+far, and :meth:`Iterator.restore` moves a new iterator over the same
+listing to that position.  To be handed a token every few pages, pass a
+callback::
+
+    >>> def save(token):
+    ...     with open('listing.checkpoint', 'w') as file_obj:
+    ...         file_obj.write(token)
+    >>> iterator = MyIterator(...)
+    >>> iterator.checkpoint_callback = save
+    >>> iterator.checkpoint_every = 10  # Save every tenth page.
+
+and after a crash::
+
+    >>> iterator = MyIterator(...)
+    >>> with open('listing.checkpoint') as file_obj:
+    ...     iterator.restore(file_obj.read())
+    >>> for item in iterator:  # Picks up after the last saved page.
+    >>>     process(item)
 """
 
+import base64
+import json
+
+from gcloud._helpers import _prefetch
+
 
 class Iterator(object):
     """A generic class for iterating through Cloud JSON APIs list responses.
@@ -56,29 +90,100 @@ class Iterator(object):
 
     :type extra_params: dict or None
     :param extra_params: Extra query string parameters for the API call.
+
+    :type prefetch: integer
+    :param prefetch: (Optional) Number of pages to request ahead, on a
+                     background thread, while the current page is consumed.
+                     Defaults to ``0`` (no prefetching).  When enabled,
+                     :attr:`page_number` and :attr:`next_page_token` track
+                     the pages fetched, which may be ahead of the pages
+                     consumed.
+
+    :type checkpoint_callback: callable
+    :param checkpoint_callback: (Optional) Called with a :meth:`checkpoint`
+                                token after every ``checkpoint_every``
+                                pages have been consumed.
+
+    :type checkpoint_every: integer
+    :param checkpoint_every: (Optional) Number of pages between calls to
+                             ``checkpoint_callback``.  Defaults to ``1``.
+
+    :raises: :class:`ValueError` if ``extra_params`` uses a reserved
+             parameter, or if ``checkpoint_every`` is less than ``1``.
     """
 
     PAGE_TOKEN = 'pageToken'
     RESERVED_PARAMS = frozenset([PAGE_TOKEN])
 
-    def __init__(self, client, path, extra_params=None):
+    def __init__(self, client, path, extra_params=None, prefetch=0,
+                 checkpoint_callback=None, checkpoint_every=1):
         self.client = client
         self.path = path
         self.page_number = 0
         self.next_page_token = None
         self.extra_params = extra_params or {}
+        self.prefetch = prefetch
+        self.checkpoint_callback = checkpoint_callback
+        self.checkpoint_every = checkpoint_every
+        self._skip_items = 0
+        self._position = None
         reserved_in_use = self.RESERVED_PARAMS.intersection(
             self.extra_params)
         if reserved_in_use:
             raise ValueError(('Using a reserved parameter',
                               reserved_in_use))
 
+    @property
+    def checkpoint_every(self):
+        """Number of pages between calls to ``checkpoint_callback``.
+
+        :rtype: integer
+        :returns: The number of pages.
+        """
+        return self._checkpoint_every
+
+    @checkpoint_every.setter
+    def checkpoint_every(self, value):
+        """Update the number of pages between checkpoints.
+
+        :type value: integer
+        :param value: The number of pages.
+
+        :raises: :class:`ValueError` if ``value`` is less than ``1``.
+        """
+        if value < 1:
+            raise ValueError('checkpoint_every must be at least 1', value)
+        self._checkpoint_every = value
+
     def __iter__(self):
         """Iterate through the list of items."""
+        page_number, page_token = self.page_number, self.next_page_token
+        skip, self._skip_items = self._skip_items, 0
+        responses = self._page_responses()
+        if self.prefetch > 0:
+            responses = _prefetch(responses, self.prefetch)
+        for response in responses:
+            items = self.get_items_from_response(response)
+            for offset, item in enumerate(items, start=1):
+                if offset > skip:
+                    self._position = (page_number, page_token, offset)
+                    yield item
+            skip = 0
+            page_number += 1
+            page_token = response.get('nextPageToken')
+            self._position = (page_number, page_token, 0)
+            if (self.checkpoint_callback is not None and
+                    page_number % self.checkpoint_every == 0):
+                self.checkpoint_callback(self.checkpoint())
+
+    def _page_responses(self):
+        """Request the remaining pages, one at a time.
+
+        :rtype: generator
+        :returns: The parsed JSON response of each remaining page.
+        """
         while self.has_next_page():
-            response = self.get_next_page_response()
-            for item in self.get_items_from_response(response):
-                yield item
+            yield self.get_next_page_response()
 
     def has_next_page(self):
         """Determines whether or not this iterator has more pages.
@@ -123,6 +228,60 @@ class Iterator(object):
         """Resets the iterator to the beginning."""
         self.page_number = 0
         self.next_page_token = None
+        self._skip_items = 0
+        self._position = None
+
+    def checkpoint(self):
+        """Serialize the position of the items consumed so far.
+
+        The position counts items handed out by iteration, so pages
+        fetched ahead by ``prefetch`` are requested again on resume.
+
+        :rtype: string
+        :returns: An opaque, URL-safe token to pass to :meth:`restore`.
+        """
+        if self._position is None:
+            page_number, page_token, offset = (
+                self.page_number, self.next_page_token, self._skip_items)
+        else:
+            page_number, page_token, offset = self._position
+        state = {
+            'path': self.path,
+            'page_number': page_number,
+            'page_token': page_token,
+            'offset': offset,
+        }
+        payload = json.dumps(state, sort_keys=True, separators=(',', ':'))
+        return base64.urlsafe_b64encode(
+            payload.encode('utf-8')).decode('ascii')
+
+    def restore(self, token):
+        """Move to a position saved by :meth:`checkpoint`.
+
+        The iterator must list the same resource, with the same query
+        parameters, as the one which produced ``token``.
+
+        :type token: string
+        :param token: A token returned by :meth:`checkpoint`.
+
+        :raises: :class:`ValueError` if ``token`` is malformed or was saved
+                 by an iterator over a different path.
+        """
+        try:
+            payload = base64.urlsafe_b64decode(token.encode('ascii'))
+            state = json.loads(payload.decode('utf-8'))
+            path = state['path']
+            page_number = int(state['page_number'])
+            page_token = state['page_token']
+            offset = int(state['offset'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Invalid checkpoint token', token)
+        if path != self.path:
+            raise ValueError('Checkpoint is for a different path', path)
+        self.page_number = page_number
+        self.next_page_token = page_token
+        self._skip_items = offset
+        self._position = None
 
     def get_items_from_response(self, response):
         """Factory method called while iterating. This should be overriden.
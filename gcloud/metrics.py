@@ -0,0 +1,360 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Instrumentation hooks for the requests made by gcloud.
+
+Hooks are notified before and after every request made through
+:meth:`gcloud.connection.JSONConnection.api_request`, storage batches,
+the datastore connection and :mod:`gcloud.streaming` transfers:
+
+>>> from gcloud import metrics
+>>> histograms = metrics.LatencyHistograms()
+>>> metrics.register_hook(histograms)
+>>> # ... use any client ...
+>>> histograms.dump()
+{'GET /storage/v1/b/{}': {'count': 1, ...}}
+
+When no hook is registered, the cost per request is a single check.
+"""
+
+import bisect
+import json
+import re
+import threading
+import time
+
+import six
+from six.moves.urllib.parse import urlsplit  # pylint: disable=F0401
+
+
+_NOW = time.time  # To be replaced by tests.
+_HOOKS = []
+_HOOKS_LOCK = threading.Lock()
+_VERSION_SEGMENT = re.compile(r'^v\d')
+
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+                   1.0, 2.0, 5.0, 10.0, 20.0, 60.0)
+"""Upper bounds (in seconds) of the buckets used by LatencyHistograms."""
+
+
+class RequestHook(object):
+    """Base class for instrumentation hooks.
+
+    Subclasses override either or both methods.  Hooks are called from the
+    thread making the request, so must be thread-safe.
+    """
+
+    def before_request(self, info):
+        """Called before a request is sent.
+
+        :type info: :class:`RequestInfo`
+        :param info: The request being made;  only ``method``, ``url``,
+                     ``url_template`` and ``payload_bytes`` are set.
+        """
+
+    def after_request(self, info):
+        """Called once a request completed (or failed).
+
+        :type info: :class:`RequestInfo`
+        :param info: The request made, including its outcome.
+        """
+
+
+class RequestInfo(object):
+    """Description of an instrumented request.
+
+    :type method: string
+    :param method: The HTTP method of the request.
+
+    :type url: string
+    :param url: The URL of the request.
+
+    :type payload_bytes: integer
+    :param payload_bytes: Size of the request body, as sent.
+
+    :type uncompressed_bytes: integer
+    :param uncompressed_bytes: (Optional) Size of the request body before it
+                               was compressed;  defaults to
+                               ``payload_bytes``.
+    """
+
+    response_bytes = None
+    """Size of the response body."""
+
+    status = None
+    """HTTP status of the (last) response, or ``None`` if none arrived."""
+
+    retries = 0
+    """Number of times the request was retried."""
+
+    elapsed = None
+    """Wall time of the request, in seconds, including retries."""
+
+    error = None
+    """Exception raised by the request, if any."""
+
+    def __init__(self, method, url, payload_bytes, uncompressed_bytes=None):
+        self.method = method
+        self.url = url
+        self.url_template = url_template(url)
+        self.payload_bytes = payload_bytes
+        if uncompressed_bytes is None:
+            uncompressed_bytes = payload_bytes
+        self.uncompressed_bytes = uncompressed_bytes
+        self.started = _NOW()
+
+    @property
+    def compression_ratio(self):
+        """Ratio of the uncompressed to the sent size of the request body.
+
+        :rtype: float
+        :returns: The ratio;  ``1.0`` if the body was not compressed.
+        """
+        return _ratio(self.uncompressed_bytes, self.payload_bytes)
+
+
+def register_hook(hook):
+    """Register a hook notified of every request.
+
+    :type hook: :class:`RequestHook`
+    :param hook: The hook to add.
+    """
+    with _HOOKS_LOCK:
+        _HOOKS.append(hook)
+
+
+def unregister_hook(hook):
+    """Stop notifying a hook previously passed to :func:`register_hook`.
+
+    :type hook: :class:`RequestHook`
+    :param hook: The hook to remove.
+
+    :raises: :class:`ValueError` if the hook is not registered.
+    """
+    with _HOOKS_LOCK:
+        _HOOKS.remove(hook)
+
+
+def url_template(url):
+    """Reduce a URL to a template grouping requests for the same method.
+
+    Query strings are dropped, and resource IDs (every other path segment
+    after the API version) are replaced by ``{}``, keeping any ``:verb``
+    suffix;  e.g. ``/storage/v1/b/{}/o/{}`` or
+    ``/v1/projects/{}/topics/{}:publish``.
+
+    :type url: string
+    :param url: The URL of a request.
+
+    :rtype: string
+    :returns: The templated path of ``url``.
+    """
+    segments = urlsplit(url).path.split('/')
+    start = 1
+    for index, segment in enumerate(segments):
+        if _VERSION_SEGMENT.match(segment):
+            start = index + 1
+            break
+    for index in range(start + 1, len(segments), 2):
+        _, colon, verb = segments[index].partition(':')
+        segments[index] = '{}' + colon + verb
+    return '/'.join(segments)
+
+
+def _ratio(uncompressed_bytes, payload_bytes):
+    """Compression ratio of a body, or of a total of bodies."""
+    if not payload_bytes:
+        return 1.0
+    return float(uncompressed_bytes) / payload_bytes
+
+
+def _body_size(body):
+    """Size of a request / response body, if it is a string."""
+    if isinstance(body, (six.binary_type, six.text_type)):
+        return len(body)
+    return 0
+
+
+def request_started(method, url, body, uncompressed_bytes=None):
+    """Notify hooks that a request is about to be sent.
+
+    :type method: string
+    :param method: The HTTP method of the request.
+
+    :type url: string
+    :param url: The URL of the request.
+
+    :type body: string or ``NoneType``
+    :param body: The body of the request, as sent.
+
+    :type uncompressed_bytes: integer
+    :param uncompressed_bytes: (Optional) Size of ``body`` before it was
+                               compressed, if it was.
+
+    :rtype: :class:`RequestInfo` or ``NoneType``
+    :returns: The info to pass to :func:`request_finished`, or ``None`` if
+              no hook is registered.
+    """
+    if not _HOOKS:
+        return None
+    info = RequestInfo(method, url, _body_size(body), uncompressed_bytes)
+    for hook in list(_HOOKS):
+        hook.before_request(info)
+    return info
+
+
+def request_finished(info, status=None, content=None, retries=0,
+                     error=None):
+    """Notify hooks that a request completed.
+
+    :type info: :class:`RequestInfo` or ``NoneType``
+    :param info: The value returned by :func:`request_started`.
+
+    :type status: integer
+    :param status: The HTTP status of the response, if any.
+
+    :type content: string
+    :param content: The body of the response, if any.
+
+    :type retries: integer
+    :param retries: The number of times the request was retried.
+
+    :type error: :class:`Exception`
+    :param error: The exception which made the request fail, if any.
+    """
+    if info is None:
+        return
+    info.elapsed = _NOW() - info.started
+    info.status = None if status is None else int(status)
+    info.response_bytes = _body_size(content)
+    info.retries = retries
+    info.error = error
+    for hook in list(_HOOKS):
+        hook.after_request(info)
+
+
+def instrument_request(method, url, body, send):
+    """Send a request, notifying hooks before and after.
+
+    :type method: string
+    :param method: The HTTP method of the request.
+
+    :type url: string
+    :param url: The URL of the request.
+
+    :type body: string or ``NoneType``
+    :param body: The body of the request.
+
+    :type send: callable
+    :param send: Callable taking no arguments which sends the request and
+                 returns ``(response, content)``;  ``response`` must have
+                 a ``status`` attribute.
+
+    :rtype: tuple
+    :returns: The value returned by ``send``.
+    """
+    info = request_started(method, url, body)
+    if info is None:
+        return send()
+    try:
+        response, content = send()
+    except Exception as exc:  # pylint: disable=broad-except
+        request_finished(info, error=exc)
+        raise
+    request_finished(info, response.status, content)
+    return response, content
+
+
+class LatencyHistograms(RequestHook):
+    """Hook keeping latency histograms per method and URL template.
+
+    :type buckets: sequence of float
+    :param buckets: Sorted upper bounds (in seconds) of the buckets.  A
+                    final bucket collects slower requests.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def after_request(self, info):
+        """Record a completed request.
+
+        :type info: :class:`RequestInfo`
+        :param info: The request made, including its outcome.
+        """
+        key = '%s %s' % (info.method, info.url_template)
+        index = bisect.bisect_left(self.buckets, info.elapsed)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    'count': 0,
+                    'errors': 0,
+                    'retries': 0,
+                    'seconds': 0.0,
+                    'payload_bytes': 0,
+                    'uncompressed_bytes': 0,
+                    'response_bytes': 0,
+                    'counts': [0] * (len(self.buckets) + 1),
+                }
+            stats['count'] += 1
+            status = info.status or 0
+            if info.error is not None or not (200 <= status < 300 or
+                                              status == 304):
+                stats['errors'] += 1
+            stats['retries'] += info.retries
+            stats['seconds'] += info.elapsed
+            stats['payload_bytes'] += info.payload_bytes
+            stats['uncompressed_bytes'] += info.uncompressed_bytes
+            stats['response_bytes'] += info.response_bytes
+            stats['counts'][index] += 1
+
+    def dump(self):
+        """Snapshot of the histograms.
+
+        :rtype: dict
+        :returns: Mapping of ``'METHOD template'`` to a dict of totals
+                  (``count``, ``errors``, ``retries``, ``seconds``,
+                  ``payload_bytes``, ``uncompressed_bytes``,
+                  ``response_bytes``), the ``compression_ratio`` of
+                  request bodies and ``buckets``, a list of
+                  ``[upper_bound, count]`` pairs (the last bound being
+                  ``None``).
+        """
+        bounds = list(self.buckets) + [None]
+        with self._lock:
+            result = {}
+            for key, stats in self._stats.items():
+                entry = dict(stats)
+                entry['compression_ratio'] = _ratio(
+                    entry['uncompressed_bytes'], entry['payload_bytes'])
+                entry['buckets'] = [list(pair) for pair in
+                                    zip(bounds, entry.pop('counts'))]
+                result[key] = entry
+        return result
+
+    def export(self, file_obj):
+        """Write the histograms as JSON.
+
+        :type file_obj: file
+        :param file_obj: A text file open for writing.
+        """
+        json.dump(self.dump(), file_obj, indent=2, sort_keys=True)
+
+    def reset(self):
+        """Discard all recorded requests."""
+        with self._lock:
+            self._stats.clear()
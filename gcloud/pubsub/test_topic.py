@@ -139,6 +139,7 @@ class TestTopic(unittest2.TestCase):
         self.assertEqual(req['method'], 'POST')
         self.assertEqual(req['path'], '/%s:publish' % PATH)
         self.assertEqual(req['data'], {'messages': [MESSAGE]})
+        self.assertTrue(req['compress'])
 
     def test_publish_single_bytes_wo_attrs_w_add_timestamp_alt_client(self):
         import base64
@@ -431,6 +432,7 @@ class TestBatch(unittest2.TestCase):
         self.assertEqual(req['method'], 'POST')
         self.assertEqual(req['path'], '%s:publish' % topic.path)
         self.assertEqual(req['data'], {'messages': [MESSAGE1, MESSAGE2]})
+        self.assertTrue(req['compress'])
 
     def test_commit_w_alternate_client(self):
         import base64
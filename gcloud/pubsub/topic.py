@@ -183,7 +183,8 @@ class Topic(object):
         message_data = {'data': message_b, 'attributes': attrs}
         data = {'messages': [message_data]}
         response = client.connection.api_request(
-            method='POST', path='%s:publish' % (self.path,), data=data)
+            method='POST', path='%s:publish' % (self.path,), data=data,
+            compress=True)
         return response['messageIds'][0]
 
     def batch(self, client=None):
@@ -265,6 +266,6 @@ class Batch(object):
             client = self.client
         response = client.connection.api_request(
             method='POST', path='%s:publish' % self.topic.path,
-            data={'messages': self.messages[:]})
+            data={'messages': self.messages[:]}, compress=True)
         self.message_ids.extend(response['messageIds'])
         del self.messages[:]
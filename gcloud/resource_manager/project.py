@@ -160,7 +160,8 @@ class Project(object):
 
         # We assume the project exists. If it doesn't it will raise a NotFound
         # exception.
-        resp = client.connection.api_request(method='GET', path=self.path)
+        resp = client.connection.api_request(method='GET', path=self.path,
+                                             conditional=True)
         self.set_properties_from_api_repr(resource=resp)
 
     def exists(self, client=None):
@@ -141,6 +141,7 @@ class TestProject(unittest2.TestCase):
         expected_request = {
             'method': 'GET',
             'path': project.path,
+            'conditional': True,
         }
         self.assertEqual(request, expected_request)
 
@@ -255,6 +256,7 @@ class TestProject(unittest2.TestCase):
         expected_get_request = {
             'method': 'GET',
             'path': project.path,
+            'conditional': True,
         }
         self.assertEqual(get_request, expected_get_request)
 
@@ -312,6 +314,7 @@ class TestProject(unittest2.TestCase):
         expected_get_request = {
             'method': 'GET',
             'path': project.path,
+            'conditional': True,
         }
         self.assertEqual(get_request, expected_get_request)
 
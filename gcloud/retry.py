@@ -0,0 +1,271 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Retry policies for requests made through JSON API connections.
+
+Every :class:`gcloud.connection.JSONConnection` owns a :class:`Retry`
+(its ``retry`` attribute), used by
+:meth:`api_request() <gcloud.connection.JSONConnection.api_request>`.
+By default, requests using an idempotent HTTP method are retried with
+exponential backoff (plus jitter) on transient errors:
+
+>>> from gcloud import storage
+>>> from gcloud.retry import Retry
+>>> client = storage.Client()
+>>> client.connection.retry = Retry(max_attempts=3, deadline=10)
+
+A policy may also be passed for a single call, e.g. to allow retrying a
+``POST`` known to be safe to repeat:
+
+>>> client.connection.api_request(
+...     'POST', '/path', data={}, retry=Retry(methods=None))
+"""
+
+import random
+import socket
+import threading
+import time
+
+from six.moves import http_client  # pylint: disable=F0401
+
+
+_NOW = time.time  # To be replaced by tests.
+_SLEEP = time.sleep  # To be replaced by tests.
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+"""HTTP methods which may be repeated without changing the outcome."""
+
+RETRYABLE_STATUSES = frozenset([
+    429,  # Too Many Requests
+    http_client.INTERNAL_SERVER_ERROR,
+    http_client.BAD_GATEWAY,
+    http_client.SERVICE_UNAVAILABLE,
+    http_client.GATEWAY_TIMEOUT,
+])
+"""HTTP status codes indicating a transient error."""
+
+RETRYABLE_EXCEPTIONS = (
+    http_client.BadStatusLine,
+    http_client.IncompleteRead,
+    http_client.ResponseNotReady,
+    socket.error,
+)
+"""Exceptions raised by the transport for transient errors."""
+
+
+class Retry(object):
+    """Policy for retrying transient failures of HTTP requests.
+
+    The delay before retry number ``n`` is
+    ``min(max_delay, initial_delay * multiplier ** (n - 1))``, plus or minus
+    up to ``jitter`` times that value.  A ``Retry-After`` header sent by the
+    server overrides the computed delay, still capped at ``max_delay``.
+
+    A policy may be shared between threads:  it only keeps counters.
+
+    :type max_attempts: integer
+    :param max_attempts: Maximum number of attempts for a request, including
+                         the first one.  Use ``1`` to disable retries.
+
+    :type deadline: float
+    :param deadline: (Optional) Maximum number of seconds to spend on a
+                     request, including time spent sleeping.  No retry is
+                     attempted if its delay would exceed the deadline.
+
+    :type initial_delay: float
+    :param initial_delay: Delay (in seconds) before the first retry.
+
+    :type max_delay: float
+    :param max_delay: Upper bound (in seconds) of any single delay.
+
+    :type multiplier: float
+    :param multiplier: Factor by which the delay grows with each retry.
+
+    :type jitter: float
+    :param jitter: Fraction of the delay to add / subtract at random, which
+                   spreads out retries from concurrent clients.
+
+    :type statuses: iterable of integer
+    :param statuses: HTTP status codes which can be retried.
+
+    :type exceptions: tuple of exception classes
+    :param exceptions: Exceptions raised by the transport which can be
+                       retried.
+
+    :type methods: iterable of string, or ``NoneType``
+    :param methods: HTTP methods which are safe to retry.  Defaults to the
+                    idempotent methods;  pass ``None`` to retry any method.
+
+    :raises: :class:`ValueError` if ``max_attempts`` is not positive.
+    """
+
+    def __init__(self, max_attempts=5, deadline=120.0, initial_delay=1.0,
+                 max_delay=32.0, multiplier=2.0, jitter=0.25,
+                 statuses=RETRYABLE_STATUSES,
+                 exceptions=RETRYABLE_EXCEPTIONS,
+                 methods=IDEMPOTENT_METHODS):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be positive', max_attempts)
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions)
+        if methods is not None:
+            methods = frozenset(method.upper() for method in methods)
+        self.methods = methods
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+        self.sleep_seconds = 0.0
+
+    def __repr__(self):
+        return '<Retry: max_attempts=%d, deadline=%r>' % (
+            self.max_attempts, self.deadline)
+
+    def allows(self, method):
+        """Check if requests using ``method`` may be retried.
+
+        :type method: string
+        :param method: The HTTP method of the request.
+
+        :rtype: boolean
+        :returns: Whether the method is safe to retry under this policy.
+        """
+        return self.methods is None or method.upper() in self.methods
+
+    def compute_delay(self, retry_num, retry_after=None):
+        """Compute the delay before a retry.
+
+        :type retry_num: integer
+        :param retry_num: The retry about to be made (``1`` for the first).
+
+        :type retry_after: float or ``NoneType``
+        :param retry_after: Delay requested by the server, if any;  it is
+                            capped at ``max_delay`` too.
+
+        :rtype: float
+        :returns: Number of seconds to sleep before retrying.
+        """
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        delay = min(self.max_delay,
+                    self.initial_delay * self.multiplier ** (retry_num - 1))
+        spread = delay * self.jitter
+        return max(0.0, delay + random.uniform(-spread, spread))
+
+    def _record(self, retried=False, slept=0.0):
+        """Update the counters of this policy."""
+        with self._lock:
+            if retried:
+                self.retries += 1
+                self.sleep_seconds += slept
+            else:
+                self.attempts += 1
+
+    def _retry_delay(self, retry_num, elapsed, retry_after=None):
+        """Compute the delay before a retry, if one is allowed.
+
+        :type retry_num: integer
+        :param retry_num: The retry about to be made (``1`` for the first).
+
+        :type elapsed: float
+        :param elapsed: Seconds spent since the first attempt was made.
+
+        :type retry_after: float or ``NoneType``
+        :param retry_after: Delay requested by the server, if any.
+
+        :rtype: float or ``NoneType``
+        :returns: Number of seconds to sleep before retrying, or ``None``
+                  if attempts are exhausted or the deadline does not allow
+                  the retry.
+        """
+        if retry_num >= self.max_attempts:
+            return None
+        delay = self.compute_delay(retry_num, retry_after)
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        return delay
+
+    def _sleep_before_retry(self, retry_num, started, retry_after=None):
+        """Sleep before a retry, unless the deadline does not allow it.
+
+        :rtype: boolean
+        :returns: Whether the caller should retry.
+        """
+        delay = self._retry_delay(retry_num, _NOW() - started, retry_after)
+        if delay is None:
+            return False
+        _SLEEP(delay)
+        self._record(retried=True, slept=delay)
+        return True
+
+    def call(self, method, send):
+        """Send a request, retrying it while it fails transiently.
+
+        :type method: string
+        :param method: The HTTP method of the request.
+
+        :type send: callable
+        :param send: Callable taking no arguments which sends the request
+                     and returns ``(response, content)``;  ``response``
+                     must have a ``status`` attribute.
+
+        :rtype: tuple of ``response`` (a dictionary of sorts)
+                and ``content`` (a string).
+        :returns: The final HTTP response and its content, which may still
+                  be an error once retries are exhausted.
+        :raises: the last exception from ``send`` if it is not retryable or
+                 retries are exhausted.
+        """
+        allowed = self.allows(method)
+        started = _NOW()
+        retry_num = 0
+        while True:
+            retry_num += 1
+            self._record()
+            try:
+                response, content = send()
+            except self.exceptions:
+                if not (allowed and
+                        self._sleep_before_retry(retry_num, started)):
+                    raise
+                continue
+
+            if (not allowed or response.status not in self.statuses or
+                    not self._sleep_before_retry(
+                        retry_num, started, _get_retry_after(response))):
+                return response, content
+
+
+def _get_retry_after(response):
+    """Extract the delay requested in a ``Retry-After`` header.
+
+    Only the "delay-seconds" form of the header is supported.
+
+    :type response: :class:`httplib2.Response` or other mapping of headers
+    :param response: The HTTP response.
+
+    :rtype: float or ``NoneType``
+    :returns: The requested delay in seconds, or ``None`` if absent or not
+              understood.
+    """
+    value = response.get('retry-after')
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
@@ -303,7 +303,7 @@ class Document(object):
 
         client = self._require_client(client)
         api_response = client.connection.api_request(
-            method='PUT', path=self.path, data=data)
+            method='PUT', path=self.path, data=data, compress=True)
 
         self._set_properties(api_response)
 
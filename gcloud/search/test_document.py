@@ -317,6 +317,7 @@ class TestDocument(unittest2.TestCase):
         self.assertEqual(req['method'], 'PUT')
         self.assertEqual(req['path'], '/%s' % self.DOC_PATH)
         self.assertEqual(req['data'], BODY)
+        self.assertTrue(req['compress'])
 
     def test_create_wo_rank_w_bound_client(self):
         import copy
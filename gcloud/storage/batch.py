@@ -21,11 +21,12 @@ from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.parser import Parser
 import io
-import json
 
 import httplib2
 import six
 
+from gcloud import codec
+from gcloud import metrics
 from gcloud.exceptions import make_exception
 from gcloud.storage.connection import Connection
 
@@ -49,11 +50,13 @@ class MIMEApplicationHTTP(MIMEApplication):
     """
     def __init__(self, method, uri, headers, body):
         if isinstance(body, dict):
-            body = json.dumps(body)
+            body = codec.dumps(body)
             headers['Content-Type'] = 'application/json'
             headers['Content-Length'] = len(body)
         if body is None:
             body = ''
+        elif isinstance(body, six.binary_type):
+            body = body.decode('utf-8')
         lines = ['%s %s HTTP/1.1' % (method, uri)]
         lines.extend(['%s: %s' % (key, value)
                       for key, value in sorted(headers.items())])
@@ -243,8 +246,10 @@ class Batch(Connection):
         # Use the private ``_connection`` rather than the public
         # ``.connection``, since the public connection may be this
         # current batch.
-        response, content = self._client._connection._make_request(
-            'POST', url, data=body, headers=headers)
+        response, content = metrics.instrument_request(
+            'POST', url, body,
+            lambda: self._client._connection._make_request(
+                'POST', url, data=body, headers=headers))
         responses = list(_unpack_batch_response(response, content))
         self._finish_futures(responses)
         return responses
@@ -322,5 +327,5 @@ def _unpack_batch_response(response, content):
         msg_headers['status'] = status
         headers = httplib2.Response(msg_headers)
         if ctype and ctype.startswith('application/json'):
-            payload = json.loads(payload)
+            payload = codec.loads(payload)
         yield headers, payload
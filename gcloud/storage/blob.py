@@ -16,7 +16,6 @@
 
 import copy
 from io import BytesIO
-import json
 import mimetypes
 import os
 import time
@@ -24,6 +23,7 @@ import time
 import six
 from six.moves.urllib.parse import quote  # pylint: disable=F0401
 
+from gcloud import codec
 from gcloud._helpers import _rfc3339_to_datetime
 from gcloud.credentials import generate_signed_url
 from gcloud.exceptions import NotFound
@@ -169,6 +169,9 @@ class Blob(_PropertyMixin):
         accessible blobs, but don't want to require users to explicitly
         log in.
 
+        To sign many URLs, use :class:`gcloud.credentials.URLSigner`, which
+        parses the private key only once.
+
         :type expiration: int, long, datetime.datetime, datetime.timedelta
         :param expiration: When the signed URL should expire.
 
@@ -412,11 +415,7 @@ class Blob(_PropertyMixin):
         else:
             http_response = make_api_request(connection.http, request,
                                              retries=num_retries)
-        response_content = http_response.content
-        if not isinstance(response_content,
-                          six.string_types):  # pragma: NO COVER  Python3
-            response_content = response_content.decode('utf-8')
-        self._set_properties(json.loads(response_content))
+        self._set_properties(codec.loads(http_response.content))
 
     def upload_from_filename(self, filename, content_type=None,
                              client=None):
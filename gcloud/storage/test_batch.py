@@ -57,10 +57,10 @@ class TestMIMEApplicationHTTP(unittest2.TestCase):
         HEADERS = {}
         LINES = [
             'GET /path/to/api HTTP/1.1',
-            'Content-Length: 14',
+            'Content-Length: 13',
             'Content-Type: application/json',
             '',
-            '{"foo": "bar"}',
+            '{"foo":"bar"}',
             ]
         mah = self._makeOne(METHOD, PATH, HEADERS, BODY)
         self.assertEqual(mah.get_payload().splitlines(), LINES)
@@ -115,7 +115,7 @@ class TestBatch(unittest2.TestCase):
         self.assertEqual(http._requests, [])
         EXPECTED_HEADERS = [
             ('Accept-Encoding', 'gzip'),
-            ('Content-Length', 0),
+            ('Content-Length', '0'),
         ]
         solo_request, = batch._requests
         self.assertEqual(solo_request[0], 'GET')
@@ -140,7 +140,7 @@ class TestBatch(unittest2.TestCase):
         self.assertEqual(http._requests, [])
         EXPECTED_HEADERS = [
             ('Accept-Encoding', 'gzip'),
-            ('Content-Length', 10),
+            ('Content-Length', '0'),
         ]
         solo_request, = batch._requests
         self.assertEqual(solo_request[0], 'POST')
@@ -165,7 +165,7 @@ class TestBatch(unittest2.TestCase):
         self.assertEqual(http._requests, [])
         EXPECTED_HEADERS = [
             ('Accept-Encoding', 'gzip'),
-            ('Content-Length', 10),
+            ('Content-Length', '0'),
         ]
         solo_request, = batch._requests
         self.assertEqual(solo_request[0], 'PATCH')
@@ -190,7 +190,7 @@ class TestBatch(unittest2.TestCase):
         self.assertEqual(http._requests, [])
         EXPECTED_HEADERS = [
             ('Accept-Encoding', 'gzip'),
-            ('Content-Length', 0),
+            ('Content-Length', '0'),
         ]
         solo_request, = batch._requests
         self.assertEqual(solo_request[0], 'DELETE')
@@ -234,7 +234,7 @@ class TestBatch(unittest2.TestCase):
         import json
         lines = chunk.splitlines()
         # blank + 2 headers + blank + request + 2 headers + blank + body
-        payload_str = json.dumps(payload)
+        payload_str = json.dumps(payload, separators=(',', ':'))
         self.assertEqual(lines[0], '')
         self.assertEqual(lines[1], 'Content-Type: application/http')
         self.assertEqual(lines[2], 'MIME-Version: 1.0')
@@ -302,6 +302,31 @@ class TestBatch(unittest2.TestCase):
 
         self._check_subrequest_no_payload(chunks[2], 'DELETE', URL)
 
+    def test_finish_w_hook(self):
+        from gcloud import metrics
+        URL = 'http://api.example.com/other_api'
+        expected = _Response()
+        expected['content-type'] = 'multipart/mixed; boundary="DEADBEEF="'
+        http = _HTTP((expected, _THREE_PART_MIME_RESPONSE))
+        connection = _Connection(http=http)
+        batch = self._makeOne(_Client(connection))
+        batch.API_BASE_URL = 'http://api.example.com'
+        batch._do_request('POST', URL, {}, {'foo': 1, 'bar': 2}, None)
+        batch._do_request('PATCH', URL, {}, {'bar': 3}, None)
+        batch._do_request('DELETE', URL, {}, None, None)
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            batch.finish()
+        finally:
+            metrics.unregister_hook(hook)
+        info, = hook._finished
+        self.assertEqual(info.method, 'POST')
+        self.assertEqual(info.url, 'http://api.example.com/batch')
+        self.assertEqual(info.status, 200)
+        self.assertEqual(info.response_bytes, len(_THREE_PART_MIME_RESPONSE))
+        self.assertEqual(info.payload_bytes, len(http._requests[0][3]))
+
     def test_finish_responses_mismatch(self):
         URL = 'http://api.example.com/other_api'
         expected = _Response()
@@ -606,6 +631,18 @@ class _MockObject(object):
     pass
 
 
+class _Hook(object):
+
+    def __init__(self):
+        self._finished = []
+
+    def before_request(self, info):
+        pass
+
+    def after_request(self, info):
+        self._finished.append(info)
+
+
 class _Client(object):
 
     def __init__(self, connection):
@@ -15,6 +15,7 @@ import six
 from six.moves import http_client   # pylint: disable=F0401
 from six.moves.urllib import parse  # pylint: disable=F0401
 
+from gcloud import metrics
 from gcloud.streaming.exceptions import BadStatusCodeError
 from gcloud.streaming.exceptions import RequestError
 from gcloud.streaming.exceptions import RetryAfterError
@@ -95,7 +96,9 @@ def _httplib2_debug_level(http_request, level, http=None):
     old_level = httplib2.debuglevel
     http_levels = {}
     httplib2.debuglevel = level
-    if http is not None:
+    # Pooled transports (e.g. :class:`gcloud.transport.PooledHttp`) do not
+    # expose their cached connections.
+    if http is not None and hasattr(http, 'connections'):
         for connection_key, connection in http.connections.items():
             # httplib2 stores two kinds of values in this dict, connection
             # classes and instances. Since the connection types are all
@@ -397,15 +400,18 @@ def make_api_request(http, http_request,
     :raises: :exc:`gcloud.streaming.exceptions.RequestError` if no response
              could be parsed.
     """
+    info = metrics.request_started(
+        http_request.http_method, http_request.url, http_request.body)
     retry = 0
     while True:
         try:
-            return wo_retry_func(
+            response = wo_retry_func(
                 http, http_request, redirections=redirections,
                 check_response_func=check_response_func)
         except _RETRYABLE_EXCEPTIONS as exc:
             retry += 1
             if retry >= retries:
+                metrics.request_finished(info, retries=retry - 1, error=exc)
                 raise
             retry_after = getattr(exc, 'retry_after', None)
             if retry_after is None:
@@ -415,6 +421,13 @@ def make_api_request(http, http_request,
             logging.debug('Retrying request to url %s after exception %s',
                           http_request.url, type(exc).__name__)
             time.sleep(retry_after)
+        except Exception as exc:
+            metrics.request_finished(info, retries=retry, error=exc)
+            raise
+        else:
+            metrics.request_finished(info, response.status_code,
+                                     response.content, retries=retry)
+            return response
 
 
 _HTTP_FACTORIES = []
@@ -59,6 +59,19 @@ class Test__httplib2_debug_level(unittest2.TestCase):
         self.assertEqual(update_me.debuglevel, 0)
         self.assertEqual(skip_me.debuglevel, 0)
 
+    def test_w_loggable_body_w_http_wo_connections(self):
+        from gcloud._testing import _Monkey
+        from gcloud.streaming import http_wrapper as MUT
+
+        request = _Request(loggable_body=object())
+        LEVEL = 1
+        _httplib2 = _Dummy(debuglevel=0)
+        _http = object()
+        with _Monkey(MUT, httplib2=_httplib2):
+            with self._makeOne(request, LEVEL, _http):
+                self.assertEqual(_httplib2.debuglevel, LEVEL)
+        self.assertEqual(_httplib2.debuglevel, 0)
+
 
 class Test_Request(unittest2.TestCase):
 
@@ -373,7 +386,7 @@ class Test_make_api_request(unittest2.TestCase):
         return make_api_request(*args, **kw)
 
     def test_wo_exception(self):
-        HTTP, REQUEST, RESPONSE = object(), object(), object()
+        HTTP, REQUEST, RESPONSE = object(), _Request(), _Response(200)
         _created, _checked = [], []
 
         def _wo_exception(*args, **kw):
@@ -394,7 +407,7 @@ class Test_make_api_request(unittest2.TestCase):
 
     def test_w_exceptions_lt_max_retries(self):
         from gcloud.streaming.exceptions import RetryAfterError
-        HTTP, RESPONSE = object(), object()
+        HTTP, RESPONSE = object(), _Response(200)
         REQUEST = _Request()
         WAIT = 10,
         _created, _checked = [], []
@@ -452,6 +465,88 @@ class Test_make_api_request(unittest2.TestCase):
             self.assertEqual(attempt, ((HTTP, REQUEST), expected_kw))
         self.assertEqual(_checked, [])  # not called by '_wo_exception'
 
+    def test_w_hook(self):
+        from gcloud._testing import _Monkey
+        from gcloud import metrics
+        from gcloud.streaming import http_wrapper as MUT
+        HTTP, RESPONSE = object(), _Response(200)
+        RESPONSE.content = 'abc'
+        REQUEST = _Request(http_method='POST', body='body')
+        _counter = [None]
+
+        def _wo_exception(*args, **kw):
+            if _counter:
+                _counter.pop()
+                raise ValueError('Retryable')
+            return RESPONSE
+
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            with _Monkey(MUT, calculate_wait_for_retry=lambda *ignored: 0):
+                self._callFUT(HTTP, REQUEST, wo_retry_func=_wo_exception)
+        finally:
+            metrics.unregister_hook(hook)
+
+        info, = hook._finished
+        self.assertEqual(info.method, 'POST')
+        self.assertEqual(info.url, _Request.URL)
+        self.assertEqual(info.payload_bytes, 4)
+        self.assertEqual(info.status, 200)
+        self.assertEqual(info.response_bytes, 3)
+        self.assertEqual(info.retries, 1)
+        self.assertEqual(info.error, None)
+
+    def test_w_hook_and_exceptions_gt_max_retries(self):
+        from gcloud._testing import _Monkey
+        from gcloud import metrics
+        from gcloud.streaming import http_wrapper as MUT
+
+        def _wo_exception(*args, **kw):
+            raise ValueError('Retryable')
+
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            with _Monkey(MUT, calculate_wait_for_retry=lambda *ignored: 0):
+                with self.assertRaises(ValueError):
+                    self._callFUT(object(), _Request(), retries=3,
+                                  wo_retry_func=_wo_exception)
+        finally:
+            metrics.unregister_hook(hook)
+
+        info, = hook._finished
+        self.assertEqual(info.status, None)
+        self.assertEqual(info.retries, 2)
+        self.assertTrue(isinstance(info.error, ValueError))
+
+    def test_w_hook_and_non_retryable_exception(self):
+        from gcloud._testing import _Monkey
+        from gcloud import metrics
+        from gcloud.streaming import http_wrapper as MUT
+        _counter = [None]
+
+        def _wo_exception(*args, **kw):
+            if _counter:
+                _counter.pop()
+                raise ValueError('Retryable')
+            raise KeyError('Not retryable')
+
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            with _Monkey(MUT, calculate_wait_for_retry=lambda *ignored: 0):
+                with self.assertRaises(KeyError):
+                    self._callFUT(object(), _Request(),
+                                  wo_retry_func=_wo_exception)
+        finally:
+            metrics.unregister_hook(hook)
+
+        info, = hook._finished
+        self.assertEqual(info.status, None)
+        self.assertEqual(info.retries, 1)
+        self.assertTrue(isinstance(info.error, KeyError))
+
 
 class Test__register_http_factory(unittest2.TestCase):
 
@@ -554,3 +649,15 @@ class _Http(object):
         self._requested.append((url, kw))
         response, self._responses = self._responses[0], self._responses[1:]
         return response
+
+
+class _Hook(object):
+
+    def __init__(self):
+        self._finished = []
+
+    def before_request(self, info):
+        pass
+
+    def after_request(self, info):
+        self._finished.append(info)
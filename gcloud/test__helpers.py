@@ -43,6 +43,84 @@ class Test__LocalStack(unittest2.TestCase):
         self.assertEqual(list(batches), [])
 
 
+class Test__LazyModule(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud._helpers import _LazyModule
+        return _LazyModule
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_import_on_first_access(self):
+        import sys
+        from gcloud._testing import _Monkey
+        NAME = 'gcloud.test__helpers_lazy_module'
+        module = _Module(VALUE=42)
+        lazy = self._makeOne(NAME)
+        self.assertEqual(repr(lazy), '<lazy module %r>' % (NAME,))
+        with _Monkey(sys, modules=dict(sys.modules, **{NAME: module})):
+            self.assertEqual(lazy.VALUE, 42)
+        self.assertEqual(lazy.__dict__['VALUE'], 42)
+
+    def test_missing_attribute(self):
+        lazy = self._makeOne('json')
+        self.assertRaises(AttributeError, getattr, lazy, 'nonesuch')
+        self.assertTrue(callable(lazy.dumps))
+
+
+class Test__LRUDict(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud._helpers import _LRUDict
+        return _LRUDict
+
+    def _makeOne(self, *items):
+        lru = self._getTargetClass()()
+        for key, value in items:
+            lru.put(key, value)
+        return lru
+
+    def _drain(self, lru):
+        drained = []
+        while len(lru):
+            drained.append(lru.pop_oldest())
+        return drained
+
+    def test_ctor(self):
+        lru = self._makeOne()
+        self.assertEqual(len(lru), 0)
+        self.assertRaises(KeyError, lru.pop_oldest)
+
+    def test_get(self):
+        lru = self._makeOne(('a', 1), ('b', 2), ('c', 3))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('missing'), None)
+        self.assertEqual(lru.get('missing', 0), 0)
+        self.assertEqual(self._drain(lru), [('b', 2), ('c', 3), ('a', 1)])
+
+    def test_put_existing(self):
+        lru = self._makeOne(('a', 1), ('b', 2))
+        lru.put('a', 3)
+        self.assertEqual(len(lru), 2)
+        self.assertEqual(self._drain(lru), [('b', 2), ('a', 3)])
+
+    def test_pop(self):
+        lru = self._makeOne(('a', 1), ('b', 2), ('c', 3))
+        self.assertEqual(lru.pop('b'), 2)
+        self.assertEqual(lru.pop('b'), None)
+        self.assertEqual(lru.pop('b', 0), 0)
+        self.assertEqual(self._drain(lru), [('a', 1), ('c', 3)])
+
+    def test_clear(self):
+        lru = self._makeOne(('a', 1), ('b', 2))
+        lru.clear()
+        self.assertEqual(len(lru), 0)
+        self.assertEqual(lru.get('a'), None)
+        lru.put('c', 3)
+        self.assertEqual(self._drain(lru), [('c', 3)])
+
+
 class Test__UTC(unittest2.TestCase):
 
     def _getTargetClass(self):
@@ -73,6 +151,13 @@ class Test__UTC(unittest2.TestCase):
         epoch = tz.fromutc(naive_epoch)
         self.assertEqual(epoch.tzinfo, tz)
 
+    def test_fromutc_w_aware(self):
+        import datetime
+
+        tz = self._makeOne()
+        epoch = datetime.datetime(1970, 1, 1, tzinfo=tz)
+        self.assertEqual(tz.fromutc(epoch), epoch)
+
     def test_tzname(self):
         tz = self._makeOne()
         self.assertEqual(tz.tzname(None), 'UTC')
@@ -304,6 +389,32 @@ class Test__microseconds_from_datetime(unittest2.TestCase):
         result = self._callFUT(timestamp)
         self.assertEqual(result, microseconds)
 
+    def test_w_non_utc_datetime(self):
+        import datetime
+        from gcloud._helpers import _UTC
+
+        class CET(_UTC):
+            _tzname = 'CET'
+            _utcoffset = datetime.timedelta(hours=1)
+
+        timestamp = datetime.datetime(1970, 1, 1, 1, microsecond=5,
+                                      tzinfo=CET())
+        self.assertEqual(self._callFUT(timestamp), 5)
+
+    def test_before_epoch(self):
+        import datetime
+
+        timestamp = datetime.datetime(1969, 12, 31, 23, 59, 59, 999999)
+        self.assertEqual(self._callFUT(timestamp), -1)
+
+    def test_exact_for_large_values(self):
+        import datetime
+        from gcloud._helpers import UTC
+
+        timestamp = datetime.datetime(9999, 12, 31, 23, 59, 59, 999999,
+                                      tzinfo=UTC)
+        self.assertEqual(self._callFUT(timestamp), 253402300799999999)
+
 
 class Test__millis_from_datetime(unittest2.TestCase):
 
@@ -405,12 +516,99 @@ class Test__total_seconds(unittest2.TestCase):
         self.assertEqual(result, 1.414)
 
 
+class Test__parse_rfc3339(unittest2.TestCase):
+
+    def _callFUT(self, dt_str):
+        from gcloud._helpers import _parse_rfc3339
+        return _parse_rfc3339(dt_str)
+
+    def test_w_micros(self):
+        import datetime
+        from gcloud._helpers import UTC
+
+        result = self._callFUT('2009-12-17T12:44:32.123456Z')
+        self.assertEqual(result, datetime.datetime(
+            2009, 12, 17, 12, 44, 32, 123456, UTC))
+        self.assertTrue(result.tzinfo is UTC)
+
+    def test_w_millis(self):
+        import datetime
+        from gcloud._helpers import UTC
+
+        result = self._callFUT('2009-12-17T12:44:32.123Z')
+        self.assertEqual(result, datetime.datetime(
+            2009, 12, 17, 12, 44, 32, 123000, UTC))
+
+    def test_matches_strptime(self):
+        import datetime
+        from gcloud._helpers import UTC
+        from gcloud._helpers import _RFC3339_MICROS
+
+        for dt_str in ('2016-02-29T00:00:00.0Z',
+                       '1999-01-01T23:59:59.05Z',
+                       '2015-07-29T17:45:21.000001Z'):
+            expected = datetime.datetime.strptime(
+                dt_str, _RFC3339_MICROS).replace(tzinfo=UTC)
+            self.assertEqual(self._callFUT(dt_str), expected)
+
+    def test_other_shape_uses_strptime(self):
+        import datetime
+        from gcloud._helpers import UTC
+
+        # Not zero-padded, but accepted by ``strptime``.
+        result = self._callFUT('2009-1-7T2:4:3.5Z')
+        self.assertEqual(result, datetime.datetime(
+            2009, 1, 7, 2, 4, 3, 500000, UTC))
+
+    def test_invalid_values(self):
+        for dt_str in ('2009-13-17T12:44:32.123456Z',
+                       '2009-12-17T12:44:32Z',
+                       '2009-12-17T12:44:32.1234567Z',
+                       '2009-12-17 12:44:32.123456Z',
+                       '2009-12-17T12:44:32.123456Z\n',
+                       'not a timestamp'):
+            self.assertRaises(ValueError, self._callFUT, dt_str)
+
+
 class Test__rfc3339_to_datetime(unittest2.TestCase):
 
+    def setUp(self):
+        from gcloud._helpers import _RFC3339_CACHE
+        _RFC3339_CACHE.clear()
+
+    def tearDown(self):
+        from gcloud._helpers import _RFC3339_CACHE
+        _RFC3339_CACHE.clear()
+
     def _callFUT(self, dt_str):
         from gcloud._helpers import _rfc3339_to_datetime
         return _rfc3339_to_datetime(dt_str)
 
+    def test_cached(self):
+        from gcloud._helpers import _RFC3339_CACHE
+
+        dt_str = '2009-12-17T12:44:32.123456Z'
+        result = self._callFUT(dt_str)
+        self.assertEqual(_RFC3339_CACHE, {dt_str: result})
+        self.assertTrue(self._callFUT(dt_str) is result)
+
+    def test_cache_bounded(self):
+        from gcloud import _helpers
+        from gcloud._testing import _Monkey
+
+        with _Monkey(_helpers, _RFC3339_CACHE_SIZE=2):
+            self._callFUT('2009-12-17T12:44:30.0Z')
+            self._callFUT('2009-12-17T12:44:31.0Z')
+            self._callFUT('2009-12-17T12:44:32.0Z')
+        self.assertEqual(list(_helpers._RFC3339_CACHE),
+                         ['2009-12-17T12:44:32.0Z'])
+
+    def test_invalid_not_cached(self):
+        from gcloud._helpers import _RFC3339_CACHE
+
+        self.assertRaises(ValueError, self._callFUT, 'bogus')
+        self.assertEqual(_RFC3339_CACHE, {})
+
     def test_it(self):
         import datetime
         from gcloud._helpers import UTC
@@ -456,6 +654,12 @@ class Test__datetime_to_rfc3339(unittest2.TestCase):
         result = self._callFUT(to_convert)
         self.assertEqual(result, dt_str)
 
+    def test_pads_fields(self):
+        import datetime
+
+        result = self._callFUT(datetime.datetime(987, 6, 5, 4, 3, 2, 1))
+        self.assertEqual(result, '0987-06-05T04:03:02.000001Z')
+
 
 class Test__to_bytes(unittest2.TestCase):
 
@@ -484,6 +688,216 @@ class Test__to_bytes(unittest2.TestCase):
         self.assertRaises(TypeError, self._callFUT, value)
 
 
+class Test__prefetch(unittest2.TestCase):
+
+    def _callFUT(self, iterable, depth):
+        from gcloud._helpers import _prefetch
+        return _prefetch(iterable, depth)
+
+    def test_empty(self):
+        self.assertEqual(list(self._callFUT(iter(()), 1)), [])
+
+    def test_yields_in_order(self):
+        items = list(range(20))
+        self.assertEqual(list(self._callFUT(iter(items), 3)), items)
+
+    def test_bounded_buffer(self):
+        import time
+        produced = []
+
+        def _produce():
+            for index in range(100):
+                produced.append(index)
+                yield index
+
+        DEPTH = 2
+        prefetched = self._callFUT(_produce(), DEPTH)
+        self.assertEqual(next(prefetched), 0)
+        time.sleep(0.05)
+        # One item consumed, ``DEPTH`` buffered and one waiting to be put.
+        self.assertTrue(len(produced) <= DEPTH + 2)
+        self.assertEqual(list(prefetched), list(range(1, 100)))
+
+    def test_exception_propagates_after_items(self):
+        def _produce():
+            yield 1
+            yield 2
+            raise KeyError('oops')
+
+        prefetched = self._callFUT(_produce(), 1)
+        self.assertEqual(next(prefetched), 1)
+        self.assertEqual(next(prefetched), 2)
+        self.assertRaises(KeyError, next, prefetched)
+
+    def test_consumer_stops_early(self):
+        import time
+        from gcloud._testing import _Monkey
+        from gcloud import _helpers as MUT
+        produced = []
+
+        def _produce():
+            while True:
+                produced.append(None)
+                yield len(produced)
+
+        with _Monkey(MUT, _PREFETCH_POLL_SECONDS=0.001):
+            prefetched = self._callFUT(_produce(), 1)
+            self.assertEqual(next(prefetched), 1)
+            time.sleep(0.02)  # Let the producer block on the full buffer.
+            prefetched.close()
+            time.sleep(0.05)
+            count = len(produced)
+            time.sleep(0.05)
+        self.assertEqual(len(produced), count)
+        self.assertTrue(count <= 3)
+
+
+class Test__map_concurrently(unittest2.TestCase):
+
+    def _callFUT(self, func, items, max_workers):
+        from gcloud._helpers import _map_concurrently
+        return _map_concurrently(func, items, max_workers)
+
+    def test_single_worker_inline(self):
+        import threading
+        threads = []
+
+        def _func(item):
+            threads.append(threading.current_thread())
+            return item * 2
+        self.assertEqual(self._callFUT(_func, iter([1, 2, 3]), 1), [2, 4, 6])
+        self.assertEqual(set(threads), set([threading.current_thread()]))
+
+    def test_single_item_inline(self):
+        import threading
+        threads = []
+
+        def _func(item):
+            threads.append(threading.current_thread())
+            return item
+        self.assertEqual(self._callFUT(_func, ['a'], 4), ['a'])
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_concurrent_keeps_order(self):
+        import threading
+        barrier = threading.Event()
+        running = []
+
+        def _func(item):
+            running.append(item)
+            if len(running) == 2:
+                barrier.set()
+            # Both workers must be running at once to get past this.
+            self.assertTrue(barrier.wait(5))
+            return item * 10
+        result = self._callFUT(_func, range(6), 2)
+        self.assertEqual(result, [0, 10, 20, 30, 40, 50])
+
+    def test_error_reraised_and_stops(self):
+        calls = []
+
+        def _func(item):
+            calls.append(item)
+            if item == 1:
+                raise KeyError(item)
+            return item
+        with self.assertRaises(KeyError):
+            self._callFUT(_func, range(100), 2)
+        self.assertTrue(len(calls) < 100)
+
+
+class Test__iterate_concurrently(unittest2.TestCase):
+
+    def _callFUT(self, iterables, max_workers, ordered, depth=2):
+        from gcloud._helpers import _iterate_concurrently
+        return _iterate_concurrently(iterables, max_workers, ordered, depth)
+
+    def test_ordered(self):
+        iterables = [range(0, 5), [], range(5, 12), range(12, 13)]
+        result = list(self._callFUT(iterables, 2, True))
+        self.assertEqual(result, list(range(13)))
+
+    def test_unordered(self):
+        iterables = [range(0, 5), [], range(5, 12), range(12, 13)]
+        result = list(self._callFUT(iterables, 3, False))
+        self.assertEqual(sorted(result), list(range(13)))
+
+    def test_no_iterables(self):
+        self.assertEqual(list(self._callFUT([], 2, False)), [])
+        self.assertEqual(list(self._callFUT([], 2, True)), [])
+
+    def test_concurrent(self):
+        import threading
+        started = [threading.Event(), threading.Event()]
+
+        def _produce(index):
+            started[index].set()
+            # Both iterables must be running at once to get past this.
+            self.assertTrue(started[1 - index].wait(5))
+            yield index
+        result = self._callFUT([_produce(0), _produce(1)], 2, True)
+        self.assertEqual(list(result), [0, 1])
+
+    def _failing(self, count):
+        for index in range(count):
+            yield index
+        raise KeyError('failed')
+
+    def test_error_ordered(self):
+        consumed = []
+        with self.assertRaises(KeyError):
+            for item in self._callFUT([range(3), self._failing(2)], 2, True):
+                consumed.append(item)
+        self.assertEqual(consumed, [0, 1, 2, 0, 1])
+
+    def test_error_unordered(self):
+        with self.assertRaises(KeyError):
+            list(self._callFUT([self._failing(2), range(3)], 1, False))
+
+    def test_consumer_stops_early(self):
+        import threading
+        import time
+        from gcloud import _helpers
+        from gcloud._testing import _Monkey
+        produced = []
+        finished = threading.Event()
+
+        def _produce():
+            # Endless:  only the consumer stopping can end it.
+            try:
+                while True:
+                    produced.append(len(produced))
+                    yield produced[-1]
+            finally:
+                finished.set()
+
+        with _Monkey(_helpers, _PREFETCH_POLL_SECONDS=0.01):
+            items = self._callFUT([_produce()], 2, False, depth=1)
+            self.assertEqual(next(items), 0)
+            time.sleep(0.05)
+            items.close()
+            self.assertTrue(finished.wait(5))
+        self.assertTrue(len(produced) < 10)
+
+    def test_consumer_stops_before_last_iterable(self):
+        import threading
+        from gcloud import _helpers
+        from gcloud._testing import _Monkey
+        finished = threading.Event()
+
+        def _produce():
+            try:
+                yield 'first'
+            finally:
+                finished.set()
+
+        with _Monkey(_helpers, _PREFETCH_POLL_SECONDS=0.01):
+            items = self._callFUT([_produce(), range(100)], 1, True, depth=1)
+            self.assertEqual(next(items), 'first')
+            items.close()
+            self.assertTrue(finished.wait(5))
+
+
 class _AppIdentity(object):
 
     def __init__(self, app_id):
@@ -536,3 +950,9 @@ class _TimeoutHTTPConnection(_BaseHTTPConnection):
     def getresponse(self):
         import socket
         raise socket.timeout('timed out')
+
+
+class _Module(object):
+
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
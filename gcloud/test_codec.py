@@ -0,0 +1,198 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+class TestStdlibJSONCodec(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.codec import StdlibJSONCodec
+        return StdlibJSONCodec
+
+    def _makeOne(self):
+        return self._getTargetClass()()
+
+    def test_dumps(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.dumps({'foo': [1, u'\u00e9']}),
+                         b'{"foo":[1,"\\u00e9"]}')
+
+    def test_loads_bytes(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.loads(b'{"foo": "\xc3\xa9"}'),
+                         {'foo': u'\u00e9'})
+
+    def test_loads_text(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.loads(u'{"foo": 1}'), {'foo': 1})
+
+
+class TestOrjsonCodec(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.codec import OrjsonCodec
+        return OrjsonCodec
+
+    def _makeOne(self):
+        return self._getTargetClass()()
+
+    def test_ctor_wo_orjson(self):
+        from gcloud._testing import _Monkey
+        from gcloud import codec as MUT
+        with _Monkey(MUT, orjson=None):
+            self.assertRaises(RuntimeError, self._makeOne)
+
+    def test_dumps(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.dumps({'foo': [1, u'\u00e9']}),
+                         u'{"foo":[1,"\u00e9"]}'.encode('utf-8'))
+
+    def test_dumps_falls_back_to_stdlib(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.dumps({'big': 2 ** 70}),
+                         b'{"big":1180591620717411303424}')
+
+    def test_dumps_non_finite_floats(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.dumps({'a': [None, float('nan')]}),
+                         b'{"a":[null,NaN]}')
+        self.assertEqual(codec.dumps([None, 1.5, 'x']), b'[null,1.5,"x"]')
+
+    def test_dumps_datetime(self):
+        import datetime
+        codec = self._makeOne()
+        self.assertRaises(TypeError, codec.dumps,
+                          {'when': datetime.datetime(2015, 1, 1)})
+
+    def test_loads_bytes(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.loads(b'{"foo": "\xc3\xa9"}'),
+                         {'foo': u'\u00e9'})
+
+    def test_loads_text(self):
+        codec = self._makeOne()
+        self.assertEqual(codec.loads(u'{"foo": 1}'), {'foo': 1})
+
+    def test_loads_falls_back_to_stdlib(self):
+        import math
+        codec = self._makeOne()
+        self.assertEqual(codec.loads(b'[1180591620717411303424]'),
+                         [2 ** 70])
+        self.assertTrue(math.isinf(codec.loads(b'-Infinity')))
+        self.assertRaises(ValueError, codec.loads, b'{not json')
+
+    def test_same_results_as_stdlib(self):
+        import datetime
+        from gcloud.codec import StdlibJSONCodec
+        stdlib = StdlibJSONCodec()
+        codec = self._makeOne()
+
+        class _Str(str):
+            pass
+
+        values = [
+            {'foo': [1, 2.5, None, True, u'\u00e9']},
+            [2 ** 64, -2 ** 63 - 1],
+            [float('inf'), float('-inf')],
+            {1: 'int key', None: 'null key'},
+            [_Str('subclass')],
+            (1, 2),
+            {'when': datetime.date(2015, 1, 1)},
+            set([1]),
+        ]
+        for value in values:
+            try:
+                expected = stdlib.loads(stdlib.dumps(value))
+            except TypeError:
+                self.assertRaises(TypeError, codec.dumps, value)
+            else:
+                data = codec.dumps(value)
+                self.assertEqual(codec.loads(data), expected)
+                self.assertEqual(stdlib.loads(data), expected)
+
+        nan, = codec.loads(codec.dumps([float('nan')]))
+        self.assertNotEqual(nan, nan)
+
+
+class Test_get_codec(unittest2.TestCase):
+
+    def _callFUT(self):
+        from gcloud.codec import get_codec
+        return get_codec()
+
+    def test_default(self):
+        from gcloud._testing import _Monkey
+        from gcloud import codec as MUT
+        with _Monkey(MUT, _CODEC=[]):
+            codec = self._callFUT()
+            self.assertTrue(isinstance(codec, MUT.OrjsonCodec))
+            self.assertTrue(self._callFUT() is codec)
+
+    def test_set(self):
+        from gcloud._testing import _Monkey
+        from gcloud import codec as MUT
+        CODEC = object()
+        with _Monkey(MUT, _CODEC=[CODEC]):
+            self.assertTrue(self._callFUT() is CODEC)
+
+
+class Test_set_codec(unittest2.TestCase):
+
+    def _callFUT(self, codec):
+        from gcloud.codec import set_codec
+        return set_codec(codec)
+
+    def test_set(self):
+        from gcloud._testing import _Monkey
+        from gcloud import codec as MUT
+        CODEC = object()
+        with _Monkey(MUT, _CODEC=[]):
+            self._callFUT(CODEC)
+            self.assertEqual(MUT._CODEC, [CODEC])
+
+    def test_reset(self):
+        from gcloud._testing import _Monkey
+        from gcloud import codec as MUT
+        with _Monkey(MUT, _CODEC=[object()]):
+            self._callFUT(None)
+            self.assertEqual(MUT._CODEC, [])
+
+
+class Test_dumps_loads(unittest2.TestCase):
+
+    def test_w_codec(self):
+        from gcloud._testing import _Monkey
+        from gcloud import codec as MUT
+        codec = _Codec()
+        with _Monkey(MUT, _CODEC=[codec]):
+            self.assertEqual(MUT.dumps({'foo': 1}), b'dumped')
+            self.assertEqual(MUT.loads(b'{}'), 'loaded')
+        self.assertEqual(codec._dumped, [{'foo': 1}])
+        self.assertEqual(codec._loaded, [b'{}'])
+
+
+class _Codec(object):
+
+    def __init__(self):
+        self._dumped = []
+        self._loaded = []
+
+    def dumps(self, value):
+        self._dumped.append(value)
+        return b'dumped'
+
+    def loads(self, data):
+        self._loaded.append(data)
+        return 'loaded'
@@ -15,6 +15,22 @@
 import unittest2
 
 
+class Test__gzip(unittest2.TestCase):
+
+    def _callFUT(self, data):
+        from gcloud.connection import _gzip
+        return _gzip(data)
+
+    def test_roundtrip(self):
+        import gzip
+        import io
+        DATA = b'abc' * 1000
+        compressed = self._callFUT(DATA)
+        self.assertTrue(len(compressed) < len(DATA))
+        self.assertEqual(
+            gzip.GzipFile(fileobj=io.BytesIO(compressed)).read(), DATA)
+
+
 class TestConnection(unittest2.TestCase):
 
     def _getTargetClass(self):
@@ -40,24 +56,40 @@ class TestConnection(unittest2.TestCase):
         self.assertEqual(conn.credentials, None)
         self.assertTrue(conn.http is http)
 
+    def test_ctor_w_token_cache(self):
+        from oauth2client.client import GoogleCredentials
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+
+        def _credentials():
+            return GoogleCredentials(None, 'client-id', 'secret', 'refresh',
+                                     None, 'https://example.com/token', None)
+
+        first, second = _credentials(), _credentials()
+        with _Monkey(MUT, _DEFAULT_CACHE=[MUT.TokenCache()]):
+            conn1 = self._makeOne(first)
+            conn2 = self._makeOne(second)
+        self.assertTrue(conn1.credentials is first)
+        self.assertTrue(conn2.credentials is first)
+
     def test_http_w_existing(self):
         conn = self._makeOne()
         conn._http = http = object()
         self.assertTrue(conn.http is http)
 
     def test_http_wo_creds(self):
-        import httplib2
+        from gcloud.transport import PooledHttp
         conn = self._makeOne()
-        self.assertTrue(isinstance(conn.http, httplib2.Http))
+        self.assertTrue(isinstance(conn.http, PooledHttp))
 
     def test_http_w_creds(self):
-        import httplib2
+        from gcloud.transport import PooledHttp
 
         authorized = object()
         credentials = _Credentials(authorized)
         conn = self._makeOne(credentials)
         self.assertTrue(conn.http is authorized)
-        self.assertTrue(isinstance(credentials._called_with, httplib2.Http))
+        self.assertTrue(isinstance(credentials._called_with, PooledHttp))
 
     def test_user_agent_format(self):
         from pkg_resources import get_distribution
@@ -104,18 +136,18 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertTrue(conn.http is http)
 
     def test_http_wo_creds(self):
-        import httplib2
+        from gcloud.transport import PooledHttp
         conn = self._makeOne()
-        self.assertTrue(isinstance(conn.http, httplib2.Http))
+        self.assertTrue(isinstance(conn.http, PooledHttp))
 
     def test_http_w_creds(self):
-        import httplib2
+        from gcloud.transport import PooledHttp
 
         authorized = object()
         credentials = _Credentials(authorized)
         conn = self._makeOne(credentials)
         self.assertTrue(conn.http is authorized)
-        self.assertTrue(isinstance(credentials._called_with, httplib2.Http))
+        self.assertTrue(isinstance(credentials._called_with, PooledHttp))
 
     def test_build_api_url_no_extra_query_params(self):
         conn = self._makeMockOne()
@@ -163,7 +195,7 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertEqual(http._called_with['body'], None)
         expected_headers = {
             'Accept-Encoding': 'gzip',
-            'Content-Length': 0,
+            'Content-Length': '0',
             'User-Agent': conn.USER_AGENT,
         }
         self.assertEqual(http._called_with['headers'], expected_headers)
@@ -181,12 +213,24 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertEqual(http._called_with['body'], {})
         expected_headers = {
             'Accept-Encoding': 'gzip',
-            'Content-Length': 0,
+            'Content-Length': '0',
             'Content-Type': 'application/json',
             'User-Agent': conn.USER_AGENT,
         }
         self.assertEqual(http._called_with['headers'], expected_headers)
 
+    def test__make_request_w_text_data(self):
+        conn = self._makeOne()
+        URI = 'http://example.com/test'
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'text/plain'},
+            b'',
+        )
+        conn._make_request('POST', URI, u'\u00e9t\u00e9', 'text/plain')
+        self.assertEqual(http._called_with['body'],
+                         u'\u00e9t\u00e9'.encode('utf-8'))
+        self.assertEqual(http._called_with['headers']['Content-Length'], '5')
+
     def test__make_request_w_extra_headers(self):
         conn = self._makeOne()
         URI = 'http://example.com/test'
@@ -200,7 +244,7 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertEqual(http._called_with['body'], None)
         expected_headers = {
             'Accept-Encoding': 'gzip',
-            'Content-Length': 0,
+            'Content-Length': '0',
             'X-Foo': 'foo',
             'User-Agent': conn.USER_AGENT,
         }
@@ -225,7 +269,7 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertEqual(http._called_with['body'], None)
         expected_headers = {
             'Accept-Encoding': 'gzip',
-            'Content-Length': 0,
+            'Content-Length': '0',
             'User-Agent': conn.USER_AGENT,
         }
         self.assertEqual(http._called_with['headers'], expected_headers)
@@ -274,15 +318,14 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertEqual(http._called_with['body'], None)
         expected_headers = {
             'Accept-Encoding': 'gzip',
-            'Content-Length': 0,
+            'Content-Length': '0',
             'User-Agent': conn.USER_AGENT,
         }
         self.assertEqual(http._called_with['headers'], expected_headers)
 
     def test_api_request_w_data(self):
-        import json
         DATA = {'foo': 'bar'}
-        DATAJ = json.dumps(DATA)
+        DATAJ = b'{"foo":"bar"}'
         conn = self._makeMockOne()
         # Intended to emulate self.mock_template
         URI = '/'.join([
@@ -301,12 +344,187 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertEqual(http._called_with['body'], DATAJ)
         expected_headers = {
             'Accept-Encoding': 'gzip',
-            'Content-Length': len(DATAJ),
+            'Content-Length': str(len(DATAJ)),
             'Content-Type': 'application/json',
             'User-Agent': conn.USER_AGENT,
         }
         self.assertEqual(http._called_with['headers'], expected_headers)
 
+    def test_api_request_w_compress_wo_threshold(self):
+        conn = self._makeMockOne()
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json'},
+            b'{}',
+        )
+        conn.api_request('POST', '/', data={'foo': 'bar'}, compress=True)
+        self.assertEqual(http._called_with['body'], b'{"foo":"bar"}')
+        self.assertFalse('Content-Encoding' in http._called_with['headers'])
+
+    def test_api_request_w_compress_below_threshold(self):
+        conn = self._makeMockOne()
+        conn.compression_threshold = 100
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json'},
+            b'{}',
+        )
+        conn.api_request('POST', '/', data={'foo': 'bar'}, compress=True)
+        self.assertEqual(http._called_with['body'], b'{"foo":"bar"}')
+        self.assertFalse('Content-Encoding' in http._called_with['headers'])
+
+    def test_api_request_w_compress_above_threshold(self):
+        import gzip
+        import io
+        from gcloud import metrics
+        DATA = {'foo': 'bar' * 100}
+        DATAJ = b'{"foo":"' + b'bar' * 100 + b'"}'
+        conn = self._makeMockOne()
+        conn.compression_threshold = 100
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json'},
+            b'{}',
+        )
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            conn.api_request('POST', '/', data=DATA, compress=True)
+        finally:
+            metrics.unregister_hook(hook)
+        body = http._called_with['body']
+        self.assertEqual(
+            gzip.GzipFile(fileobj=io.BytesIO(body)).read(), DATAJ)
+        expected_headers = {
+            'Accept-Encoding': 'gzip',
+            'Content-Encoding': 'gzip',
+            'Content-Length': str(len(body)),
+            'Content-Type': 'application/json',
+            'User-Agent': conn.USER_AGENT,
+        }
+        self.assertEqual(http._called_with['headers'], expected_headers)
+        info, = hook._finished
+        self.assertEqual(info.payload_bytes, len(body))
+        self.assertEqual(info.uncompressed_bytes, len(DATAJ))
+        self.assertTrue(info.compression_ratio > 1.0)
+
+    def test_api_request_w_threshold_wo_compress(self):
+        conn = self._makeMockOne()
+        conn.compression_threshold = 0
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json'},
+            b'{}',
+        )
+        conn.api_request('POST', '/', data={'foo': 'bar'})
+        self.assertEqual(http._called_with['body'], b'{"foo":"bar"}')
+        self.assertFalse('Content-Encoding' in http._called_with['headers'])
+
+    def test_api_request_w_unknown_option(self):
+        conn = self._makeMockOne()
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json'},
+            b'{}',
+        )
+        self.assertRaises(TypeError, conn.api_request, 'GET', '/',
+                          bogus=True)
+        self.assertEqual(http._called_with, None)
+
+    def test_api_request_conditional_wo_cache(self):
+        conn = self._makeMockOne()
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json',
+             'etag': 'abc'},
+            b'{"foo": "bar"}',
+        )
+        self.assertEqual(conn.api_request('GET', '/', conditional=True),
+                         {'foo': 'bar'})
+        self.assertFalse('If-None-Match' in http._called_with['headers'])
+
+    def test_api_request_conditional_miss_then_hit(self):
+        from gcloud.etag_cache import ETagCache
+        conn = self._makeMockOne()
+        cache = conn.etag_cache = ETagCache()
+        http = conn._http = _HttpMultiple(
+            ({'status': '200', 'content-type': 'application/json',
+              'etag': 'abc'}, b'{"foo": "bar"}'),
+            ({'status': '304'}, b''),
+        )
+        first = conn.api_request('GET', '/b/x', conditional=True)
+        second = conn.api_request('GET', '/b/x', conditional=True)
+        self.assertEqual(first, {'foo': 'bar'})
+        self.assertEqual(second, {'foo': 'bar'})
+        self.assertFalse(first is second)
+        self.assertFalse('If-None-Match' in http._called_with[0]['headers'])
+        self.assertEqual(http._called_with[1]['headers']['If-None-Match'],
+                         'abc')
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_api_request_conditional_changed(self):
+        from gcloud.etag_cache import ETagCache
+        conn = self._makeMockOne()
+        cache = conn.etag_cache = ETagCache()
+        URL = conn.build_api_url('/b/x')
+        cache.put(URL, 'old', {'foo': 'old'})
+        conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json',
+             'etag': 'new'},
+            b'{"foo": "new"}',
+        )
+        self.assertEqual(conn.api_request('GET', '/b/x', conditional=True),
+                         {'foo': 'new'})
+        self.assertEqual(cache.get(URL), ('new', {'foo': 'new'}))
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 1)
+
+    def test_api_request_conditional_wo_etag(self):
+        from gcloud.etag_cache import ETagCache
+        conn = self._makeMockOne()
+        cache = conn.etag_cache = ETagCache()
+        conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json'},
+            b'{"foo": "bar"}',
+        )
+        conn.api_request('GET', '/b/x', conditional=True)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 1)
+
+    def test_api_request_unconditional_w_cache(self):
+        from gcloud.etag_cache import ETagCache
+        conn = self._makeMockOne()
+        cache = conn.etag_cache = ETagCache()
+        URL = conn.build_api_url('/b/x')
+        cache.put(URL, 'abc', {'foo': 'bar'})
+        http = conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json',
+             'etag': 'def'},
+            b'{"foo": "baz"}',
+        )
+        conn.api_request('GET', '/b/x')
+        self.assertFalse('If-None-Match' in http._called_with['headers'])
+        self.assertEqual(cache.get(URL), ('abc', {'foo': 'bar'}))
+        self.assertEqual(cache.misses, 0)
+
+    def test_api_request_w_cache_invalidated_by_update(self):
+        from gcloud.etag_cache import ETagCache
+        conn = self._makeMockOne()
+        cache = conn.etag_cache = ETagCache()
+        cache.put(conn.build_api_url('/b/x', {'projection': 'noAcl'}),
+                  'abc', {'foo': 'bar'})
+        conn._http = _Http(
+            {'status': '200', 'content-type': 'application/json'},
+            b'{"foo": "baz"}',
+        )
+        conn.api_request('PATCH', '/b/x', data={'foo': 'baz'},
+                         query_params={'projection': 'full'})
+        self.assertEqual(len(cache), 0)
+
+    def test_api_request_w_304_not_cached(self):
+        from gcloud.etag_cache import ETagCache
+        from gcloud.exceptions import NotModified
+        conn = self._makeMockOne()
+        conn.etag_cache = ETagCache()
+        conn._http = _Http({'status': '304'}, b'{}')
+        self.assertRaises(NotModified, conn.api_request, 'GET', '/b/x',
+                          conditional=True)
+
     def test_api_request_w_404(self):
         from gcloud.exceptions import NotFound
         conn = self._makeMockOne()
@@ -317,13 +535,130 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertRaises(NotFound, conn.api_request, 'GET', '/')
 
     def test_api_request_w_500(self):
+        from gcloud._testing import _Monkey
+        from gcloud import retry as MUT
+        from gcloud.exceptions import InternalServerError
+        conn = self._makeMockOne()
+        conn._http = _Http(
+            {'status': '500', 'content-type': 'text/plain'},
+            b'{}',
+        )
+        slept = []
+        with _Monkey(MUT, _SLEEP=slept.append):
+            self.assertRaises(InternalServerError,
+                              conn.api_request, 'GET', '/')
+        self.assertEqual(conn.retry.attempts, conn.retry.max_attempts)
+        self.assertEqual(len(slept), conn.retry.max_attempts - 1)
+
+    def test_api_request_w_hook(self):
+        from gcloud._testing import _Monkey
+        from gcloud import metrics
+        from gcloud import retry as MUT
+        conn = self._makeMockOne()
+        type(conn).API_VERSION = 'v1'
+        conn._http = _HttpMultiple(
+            ({'status': '503', 'content-type': 'text/plain'}, b'{}'),
+            ({'status': '200', 'content-type': 'application/json'},
+             b'{"foo": "bar"}'),
+        )
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            with _Monkey(MUT, _SLEEP=lambda seconds: None):
+                conn.api_request('GET', '/b/bucket', query_params={'a': 1})
+        finally:
+            metrics.unregister_hook(hook)
+        info, = hook._finished
+        self.assertEqual(info.method, 'GET')
+        self.assertEqual(info.url_template, '/mock/v1/b/{}')
+        self.assertEqual(info.status, 200)
+        self.assertEqual(info.retries, 1)
+        self.assertEqual(info.payload_bytes, 0)
+        self.assertEqual(info.response_bytes, 14)
+        self.assertEqual(info.error, None)
+
+    def test_api_request_w_hook_and_transport_error(self):
+        from gcloud import metrics
+        conn = self._makeMockOne()
+        conn._http = _HttpFailure()
+        hook = _Hook()
+        metrics.register_hook(hook)
+        try:
+            self.assertRaises(_Failure, conn.api_request, 'POST', '/',
+                              data={'foo': 'bar'})
+        finally:
+            metrics.unregister_hook(hook)
+        info, = hook._finished
+        self.assertEqual(info.status, None)
+        self.assertEqual(info.retries, 0)
+        self.assertEqual(info.payload_bytes, len(b'{"foo":"bar"}'))
+        self.assertTrue(isinstance(info.error, _Failure))
+
+    def test_api_request_w_500_non_idempotent(self):
         from gcloud.exceptions import InternalServerError
         conn = self._makeMockOne()
         conn._http = _Http(
             {'status': '500', 'content-type': 'text/plain'},
             b'{}',
         )
-        self.assertRaises(InternalServerError, conn.api_request, 'GET', '/')
+        self.assertRaises(InternalServerError, conn.api_request, 'POST', '/')
+        self.assertEqual(conn.retry.attempts, 1)
+        self.assertEqual(conn.retry.retries, 0)
+
+    def test_api_request_w_503_then_success(self):
+        from gcloud._testing import _Monkey
+        from gcloud import retry as MUT
+        conn = self._makeMockOne()
+        http = conn._http = _HttpMultiple(
+            ({'status': '503', 'content-type': 'text/plain',
+              'retry-after': '7'}, b'{}'),
+            ({'status': '200', 'content-type': 'application/json'},
+             b'{"foo": "bar"}'),
+        )
+        slept = []
+        with _Monkey(MUT, _SLEEP=slept.append):
+            result = conn.api_request('GET', '/')
+        self.assertEqual(result, {'foo': 'bar'})
+        self.assertEqual(len(http._called_with), 2)
+        self.assertEqual(slept, [7.0])
+        self.assertEqual(conn.retry.attempts, 2)
+        self.assertEqual(conn.retry.retries, 1)
+        self.assertEqual(conn.retry.sleep_seconds, 7.0)
+
+    def test_api_request_w_explicit_retry(self):
+        from gcloud._testing import _Monkey
+        from gcloud import retry as MUT
+        from gcloud.retry import Retry
+        conn = self._makeMockOne()
+        http = conn._http = _HttpMultiple(
+            ({'status': '429', 'content-type': 'text/plain'}, b'{}'),
+            ({'status': '200', 'content-type': 'application/json'}, b'{}'),
+        )
+        retry = Retry(methods=None, initial_delay=0.5, jitter=0)
+        slept = []
+        with _Monkey(MUT, _SLEEP=slept.append):
+            result = conn.api_request('POST', '/', data={}, retry=retry)
+        self.assertEqual(result, {})
+        self.assertEqual(len(http._called_with), 2)
+        self.assertEqual(slept, [0.5])
+        self.assertEqual(retry.attempts, 2)
+        self.assertEqual(conn._retry, None)
+
+    def test_retry_default(self):
+        from gcloud.retry import Retry
+        conn = self._makeOne()
+        retry = conn.retry
+        self.assertTrue(isinstance(retry, Retry))
+        self.assertTrue(conn.retry is retry)
+
+    def test_retry_setter(self):
+        from gcloud.retry import Retry
+        conn = self._makeOne()
+        retry = Retry(max_attempts=1)
+        conn.retry = retry
+        self.assertTrue(conn.retry is retry)
+        conn.retry = None
+        self.assertFalse(conn.retry is retry)
 
     def test_api_request_non_binary_response(self):
         conn = self._makeMockOne()
@@ -345,7 +680,7 @@ class TestJSONConnection(unittest2.TestCase):
         self.assertEqual(http._called_with['body'], None)
         expected_headers = {
             'Accept-Encoding': 'gzip',
-            'Content-Length': 0,
+            'Content-Length': '0',
             'User-Agent': conn.USER_AGENT,
         }
         self.assertEqual(http._called_with['headers'], expected_headers)
@@ -365,6 +700,41 @@ class _Http(object):
         return self._response, self._content
 
 
+class _HttpMultiple(object):
+
+    def __init__(self, *responses):
+        from httplib2 import Response
+        self._responses = [(Response(headers), content)
+                           for headers, content in responses]
+        self._called_with = []
+
+    def request(self, **kw):
+        self._called_with.append(kw)
+        return self._responses.pop(0)
+
+
+class _Failure(Exception):
+    pass
+
+
+class _HttpFailure(object):
+
+    def request(self, **kw):
+        raise _Failure()
+
+
+class _Hook(object):
+
+    def __init__(self):
+        self._finished = []
+
+    def before_request(self, info):
+        pass
+
+    def after_request(self, info):
+        self._finished.append(info)
+
+
 class _Credentials(object):
 
     _scopes = None
@@ -225,6 +225,132 @@ class Test_generate_signed_url(unittest2.TestCase):
         self.assertEqual(frag, '')
 
 
+class TestURLSigner(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.credentials import URLSigner
+        return URLSigner
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor(self):
+        credentials = _makeServiceAccountCredentials()
+        signer = self._makeOne(credentials, 'http://api.example.com')
+        self.assertEqual(signer.api_access_endpoint, 'http://api.example.com')
+        self.assertEqual(signer.service_account_name,
+                         credentials._service_account_email)
+
+    def test_sign_matches_generate_signed_url(self):
+        import datetime
+        from gcloud.credentials import generate_signed_url
+        ENDPOINT = 'http://api.example.com'
+        credentials = _makeServiceAccountCredentials()
+        signer = self._makeOne(credentials, ENDPOINT)
+        expected = generate_signed_url(
+            credentials, '/name/path', 1000, api_access_endpoint=ENDPOINT,
+            method='PUT', content_md5='MD5', content_type='text/plain')
+        self.assertEqual(
+            signer.sign('/name/path', 1000, method='PUT', content_md5='MD5',
+                        content_type='text/plain'),
+            expected)
+        expiration = datetime.datetime(1970, 1, 1, 0, 16, 40)
+        self.assertEqual(signer.sign('/name/path', expiration),
+                         generate_signed_url(credentials, '/name/path', 1000,
+                                             api_access_endpoint=ENDPOINT))
+
+    def test_sign_many(self):
+        credentials = _makeServiceAccountCredentials()
+        signer = self._makeOne(credentials)
+        requests = [('/name/one', 1000), ('/name/two', 2000, 'DELETE')]
+        self.assertEqual(signer.sign_many(requests),
+                         [signer.sign('/name/one', 1000),
+                          signer.sign('/name/two', 2000, 'DELETE')])
+        self.assertEqual(signer.sign_many(iter([])), [])
+
+    def test_sign_many_w_processes(self):
+        credentials = _makeServiceAccountCredentials()
+        signer = self._makeOne(credentials)
+        requests = [('/name/%d' % (index,), 1000) for index in range(5)]
+        self.assertEqual(signer.sign_many(requests, processes=2, chunksize=2),
+                         signer.sign_many(requests))
+
+    def test_pickle(self):
+        from six.moves import cPickle as pickle
+        signer = self._makeOne(_makeServiceAccountCredentials())
+        copied = pickle.loads(pickle.dumps(signer))
+        self.assertEqual(copied.service_account_name,
+                         signer.service_account_name)
+        self.assertEqual(copied.sign('/name/path', 1000),
+                         signer.sign('/name/path', 1000))
+
+    def test_worker_helpers(self):
+        from gcloud._testing import _Monkey
+        from gcloud import credentials as MUT
+        signer = self._makeOne(_makeServiceAccountCredentials())
+        with _Monkey(MUT, _WORKER_SIGNER=[]):
+            MUT._init_signing_worker(signer)
+            self.assertEqual(MUT._sign_in_worker(u'STRING'),
+                             signer._get_signature(b'STRING'))
+
+
+class TestURLSignerAppEngine(unittest2.TestCase):
+
+    def setUp(self):
+        self.APP_IDENTITY = _AppIdentity('SERVICE_ACCOUNT_NAME')
+        _setup_appengine_import(self, self.APP_IDENTITY)
+
+    def tearDown(self):
+        _teardown_appengine_import(self)
+
+    def _makeOne(self):
+        from oauth2client.appengine import AppAssertionCredentials
+        from gcloud.credentials import URLSigner
+        return URLSigner(AppAssertionCredentials([]))
+
+    def test_sign_many(self):
+        import base64
+        from six.moves.urllib.parse import parse_qs
+        from six.moves.urllib.parse import urlsplit
+        from oauth2client.appengine import AppAssertionCredentials
+        from gcloud._testing import _Monkey
+        from gcloud import credentials as MUT
+
+        with _Monkey(MUT, _GAECreds=AppAssertionCredentials,
+                     app_identity=self.APP_IDENTITY):
+            signer = self._makeOne()
+            url, = signer.sign_many([('/name/path', 1000)])
+
+        params = parse_qs(urlsplit(url).query)
+        self.assertEqual(params['GoogleAccessId'], ['SERVICE_ACCOUNT_NAME'])
+        string_to_sign = b'GET\n\n\n1000\n/name/path'
+        self.assertEqual(self.APP_IDENTITY._strings_signed, [string_to_sign])
+        self.assertEqual(params['Signature'],
+                         [base64.b64encode(string_to_sign).decode('ascii')])
+
+    def test_sign_many_w_processes(self):
+        from oauth2client.appengine import AppAssertionCredentials
+        from gcloud._testing import _Monkey
+        from gcloud import credentials as MUT
+
+        with _Monkey(MUT, _GAECreds=AppAssertionCredentials,
+                     app_identity=self.APP_IDENTITY):
+            signer = self._makeOne()
+            self.assertRaises(ValueError, signer.sign_many,
+                              [('/name/path', 1000)], processes=2)
+
+    def test_pickle(self):
+        from six.moves import cPickle as pickle
+        from oauth2client.appengine import AppAssertionCredentials
+        from gcloud._testing import _Monkey
+        from gcloud import credentials as MUT
+
+        with _Monkey(MUT, _GAECreds=AppAssertionCredentials,
+                     app_identity=self.APP_IDENTITY):
+            signer = self._makeOne()
+        self.assertRaises(ValueError, pickle.dumps, signer)
+
+
 class Test__get_signature_bytes(unittest2.TestCase):
 
     def setUp(self):
@@ -567,6 +693,19 @@ class Test__get_expiration_seconds(unittest2.TestCase):
         self.assertEqual(result, utc_seconds + 86400)
 
 
+_PRIVATE_KEY_PEM = []
+
+
+def _makeServiceAccountCredentials():
+    from Crypto.PublicKey import RSA
+    from oauth2client import service_account
+    if not _PRIVATE_KEY_PEM:
+        _PRIVATE_KEY_PEM.append(RSA.generate(1024).exportKey(pkcs=8))
+    return service_account._ServiceAccountCredentials(
+        'service-account-id', 'testing@example.com', 'private-key-id',
+        _PRIVATE_KEY_PEM[0], [])
+
+
 class _Credentials(object):
 
     service_account_name = 'testing@example.com'
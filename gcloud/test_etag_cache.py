@@ -0,0 +1,115 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+class Test__copy_json(unittest2.TestCase):
+
+    def _callFUT(self, value):
+        from gcloud.etag_cache import _copy_json
+        return _copy_json(value)
+
+    def test_nested(self):
+        VALUE = {'a': [1, {'b': 'c'}], 'd': None}
+        copied = self._callFUT(VALUE)
+        self.assertEqual(copied, VALUE)
+        self.assertFalse(copied is VALUE)
+        self.assertFalse(copied['a'] is VALUE['a'])
+        self.assertFalse(copied['a'][1] is VALUE['a'][1])
+
+
+class TestETagCache(unittest2.TestCase):
+
+    URL = 'https://www.googleapis.com/storage/v1/b/bucket'
+
+    def _getTargetClass(self):
+        from gcloud.etag_cache import ETagCache
+        return ETagCache
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor_defaults(self):
+        from gcloud.etag_cache import DEFAULT_MAX_SIZE
+        cache = self._makeOne()
+        self.assertEqual(cache.max_size, DEFAULT_MAX_SIZE)
+        self.assertEqual(cache.ttl, None)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
+
+    def test_get_miss(self):
+        cache = self._makeOne()
+        self.assertEqual(cache.get(self.URL), None)
+
+    def test_put_and_get(self):
+        RESOURCE = {'name': 'bucket', 'labels': {'a': 'b'}}
+        cache = self._makeOne()
+        cache.put(self.URL + '?projection=noAcl', 'abc', RESOURCE)
+        RESOURCE['labels']['a'] = 'changed'
+        etag, resource = cache.get(self.URL + '?projection=noAcl')
+        self.assertEqual(etag, 'abc')
+        self.assertEqual(resource, {'name': 'bucket', 'labels': {'a': 'b'}})
+        resource['labels']['a'] = 'changed'
+        self.assertEqual(cache.get(self.URL + '?projection=noAcl')[1],
+                         {'name': 'bucket', 'labels': {'a': 'b'}})
+
+    def test_get_w_other_query(self):
+        cache = self._makeOne()
+        cache.put(self.URL + '?projection=noAcl', 'abc', {})
+        self.assertEqual(cache.get(self.URL + '?projection=full'), None)
+
+    def test_get_expired(self):
+        from gcloud._testing import _Monkey
+        from gcloud import etag_cache as MUT
+        cache = self._makeOne(ttl=10)
+        with _Monkey(MUT, _NOW=lambda: 100.0):
+            cache.put(self.URL, 'abc', {})
+        with _Monkey(MUT, _NOW=lambda: 110.0):
+            self.assertEqual(cache.get(self.URL), ('abc', {}))
+        with _Monkey(MUT, _NOW=lambda: 110.5):
+            self.assertEqual(cache.get(self.URL), None)
+        self.assertEqual(len(cache), 0)
+
+    def test_put_evicts_least_recently_used(self):
+        cache = self._makeOne(max_size=2)
+        cache.put(self.URL + '/1', 'one', {})
+        cache.put(self.URL + '/2', 'two', {})
+        cache.get(self.URL + '/1')
+        cache.put(self.URL + '/3', 'three', {})
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(self.URL + '/2'), None)
+        self.assertEqual(cache.get(self.URL + '/1'), ('one', {}))
+        self.assertEqual(cache.get(self.URL + '/3'), ('three', {}))
+
+    def test_invalidate(self):
+        cache = self._makeOne()
+        cache.put(self.URL + '?projection=noAcl', 'abc', {})
+        cache.invalidate(self.URL + '?projection=full')
+        cache.invalidate(self.URL + '/o/missing')
+        self.assertEqual(len(cache), 0)
+
+    def test_counters_and_clear(self):
+        cache = self._makeOne()
+        cache.put(self.URL, 'abc', {})
+        cache.record_hit()
+        cache.record_hit()
+        cache.record_miss()
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
@@ -33,6 +33,66 @@ class TestIterator(unittest2.TestCase):
         self.assertEqual(iterator.path, PATH)
         self.assertEqual(iterator.page_number, 0)
         self.assertEqual(iterator.next_page_token, None)
+        self.assertEqual(iterator.prefetch, 0)
+        self.assertEqual(iterator.checkpoint_callback, None)
+        self.assertEqual(iterator.checkpoint_every, 1)
+
+    def test_ctor_w_prefetch(self):
+        connection = _Connection()
+        client = _Client(connection)
+        iterator = self._makeOne(client, '/foo', prefetch=2)
+        self.assertEqual(iterator.prefetch, 2)
+
+    def test_ctor_w_invalid_checkpoint_every(self):
+        client = _Client(_Connection())
+        self.assertRaises(ValueError, self._makeOne, client, '/foo',
+                          checkpoint_every=0)
+
+    def test_checkpoint_every_setter(self):
+        client = _Client(_Connection())
+        iterator = self._makeOne(client, '/foo')
+        iterator.checkpoint_every = 10
+        self.assertEqual(iterator.checkpoint_every, 10)
+        with self.assertRaises(ValueError):
+            iterator.checkpoint_every = 0
+        self.assertEqual(iterator.checkpoint_every, 10)
+
+    def test___iter__w_prefetch(self):
+        PATH = '/foo'
+        TOKEN = 'token'
+
+        def _get_items(response):
+            return [item['name'] for item in response.get('items', [])]
+        connection = _Connection(
+            {'items': [{'name': 'key1'}, {'name': 'key2'}],
+             'nextPageToken': TOKEN},
+            {'items': [{'name': 'key3'}]})
+        client = _Client(connection)
+        iterator = self._makeOne(client, PATH, prefetch=1)
+        iterator.get_items_from_response = _get_items
+        self.assertEqual(list(iterator), ['key1', 'key2', 'key3'])
+        first, second = connection._requested
+        self.assertEqual(first['query_params'], {})
+        self.assertEqual(second['query_params'], {'pageToken': TOKEN})
+        self.assertEqual(iterator.page_number, 2)
+
+    def test___iter__w_prefetch_error(self):
+        from gcloud.exceptions import NotFound
+        PATH = '/foo'
+
+        def _get_items(response):
+            return [item['name'] for item in response.get('items', [])]
+        connection = _Connection(
+            {'items': [{'name': 'key1'}], 'nextPageToken': 'token'},
+            NotFound('gone'))
+        client = _Client(connection)
+        iterator = self._makeOne(client, PATH, prefetch=2)
+        iterator.get_items_from_response = _get_items
+        consumed = []
+        with self.assertRaises(NotFound):
+            for item in iterator:
+                consumed.append(item)
+        self.assertEqual(consumed, ['key1'])
 
     def test___iter__(self):
         PATH = '/foo'
@@ -163,6 +223,123 @@ class TestIterator(unittest2.TestCase):
         self.assertEqual(iterator.page_number, 0)
         self.assertEqual(iterator.next_page_token, None)
 
+    def test_reset_clears_restored_position(self):
+        connection = _Connection()
+        client = _Client(connection)
+        iterator = self._makeOne(client, '/foo')
+        iterator.restore(self._makeOne(client, '/foo').checkpoint())
+        iterator._skip_items = 3
+        iterator.reset()
+        self.assertEqual(iterator._skip_items, 0)
+        other = self._makeOne(client, '/foo')
+        self.assertEqual(iterator.checkpoint(), other.checkpoint())
+
+    def _makePaged(self, *pages, **kw):
+        pages = list(pages)
+        responses = []
+        for index, names in enumerate(pages):
+            response = {'items': [{'name': name} for name in names]}
+            if index < len(pages) - 1:
+                response['nextPageToken'] = 'token-%d' % (index + 1,)
+            responses.append(response)
+        connection = _Connection(*responses)
+        iterator = self._makeOne(_Client(connection), '/foo', **kw)
+        iterator.get_items_from_response = _get_names
+        return iterator, connection
+
+    def test_checkpoint_new(self):
+        import base64
+        import json
+        iterator, _ = self._makePaged()
+        state = json.loads(base64.urlsafe_b64decode(
+            iterator.checkpoint().encode('ascii')).decode('utf-8'))
+        self.assertEqual(state, {'path': '/foo', 'page_number': 0,
+                                 'page_token': None, 'offset': 0})
+
+    def test_checkpoint_w_page_token(self):
+        iterator, _ = self._makePaged(['b'])
+        iterator.next_page_token = 'start'
+        restored, _ = self._makePaged()
+        restored.restore(iterator.checkpoint())
+        self.assertEqual(restored.page_number, 0)
+        self.assertEqual(restored.next_page_token, 'start')
+
+    def test_checkpoint_mid_page_and_restore(self):
+        iterator, _ = self._makePaged(['a', 'b', 'c'], ['d', 'e'])
+        items = iter(iterator)
+        self.assertEqual([next(items), next(items)], ['a', 'b'])
+        token = iterator.checkpoint()
+
+        restored, connection = self._makePaged(['a', 'b', 'c'], ['d', 'e'])
+        restored.restore(token)
+        self.assertEqual(restored.checkpoint(), token)
+        self.assertEqual(list(restored), ['c', 'd', 'e'])
+        self.assertEqual(connection._requested[0]['query_params'], {})
+
+    def test_checkpoint_exhausted(self):
+        iterator, _ = self._makePaged(['a', 'b'], ['c'])
+        self.assertEqual(list(iterator), ['a', 'b', 'c'])
+        token = iterator.checkpoint()
+
+        restored, connection = self._makePaged(['c'])
+        restored.restore(token)
+        self.assertEqual(restored.page_number, 2)
+        self.assertEqual(restored.next_page_token, None)
+        self.assertEqual(list(restored), [])
+        self.assertEqual(connection._requested, [])
+
+    def test_restore_skips_only_first_page(self):
+        iterator, _ = self._makePaged(['a', 'b'], ['c', 'd'])
+        items = iter(iterator)
+        next(items)
+        token = iterator.checkpoint()
+        restored, _ = self._makePaged(['a', 'b'], ['c', 'd'])
+        restored.restore(token)
+        self.assertEqual(list(restored), ['b', 'c', 'd'])
+
+    def test_checkpoint_w_prefetch_tracks_consumed(self):
+        iterator, connection = self._makePaged(
+            ['a', 'b'], ['c'], prefetch=2)
+        items = iter(iterator)
+        self.assertEqual(next(items), 'a')
+        token = iterator.checkpoint()
+        self.assertEqual(list(items), ['b', 'c'])
+        self.assertEqual(iterator.page_number, 2)
+
+        restored, _ = self._makePaged(['a', 'b'], ['c'])
+        restored.restore(token)
+        self.assertEqual(list(restored), ['b', 'c'])
+
+    def test_checkpoint_callback(self):
+        tokens = []
+        iterator, _ = self._makePaged(
+            ['a'], ['b'], ['c'], ['d'], ['e'],
+            checkpoint_callback=tokens.append, checkpoint_every=2)
+        self.assertEqual(list(iterator), ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(len(tokens), 2)
+
+        restored, connection = self._makePaged(['e'])
+        restored.restore(tokens[-1])
+        self.assertEqual(restored.page_number, 4)
+        self.assertEqual(restored.next_page_token, 'token-4')
+        self.assertEqual(list(restored), ['e'])
+        self.assertEqual(connection._requested[0]['query_params'],
+                         {'pageToken': 'token-4'})
+
+    def test_restore_wrong_path(self):
+        iterator, _ = self._makePaged()
+        other = self._makeOne(_Client(_Connection()), '/bar')
+        self.assertRaises(ValueError, other.restore, iterator.checkpoint())
+        self.assertEqual(other.page_number, 0)
+
+    def test_restore_invalid_token(self):
+        import base64
+        iterator, _ = self._makePaged()
+        missing_keys = base64.urlsafe_b64encode(b'{}').decode('ascii')
+        for token in ('not-base64!', missing_keys,
+                      base64.urlsafe_b64encode(b'nope').decode('ascii')):
+            self.assertRaises(ValueError, iterator.restore, token)
+
     def test_get_items_from_response_raises_NotImplementedError(self):
         PATH = '/foo'
         connection = _Connection()
@@ -172,6 +349,10 @@ class TestIterator(unittest2.TestCase):
                           iterator.get_items_from_response, object())
 
 
+def _get_names(response):
+    return [item['name'] for item in response.get('items', [])]
+
+
 class _Connection(object):
 
     def __init__(self, *responses):
@@ -181,6 +362,8 @@ class _Connection(object):
     def api_request(self, **kw):
         self._requested.append(kw)
         response, self._responses = self._responses[0], self._responses[1:]
+        if isinstance(response, Exception):
+            raise response
         return response
 
 
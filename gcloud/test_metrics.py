@@ -0,0 +1,380 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+class TestRequestHook(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.metrics import RequestHook
+        return RequestHook
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_methods_are_noops(self):
+        hook = self._makeOne()
+        self.assertEqual(hook.before_request(object()), None)
+        self.assertEqual(hook.after_request(object()), None)
+
+
+class TestRequestInfo(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.metrics import RequestInfo
+        return RequestInfo
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor(self):
+        from gcloud._testing import _Monkey
+        from gcloud import metrics as MUT
+        URL = 'https://www.googleapis.com/storage/v1/b/bucket?a=1'
+        with _Monkey(MUT, _NOW=lambda: 123.0):
+            info = self._makeOne('GET', URL, 12)
+        self.assertEqual(info.method, 'GET')
+        self.assertEqual(info.url, URL)
+        self.assertEqual(info.url_template, '/storage/v1/b/{}')
+        self.assertEqual(info.payload_bytes, 12)
+        self.assertEqual(info.uncompressed_bytes, 12)
+        self.assertEqual(info.compression_ratio, 1.0)
+        self.assertEqual(info.started, 123.0)
+        self.assertEqual(info.response_bytes, None)
+        self.assertEqual(info.status, None)
+        self.assertEqual(info.retries, 0)
+        self.assertEqual(info.elapsed, None)
+        self.assertEqual(info.error, None)
+
+    def test_ctor_w_uncompressed_bytes(self):
+        info = self._makeOne('POST', 'http://example.com/', 25, 100)
+        self.assertEqual(info.payload_bytes, 25)
+        self.assertEqual(info.uncompressed_bytes, 100)
+        self.assertEqual(info.compression_ratio, 4.0)
+
+    def test_compression_ratio_wo_payload(self):
+        info = self._makeOne('GET', 'http://example.com/', 0)
+        self.assertEqual(info.compression_ratio, 1.0)
+
+
+class Test_register_hook(unittest2.TestCase):
+
+    def test_register_and_unregister(self):
+        from gcloud.metrics import _HOOKS
+        from gcloud.metrics import register_hook
+        from gcloud.metrics import unregister_hook
+        hook = _Hook()
+        register_hook(hook)
+        try:
+            self.assertTrue(hook in _HOOKS)
+        finally:
+            unregister_hook(hook)
+        self.assertFalse(hook in _HOOKS)
+
+    def test_unregister_unknown(self):
+        from gcloud.metrics import unregister_hook
+        self.assertRaises(ValueError, unregister_hook, _Hook())
+
+
+class Test_url_template(unittest2.TestCase):
+
+    def _callFUT(self, url):
+        from gcloud.metrics import url_template
+        return url_template(url)
+
+    def test_w_versioned_path(self):
+        self.assertEqual(
+            self._callFUT('https://www.googleapis.com/storage/v1/b/bucket/'
+                          'o/blob?projection=full'),
+            '/storage/v1/b/{}/o/{}')
+
+    def test_w_collection(self):
+        self.assertEqual(
+            self._callFUT('https://www.googleapis.com/storage/v1/b'),
+            '/storage/v1/b')
+
+    def test_w_verb(self):
+        self.assertEqual(
+            self._callFUT('https://pubsub.googleapis.com/v1/projects/'
+                          'proj/topics/topic:publish'),
+            '/v1/projects/{}/topics/{}:publish')
+
+    def test_wo_version(self):
+        self.assertEqual(self._callFUT('http://example.com/b/bucket'),
+                         '/b/{}')
+
+
+class Test_request_started(unittest2.TestCase):
+
+    def _callFUT(self, *args):
+        from gcloud.metrics import request_started
+        return request_started(*args)
+
+    def test_wo_hooks(self):
+        self.assertEqual(self._callFUT('GET', 'http://example.com/', None),
+                         None)
+
+    def test_w_hook(self):
+        from gcloud.metrics import register_hook
+        from gcloud.metrics import unregister_hook
+        hook = _Hook()
+        register_hook(hook)
+        try:
+            info = self._callFUT('POST', 'http://example.com/v1/b', b'body')
+        finally:
+            unregister_hook(hook)
+        self.assertEqual(hook._started, [info])
+        self.assertEqual(info.method, 'POST')
+        self.assertEqual(info.payload_bytes, 4)
+        self.assertEqual(info.uncompressed_bytes, 4)
+
+    def test_w_hook_and_uncompressed_bytes(self):
+        from gcloud.metrics import register_hook
+        from gcloud.metrics import unregister_hook
+        hook = _Hook()
+        register_hook(hook)
+        try:
+            info = self._callFUT('POST', 'http://example.com/v1/b', b'body',
+                                 40)
+        finally:
+            unregister_hook(hook)
+        self.assertEqual(info.payload_bytes, 4)
+        self.assertEqual(info.uncompressed_bytes, 40)
+
+    def test_w_hook_and_non_string_body(self):
+        from gcloud.metrics import register_hook
+        from gcloud.metrics import unregister_hook
+        hook = _Hook()
+        register_hook(hook)
+        try:
+            info = self._callFUT('PUT', 'http://example.com/', object())
+        finally:
+            unregister_hook(hook)
+        self.assertEqual(info.payload_bytes, 0)
+
+
+class Test_request_finished(unittest2.TestCase):
+
+    def _callFUT(self, *args, **kw):
+        from gcloud.metrics import request_finished
+        return request_finished(*args, **kw)
+
+    def test_wo_info(self):
+        self.assertEqual(self._callFUT(None, 200, b'{}'), None)
+
+    def test_w_info(self):
+        from gcloud._testing import _Monkey
+        from gcloud import metrics as MUT
+        hook = _Hook()
+        MUT.register_hook(hook)
+        try:
+            with _Monkey(MUT, _NOW=lambda: 10.0):
+                info = MUT.request_started('GET', 'http://example.com/', '')
+            with _Monkey(MUT, _NOW=lambda: 10.5):
+                self._callFUT(info, '200', u'abc', retries=2)
+        finally:
+            MUT.unregister_hook(hook)
+        self.assertEqual(hook._finished, [info])
+        self.assertEqual(info.elapsed, 0.5)
+        self.assertEqual(info.status, 200)
+        self.assertEqual(info.response_bytes, 3)
+        self.assertEqual(info.retries, 2)
+        self.assertEqual(info.error, None)
+
+    def test_w_error(self):
+        from gcloud import metrics as MUT
+        hook = _Hook()
+        MUT.register_hook(hook)
+        error = ValueError()
+        try:
+            info = MUT.request_started('GET', 'http://example.com/', None)
+            self._callFUT(info, error=error)
+        finally:
+            MUT.unregister_hook(hook)
+        self.assertEqual(info.status, None)
+        self.assertEqual(info.response_bytes, 0)
+        self.assertTrue(info.error is error)
+
+
+class Test_instrument_request(unittest2.TestCase):
+
+    def _callFUT(self, *args):
+        from gcloud.metrics import instrument_request
+        return instrument_request(*args)
+
+    def test_wo_hooks(self):
+        RESULT = (_Response(200), b'')
+        self.assertTrue(
+            self._callFUT('GET', 'http://example.com/', None,
+                          lambda: RESULT) is RESULT)
+
+    def test_w_hook(self):
+        from gcloud.metrics import register_hook
+        from gcloud.metrics import unregister_hook
+        response = _Response(204)
+        hook = _Hook()
+        register_hook(hook)
+        try:
+            result = self._callFUT('DELETE', 'http://example.com/', None,
+                                   lambda: (response, b''))
+        finally:
+            unregister_hook(hook)
+        self.assertEqual(result, (response, b''))
+        info, = hook._finished
+        self.assertEqual(info.status, 204)
+
+    def test_w_hook_and_error(self):
+        from gcloud.metrics import register_hook
+        from gcloud.metrics import unregister_hook
+
+        def _send():
+            raise ValueError()
+
+        hook = _Hook()
+        register_hook(hook)
+        try:
+            self.assertRaises(ValueError, self._callFUT, 'GET',
+                              'http://example.com/', None, _send)
+        finally:
+            unregister_hook(hook)
+        info, = hook._finished
+        self.assertTrue(isinstance(info.error, ValueError))
+
+
+class TestLatencyHistograms(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.metrics import LatencyHistograms
+        return LatencyHistograms
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _makeInfo(self, method='GET', url='http://example.com/v1/b/x',
+                  elapsed=0.0, status=200, retries=0, error=None,
+                  payload_bytes=0, uncompressed_bytes=None,
+                  response_bytes=0):
+        from gcloud.metrics import RequestInfo
+        info = RequestInfo(method, url, payload_bytes, uncompressed_bytes)
+        info.elapsed = elapsed
+        info.status = status
+        info.retries = retries
+        info.error = error
+        info.response_bytes = response_bytes
+        return info
+
+    def test_ctor_defaults(self):
+        from gcloud.metrics import LATENCY_BUCKETS
+        histograms = self._makeOne()
+        self.assertEqual(histograms.buckets, LATENCY_BUCKETS)
+        self.assertEqual(histograms.dump(), {})
+
+    def test_after_request_and_dump(self):
+        histograms = self._makeOne(buckets=[0.1, 1.0])
+        histograms.after_request(self._makeInfo(
+            elapsed=0.05, payload_bytes=3, uncompressed_bytes=12,
+            response_bytes=10))
+        histograms.after_request(self._makeInfo(
+            elapsed=0.5, status=503, retries=2))
+        histograms.after_request(self._makeInfo(
+            elapsed=5.0, status=None, error=ValueError()))
+        histograms.after_request(self._makeInfo(
+            method='POST', elapsed=1.0))
+        histograms.after_request(self._makeInfo(
+            method='PUT', elapsed=0.01, status=304))
+        self.assertEqual(histograms.dump(), {
+            'GET /v1/b/{}': {
+                'count': 3,
+                'errors': 2,
+                'retries': 2,
+                'seconds': 5.55,
+                'payload_bytes': 3,
+                'uncompressed_bytes': 12,
+                'compression_ratio': 4.0,
+                'response_bytes': 10,
+                'buckets': [[0.1, 1], [1.0, 1], [None, 1]],
+            },
+            'POST /v1/b/{}': {
+                'count': 1,
+                'errors': 0,
+                'retries': 0,
+                'seconds': 1.0,
+                'payload_bytes': 0,
+                'uncompressed_bytes': 0,
+                'compression_ratio': 1.0,
+                'response_bytes': 0,
+                'buckets': [[0.1, 0], [1.0, 1], [None, 0]],
+            },
+            'PUT /v1/b/{}': {
+                'count': 1,
+                'errors': 0,
+                'retries': 0,
+                'seconds': 0.01,
+                'payload_bytes': 0,
+                'uncompressed_bytes': 0,
+                'compression_ratio': 1.0,
+                'response_bytes': 0,
+                'buckets': [[0.1, 1], [1.0, 0], [None, 0]],
+            },
+        })
+
+    def test_export(self):
+        import json
+        from six import StringIO
+        histograms = self._makeOne(buckets=[1.0])
+        histograms.after_request(self._makeInfo(elapsed=0.5))
+        file_obj = StringIO()
+        histograms.export(file_obj)
+        self.assertEqual(json.loads(file_obj.getvalue()),
+                         histograms.dump())
+
+    def test_reset(self):
+        histograms = self._makeOne()
+        histograms.after_request(self._makeInfo())
+        histograms.reset()
+        self.assertEqual(histograms.dump(), {})
+
+    def test_registered(self):
+        from gcloud.metrics import register_hook
+        from gcloud.metrics import request_finished
+        from gcloud.metrics import request_started
+        from gcloud.metrics import unregister_hook
+        histograms = self._makeOne()
+        register_hook(histograms)
+        try:
+            info = request_started('GET', 'http://example.com/v1/b/x', None)
+            request_finished(info, 200, b'{}')
+        finally:
+            unregister_hook(histograms)
+        self.assertEqual(histograms.dump()['GET /v1/b/{}']['count'], 1)
+
+
+class _Hook(object):
+
+    def __init__(self):
+        self._started = []
+        self._finished = []
+
+    def before_request(self, info):
+        self._started.append(info)
+
+    def after_request(self, info):
+        self._finished.append(info)
+
+
+class _Response(object):
+
+    def __init__(self, status):
+        self.status = status
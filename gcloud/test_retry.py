@@ -0,0 +1,230 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+class TestRetry(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.retry import Retry
+        return Retry
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _callWithClock(self, retry, method, send, now=0.0):
+        from gcloud._testing import _Monkey
+        from gcloud import retry as MUT
+        clock = _Clock(now)
+        with _Monkey(MUT, _NOW=clock.now, _SLEEP=clock.sleep):
+            result = retry.call(method, send)
+        return result, clock
+
+    def test_ctor_defaults(self):
+        from gcloud.retry import IDEMPOTENT_METHODS
+        from gcloud.retry import RETRYABLE_EXCEPTIONS
+        from gcloud.retry import RETRYABLE_STATUSES
+        retry = self._makeOne()
+        self.assertEqual(retry.max_attempts, 5)
+        self.assertEqual(retry.deadline, 120.0)
+        self.assertEqual(retry.statuses, RETRYABLE_STATUSES)
+        self.assertEqual(retry.exceptions, RETRYABLE_EXCEPTIONS)
+        self.assertEqual(retry.methods, IDEMPOTENT_METHODS)
+        self.assertEqual(retry.attempts, 0)
+        self.assertEqual(retry.retries, 0)
+        self.assertEqual(retry.sleep_seconds, 0.0)
+
+    def test_ctor_explicit(self):
+        retry = self._makeOne(max_attempts=2, deadline=None,
+                              statuses=[500], exceptions=[KeyError],
+                              methods=['post'])
+        self.assertEqual(retry.max_attempts, 2)
+        self.assertEqual(retry.deadline, None)
+        self.assertEqual(retry.statuses, frozenset([500]))
+        self.assertEqual(retry.exceptions, (KeyError,))
+        self.assertEqual(retry.methods, frozenset(['POST']))
+
+    def test_ctor_invalid_max_attempts(self):
+        self.assertRaises(ValueError, self._makeOne, max_attempts=0)
+
+    def test___repr__(self):
+        retry = self._makeOne(max_attempts=3, deadline=10.0)
+        self.assertEqual(repr(retry), '<Retry: max_attempts=3, deadline=10.0>')
+
+    def test_allows(self):
+        retry = self._makeOne()
+        self.assertTrue(retry.allows('GET'))
+        self.assertTrue(retry.allows('delete'))
+        self.assertFalse(retry.allows('POST'))
+        self.assertTrue(self._makeOne(methods=None).allows('POST'))
+
+    def test_compute_delay_exponential(self):
+        retry = self._makeOne(initial_delay=1.0, multiplier=2.0,
+                              max_delay=5.0, jitter=0)
+        self.assertEqual(retry.compute_delay(1), 1.0)
+        self.assertEqual(retry.compute_delay(2), 2.0)
+        self.assertEqual(retry.compute_delay(3), 4.0)
+        self.assertEqual(retry.compute_delay(4), 5.0)
+
+    def test_compute_delay_w_jitter(self):
+        retry = self._makeOne(initial_delay=4.0, jitter=0.25)
+        for _ in range(20):
+            delay = retry.compute_delay(1)
+            self.assertTrue(3.0 <= delay <= 5.0)
+
+    def test_compute_delay_w_retry_after(self):
+        retry = self._makeOne()
+        self.assertEqual(retry.compute_delay(1, retry_after=30.0), 30.0)
+
+    def test_compute_delay_w_retry_after_above_max_delay(self):
+        retry = self._makeOne(max_delay=10.0)
+        self.assertEqual(retry.compute_delay(1, retry_after=3600.0), 10.0)
+
+    def test_call_success(self):
+        retry = self._makeOne()
+        send = _Send((200, {}))
+        (response, content), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(content, b'CONTENT')
+        self.assertEqual(clock.slept, [])
+        self.assertEqual(retry.attempts, 1)
+        self.assertEqual(retry.retries, 0)
+
+    def test_call_non_retryable_status(self):
+        retry = self._makeOne()
+        send = _Send((404, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 404)
+        self.assertEqual(clock.slept, [])
+
+    def test_call_retryable_status_then_success(self):
+        retry = self._makeOne(jitter=0)
+        send = _Send((503, {}), (500, {}), (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(clock.slept, [1.0, 2.0])
+        self.assertEqual(retry.attempts, 3)
+        self.assertEqual(retry.retries, 2)
+        self.assertEqual(retry.sleep_seconds, 3.0)
+
+    def test_call_retryable_status_exhausted(self):
+        retry = self._makeOne(max_attempts=3, jitter=0)
+        send = _Send((503, {}), (503, {}), (503, {}), (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 503)
+        self.assertEqual(clock.slept, [1.0, 2.0])
+        self.assertEqual(retry.attempts, 3)
+
+    def test_call_retryable_status_non_idempotent(self):
+        retry = self._makeOne()
+        send = _Send((503, {}), (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'POST', send)
+        self.assertEqual(response.status, 503)
+        self.assertEqual(clock.slept, [])
+
+    def test_call_w_retry_after(self):
+        retry = self._makeOne()
+        send = _Send((429, {'retry-after': '12'}), (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(clock.slept, [12.0])
+
+    def test_call_w_invalid_retry_after(self):
+        retry = self._makeOne(jitter=0)
+        send = _Send((429, {'retry-after': 'Fri, 31 Dec 1999 23:59:59 GMT'}),
+                     (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(clock.slept, [1.0])
+
+    def test_call_deadline_exceeded(self):
+        retry = self._makeOne(deadline=9.0)
+        send = _Send((429, {'retry-after': '5'}), (429, {'retry-after': '5'}),
+                     (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 429)
+        self.assertEqual(clock.slept, [5.0])
+
+    def test_call_wo_deadline(self):
+        retry = self._makeOne(deadline=None, max_delay=600.0)
+        send = _Send((429, {'retry-after': '500'}), (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(clock.slept, [500.0])
+
+    def test_call_retryable_exception_then_success(self):
+        import socket
+        retry = self._makeOne(jitter=0)
+        send = _Send(socket.error('reset'), (200, {}))
+        (response, _), clock = self._callWithClock(retry, 'GET', send)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(clock.slept, [1.0])
+
+    def test_call_retryable_exception_exhausted(self):
+        import socket
+        retry = self._makeOne(max_attempts=2, jitter=0)
+        send = _Send(socket.error('reset'), socket.error('reset again'))
+        self.assertRaises(socket.error, self._callWithClock,
+                          retry, 'GET', send)
+        self.assertEqual(retry.attempts, 2)
+        self.assertEqual(retry.retries, 1)
+
+    def test_call_retryable_exception_non_idempotent(self):
+        import socket
+        retry = self._makeOne()
+        send = _Send(socket.error('reset'), (200, {}))
+        self.assertRaises(socket.error, self._callWithClock,
+                          retry, 'POST', send)
+        self.assertEqual(retry.attempts, 1)
+
+    def test_call_non_retryable_exception(self):
+        retry = self._makeOne()
+        send = _Send(KeyError('oops'), (200, {}))
+        self.assertRaises(KeyError, self._callWithClock, retry, 'GET', send)
+        self.assertEqual(retry.attempts, 1)
+
+
+class _Clock(object):
+
+    def __init__(self, now):
+        self._now = now
+        self.slept = []
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self._now += seconds
+
+
+class _Response(dict):
+
+    def __init__(self, status, headers):
+        super(_Response, self).__init__(headers)
+        self.status = status
+
+
+class _Send(object):
+
+    def __init__(self, *results):
+        self._results = list(results)
+
+    def __call__(self):
+        result = self._results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        status, headers = result
+        return _Response(status, headers), b'CONTENT'
@@ -0,0 +1,413 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+class Test__credentials_key(unittest2.TestCase):
+
+    def _callFUT(self, credentials):
+        from gcloud.token_cache import _credentials_key
+        return _credentials_key(credentials)
+
+    def test_equivalent(self):
+        first = _makeCredentials(access_token='one')
+        second = _makeCredentials(access_token='two')
+        self.assertEqual(self._callFUT(first), self._callFUT(second))
+
+    def test_different_account(self):
+        first = _makeCredentials()
+        second = _makeCredentials(client_id='other')
+        self.assertNotEqual(self._callFUT(first), self._callFUT(second))
+
+    def test_scopes_order_ignored(self):
+        first = _makeCredentials()
+        first._scopes = ['b', 'a']
+        second = _makeCredentials()
+        second._scopes = ('a', 'b')
+        third = _makeCredentials()
+        third._scopes = ('a',)
+        self.assertEqual(self._callFUT(first), self._callFUT(second))
+        self.assertNotEqual(self._callFUT(first), self._callFUT(third))
+
+
+class TestTokenCache(unittest2.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self._tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self._tempdir)
+
+    def _getTargetClass(self):
+        from gcloud.token_cache import TokenCache
+        return TokenCache
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _path(self):
+        import os
+        return os.path.join(self._tempdir, 'tokens.json')
+
+    def test_ctor_defaults(self):
+        from gcloud.token_cache import DEFAULT_REFRESH_MARGIN
+        cache = self._makeOne()
+        self.assertEqual(cache.path, None)
+        self.assertEqual(cache.refresh_margin, DEFAULT_REFRESH_MARGIN)
+
+    def test_share_returns_first_equivalent(self):
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        timers = []
+        cache = self._makeOne()
+        first = _makeCredentials()
+        second = _makeCredentials()
+        with _Monkey(MUT, _TIMER=_timerFactory(timers)):
+            self.assertTrue(cache.share(first) is first)
+            self.assertTrue(cache.share(second) is first)
+        self.assertTrue(isinstance(first.store, MUT._CacheStorage))
+        self.assertEqual(second.store, None)
+        self.assertEqual(timers, [])
+
+    def test_share_schedules_refresh(self):
+        import datetime
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        NOW = datetime.datetime(2015, 1, 1)
+        timers = []
+        cache = self._makeOne(refresh_margin=60)
+        credentials = _makeCredentials(
+            access_token='token',
+            token_expiry=NOW + datetime.timedelta(hours=1))
+        with _Monkey(MUT, _NOW=lambda: NOW, _TIMER=_timerFactory(timers)):
+            cache.share(credentials)
+        timer, = timers
+        self.assertEqual(timer.interval, 3540)
+        self.assertEqual(timer.args, (MUT._credentials_key(credentials),))
+        self.assertTrue(timer.daemon)
+        self.assertTrue(timer.started)
+
+    def test_share_schedules_immediate_refresh_when_expiring(self):
+        import datetime
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        NOW = datetime.datetime(2015, 1, 1)
+        timers = []
+        cache = self._makeOne(refresh_margin=300)
+        credentials = _makeCredentials(
+            access_token='token',
+            token_expiry=NOW + datetime.timedelta(seconds=10))
+        with _Monkey(MUT, _NOW=lambda: NOW, _TIMER=_timerFactory(timers)):
+            cache.share(credentials)
+        self.assertEqual(timers[0].interval, 0)
+
+    def test_share_seeds_persisted_token(self):
+        import datetime
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        timers = []
+        expiry = (datetime.datetime.utcnow() +
+                  datetime.timedelta(hours=1)).replace(microsecond=0)
+        writer = self._makeOne(path=self._path())
+        key = MUT._credentials_key(_makeCredentials())
+        writer._write_entry(key, 'persisted', expiry)
+
+        cache = self._makeOne(path=self._path())
+        credentials = _makeCredentials()
+        with _Monkey(MUT, _TIMER=_timerFactory(timers)):
+            cache.share(credentials)
+        self.assertEqual(credentials.access_token, 'persisted')
+        self.assertEqual(credentials.token_expiry, expiry)
+        self.assertEqual(len(timers), 1)
+
+    def test_share_ignores_expired_persisted_token(self):
+        import datetime
+        from gcloud import token_cache as MUT
+        expiry = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+        writer = self._makeOne(path=self._path())
+        key = MUT._credentials_key(_makeCredentials())
+        writer._write_entry(key, 'expired', expiry)
+
+        cache = self._makeOne(path=self._path())
+        credentials = _makeCredentials()
+        cache.share(credentials)
+        self.assertEqual(credentials.access_token, None)
+
+    def test_share_keeps_existing_token(self):
+        cache = self._makeOne(path=self._path())
+        credentials = _makeCredentials(access_token='token')
+        cache.share(credentials)
+        self.assertEqual(credentials.access_token, 'token')
+
+    def test_refresh_persists_and_reschedules(self):
+        import datetime
+        import json
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        NOW = datetime.datetime(2015, 1, 1)
+        timers = []
+        http = _Http(200, {'access_token': 'new', 'expires_in': 3600})
+        cache = self._makeOne(path=self._path(), refresh_margin=60)
+        credentials = _makeCredentials()
+        key = MUT._credentials_key(credentials)
+        with _Monkey(MUT, _NOW=lambda: NOW, _TIMER=_timerFactory(timers),
+                     _HTTP_FACTORY=lambda: http):
+            cache.share(credentials)
+            self.assertEqual(timers, [])
+            cache._refresh(key)
+
+        self.assertEqual(credentials.access_token, 'new')
+        self.assertEqual(len(http._requested), 1)
+        with open(self._path(), 'rb') as file_obj:
+            entries = json.loads(file_obj.read().decode('utf-8'))
+        self.assertEqual(entries[key]['access_token'], 'new')
+        # Scheduled once by ``locked_put`` and once after the refresh.
+        self.assertEqual(len(timers), 2)
+        self.assertTrue(timers[0].cancelled)
+        self.assertFalse(timers[1].cancelled)
+
+    def test_refresh_adopts_token_from_other_process(self):
+        import datetime
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        timers = []
+        http = _Http(200, {'access_token': 'new', 'expires_in': 3600})
+        cache = self._makeOne(path=self._path())
+        credentials = _makeCredentials(access_token='old')
+        key = MUT._credentials_key(credentials)
+        expiry = (datetime.datetime.utcnow() +
+                  datetime.timedelta(hours=1)).replace(microsecond=0)
+        with _Monkey(MUT, _TIMER=_timerFactory(timers),
+                     _HTTP_FACTORY=lambda: http):
+            cache.share(credentials)
+            other = self._makeOne(path=self._path())
+            other._write_entry(key, 'other', expiry)
+            cache._refresh(key)
+
+        self.assertEqual(credentials.access_token, 'other')
+        self.assertEqual(credentials.token_expiry, expiry)
+        self.assertEqual(http._requested, [])
+        self.assertEqual(len(timers), 1)
+
+    def test_refresh_failure_retries_later(self):
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        timers = []
+        http = _Http(400, {'error': 'invalid_grant'})
+        cache = self._makeOne()
+        credentials = _makeCredentials()
+        key = MUT._credentials_key(credentials)
+        with _Monkey(MUT, _TIMER=_timerFactory(timers),
+                     _HTTP_FACTORY=lambda: http):
+            cache.share(credentials)
+            cache._refresh(key)
+        timer, = timers
+        self.assertEqual(timer.interval, MUT._RETRY_SECONDS)
+
+    def test_close(self):
+        import datetime
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        timers = []
+        cache = self._makeOne()
+        credentials = _makeCredentials(
+            access_token='token',
+            token_expiry=datetime.datetime.utcnow())
+        with _Monkey(MUT, _TIMER=_timerFactory(timers)):
+            cache.share(credentials)
+        cache.close()
+        self.assertTrue(timers[0].cancelled)
+        self.assertEqual(cache._timers, {})
+
+    def test_storage_delete(self):
+        from gcloud import token_cache as MUT
+        cache = self._makeOne(path=self._path())
+        credentials = _makeCredentials()
+        key = MUT._credentials_key(credentials)
+        cache.share(credentials)
+        cache._write_entry(key, 'token', None)
+        self.assertEqual(cache._read_entry(key), ('token', None))
+        credentials.store.delete()
+        self.assertEqual(cache._read_entry(key), None)
+
+    def test_storage_wo_path(self):
+        cache = self._makeOne()
+        credentials = _makeCredentials()
+        cache.share(credentials)
+        self.assertEqual(credentials.store.get(), None)
+        credentials.store.delete()
+
+    def test_read_entry_w_corrupt_file(self):
+        with open(self._path(), 'wb') as file_obj:
+            file_obj.write(b'{not json')
+        cache = self._makeOne(path=self._path())
+        self.assertEqual(cache._read_entry('key'), None)
+
+    def test_write_entry_file_mode(self):
+        import os
+        import stat
+        cache = self._makeOne(path=self._path())
+        cache._write_entry('key', 'token', None)
+        mode = stat.S_IMODE(os.stat(self._path()).st_mode)
+        self.assertEqual(mode, 0o600)
+
+    def test_write_entry_w_stale_temp_file(self):
+        import os
+        import stat
+        temp_path = self._path() + '.tmp'
+        with open(temp_path, 'wb') as file_obj:
+            file_obj.write(b'stale')
+        os.chmod(temp_path, 0o644)
+        cache = self._makeOne(path=self._path())
+        cache._write_entry('key', 'token', None)
+        self.assertEqual(cache._read_entry('key'), ('token', None))
+        self.assertFalse(os.path.exists(temp_path))
+        mode = stat.S_IMODE(os.stat(self._path()).st_mode)
+        self.assertEqual(mode, 0o600)
+
+    def test_lock_nested(self):
+        cache = self._makeOne(path=self._path())
+        cache._acquire_lock()
+        lock_file = cache._lock_file
+        cache._acquire_lock()
+        self.assertTrue(cache._lock_file is lock_file)
+        cache._release_lock()
+        self.assertTrue(cache._lock_file is lock_file)
+        self.assertFalse(lock_file.closed)
+        cache._release_lock()
+        self.assertEqual(cache._lock_file, None)
+        self.assertTrue(lock_file.closed)
+
+
+class Test_default_cache(unittest2.TestCase):
+
+    def test_get_default_cache_wo_env(self):
+        import os
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        from gcloud.environment_vars import TOKEN_CACHE
+        environ = dict(os.environ)
+        environ.pop(TOKEN_CACHE, None)
+        with _Monkey(os, environ=environ):
+            with _Monkey(MUT, _DEFAULT_CACHE=[]):
+                self.assertEqual(MUT.get_default_cache(), None)
+
+    def test_get_default_cache_w_env(self):
+        import os
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        from gcloud.environment_vars import TOKEN_CACHE
+        environ = dict(os.environ)
+        environ[TOKEN_CACHE] = '/tmp/tokens.json'
+        with _Monkey(os, environ=environ):
+            with _Monkey(MUT, _DEFAULT_CACHE=[]):
+                cache = MUT.get_default_cache()
+                self.assertTrue(MUT.get_default_cache() is cache)
+        self.assertEqual(cache.path, '/tmp/tokens.json')
+
+    def test_set_default_cache(self):
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        cache = MUT.TokenCache()
+        with _Monkey(MUT, _DEFAULT_CACHE=[]):
+            MUT.set_default_cache(cache)
+            self.assertTrue(MUT.get_default_cache() is cache)
+            MUT.set_default_cache(None)
+            self.assertEqual(MUT.get_default_cache(), None)
+
+
+class Test_share_credentials(unittest2.TestCase):
+
+    def _callFUT(self, credentials):
+        from gcloud.token_cache import share_credentials
+        return share_credentials(credentials)
+
+    def test_wo_cache(self):
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        credentials = _makeCredentials()
+        with _Monkey(MUT, _DEFAULT_CACHE=[None]):
+            self.assertTrue(self._callFUT(credentials) is credentials)
+
+    def test_w_non_oauth2_credentials(self):
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        credentials = object()
+        with _Monkey(MUT, _DEFAULT_CACHE=[MUT.TokenCache()]):
+            self.assertTrue(self._callFUT(credentials) is credentials)
+            self.assertEqual(self._callFUT(None), None)
+
+    def test_w_cache(self):
+        from gcloud._testing import _Monkey
+        from gcloud import token_cache as MUT
+        first = _makeCredentials()
+        with _Monkey(MUT, _DEFAULT_CACHE=[MUT.TokenCache()]):
+            self.assertTrue(self._callFUT(first) is first)
+            self.assertTrue(self._callFUT(_makeCredentials()) is first)
+
+
+def _makeCredentials(access_token=None, client_id='client-id',
+                     token_expiry=None):
+    from oauth2client.client import OAuth2Credentials
+    return OAuth2Credentials(
+        access_token, client_id, 'client-secret', 'refresh-token',
+        token_expiry, 'https://example.com/token', None)
+
+
+class _Timer(object):
+
+    daemon = False
+    started = False
+    cancelled = False
+
+    def __init__(self, interval, function, args):
+        self.interval = interval
+        self.function = function
+        self.args = args
+
+    def start(self):
+        self.started = True
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def _timerFactory(timers):
+    def _factory(*args):
+        timer = _Timer(*args)
+        timers.append(timer)
+        return timer
+    return _factory
+
+
+class _Response(object):
+
+    def __init__(self, status):
+        self.status = status
+
+
+class _Http(object):
+
+    def __init__(self, status, payload):
+        import json
+        self._status = status
+        self._content = json.dumps(payload).encode('utf-8')
+        self._requested = []
+
+    def request(self, uri, **kw):
+        self._requested.append((uri, kw))
+        return _Response(self._status), self._content
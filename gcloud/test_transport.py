@@ -0,0 +1,349 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2
+
+
+class TestPooledHttp(unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.transport import PooledHttp
+        return PooledHttp
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor_defaults(self):
+        from gcloud.transport import DEFAULT_POOL_SIZE
+        pool = self._makeOne()
+        self.assertEqual(pool.max_size, DEFAULT_POOL_SIZE)
+        self.assertEqual(pool.size, 0)
+
+    def test_ctor_w_invalid_max_size(self):
+        self.assertRaises(ValueError, self._makeOne, max_size=0)
+
+    def test_request_creates_with_default_factory(self):
+        import httplib2
+        pool = self._makeOne()
+        http = pool._acquire()
+        self.assertTrue(isinstance(http, httplib2.Http))
+        self.assertEqual(pool.size, 1)
+
+    def test_request_defaults(self):
+        import httplib2
+        created = []
+        pool = self._makeOne(http_factory=_makeFactory(created))
+        response, content = pool.request('http://example.com/')
+        self.assertEqual(response, {'status': '200'})
+        self.assertEqual(content, b'')
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0]._called_with, {
+            'uri': 'http://example.com/',
+            'method': 'GET',
+            'body': None,
+            'headers': None,
+            'redirections': httplib2.DEFAULT_MAX_REDIRECTS,
+            'connection_type': None,
+        })
+
+    def test_request_explicit(self):
+        created = []
+        pool = self._makeOne(http_factory=_makeFactory(created))
+        headers = {'X-Foo': 'bar'}
+        connection_type = object()
+        pool.request('http://example.com/', 'POST', b'body', headers, 2,
+                     connection_type)
+        self.assertEqual(created[0]._called_with, {
+            'uri': 'http://example.com/',
+            'method': 'POST',
+            'body': b'body',
+            'headers': headers,
+            'redirections': 2,
+            'connection_type': connection_type,
+        })
+
+    def test_request_reuses_released_member(self):
+        created = []
+        pool = self._makeOne(http_factory=_makeFactory(created))
+        pool.request('http://example.com/one')
+        pool.request('http://example.com/two')
+        self.assertEqual(len(created), 1)
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(created[0]._called_with['uri'],
+                         'http://example.com/two')
+
+    def test_request_releases_member_on_error(self):
+        created = []
+        pool = self._makeOne(max_size=1,
+                             http_factory=_makeFactory(created, fail=True))
+        self.assertRaises(_Failure, pool.request, 'http://example.com/')
+        self.assertRaises(_Failure, pool.request, 'http://example.com/')
+        self.assertEqual(len(created), 1)
+
+    def test_acquire_factory_failure_frees_slot(self):
+        created = []
+        failures = [_Failure()]
+
+        def _factory():
+            if failures:
+                raise failures.pop()
+            return _makeFactory(created)()
+
+        pool = self._makeOne(max_size=1, http_factory=_factory)
+        self.assertRaises(_Failure, pool._acquire)
+        self.assertEqual(pool.size, 0)
+        self.assertTrue(pool._acquire() is created[0])
+        self.assertEqual(pool.size, 1)
+
+    def test_acquire_bounded_by_max_size(self):
+        import threading
+        created = []
+        pool = self._makeOne(max_size=2, http_factory=_makeFactory(created))
+        first = pool._acquire()
+        second = pool._acquire()
+        self.assertEqual(pool.size, 2)
+
+        acquired = []
+        waiter = threading.Thread(
+            target=lambda: acquired.append(pool._acquire()))
+        waiter.start()
+        waiter.join(0.05)
+        self.assertEqual(acquired, [])
+
+        pool._release(second)
+        waiter.join()
+        self.assertEqual(acquired, [second])
+        self.assertEqual(len(created), 2)
+        pool._release(first)
+
+    def test_request_shared_between_threads(self):
+        import threading
+        created = []
+        pool = self._makeOne(max_size=3, http_factory=_makeFactory(created))
+
+        def _worker():
+            for _ in range(20):
+                pool.request('http://example.com/')
+
+        workers = [threading.Thread(target=_worker) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertTrue(1 <= len(created) <= 3)
+        self.assertEqual(sum(http._count for http in created), 160)
+        self.assertFalse(any(http._overlapped for http in created))
+
+
+class Test__encode_content(unittest2.TestCase):
+
+    def _callFUT(self, content):
+        from gcloud.transport import _encode_content
+        return _encode_content(content)
+
+    def test_utf8_bytes(self):
+        self.assertEqual(self._callFUT(b'{"a": "\xc3\xa9"}'),
+                         {'content': u'{"a": "\u00e9"}'})
+
+    def test_text(self):
+        self.assertEqual(self._callFUT(u'\u00e9'), {'content': u'\u00e9'})
+
+    def test_binary(self):
+        self.assertEqual(self._callFUT(b'\xff\x00'),
+                         {'content_base64': '/wA='})
+
+
+class Test__decode_content(unittest2.TestCase):
+
+    def _callFUT(self, record):
+        from gcloud.transport import _decode_content
+        return _decode_content(record)
+
+    def test_text(self):
+        self.assertEqual(self._callFUT({'content': u'\u00e9'}),
+                         b'\xc3\xa9')
+
+    def test_base64(self):
+        self.assertEqual(self._callFUT({'content_base64': '/wA='}),
+                         b'\xff\x00')
+
+
+class _TempDirMixin(object):
+
+    def setUp(self):
+        import tempfile
+        self._tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self._tempdir)
+
+    def _path(self):
+        import os
+        return os.path.join(self._tempdir, 'exchanges.jsonl.gz')
+
+
+class TestRecordingHttp(_TempDirMixin, unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.transport import RecordingHttp
+        return RecordingHttp
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _readRecords(self):
+        import gzip
+        import json
+        file_obj = gzip.open(self._path(), 'rb')
+        try:
+            return [json.loads(line.decode('utf-8')) for line in file_obj]
+        finally:
+            file_obj.close()
+
+    def test_request_records(self):
+        import httplib2
+        from gcloud._testing import _Monkey
+        from gcloud import transport as MUT
+        http = _Http()
+        times = [10.0, 10.25, 11.0, 11.5]
+        with _Monkey(MUT, _NOW=lambda: times.pop(0)):
+            with self._makeOne(self._path(), http) as recorder:
+                response, content = recorder.request(
+                    'http://example.com/a', headers={'Authorization': 'x'})
+                recorder.request('http://example.com/b', method='POST',
+                                 body=b'body')
+        self.assertEqual(response, {'status': '200'})
+        self.assertEqual(content, b'')
+        self.assertEqual(http._called_with, {
+            'uri': 'http://example.com/b',
+            'method': 'POST',
+            'body': b'body',
+            'headers': None,
+            'redirections': httplib2.DEFAULT_MAX_REDIRECTS,
+            'connection_type': None,
+        })
+        self.assertEqual(self._readRecords(), [
+            {'method': 'GET', 'uri': 'http://example.com/a',
+             'headers': {'status': '200'}, 'content': '', 'elapsed': 0.25},
+            {'method': 'POST', 'uri': 'http://example.com/b',
+             'headers': {'status': '200'}, 'content': '', 'elapsed': 0.5},
+        ])
+
+
+class TestReplayHttp(_TempDirMixin, unittest2.TestCase):
+
+    def _getTargetClass(self):
+        from gcloud.transport import ReplayHttp
+        return ReplayHttp
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _record(self, *exchanges):
+        from gcloud.transport import RecordingHttp
+        with RecordingHttp(self._path(), _HttpSequence(exchanges)) as http:
+            for method, uri, _, _ in exchanges:
+                http.request(uri, method=method)
+
+    def test_ctor(self):
+        self._record(('GET', 'http://example.com/a', '200', b'a'),
+                     ('GET', 'http://example.com/b', '200', b'b'))
+        replay = self._makeOne(self._path())
+        self.assertEqual(replay.path, self._path())
+        self.assertEqual(replay.latency_scale, 0.0)
+        self.assertEqual(len(replay), 2)
+
+    def test_request_in_order_then_cycles(self):
+        self._record(('GET', 'http://example.com/a', '200', b'first'),
+                     ('POST', 'http://example.com/a', '201', b'\xff'),
+                     ('GET', 'http://example.com/a', '404', b'second'))
+        replay = self._makeOne(self._path())
+        served = [replay.request('http://example.com/a')
+                  for _ in range(3)]
+        self.assertEqual([(response.status, content)
+                          for response, content in served],
+                         [(200, b'first'), (404, b'second'),
+                          (200, b'first')])
+        response, content = replay.request('http://example.com/a',
+                                           method='POST', body=b'ignored')
+        self.assertEqual(response.status, 201)
+        self.assertEqual(response['content-type'], 'application/json')
+        self.assertEqual(content, b'\xff')
+
+    def test_request_unknown(self):
+        self._record(('GET', 'http://example.com/a', '200', b''))
+        replay = self._makeOne(self._path())
+        self.assertRaises(KeyError, replay.request, 'http://example.com/b')
+
+    def test_request_w_latency(self):
+        from gcloud._testing import _Monkey
+        from gcloud import transport as MUT
+        times = [0.0, 0.5]
+        with _Monkey(MUT, _NOW=lambda: times.pop(0)):
+            self._record(('GET', 'http://example.com/a', '200', b''))
+        replay = self._makeOne(self._path(), latency_scale=2.0)
+        slept = []
+        with _Monkey(MUT, _SLEEP=slept.append):
+            replay.request('http://example.com/a')
+        self.assertEqual(slept, [1.0])
+
+
+class _Failure(Exception):
+    pass
+
+
+class _Http(object):
+
+    _called_with = None
+    _count = 0
+    _overlapped = False
+    _in_use = False
+
+    def __init__(self, fail=False):
+        self._fail = fail
+
+    def request(self, uri, **kw):
+        import time
+        if self._in_use:
+            self._overlapped = True
+        self._in_use = True
+        try:
+            time.sleep(0)
+            self._called_with = dict(uri=uri, **kw)
+            self._count += 1
+            if self._fail:
+                raise _Failure()
+            return {'status': '200'}, b''
+        finally:
+            self._in_use = False
+
+
+def _makeFactory(created, fail=False):
+    def _factory():
+        http = _Http(fail=fail)
+        created.append(http)
+        return http
+    return _factory
+
+
+class _HttpSequence(object):
+
+    def __init__(self, exchanges):
+        self._exchanges = list(exchanges)
+
+    def request(self, uri, **kw):  # pylint: disable=W0613
+        _, _, status, content = self._exchanges.pop(0)
+        return {'status': status, 'content-type': 'application/json'}, content
@@ -0,0 +1,337 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Share OAuth2 access tokens between clients and processes.
+
+Once a :class:`TokenCache` is installed (via :func:`set_default_cache` or
+the :envvar:`GCLOUD_TOKEN_CACHE` environment variable, naming the cache
+file), connections created with equivalent credentials (same account and
+scopes) share a single credentials object, so a token is fetched once per
+process.  If the cache has a ``path``, tokens are also persisted there
+(under a file lock), so new processes start with a valid token instead of
+making a round trip to the token endpoint.
+
+Tokens are refreshed in a background thread ``refresh_margin`` seconds
+before they expire, so requests never wait for a refresh.
+
+>>> from gcloud import token_cache
+>>> token_cache.set_default_cache(
+...     token_cache.TokenCache(path='/tmp/gcloud-tokens.json'))
+"""
+
+import copy
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: NO COVER  Windows
+    fcntl = None
+
+import httplib2
+from oauth2client import client
+
+from gcloud._helpers import _NOW
+from gcloud._helpers import _RFC3339_MICROS
+from gcloud.environment_vars import TOKEN_CACHE
+
+
+DEFAULT_REFRESH_MARGIN = 300
+"""Seconds before expiry at which tokens are refreshed."""
+
+_RETRY_SECONDS = 30
+_TIMER = threading.Timer  # To be replaced by tests.
+_HTTP_FACTORY = httplib2.Http  # To be replaced by tests.
+_IDENTITY_ATTRIBUTES = (
+    'client_id',
+    'refresh_token',
+    'token_uri',
+    'service_account_name',
+    '_service_account_email',
+    '_private_key_id',
+    'scope',
+    '_scopes',
+)
+_DEFAULT_CACHE = []
+
+
+def _credentials_key(credentials):
+    """Key identifying the account and scopes of a credentials object.
+
+    :type credentials: :class:`oauth2client.client.OAuth2Credentials`
+    :param credentials: The credentials to identify.
+
+    :rtype: string
+    :returns: A hex digest, so that no secret is stored in the cache.
+    """
+    identity = [type(credentials).__name__]
+    for name in _IDENTITY_ATTRIBUTES:
+        value = getattr(credentials, name, None)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            value = sorted(value)
+        identity.append(repr(value))
+    return hashlib.sha256(
+        '\n'.join(identity).encode('utf-8')).hexdigest()
+
+
+class _CacheStorage(client.Storage):
+    """Storage for shared credentials, backed by a :class:`TokenCache`.
+
+    :type cache: :class:`TokenCache`
+    :param cache: The cache holding the token.
+
+    :type key: string
+    :param key: The key of the credentials in the cache.
+    """
+
+    def __init__(self, cache, key):
+        self._cache = cache
+        self._key = key
+
+    def acquire_lock(self):
+        """Acquire the cache lock."""
+        self._cache._acquire_lock()
+
+    def release_lock(self):
+        """Release the cache lock."""
+        self._cache._release_lock()
+
+    def locked_get(self):
+        """Credentials carrying the persisted token, if any.
+
+        :rtype: :class:`oauth2client.client.OAuth2Credentials` or
+                ``NoneType``
+        :returns: A copy of the shared credentials holding the token read
+                  from the cache file, or ``None`` if none is stored.
+        """
+        entry = self._cache._read_entry(self._key)
+        if entry is None:
+            return None
+        access_token, token_expiry = entry
+        credentials = copy.copy(self._cache._credentials[self._key])
+        credentials.access_token = access_token
+        credentials.token_expiry = token_expiry
+        return credentials
+
+    def locked_put(self, credentials):
+        """Persist the token of refreshed credentials.
+
+        :type credentials: :class:`oauth2client.client.OAuth2Credentials`
+        :param credentials: The refreshed credentials.
+        """
+        self._cache._write_entry(self._key, credentials.access_token,
+                                 credentials.token_expiry)
+        self._cache._schedule(self._key)
+
+    def locked_delete(self):
+        """Remove the persisted token."""
+        self._cache._write_entry(self._key, None, None)
+
+
+class TokenCache(object):
+    """Cache of OAuth2 credentials shared by connections.
+
+    :type path: string
+    :param path: (Optional) File in which tokens are persisted, allowing
+                 processes to share them.  A lock file (``path + '.lock'``)
+                 is created next to it.
+
+    :type refresh_margin: integer
+    :param refresh_margin: Seconds before expiry at which a token is
+                           refreshed in the background.
+    """
+
+    def __init__(self, path=None, refresh_margin=DEFAULT_REFRESH_MARGIN):
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+        self._credentials = {}
+        self._timers = {}
+
+    def share(self, credentials):
+        """Return the shared credentials equivalent to ``credentials``.
+
+        The first credentials seen for an account and set of scopes are
+        kept;  later equivalent credentials are replaced by them.
+
+        :type credentials: :class:`oauth2client.client.OAuth2Credentials`
+        :param credentials: The credentials of a new connection.
+
+        :rtype: :class:`oauth2client.client.OAuth2Credentials`
+        :returns: The shared credentials.
+        """
+        key = _credentials_key(credentials)
+        with self._lock:
+            shared = self._credentials.get(key)
+            if shared is not None:
+                return shared
+            self._credentials[key] = credentials
+
+        storage = _CacheStorage(self, key)
+        credentials.set_store(storage)
+        if credentials.access_token is None:
+            stored = storage.get()
+            if stored is not None and not stored.access_token_expired:
+                credentials.access_token = stored.access_token
+                credentials.token_expiry = stored.token_expiry
+        self._schedule(key)
+        return credentials
+
+    def close(self):
+        """Stop refreshing tokens in the background."""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+    def _schedule(self, key, delay=None):
+        """(Re)start the timer refreshing the token for ``key``."""
+        credentials = self._credentials[key]
+        if delay is None:
+            if credentials.token_expiry is None:
+                return
+            remaining = credentials.token_expiry - _NOW()
+            delay = max(0, (remaining.days * 86400 + remaining.seconds -
+                            self.refresh_margin))
+        timer = _TIMER(delay, self._refresh, (key,))
+        timer.daemon = True
+        with self._lock:
+            previous = self._timers.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._timers[key] = timer
+        timer.start()
+
+    def _refresh(self, key):
+        """Refresh the token for ``key`` (called from a timer)."""
+        credentials = self._credentials[key]
+        try:
+            credentials.refresh(_HTTP_FACTORY())
+        except Exception:  # pylint: disable=broad-except
+            self._schedule(key, _RETRY_SECONDS)
+        else:
+            self._schedule(key)
+
+    def _acquire_lock(self):
+        """Lock the cache against other threads and processes.
+
+        Re-entrant:  only the outermost acquisition locks the file.
+        """
+        self._lock.acquire()
+        self._lock_depth += 1
+        if (self._lock_depth == 1 and self.path is not None and
+                fcntl is not None):
+            self._lock_file = open(self.path + '.lock', 'ab')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _release_lock(self):
+        """Release the lock taken by :meth:`_acquire_lock`."""
+        self._lock_depth -= 1
+        if self._lock_depth == 0 and self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self._lock.release()
+
+    def _load(self):
+        """Entries persisted in the cache file."""
+        try:
+            with open(self.path, 'rb') as file_obj:
+                return json.loads(file_obj.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _read_entry(self, key):
+        """Token and expiry persisted for ``key``, if any."""
+        if self.path is None:
+            return None
+        entry = self._load().get(key)
+        if entry is None:
+            return None
+        token_expiry = entry['token_expiry']
+        if token_expiry is not None:
+            token_expiry = datetime.datetime.strptime(
+                token_expiry, _RFC3339_MICROS)
+        return entry['access_token'], token_expiry
+
+    def _write_entry(self, key, access_token, token_expiry):
+        """Persist the token for ``key``;  ``None`` removes it."""
+        if self.path is None:
+            return
+        entries = self._load()
+        if access_token is None:
+            entries.pop(key, None)
+        else:
+            if token_expiry is not None:
+                token_expiry = token_expiry.strftime(_RFC3339_MICROS)
+            entries[key] = {
+                'access_token': access_token,
+                'token_expiry': token_expiry,
+            }
+        temp_path = self.path + '.tmp'
+        try:
+            os.unlink(temp_path)  # Left over by a writer which crashed.
+        except OSError:
+            pass
+        # Created private, rather than under the umask and chmod'ed later.
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as file_obj:
+            file_obj.write(json.dumps(entries).encode('utf-8'))
+        os.rename(temp_path, self.path)
+
+
+def get_default_cache():
+    """The cache used by new connections.
+
+    :rtype: :class:`TokenCache` or ``NoneType``
+    :returns: The cache passed to :func:`set_default_cache`, else a cache
+              persisted in the file named by :envvar:`GCLOUD_TOKEN_CACHE`,
+              else ``None``.
+    """
+    if not _DEFAULT_CACHE:
+        path = os.getenv(TOKEN_CACHE)
+        _DEFAULT_CACHE.append(None if path is None else TokenCache(path))
+    return _DEFAULT_CACHE[0]
+
+
+def set_default_cache(cache):
+    """Set the cache used by new connections.
+
+    :type cache: :class:`TokenCache` or ``NoneType``
+    :param cache: The cache;  ``None`` disables sharing.
+    """
+    del _DEFAULT_CACHE[:]
+    _DEFAULT_CACHE.append(cache)
+
+
+def share_credentials(credentials):
+    """Share credentials through the default cache, if any.
+
+    :type credentials: :class:`oauth2client.client.OAuth2Credentials` or
+                       ``NoneType``
+    :param credentials: The credentials of a new connection.
+
+    :rtype: :class:`oauth2client.client.OAuth2Credentials` or ``NoneType``
+    :returns: The shared credentials, or ``credentials`` itself if no cache
+              is set or they are not OAuth2 credentials.
+    """
+    cache = get_default_cache()
+    if cache is None or not isinstance(credentials, client.OAuth2Credentials):
+        return credentials
+    return cache.share(credentials)
@@ -0,0 +1,343 @@
+# Copyright 2015 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""HTTP transports usable as the ``http`` of a connection.
+
+:class:`httplib2.Http` is not thread-safe:  concurrent requests through one
+instance corrupt its cached connections.  :class:`PooledHttp` exposes the
+same ``request()`` API, but checks out a pooled :class:`httplib2.Http` for
+the duration of each request, so one instance may be shared between threads
+while still re-using persistent (keep-alive) connections to each host.
+
+:class:`RecordingHttp` and :class:`ReplayHttp` capture real traffic to a
+file and serve it back offline, e.g. to profile response parsing against
+realistic data without touching the network:
+
+>>> from gcloud import storage
+>>> from gcloud.transport import RecordingHttp, ReplayHttp
+>>> with RecordingHttp('listing.jsonl.gz', client.connection.http) as http:
+...     client.connection._http = http
+...     blobs = list(bucket.list_blobs())
+>>> client.connection._http = ReplayHttp('listing.jsonl.gz')
+>>> blobs = list(bucket.list_blobs())  # Same pages, no network.
+"""
+
+import base64
+import collections
+import gzip
+import json
+import threading
+import time
+
+import httplib2
+import six
+from six.moves import queue  # pylint: disable=F0401
+
+
+DEFAULT_POOL_SIZE = 10
+"""Default maximum number of HTTP objects held by a :class:`PooledHttp`."""
+
+_NOW = time.time  # To be replaced by tests.
+_SLEEP = time.sleep  # To be replaced by tests.
+
+
+class PooledHttp(object):
+    """Thread-safe HTTP transport backed by a bounded pool.
+
+    Each pooled :class:`httplib2.Http` keeps its own persistent connection
+    per host, so a request checking out a recently used member re-uses an
+    open socket rather than reconnecting.  Members are handed out LIFO to
+    keep the warmest connections busy.  When all ``max_size`` members are
+    in use, callers block until one is returned.
+
+    :type max_size: integer
+    :param max_size: The maximum number of HTTP objects (and hence of
+                     concurrent requests) held by the pool.
+
+    :type http_factory: callable
+    :param http_factory: (Optional) Callable taking no arguments and
+                         returning a new :class:`httplib2.Http` (or an
+                         object defining ``request()``).  Defaults to
+                         :class:`httplib2.Http`.
+
+    :raises: :class:`ValueError` if ``max_size`` is not positive.
+    """
+
+    def __init__(self, max_size=DEFAULT_POOL_SIZE, http_factory=None):
+        if max_size < 1:
+            raise ValueError('max_size must be positive', max_size)
+        if http_factory is None:
+            http_factory = httplib2.Http
+        self.max_size = max_size
+        self._http_factory = http_factory
+        self._pool = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    @property
+    def size(self):
+        """Number of HTTP objects created so far by the pool.
+
+        :rtype: integer
+        :returns: The count of members, never more than ``max_size``.
+        """
+        return self._created
+
+    def _acquire(self):
+        """Check out an HTTP object, creating or waiting for one if needed.
+
+        :rtype: :class:`httplib2.Http`
+        :returns: A pool member not in use by any other thread.
+        """
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.max_size
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                return self._http_factory()
+            except Exception:
+                # Give the slot back, else the pool shrinks for good.
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._pool.get()
+
+    def _release(self, http):
+        """Return an HTTP object to the pool.
+
+        :type http: :class:`httplib2.Http`
+        :param http: A member previously returned by :meth:`_acquire`.
+        """
+        self._pool.put(http)
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                redirections=httplib2.DEFAULT_MAX_REDIRECTS,
+                connection_type=None):
+        """Perform a request using a pooled HTTP object.
+
+        Mirrors :meth:`httplib2.Http.request`, so instances can be passed
+        to ``credentials.authorize()``.
+
+        :type uri: string
+        :param uri: The absolute URI of the request.
+
+        :type method: string
+        :param method: The HTTP method to use.
+
+        :type body: string
+        :param body: (Optional) The body of the request.
+
+        :type headers: dict
+        :param headers: (Optional) HTTP headers to send with the request.
+
+        :type redirections: integer
+        :param redirections: Number of redirects to follow.
+
+        :type connection_type: class
+        :param connection_type: (Optional) Override for the connection class.
+
+        :rtype: tuple of ``response`` (a dictionary of sorts)
+                and ``content`` (a string).
+        :returns: The HTTP response object and the content of the response.
+        """
+        http = self._acquire()
+        try:
+            return http.request(uri, method=method, body=body,
+                                headers=headers, redirections=redirections,
+                                connection_type=connection_type)
+        finally:
+            self._release(http)
+
+
+def _encode_content(content):
+    """Represent a response body as JSON fields of a recorded exchange."""
+    if isinstance(content, six.text_type):
+        content = content.encode('utf-8')
+    try:
+        return {'content': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'content_base64': base64.b64encode(content).decode('ascii')}
+
+
+def _decode_content(record):
+    """Response body of a recorded exchange, as bytes."""
+    if 'content_base64' in record:
+        return base64.b64decode(record['content_base64'].encode('ascii'))
+    return record['content'].encode('utf-8')
+
+
+class RecordingHttp(object):
+    """HTTP transport recording the exchanges made through another one.
+
+    Each request is forwarded to ``http``;  the method, URI, response
+    status and headers, response body and elapsed time are appended to
+    ``path``, as one JSON object per line of a gzip-compressed file.
+    Request headers (including credentials) and bodies are not recorded.
+
+    :type path: string
+    :param path: The file to write.
+
+    :type http: :class:`httplib2.Http` or class that defines ``request()``.
+    :param http: The transport making the requests.
+    """
+
+    def __init__(self, path, http):
+        self.path = path
+        self._http = http
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Finish writing the file."""
+        with self._lock:
+            self._file.close()
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                redirections=httplib2.DEFAULT_MAX_REDIRECTS,
+                connection_type=None):
+        """Perform a request, recording it.
+
+        Mirrors :meth:`httplib2.Http.request`.
+
+        :type uri: string
+        :param uri: The absolute URI of the request.
+
+        :type method: string
+        :param method: The HTTP method to use.
+
+        :type body: string
+        :param body: (Optional) The body of the request.
+
+        :type headers: dict
+        :param headers: (Optional) HTTP headers to send with the request.
+
+        :type redirections: integer
+        :param redirections: Number of redirects to follow.
+
+        :type connection_type: class
+        :param connection_type: (Optional) Override for the connection class.
+
+        :rtype: tuple of ``response`` (a dictionary of sorts)
+                and ``content`` (a string).
+        :returns: The HTTP response object and the content of the response.
+        """
+        start = _NOW()
+        response, content = self._http.request(
+            uri, method=method, body=body, headers=headers,
+            redirections=redirections, connection_type=connection_type)
+        record = {
+            'method': method,
+            'uri': uri,
+            'headers': dict(response),
+            'elapsed': _NOW() - start,
+        }
+        record.update(_encode_content(content))
+        line = json.dumps(record, separators=(',', ':'), sort_keys=True)
+        with self._lock:
+            self._file.write(line.encode('utf-8') + b'\n')
+        return response, content
+
+
+class ReplayHttp(object):
+    """HTTP transport serving exchanges recorded by :class:`RecordingHttp`.
+
+    Requests are matched on their method and URI.  The responses recorded
+    for a request are served in order, starting over once all were served
+    (so that a recorded session may be replayed repeatedly).
+
+    :type path: string
+    :param path: The file written by a :class:`RecordingHttp`.
+
+    :type latency_scale: float
+    :param latency_scale: Factor applied to the recorded elapsed time of
+                          each exchange, which is then waited for before
+                          responding:  ``1.0`` simulates the recorded
+                          latency, while ``0.0`` (the default) responds
+                          immediately.
+    """
+
+    def __init__(self, path, latency_scale=0.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._exchanges = collections.defaultdict(collections.deque)
+        file_obj = gzip.open(path, 'rb')
+        try:
+            for line in file_obj:
+                record = json.loads(line.decode('utf-8'))
+                self._exchanges[record['method'], record['uri']].append((
+                    record['headers'], _decode_content(record),
+                    record['elapsed']))
+        finally:
+            file_obj.close()
+
+    def __len__(self):
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                redirections=httplib2.DEFAULT_MAX_REDIRECTS,
+                connection_type=None):
+        """Serve the next recorded response to a request.
+
+        Mirrors :meth:`httplib2.Http.request`.
+
+        :type uri: string
+        :param uri: The absolute URI of the request.
+
+        :type method: string
+        :param method: The HTTP method to use.
+
+        :type body: string
+        :param body: (Optional) Ignored.
+
+        :type headers: dict
+        :param headers: (Optional) Ignored.
+
+        :type redirections: integer
+        :param redirections: Ignored.
+
+        :type connection_type: class
+        :param connection_type: Ignored.
+
+        :rtype: tuple of ``response`` (a dictionary of sorts)
+                and ``content`` (a string).
+        :returns: The HTTP response object and the content of the response.
+        :raises: :class:`KeyError` if no response was recorded for the
+                 request.
+        """
+        del body, headers, redirections, connection_type  # Unused.
+        with self._lock:
+            exchanges = self._exchanges.get((method, uri))
+            if not exchanges:
+                raise KeyError('No recorded response for %s %s' % (
+                    method, uri))
+            exchange = exchanges.popleft()
+            exchanges.append(exchange)
+        response_headers, content, elapsed = exchange
+        if self.latency_scale:
+            _SLEEP(elapsed * self.latency_scale)
+        return httplib2.Response(response_headers), content
@@ -1,4 +1,5 @@
 import os
+import re
 
 
 from setuptools import setup
@@ -11,6 +12,13 @@ with open(os.path.join(here, 'README.rst')) as f:
     README = f.read()
 
 
+# ``gcloud.__version__`` is the single source of the version;  it is read
+# rather than imported, as importing ``gcloud`` needs its requirements.
+with open(os.path.join(here, 'gcloud', '__init__.py')) as f:
+    VERSION = re.search(r"^__version__ = '([^']+)'$", f.read(),
+                        re.MULTILINE).group(1)
+
+
 REQUIREMENTS = [
     'httplib2 >= 0.9.1',
     'oauth2client >= 1.4.6',
@@ -21,7 +29,7 @@ REQUIREMENTS = [
 
 setup(
     name='gcloud',
-    version='0.8.0',
+    version=VERSION,
     description='API Client library for Google Cloud',
     author='Google Cloud Platform',
     author_email='jjg+gcloud-python@google.com',